@@ -0,0 +1,36 @@
+"""add MetricRunningTotal table
+
+Revision ID: j9k0l1m2n3o4
+Revises: i8j9k0l1m2n3
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "j9k0l1m2n3o4"
+down_revision: Union[str, None] = "i8j9k0l1m2n3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "MetricRunningTotal",
+        sa.Column("metric_key", sa.String(length=64), nullable=False),
+        sa.Column("season", sa.String(length=16), nullable=False),
+        sa.Column("entity_type", sa.String(length=16), nullable=False),
+        sa.Column("entity_id", sa.String(length=50), nullable=False),
+        sa.Column("totals_json", sa.Text(), nullable=False),
+        sa.Column("last_game_id", sa.String(length=20), nullable=True),
+        sa.Column("folded_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("metric_key", "season", "entity_type", "entity_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("MetricRunningTotal")
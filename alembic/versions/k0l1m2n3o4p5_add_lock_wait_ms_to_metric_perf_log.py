@@ -0,0 +1,28 @@
+"""add lock_wait_ms to MetricPerfLog
+
+Revision ID: k0l1m2n3o4p5
+Revises: j9k0l1m2n3o4
+Create Date: 2026-10-18 00:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "k0l1m2n3o4p5"
+down_revision: Union[str, None] = "j9k0l1m2n3o4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "MetricPerfLog",
+        sa.Column("lock_wait_ms", sa.Integer(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("MetricPerfLog", "lock_wait_ms")
@@ -0,0 +1,28 @@
+"""add peer_rank / peer_total to MetricResult
+
+Revision ID: l1m2n3o4p5q6
+Revises: k0l1m2n3o4p5
+Create Date: 2026-10-18 02:30:00.000000
+
+Populate existing rows with ``python -m db.backfill_metric_ranks``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "l1m2n3o4p5q6"
+down_revision: Union[str, None] = "k0l1m2n3o4p5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("MetricResult", sa.Column("peer_rank", sa.Integer(), nullable=True))
+    op.add_column("MetricResult", sa.Column("peer_total", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("MetricResult", "peer_total")
+    op.drop_column("MetricResult", "peer_rank")
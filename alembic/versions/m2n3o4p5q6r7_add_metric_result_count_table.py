@@ -0,0 +1,34 @@
+"""add MetricResultCount table
+
+Revision ID: m2n3o4p5q6r7
+Revises: l1m2n3o4p5q6
+Create Date: 2026-10-18 03:00:00.000000
+
+Populated by the ``tasks.metrics.reconcile_metric_result_counts`` beat task;
+the catalog falls back to the MetricResult GROUP BY until its first run.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "m2n3o4p5q6r7"
+down_revision: Union[str, None] = "l1m2n3o4p5q6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "MetricResultCount",
+        sa.Column("metric_key", sa.String(length=64), nullable=False),
+        sa.Column("season", sa.String(length=16), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("metric_key", "season"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("MetricResultCount")
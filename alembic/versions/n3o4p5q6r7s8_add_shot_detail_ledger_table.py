@@ -0,0 +1,44 @@
+"""add ShotDetailLedger table
+
+Revision ID: n3o4p5q6r7s8
+Revises: m2n3o4p5q6r7
+Create Date: 2026-10-18 05:00:00.000000
+
+Seed it once with ``python -m db.backfill_nba_player_shot_detail --ledger-only``;
+until a game has a row, the all-games gap finder does not report it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "n3o4p5q6r7s8"
+down_revision: Union[str, None] = "m2n3o4p5q6r7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ShotDetailLedger",
+        sa.Column("game_id", sa.String(length=50), nullable=False),
+        sa.Column("season", sa.String(length=50), nullable=True),
+        sa.Column("expected_fga", sa.Integer(), nullable=False),
+        sa.Column("stored_attempts", sa.Integer(), nullable=False),
+        sa.Column("missing_attempts", sa.Integer(), nullable=False),
+        sa.Column("is_complete", sa.Boolean(), nullable=False),
+        sa.Column("verified_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["game_id"], ["Game.game_id"]),
+        sa.PrimaryKeyConstraint("game_id"),
+    )
+    op.create_index(
+        "ix_ShotDetailLedger_complete_season",
+        "ShotDetailLedger",
+        ["is_complete", "season"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ShotDetailLedger_complete_season", table_name="ShotDetailLedger")
+    op.drop_table("ShotDetailLedger")
@@ -0,0 +1,49 @@
+"""add GameArtifactStatus table
+
+Revision ID: o4p5q6r7s8t9
+Revises: n3o4p5q6r7s8
+Create Date: 2026-10-18 06:00:00.000000
+
+Rows are created by ``tasks.ingest`` the first time it probes a game; games
+without one are probed as before, so no backfill is required.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "o4p5q6r7s8t9"
+down_revision: Union[str, None] = "n3o4p5q6r7s8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "GameArtifactStatus",
+        sa.Column("game_id", sa.String(length=50), nullable=False),
+        sa.Column("season", sa.String(length=50), nullable=True),
+        sa.Column("game_date", sa.DATE(), nullable=True),
+        sa.Column("has_detail", sa.Boolean(), nullable=False),
+        sa.Column("has_pbp", sa.Boolean(), nullable=False),
+        sa.Column("has_shot", sa.Boolean(), nullable=False),
+        sa.Column("has_line", sa.Boolean(), nullable=False),
+        sa.Column("has_period", sa.Boolean(), nullable=False),
+        sa.Column("has_metric_run_logs", sa.Boolean(), nullable=False),
+        sa.Column("has_metric_results", sa.Boolean(), nullable=False),
+        sa.Column("complete", sa.Boolean(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["game_id"], ["Game.game_id"]),
+        sa.PrimaryKeyConstraint("game_id"),
+    )
+    op.create_index(
+        "ix_GameArtifactStatus_game_date_complete",
+        "GameArtifactStatus",
+        ["game_date", "complete"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_GameArtifactStatus_game_date_complete", table_name="GameArtifactStatus")
+    op.drop_table("GameArtifactStatus")
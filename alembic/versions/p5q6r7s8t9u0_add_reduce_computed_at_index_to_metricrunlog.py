@@ -0,0 +1,29 @@
+"""add (metric_key, season, computed_at) index to MetricRunLog
+
+Revision ID: p5q6r7s8t9u0
+Revises: o4p5q6r7s8t9
+Create Date: 2026-10-18 18:00:00.000000
+
+Lets the incremental reduce find rows re-mapped since its oldest checkpoint
+with a range scan instead of reading the whole (metric_key, season).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "p5q6r7s8t9u0"
+down_revision: Union[str, None] = "o4p5q6r7s8t9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_MetricRunLog_reduce_computed_at", "MetricRunLog",
+        ["metric_key", "season", "computed_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_MetricRunLog_reduce_computed_at", "MetricRunLog")
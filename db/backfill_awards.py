@@ -13,18 +13,12 @@ import time
 from collections import defaultdict
 from dataclasses import dataclass
 
-from requests.exceptions import ConnectionError, Timeout
 from sqlalchemy import or_
 from sqlalchemy.orm import sessionmaker
-from tenacity import (
-    RetryError,
-    before_sleep_log,
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
+from tenacity import RetryError
 
+from db.data_version import bump_data_versions
+from db.nba_fetch import scheduled
 from db.models import Award, Game, PlayerGameStats, Team, engine
 
 try:
@@ -267,12 +261,7 @@ def _player_award_seed_from_row(row: dict[str, object], team_lookup: dict[str, l
     )
 
 
-@retry(
-    wait=wait_exponential(multiplier=1, max=60),
-    stop=stop_after_attempt(8),
-    retry=retry_if_exception_type((ConnectionError, Timeout, Exception)),
-    before_sleep=before_sleep_log(logger, logging.INFO),
-)
+@scheduled("lookup", retry_on=(Exception,), attempts=8, max_wait=60)
 def _fetch_player_awards(player_id: str) -> list[dict[str, object]]:
     if playerawards is None:
         raise RuntimeError("nba_api is not installed; cannot fetch player awards")
@@ -282,12 +271,7 @@ def _fetch_player_awards(player_id: str) -> list[dict[str, object]]:
     return [dict(zip(headers, row)) for row in payload["data"]]
 
 
-@retry(
-    wait=wait_exponential(multiplier=1, max=60),
-    stop=stop_after_attempt(8),
-    retry=retry_if_exception_type((ConnectionError, Timeout, Exception)),
-    before_sleep=before_sleep_log(logger, logging.INFO),
-)
+@scheduled("league", retry_on=(Exception,), attempts=8, max_wait=60)
 def _fetch_scoring_leader(season_text: str) -> dict[str, object] | None:
     if leagueleaders is None:
         raise RuntimeError("nba_api is not installed; cannot fetch league leaders")
@@ -461,6 +445,7 @@ def run(*, dry_run: bool = False, only_season: int | None = None) -> dict[str, i
             session.rollback()
         else:
             session.commit()
+            bump_data_versions("awards")
 
         logger.info("Done. inserted=%s updated=%s skipped=%s", stats["inserted"], stats["updated"], stats["skipped"])
         return stats
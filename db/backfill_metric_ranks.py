@@ -0,0 +1,79 @@
+"""Backfill MetricResult.peer_rank / peer_total.
+
+Reducers keep the columns current from the first run after the
+``l1m2n3o4p5q6`` migration; this fills in rows written before it. Pages fall
+back to the live peer self-join until a row is ranked, so the backfill can run
+while the site is serving.
+
+Usage:
+  python -m db.backfill_metric_ranks
+  python -m db.backfill_metric_ranks --metric-key points_per_game --season 22025
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+from collections import Counter
+
+from sqlalchemy.orm import sessionmaker
+
+from db.models import MetricResult, engine
+from metrics.framework.runner import _ranks_maintained, refresh_metric_pool
+from metrics.framework.runtime import get_metric
+
+
+logger = logging.getLogger(__name__)
+SessionLocal = sessionmaker(bind=engine)
+
+
+def _metric_season_pairs(session, metric_keys=None, seasons=None) -> list[tuple[str, str]]:
+    query = session.query(MetricResult.metric_key, MetricResult.season).distinct()
+    if metric_keys:
+        query = query.filter(MetricResult.metric_key.in_(metric_keys))
+    if seasons:
+        query = query.filter(MetricResult.season.in_(seasons))
+    return sorted((str(metric_key), str(season)) for metric_key, season in query.all() if season)
+
+
+def backfill_ranks(metric_keys=None, seasons=None, *, dry_run: bool = False) -> dict:
+    counts: Counter[str] = Counter()
+    with SessionLocal() as session:
+        pairs = _metric_season_pairs(session, metric_keys, seasons)
+        metric_defs: dict = {}
+        for idx, (metric_key, season) in enumerate(pairs, start=1):
+            if metric_key not in metric_defs:
+                metric_defs[metric_key] = get_metric(metric_key, session=session)
+            metric_def = metric_defs[metric_key]
+            if not _ranks_maintained(metric_def):
+                counts["skipped"] += 1
+                continue
+            counts["rows_updated"] += refresh_metric_pool(session, metric_key, season, metric_def)
+            counts["pairs"] += 1
+            if dry_run:
+                session.rollback()
+            else:
+                session.commit()
+            if idx % 100 == 0:
+                logger.info(
+                    "backfill_metric_ranks progress=%d/%d rows_updated=%d",
+                    idx,
+                    len(pairs),
+                    counts["rows_updated"],
+                )
+    return dict(counts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill stored MetricResult peer ranks.")
+    parser.add_argument("--metric-key", action="append", help="Metric key to rank. Defaults to every metric with results.")
+    parser.add_argument("--season", action="append", help="Season to rank. Defaults to every season with results.")
+    parser.add_argument("--dry-run", action="store_true", help="Compute ranks without committing changes.")
+    parser.add_argument("--verbose", action="store_true", help="Enable INFO logging.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    print(backfill_ranks(args.metric_key, args.season, dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,18 +13,12 @@ from dataclasses import dataclass
 from datetime import date
 from functools import lru_cache
 
-from requests.exceptions import ConnectionError, Timeout
 from sqlalchemy.orm import sessionmaker
-from tenacity import (
-    RetryError,
-    before_sleep_log,
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
+from tenacity import RetryError
 
+from db.data_version import bump_data_versions
 from db.models import Player, engine
+from db.nba_fetch import scheduled
 
 try:
     from nba_api.stats.endpoints import drafthistory
@@ -61,12 +55,7 @@ class BackfillCounts:
         self.errors += other.errors
 
 
-@retry(
-    wait=wait_exponential(multiplier=1, max=60),
-    stop=stop_after_attempt(10),
-    retry=retry_if_exception_type((ConnectionError, Timeout, Exception)),
-    before_sleep=before_sleep_log(logger, logging.INFO),
-)
+@scheduled("league", retry_on=(Exception,), attempts=10, max_wait=60)
 def fetch_draft_history(year: int) -> list[dict]:
     """Fetch all draft picks for a single year."""
     if drafthistory is None:
@@ -218,6 +207,7 @@ def run(year: int | None = None, refresh_all: bool = False) -> BackfillCounts:
             if index < total_years:
                 time.sleep(RATE_LIMIT_SECONDS)
 
+        bump_data_versions("players")
         logger.info(
             "Done. Updated: %s, Created: %s, Skipped: %s, Errors: %s",
             total.updated,
@@ -1,14 +1,22 @@
 from nba_api.stats.endpoints import boxscoretraditionalv3
 from nba_api.stats.library.http import STATS_HEADERS
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
 from datetime import datetime
 from db.game_status import infer_game_status
 from db.models import Team, TeamGameStats, PlayerGameStats, Player, Game, engine
+from db.nba_fetch import scheduled
+from db.nba_response_cache import cached_response
+from db.slug_index import publish_slug_changes
 from sqlalchemy import func
-from tenacity import retry, wait_exponential, stop_after_attempt, retry_if_exception_type, before_sleep_log, RetryError
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from tenacity import RetryError
 from requests.exceptions import ConnectionError, Timeout
 import logging
 
 API_TIMEOUT_SECONDS = 12
+# Tries per period when the payload fails to normalise (the scheduler retries network errors itself).
+PERIOD_STATS_ATTEMPTS = 4
 
 
 def _stats_headers():
@@ -213,19 +221,31 @@ def get_team_id(session, matchup):
     return homeTeamList, roadTeamList
 
 
-@retry(
-    wait=wait_exponential(multiplier=1, max=4),  # Wait 1, 2, 4 seconds
-    stop=stop_after_attempt(4),  # Retry on transient API/transport issues
-    retry=retry_if_exception_type((ConnectionError, Timeout, ValueError)),  # Retry only transient issues
-    before_sleep=before_sleep_log(logger, logging.INFO)  # Log before sleep
-)
+def _box_score_cacheable(raw, params):
+    """Keep period requests that came back as full-game totals out of the response cache."""
+    period = params.get("period")
+    if period is None or not isinstance(raw, dict):
+        return True
+    try:
+        rows = _period_player_rows(raw, params.get("game_id"))
+    except ValueError:
+        return False
+    return rows is None or _rows_look_like_single_period(rows, period)
+
+
+@cached_response("boxscoretraditionalv3", cacheable=_box_score_cacheable)
+@scheduled("boxscore", retry_on=(ConnectionError, Timeout, ValueError), attempts=4, max_wait=4)
+def fetch_box_score_raw(game_id, period=None):
+    """Raw BoxScoreTraditionalV3 JSON for the whole game, or for one period."""
+    params = dict(game_id=game_id, timeout=API_TIMEOUT_SECONDS, headers=_stats_headers())
+    if period is not None:
+        params.update(start_period=str(period), end_period=str(period), range_type='1')
+    return boxscoretraditionalv3.BoxScoreTraditionalV3(**params).get_dict()
+
+
 def fetch_game_details(game_id):
     try:
-        raw = boxscoretraditionalv3.BoxScoreTraditionalV3(
-            game_id=game_id,
-            timeout=API_TIMEOUT_SECONDS,
-            headers=_stats_headers(),
-        ).get_dict()
+        raw = fetch_box_score_raw(game_id)
         boxscore = raw.get('boxScoreTraditional') or {}
 
         home_team = boxscore.get('homeTeam') or {}
@@ -253,54 +273,63 @@ def fetch_game_details(game_id):
         raise e
 
 
-@retry(
-    wait=wait_exponential(multiplier=1, max=4),
-    stop=stop_after_attempt(4),
-    retry=retry_if_exception_type((ConnectionError, Timeout, ValueError)),
-    before_sleep=before_sleep_log(logger, logging.INFO),
-)
 def fetch_period_stats(game_id, period):
-    """Fetch box score for a single period. Returns None if period has no data."""
-    try:
-        raw = boxscoretraditionalv3.BoxScoreTraditionalV3(
-            game_id=game_id,
-            start_period=str(period),
-            end_period=str(period),
-            range_type='1',
-            timeout=API_TIMEOUT_SECONDS,
-            headers=_stats_headers(),
-        ).get_dict()
-        if not isinstance(raw, dict):
-            return None
-        boxscore = raw.get('boxScoreTraditional') or {}
-        home_team = boxscore.get('homeTeam') or {}
-        away_team = boxscore.get('awayTeam') or {}
-        all_players = (home_team.get('players') or []) + (away_team.get('players') or [])
-        # dict.get(k, {}) returns {} only when k is absent. If the API returns
-        # statistics: null (happens for DNP players), we get None, and the
-        # chained .get('minutes') raises NoneType — which earlier dropped
-        # 0042500162 out of the metric pipeline entirely. Use `or {}` instead.
-        if not any((p.get('statistics') or {}).get('minutes', '0:00') != '0:00' for p in all_players):
-            return None
-        rows = []
-        for team in [home_team, away_team]:
-            team_id = team.get('teamId')
-            for player in team.get('players') or []:
-                stats = player.get('statistics') or {}
-                if stats.get('minutes', '0:00') == '0:00':
-                    continue
-                rows.append(_normalize_player_stats(player, team_id, game_id))
-        if not _rows_look_like_single_period(rows, period):
-            logger.warning(
-                "Period %s for %s looks like full-game totals; skipping period stats.",
-                period,
-                game_id,
-            )
-            return None
-        return rows
-    except Exception as e:
-        logger.error(f"Failed to fetch period {period} for {game_id}: {e}")
-        raise
+    """Fetch box score for a single period. Returns None if period has no data.
+
+    A payload that fails to normalise (ValueError) is fetched again, bypassing
+    the response cache, up to ``PERIOD_STATS_ATTEMPTS`` times.
+    """
+    for attempt in range(1, PERIOD_STATS_ATTEMPTS + 1):
+        try:
+            raw = fetch_box_score_raw(game_id, period, refresh_cache=attempt > 1)
+            return _period_stats_rows(raw, game_id, period)
+        except ValueError as e:
+            if attempt == PERIOD_STATS_ATTEMPTS:
+                logger.error(f"Failed to fetch period {period} for {game_id}: {e}")
+                raise
+            logger.warning(f"Refetching period {period} for {game_id} after a bad payload: {e}")
+        except Exception as e:
+            logger.error(f"Failed to fetch period {period} for {game_id}: {e}")
+            raise
+
+
+def _period_stats_rows(raw, game_id, period):
+    if not isinstance(raw, dict):
+        return None
+    rows = _period_player_rows(raw, game_id)
+    if rows is None:
+        return None
+    if not _rows_look_like_single_period(rows, period):
+        logger.warning(
+            "Period %s for %s looks like full-game totals; skipping period stats.",
+            period,
+            game_id,
+        )
+        return None
+    return rows
+
+
+def _period_player_rows(raw, game_id):
+    """Normalised rows of the players who played in a period box score; None when nobody did."""
+    boxscore = raw.get('boxScoreTraditional') or {}
+    home_team = boxscore.get('homeTeam') or {}
+    away_team = boxscore.get('awayTeam') or {}
+    all_players = (home_team.get('players') or []) + (away_team.get('players') or [])
+    # dict.get(k, {}) returns {} only when k is absent. If the API returns
+    # statistics: null (happens for DNP players), we get None, and the
+    # chained .get('minutes') raises NoneType — which earlier dropped
+    # 0042500162 out of the metric pipeline entirely. Use `or {}` instead.
+    if not any((p.get('statistics') or {}).get('minutes', '0:00') != '0:00' for p in all_players):
+        return None
+    rows = []
+    for team in [home_team, away_team]:
+        team_id = team.get('teamId')
+        for player in team.get('players') or []:
+            stats = player.get('statistics') or {}
+            if stats.get('minutes', '0:00') == '0:00':
+                continue
+            rows.append(_normalize_player_stats(player, team_id, game_id))
+    return rows
 
 
 def has_game_period_stats(session, game_id: str, *, min_periods: int = 4) -> bool:
@@ -317,161 +346,254 @@ def has_game_period_stats(session, game_id: str, *, min_periods: int = 4) -> boo
     ) >= min_periods
 
 
+def _period_stats_or_none(game_id, period):
+    try:
+        return fetch_period_stats(game_id, period)
+    except Exception:
+        # Retries exhausted, or the API has no such period.
+        return None
+
+
 def fetch_all_period_stats(game_id):
-    """Fetch per-period box scores for all periods (Q1-Q4 + OTs)."""
-    import time as _time
-    all_periods = {}
-    for period in range(1, 12):
-        try:
-            rows = fetch_period_stats(game_id, period)
-        except RetryError:
-            # Network failure after retries — stop trying more periods
-            if period <= 4:
-                return {}
-            logger.info("period %s unavailable for game %s (likely no overtime).", period, game_id)
-            break
-        except Exception:
-            # API parse error (e.g. period doesn't exist) — no more periods
-            if period <= 4:
-                return {}
-            logger.info("period %s unavailable for game %s (likely no overtime).", period, game_id)
-            break
+    """Fetch per-period box scores for all periods (Q1-Q4 + OTs).
+
+    The four quarters are requested concurrently; the shared nba_api
+    scheduler paces them. Overtimes follow one at a time until a period
+    comes back empty.
+    """
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        # Each worker runs in a copy of this context, so refreshing_responses() reaches it.
+        futures = [
+            pool.submit(contextvars.copy_context().run, _period_stats_or_none, game_id, period)
+            for period in range(1, 5)
+        ]
+        regulation = [future.result() for future in futures]
+    if any(rows is None for rows in regulation):
+        return {}
+    all_periods = dict(zip(range(1, 5), regulation))
+    for period in range(5, 12):
+        rows = _period_stats_or_none(game_id, period)
         if rows is None:
-            if period <= 4:
-                return {}
+            logger.info("period %s unavailable for game %s (likely no overtime).", period, game_id)
             break
         all_periods[period] = rows
-        _time.sleep(0.5)
     return all_periods
 
 
-def create_player_period_stats(session, game_id, period, player_stats):
-    """Create or update a PlayerGamePeriodStats row."""
-    if PlayerGamePeriodStats is None:
-        return
-    player_id = str(player_stats['PLAYER_ID'])
-    team_id = str(player_stats['TEAM_ID'])
+def _player_period_stats_values(player_stats):
     min_value, sec_value = _parse_minutes(player_stats.get('MIN'))
+    return {
+        'min': min_value,
+        'sec': sec_value,
+        'pts': player_stats['PTS'],
+        'fgm': player_stats['FGM'],
+        'fga': player_stats['FGA'],
+        'fg3m': player_stats['FG3M'],
+        'fg3a': player_stats['FG3A'],
+        'ftm': player_stats['FTM'],
+        'fta': player_stats['FTA'],
+        'oreb': player_stats['OREB'],
+        'dreb': player_stats['DREB'],
+        'reb': player_stats['REB'],
+        'ast': player_stats['AST'],
+        'stl': player_stats['STL'],
+        'blk': player_stats['BLK'],
+        'tov': player_stats['TO'],
+        'pf': player_stats['PF'],
+        'plus_minus': player_stats['PLUS_MINUS'],
+    }
 
-    record = session.query(PlayerGamePeriodStats).filter_by(
-        game_id=game_id, team_id=team_id, player_id=player_id, period=period,
-    ).first()
-    if record is None:
-        record = PlayerGamePeriodStats(
-            game_id=game_id, team_id=team_id, player_id=player_id, period=period,
-        )
-    record.min = min_value
-    record.sec = sec_value
-    record.pts = player_stats['PTS']
-    record.fgm = player_stats['FGM']
-    record.fga = player_stats['FGA']
-    record.fg3m = player_stats['FG3M']
-    record.fg3a = player_stats['FG3A']
-    record.ftm = player_stats['FTM']
-    record.fta = player_stats['FTA']
-    record.oreb = player_stats['OREB']
-    record.dreb = player_stats['DREB']
-    record.reb = player_stats['REB']
-    record.ast = player_stats['AST']
-    record.stl = player_stats['STL']
-    record.blk = player_stats['BLK']
-    record.tov = player_stats['TO']
-    record.pf = player_stats['PF']
-    record.plus_minus = player_stats['PLUS_MINUS']
-    session.add(record)
-
-
-def create_team_game_stats(session, game_id, team_stats, on_road, win):
-    team_id = str(team_stats['TEAM_ID'])
-    team_game_status_record = session.query(TeamGameStats).filter_by(game_id=game_id, team_id=team_id).first()
+
+def _team_game_stats_values(team_stats, on_road, win):
     min_value, _ = _parse_minutes(team_stats.get('MIN'))
-    if team_game_status_record is None:
-        team_game_status_record = TeamGameStats(
-            game_id=game_id,
-            team_id=team_id,
-        )
-    team_game_status_record.data_source = NBA_API_BOX_SCORE_SOURCE
-    team_game_status_record.on_road = on_road
-    team_game_status_record.win = win
-    team_game_status_record.min = min_value
-    team_game_status_record.pts = team_stats['PTS']
-    team_game_status_record.fgm = team_stats['FGM']
-    team_game_status_record.fga = team_stats['FGA']
-    team_game_status_record.fg_pct = team_stats['FG_PCT']
-    team_game_status_record.fg3m = team_stats['FG3M']
-    team_game_status_record.fg3a = team_stats['FG3A']
-    team_game_status_record.fg3_pct = team_stats['FG3_PCT']
-    team_game_status_record.ftm = team_stats['FTM']
-    team_game_status_record.fta = team_stats['FTA']
-    team_game_status_record.ft_pct = team_stats['FT_PCT']
-    team_game_status_record.oreb = team_stats['OREB']
-    team_game_status_record.dreb = team_stats['DREB']
-    team_game_status_record.reb = team_stats['REB']
-    team_game_status_record.ast = team_stats['AST']
-    team_game_status_record.stl = team_stats['STL']
-    team_game_status_record.blk = team_stats['BLK']
-    team_game_status_record.tov = team_stats['TO']
-    team_game_status_record.pf = team_stats['PF']
-    session.add(team_game_status_record)
-
-
-def create_player_game_stats(session, player_stats):
-    # create player if not exist
-    player_record=session.query(Player).filter_by(
-        player_id=str(player_stats['PLAYER_ID']),
-    ).first()
-    if player_record is None:
-        logger.error(f"Create player {player_stats['PLAYER_NAME']}, id: {player_stats['PLAYER_ID']}")
-        name_parts = player_stats['PLAYER_NAME'].split()
-        player_record = Player(
-            player_id=str(player_stats['PLAYER_ID']),
-            first_name=name_parts[0] if name_parts else player_stats['PLAYER_NAME'],
-            last_name=' '.join(name_parts[1:]) if len(name_parts) > 1 else '',
-            full_name=player_stats['PLAYER_NAME'],
-            nick_name=player_stats['NICKNAME'],
-            is_active=True,
-        )
-        session.add(player_record)
+    return {
+        'data_source': NBA_API_BOX_SCORE_SOURCE,
+        'on_road': on_road,
+        'win': win,
+        'min': min_value,
+        'pts': team_stats['PTS'],
+        'fgm': team_stats['FGM'],
+        'fga': team_stats['FGA'],
+        'fg_pct': team_stats['FG_PCT'],
+        'fg3m': team_stats['FG3M'],
+        'fg3a': team_stats['FG3A'],
+        'fg3_pct': team_stats['FG3_PCT'],
+        'ftm': team_stats['FTM'],
+        'fta': team_stats['FTA'],
+        'ft_pct': team_stats['FT_PCT'],
+        'oreb': team_stats['OREB'],
+        'dreb': team_stats['DREB'],
+        'reb': team_stats['REB'],
+        'ast': team_stats['AST'],
+        'stl': team_stats['STL'],
+        'blk': team_stats['BLK'],
+        'tov': team_stats['TO'],
+        'pf': team_stats['PF'],
+    }
 
-    player_game_status_record = session.query(PlayerGameStats).filter_by(
-        game_id=player_stats['GAME_ID'],
-        player_id=str(player_stats['PLAYER_ID']),
-        team_id=str(player_stats['TEAM_ID'])
-    ).first()
+
+def _player_game_stats_values(player_stats):
     min_value, sec_value = _parse_minutes(player_stats.get('MIN'))
-    if player_game_status_record is None:
-        player_game_status_record = PlayerGameStats(
-            game_id=player_stats['GAME_ID'],
-            team_id=str(player_stats['TEAM_ID']),
-            player_id=str(player_stats['PLAYER_ID']),
+    return {
+        'data_source': NBA_API_BOX_SCORE_SOURCE,
+        'comment': player_stats['COMMENT'],
+        'min': min_value,
+        'sec': sec_value,
+        'starter': bool(player_stats['START_POSITION']),
+        'position': player_stats['START_POSITION'],
+        'pts': player_stats['PTS'],
+        'fgm': player_stats['FGM'],
+        'fga': player_stats['FGA'],
+        'fg_pct': player_stats['FG_PCT'],
+        'fg3m': player_stats['FG3M'],
+        'fg3a': player_stats['FG3A'],
+        'fg3_pct': player_stats['FG3_PCT'],
+        'ftm': player_stats['FTM'],
+        'fta': player_stats['FTA'],
+        'ft_pct': player_stats['FT_PCT'],
+        'oreb': player_stats['OREB'],
+        'dreb': player_stats['DREB'],
+        'reb': player_stats['REB'],
+        'ast': player_stats['AST'],
+        'stl': player_stats['STL'],
+        'blk': player_stats['BLK'],
+        'tov': player_stats['TO'],
+        'pf': player_stats['PF'],
+        'plus': player_stats['PLUS_MINUS'],
+    }
+
+
+def _new_player_values(player_stats):
+    name_parts = player_stats['PLAYER_NAME'].split()
+    return {
+        'player_id': str(player_stats['PLAYER_ID']),
+        'first_name': name_parts[0] if name_parts else player_stats['PLAYER_NAME'],
+        'last_name': ' '.join(name_parts[1:]) if len(name_parts) > 1 else '',
+        'full_name': player_stats['PLAYER_NAME'],
+        'nick_name': player_stats['NICKNAME'],
+        'is_active': True,
+    }
+
+
+class BoxScoreRows:
+    """Box score rows for one or more games, written in a few multi-row statements.
+
+    A SELECT plus an ORM update per row costs more than 100 round trips per
+    game once period stats are included. Adding rows here only builds them
+    in memory. ``write`` then sends one SELECT for the players that already
+    exist, one INSERT for the missing ``Player`` rows, and one
+    ``INSERT ... ON DUPLICATE KEY UPDATE`` per table per
+    ``UPSERT_CHUNK_ROWS`` rows, so a season re-ingest can collect many
+    games (``extend``) before writing. Sessions on other dialects (the
+    SQLite test databases) fall back to ``session.merge`` per row.
+    """
+
+    UPSERT_CHUNK_ROWS = 1000
+
+    def __init__(self):
+        self.new_players = {}
+        self.team_game_stats = {}
+        self.player_game_stats = {}
+        self.player_period_stats = {}
+
+    @property
+    def game_ids(self):
+        return {key[0] for key in self.team_game_stats} | {key[0] for key in self.player_game_stats}
+
+    def extend(self, other):
+        """Queue everything ``other`` holds, e.g. a game that finished cleanly."""
+        self.new_players.update(other.new_players)
+        self.team_game_stats.update(other.team_game_stats)
+        self.player_game_stats.update(other.player_game_stats)
+        self.player_period_stats.update(other.player_period_stats)
+
+    def for_game(self, game_id):
+        """A copy holding only ``game_id``'s rows, e.g. to retry a failed batch one game at a time."""
+        rows = BoxScoreRows()
+        rows.team_game_stats = {key: values for key, values in self.team_game_stats.items() if key[0] == game_id}
+        rows.player_game_stats = {key: values for key, values in self.player_game_stats.items() if key[0] == game_id}
+        rows.player_period_stats = {key: values for key, values in self.player_period_stats.items() if key[0] == game_id}
+        player_ids = {key[2] for key in rows.player_game_stats} | {key[2] for key in rows.player_period_stats}
+        rows.new_players = {player_id: values for player_id, values in self.new_players.items() if player_id in player_ids}
+        return rows
+
+    def add_team_game_stats(self, game_id, team_stats, on_road, win):
+        key = (game_id, str(team_stats['TEAM_ID']))
+        self.team_game_stats[key] = {
+            'game_id': key[0], 'team_id': key[1], **_team_game_stats_values(team_stats, on_road, win),
+        }
+
+    def add_player_game_stats(self, player_stats):
+        """Queue one player's game line (and the Player row if missing); returns whether they started."""
+        key = (player_stats['GAME_ID'], str(player_stats['TEAM_ID']), str(player_stats['PLAYER_ID']))
+        self.new_players.setdefault(key[2], _new_player_values(player_stats))
+        self.player_game_stats[key] = {
+            'game_id': key[0], 'team_id': key[1], 'player_id': key[2], **_player_game_stats_values(player_stats),
+        }
+        return bool(player_stats['START_POSITION'])
+
+    def add_player_period_stats(self, game_id, period, player_stats):
+        key = (game_id, str(player_stats['TEAM_ID']), str(player_stats['PLAYER_ID']), period)
+        self.player_period_stats[key] = {
+            'game_id': key[0], 'team_id': key[1], 'player_id': key[2], 'period': key[3],
+            **_player_period_stats_values(player_stats),
+        }
+
+    def add_period_data(self, game_id, period_data):
+        for period, period_rows in period_data.items():
+            for player_stats in period_rows:
+                self.add_player_period_stats(game_id, period, player_stats)
+
+    def write(self, session):
+        """Write everything queued so far in the caller's transaction, then clear it."""
+        mysql = session.get_bind().dialect.name == "mysql"
+        if self.new_players:
+            existing = {
+                row.player_id
+                for row in session.query(Player.player_id).filter(Player.player_id.in_(list(self.new_players))).all()
+            }
+            missing = [values for player_id, values in self.new_players.items() if player_id not in existing]
+            for values in missing:
+                logger.error(f"Create player {values['full_name']}, id: {values['player_id']}")
+            if missing and mysql:
+                # IGNORE: a concurrent ingest may create the same rookie first.
+                session.execute(mysql_insert(Player).prefix_with("IGNORE").values(missing))
+            elif missing:
+                session.add_all(Player(**values) for values in missing)
+                session.flush()
+        tables = [(TeamGameStats, self.team_game_stats), (PlayerGameStats, self.player_game_stats)]
+        if PlayerGamePeriodStats is not None:
+            tables.append((PlayerGamePeriodStats, self.player_period_stats))
+        for model, rows in tables:
+            if mysql:
+                _upsert_rows(session, model, list(rows.values()), self.UPSERT_CHUNK_ROWS)
+            else:
+                for values in rows.values():
+                    session.merge(model(**values))
+        self.clear()
+
+    def clear(self):
+        for rows in (self.new_players, self.team_game_stats, self.player_game_stats, self.player_period_stats):
+            rows.clear()
+
+
+def _upsert_rows(session, model, rows, chunk_size):
+    if not rows:
+        return
+    key_columns = {column.name for column in model.__table__.primary_key.columns}
+    for start in range(0, len(rows), chunk_size):
+        stmt = mysql_insert(model).values(rows[start:start + chunk_size])
+        stmt = stmt.on_duplicate_key_update(
+            {name: stmt.inserted[name] for name in rows[0] if name not in key_columns}
         )
-    player_game_status_record.data_source = NBA_API_BOX_SCORE_SOURCE
-    player_game_status_record.comment = player_stats['COMMENT']
-    player_game_status_record.min = min_value
-    player_game_status_record.sec = sec_value
-    player_game_status_record.starter = bool(player_stats['START_POSITION'])
-    player_game_status_record.position = player_stats['START_POSITION']
-    player_game_status_record.pts = player_stats['PTS']
-    player_game_status_record.fgm = player_stats['FGM']
-    player_game_status_record.fga = player_stats['FGA']
-    player_game_status_record.fg_pct = player_stats['FG_PCT']
-    player_game_status_record.fg3m = player_stats['FG3M']
-    player_game_status_record.fg3a = player_stats['FG3A']
-    player_game_status_record.fg3_pct = player_stats['FG3_PCT']
-    player_game_status_record.ftm = player_stats['FTM']
-    player_game_status_record.fta = player_stats['FTA']
-    player_game_status_record.ft_pct = player_stats['FT_PCT']
-    player_game_status_record.oreb = player_stats['OREB']
-    player_game_status_record.dreb = player_stats['DREB']
-    player_game_status_record.reb = player_stats['REB']
-    player_game_status_record.ast = player_stats['AST']
-    player_game_status_record.stl = player_stats['STL']
-    player_game_status_record.blk = player_stats['BLK']
-    player_game_status_record.tov = player_stats['TO']
-    player_game_status_record.pf = player_stats['PF']
-    player_game_status_record.plus = player_stats['PLUS_MINUS']
-    session.add(player_game_status_record)
-    return bool(player_stats['START_POSITION'])
+        session.execute(stmt)
+
+
+def store_player_period_stats(session, game_id, period_data):
+    """Upsert a game's per-period player rows as fetched by ``fetch_all_period_stats``."""
+    rows = BoxScoreRows()
+    rows.add_period_data(game_id, period_data)
+    rows.write(session)
 
 
 def is_game_detail_back_filled(game_id, sess):
@@ -492,7 +614,8 @@ def is_game_detail_back_filled(game_id, sess):
     return total_pts > 0
 
 
-def back_fill_game_detail(game, game_record, sess, commit):
+def back_fill_game_detail(game, game_record, sess, commit, rows=None):
+    """Store one game's box score; with ``rows`` the stats rows are only queued there for the caller to write."""
     if is_game_detail_back_filled(game['GAME_ID'], sess):
         logger.info("skip back filling game detail for game {}, id {}".format(game['MATCHUP'], game['GAME_ID']))
         return True
@@ -545,9 +668,12 @@ def back_fill_game_detail(game, game_record, sess, commit):
     # Compute or refresh the slug. Also rewrite the legacy `game-<id>`
     # fallback that the alembic migration set for rows whose teams weren't
     # known at migration time — those teams are now filled in.
+    rewritten_slug = None
     if not game_record.slug or game_record.slug == f"game-{game['GAME_ID']}":
         computed = _compute_game_slug(sess, game_record)
         if computed:
+            if game_record.slug and computed != game_record.slug:
+                rewritten_slug = computed
             game_record.slug = computed
 
     # Ensure parent Game row exists before inserting child stats rows.
@@ -555,28 +681,31 @@ def back_fill_game_detail(game, game_record, sess, commit):
     sess.flush()
 
     # Store stats for home and visitor team
-    create_team_game_stats(sess, game['GAME_ID'], home_team_stats, False,
-                           home_team_stats['PTS'] > road_team_stats['PTS'])
-    create_team_game_stats(sess, game['GAME_ID'], road_team_stats, True,
-                           home_team_stats['PTS'] < road_team_stats['PTS'])
+    queue_only = rows is not None
+    if rows is None:
+        rows = BoxScoreRows()
+    rows.add_team_game_stats(game['GAME_ID'], home_team_stats, False,
+                             home_team_stats['PTS'] > road_team_stats['PTS'])
+    rows.add_team_game_stats(game['GAME_ID'], road_team_stats, True,
+                             home_team_stats['PTS'] < road_team_stats['PTS'])
 
     # Backfill player game status
     starter = 0
     for player_stats in game_details['PlayerStats']:
-        starter += create_player_game_stats(sess, player_stats)
+        starter += rows.add_player_game_stats(player_stats)
     if starter != 10:
         logger.warning('not 10 starters in the game {}'.format(game['MATCHUP']))
 
     # Backfill per-period player stats
     try:
         period_data = fetch_all_period_stats(game['GAME_ID'])
-        for period, period_rows in period_data.items():
-            for ps in period_rows:
-                create_player_period_stats(sess, game['GAME_ID'], period, ps)
+        rows.add_period_data(game['GAME_ID'], period_data)
         if period_data:
             logger.info(f"Stored per-period stats for {game['GAME_ID']}: {len(period_data)} periods")
     except Exception as e:
         logger.warning(f"Per-period stats failed for {game['GAME_ID']}: {e}")
+    if not queue_only:
+        rows.write(sess)
 
     if commit:
         try:
@@ -584,6 +713,10 @@ def back_fill_game_detail(game, game_record, sess, commit):
         except Exception as e:
             logger.info(f"Failed to insert game detail for game {game['GAME_ID']}: {e}")
             sess.rollback()
+        else:
+            if rewritten_slug:
+                # Web workers may have cached the legacy fallback slug.
+                publish_slug_changes("game", {game['GAME_ID']: rewritten_slug})
 
     return True
 
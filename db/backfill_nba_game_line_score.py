@@ -5,32 +5,25 @@ import logging
 from datetime import datetime
 
 from nba_api.stats.endpoints import boxscoresummaryv3
-from requests.exceptions import ConnectionError, Timeout
 from sqlalchemy.orm import Session, sessionmaker
-from tenacity import (
-    before_sleep_log,
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
 
 from db.models import Game, GameLineScore, engine
+from db.nba_fetch import scheduled
+from db.nba_response_cache import cached_response
 
 logger = logging.getLogger(__name__)
 
 SessionLocal = sessionmaker(bind=engine)
 
 
-@retry(
-    wait=wait_exponential(multiplier=1, max=5),
-    stop=stop_after_attempt(3),
-    retry=retry_if_exception_type((ConnectionError, Timeout)),
-    before_sleep=before_sleep_log(logger, logging.INFO),
-)
+@cached_response("boxscoresummaryv3")
+@scheduled("summary", attempts=3, max_wait=5)
+def _fetch_box_score_summary_raw(game_id: str) -> dict:
+    return boxscoresummaryv3.BoxScoreSummaryV3(game_id=game_id, timeout=10).get_dict()
+
+
 def fetch_game_line_score_payload(game_id: str) -> dict:
-    response = boxscoresummaryv3.BoxScoreSummaryV3(game_id=game_id, timeout=10)
-    return response.get_dict().get("boxScoreSummary", {})
+    return _fetch_box_score_summary_raw(game_id).get("boxScoreSummary", {})
 
 
 def has_game_line_score(session: Session, game_id: str) -> bool:
@@ -3,8 +3,8 @@ import requests
 from nba_api.stats.library.http import STATS_HEADERS
 from sqlalchemy.orm import sessionmaker
 from db.models import Game, GamePlayByPlay, Player, engine
-from tenacity import retry, wait_exponential, stop_after_attempt, retry_if_exception_type, before_sleep_log, RetryError
-from requests.exceptions import ConnectionError, Timeout
+from db.nba_fetch import scheduled
+from db.nba_response_cache import cached_response
 from static_numbers.event_msg_type import EventMsgType
 
 import logging
@@ -195,30 +195,31 @@ def _normalize_pbp(raw):
     return {'PlayByPlay': deduped}
 
 
-@retry(
-    wait=wait_exponential(multiplier=1, max=4),  # Wait 1, 2, 4 seconds
-    stop=stop_after_attempt(5),  # Retry up to 5 times
-    retry=retry_if_exception_type((ConnectionError, Timeout)),  # Retry only network issues
-    before_sleep=before_sleep_log(logger, logging.INFO)  # Log before sleep
-)
+@cached_response("playbyplayv3")
+@scheduled("playbyplay", attempts=5, max_wait=4)
+def fetch_play_by_play_raw(game_id):
+    """Raw playbyplayv3 JSON; raises ValueError (and caches nothing) when it has no actions."""
+    response = requests.get(
+        "https://stats.nba.com/stats/playbyplayv3",
+        params={
+            "GameID": str(game_id),
+            "StartPeriod": 1,
+            "EndPeriod": 10,
+        },
+        headers=STATS_HEADERS,
+        timeout=30,
+    )
+    response.raise_for_status()
+    raw = response.json()
+    actions = ((raw.get("game") or {}).get("actions") or [])
+    if not actions:
+        raise ValueError(f"No PBP actions returned for game {game_id}")
+    return raw
+
+
 def fetch_game_play_by_play(game_id):
     try:
-        response = requests.get(
-            "https://stats.nba.com/stats/playbyplayv3",
-            params={
-                "GameID": str(game_id),
-                "StartPeriod": 1,
-                "EndPeriod": 10,
-            },
-            headers=STATS_HEADERS,
-            timeout=30,
-        )
-        response.raise_for_status()
-        raw = response.json()
-        actions = ((raw.get("game") or {}).get("actions") or [])
-        if not actions:
-            raise ValueError(f"No PBP actions returned for game {game_id}")
-        return _normalize_pbp(raw)
+        return _normalize_pbp(fetch_play_by_play_raw(str(game_id)))
     except Exception as e:
         logger.error(f"Failed to fetch game pbp for {game_id}, error: {e}")
         raise e
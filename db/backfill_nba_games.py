@@ -12,8 +12,8 @@ from nba_api.stats.endpoints import leaguegamefinder
 from sqlalchemy.orm import sessionmaker
 from db.models import Game, engine
 from db.backfill_nba_game_pbp import back_fill_pbp
-from db.backfill_nba_game_detail import back_fill_game_detail
-from db.backfill_nba_player_shot_detail import back_fill_game_shot_record
+from db.backfill_nba_game_detail import BoxScoreRows, back_fill_game_detail
+from db.backfill_nba_player_shot_detail import back_fill_game_shot_record, record_shot_detail_completeness
 from concurrent.futures import ThreadPoolExecutor
 import logging
 import sys
@@ -22,6 +22,9 @@ import sys
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Games whose box score rows a season backfill collects before writing them together.
+BOX_SCORE_BATCH_GAMES = 50
+
 
 def fetch_games(season='2023-24', season_type='Regular Season'):
     # This fetches games for the NBA (league_id_nullable='00' for NBA)
@@ -40,7 +43,13 @@ def fetch_games(season='2023-24', season_type='Regular Season'):
     return games
 
 
-def process_and_store_game(sess, game):
+def process_and_store_game(sess, game, box_score_rows=None):
+    """Backfill one game and commit it.
+
+    With ``box_score_rows`` the game's box score rows are added there once
+    the game commits cleanly, for ``write_box_score_batch`` to store with
+    the rest of the batch; otherwise they are written here.
+    """
     game_id = game['GAME_ID']
     game_record = sess.query(Game).filter_by(game_id=game_id).first()
     if game_record is None:
@@ -50,7 +59,8 @@ def process_and_store_game(sess, game):
 
     try:
         # backfill game detail info
-        has_game_detail = back_fill_game_detail(game, game_record, sess, False)
+        game_rows = BoxScoreRows() if box_score_rows is not None else None
+        has_game_detail = back_fill_game_detail(game, game_record, sess, False, rows=game_rows)
         if not has_game_detail:
             sess.rollback()
             return
@@ -63,25 +73,80 @@ def process_and_store_game(sess, game):
         if False:
             back_fill_game_shot_record(sess, game_id, False)
 
+        if game_rows is None:
+            # Expected FGA may have changed with the box score; keep the shot ledger in step.
+            record_shot_detail_completeness(sess, [game_id])
+
         sess.commit()
+        if game_rows is not None:
+            box_score_rows.extend(game_rows)
     except Exception as e:
         logger.info(f"Failed to insert game {game_id}: {e}")
         sess.rollback()
 
 
+def write_box_score_batch(sess, rows):
+    """Write the box score rows collected by ``process_and_store_game`` and commit them.
+
+    If the batch fails, each game is retried in its own transaction so one bad
+    game does not cost the others their box scores.
+    """
+    game_ids = sorted(rows.game_ids)
+    if not game_ids:
+        return
+    # Split first: ``write`` empties ``rows`` even when the commit after it fails.
+    per_game = {game_id: rows.for_game(game_id) for game_id in game_ids}
+    try:
+        _write_box_scores(sess, rows, game_ids)
+    except Exception:
+        logger.warning(
+            f"Failed to write box scores for {len(game_ids)} games ({game_ids[0]}..{game_ids[-1]}); "
+            "retrying one game at a time",
+            exc_info=True,
+        )
+        sess.rollback()
+        for game_id in game_ids:
+            try:
+                _write_box_scores(sess, per_game[game_id], [game_id])
+            except Exception:
+                logger.exception(f"Failed to write box scores for game {game_id}")
+                sess.rollback()
+        rows.clear()
+
+
+def _write_box_scores(sess, rows, game_ids):
+    rows.write(sess)
+    # Expected FGA may have changed with the box score; keep the shot ledger in step.
+    record_shot_detail_completeness(sess, game_ids)
+    sess.commit()
+
+
 def process_and_store_season(season, sess=None):
     Session = sessionmaker(bind=engine)
     season_types = ['Regular Season', 'Playoffs']
+    rows = BoxScoreRows()
+
+    def _flush():
+        local_sess = sess or Session()
+        try:
+            write_box_score_batch(local_sess, rows)
+        finally:
+            if sess is None:
+                local_sess.close()
+
     for season_type in season_types:
         games_df = fetch_games(season, season_type)
         for _, game in games_df.iterrows():
             # Isolate each game in its own session to avoid long-lived rollback side effects.
             local_sess = sess or Session()
             try:
-                process_and_store_game(local_sess, game)
+                process_and_store_game(local_sess, game, box_score_rows=rows)
             finally:
                 if sess is None:
                     local_sess.close()
+            if len(rows.game_ids) >= BOX_SCORE_BATCH_GAMES:
+                _flush()
+        _flush()
 
 
 if __name__ == "__main__":
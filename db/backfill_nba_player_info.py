@@ -11,19 +11,12 @@ import time
 from datetime import datetime
 
 from nba_api.stats.endpoints import commonplayerinfo
-from requests.exceptions import ConnectionError, Timeout
 from sqlalchemy import or_
 from sqlalchemy.orm import sessionmaker
-from tenacity import (
-    RetryError,
-    before_sleep_log,
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
+from tenacity import RetryError
 
 from db.models import Player, engine
+from db.nba_fetch import scheduled
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -31,12 +24,7 @@ logger = logging.getLogger(__name__)
 Session = sessionmaker(bind=engine)
 
 
-@retry(
-    wait=wait_exponential(multiplier=1, max=60),
-    stop=stop_after_attempt(10),
-    retry=retry_if_exception_type((ConnectionError, Timeout, Exception)),
-    before_sleep=before_sleep_log(logger, logging.INFO),
-)
+@scheduled("lookup", retry_on=(Exception,), attempts=10, max_wait=60)
 def fetch_player_info(player_id: str) -> dict:
     """Fetch commonplayerinfo for a single player."""
     info = commonplayerinfo.CommonPlayerInfo(player_id=player_id)
@@ -1,11 +1,15 @@
 from nba_api.stats.endpoints import shotchartdetail
+from nba_api.stats.library.http import NBAStatsResponse
 from sqlalchemy.orm import aliased, sessionmaker
-from db.models import Game, PlayerGameStats, ShotRecord, engine
-from tenacity import retry, wait_exponential, stop_after_attempt, retry_if_exception_type, before_sleep_log, RetryError
-from requests.exceptions import ConnectionError, Timeout
-from sqlalchemy import func, or_, and_, text
+from db.models import Game, PlayerGameStats, ShotDetailLedger, ShotRecord, engine
+from db.nba_fetch import scheduled
+from db.nba_response_cache import cached_response, refreshing_responses
+from sqlalchemy import false, func, or_, and_, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from collections import defaultdict
+from datetime import datetime
 
+import json
 import logging
 import concurrent.futures
 
@@ -50,13 +54,17 @@ def _resolve_game_season_type(sess, game_id):
     return _season_type_from_season_id(row[0])
 
 
-@retry(
-    wait=wait_exponential(multiplier=1, max=60),  # Wait 1, 2, 4, ..., up to 60 seconds
-    stop=stop_after_attempt(10),  # Retry up to 5 times
-    retry=retry_if_exception_type((ConnectionError, Timeout, Exception)),  # Retry on network issues and timeouts
-    before_sleep=before_sleep_log(logger, logging.INFO)  # Log before sleep
-)
-def fetch_shot_chart(team_id, player_id, game_id, season=None, season_type=None, season_type_all_star=None):
+def _shot_chart_cacheable(raw, params):
+    """An empty Shot_Chart_Detail is usually the API lagging the box score; refetch it next time."""
+    for result_set in (raw or {}).get('resultSets') or ():
+        if result_set.get('name') == 'Shot_Chart_Detail':
+            return bool(result_set.get('rowSet'))
+    return False
+
+
+@cached_response("shotchartdetail", cacheable=_shot_chart_cacheable)
+@scheduled("shotchart", retry_on=(Exception,), attempts=10, max_wait=60)
+def fetch_shot_chart_raw(team_id, player_id, game_id, season=None, season_type=None, season_type_all_star=None):
     if season is None:
         kwargs = dict(
             team_id=team_id,
@@ -67,7 +75,7 @@ def fetch_shot_chart(team_id, player_id, game_id, season=None, season_type=None,
         if season_type_all_star:
             kwargs['season_type_all_star'] = season_type_all_star
         shot_chart = shotchartdetail.ShotChartDetail(**kwargs)
-        return shot_chart.get_normalized_dict()
+        return shot_chart.get_dict()
     else:
         shot_chart = shotchartdetail.ShotChartDetail(
             team_id=0,
@@ -76,10 +84,20 @@ def fetch_shot_chart(team_id, player_id, game_id, season=None, season_type=None,
             season_nullable=season,
             season_type_all_star=season_type,
         )
-        return shot_chart.get_normalized_dict()
+        return shot_chart.get_dict()
 
 
-def get_un_back_filled_game_and_player(sess, game_id=None, player_id=None):
+def fetch_shot_chart(team_id, player_id, game_id, season=None, season_type=None, season_type_all_star=None):
+    raw = fetch_shot_chart_raw(team_id, player_id, game_id, season, season_type, season_type_all_star)
+    # nba_api's own result-set normalisation, applied to the (possibly cached) raw payload.
+    return NBAStatsResponse(json.dumps(raw), 200, None).get_normalized_dict()
+
+
+LEDGER_BATCH_GAMES = 500
+
+
+def _shot_gap_query(sess, game_clause, player_id=None):
+    """(game_id, player_id, team_id) pairs with fewer ShotRecords than FGA, limited by ``game_clause``."""
     a_cte = sess.query(
         ShotRecord.game_id,
         ShotRecord.player_id,
@@ -87,7 +105,7 @@ def get_un_back_filled_game_and_player(sess, game_id=None, player_id=None):
         func.count().label('ac')
     ).filter(
         and_(
-            or_(ShotRecord.game_id == game_id, game_id is None),
+            game_clause(ShotRecord.game_id),
             or_(ShotRecord.player_id == player_id, player_id is None),
         ),
     ).group_by(
@@ -103,7 +121,7 @@ def get_un_back_filled_game_and_player(sess, game_id=None, player_id=None):
         func.sum(PlayerGameStats.fga).label('bc')
     ).filter(
         and_(
-            or_(PlayerGameStats.game_id == game_id, game_id is None),
+            game_clause(PlayerGameStats.game_id),
             or_(PlayerGameStats.player_id == player_id, player_id is None),
         ),
     ).group_by(
@@ -130,12 +148,106 @@ def get_un_back_filled_game_and_player(sess, game_id=None, player_id=None):
     )
 
 
-def is_game_shot_back_filled(sess, game_id):
+def get_un_back_filled_game_and_player(sess, game_id=None, player_id=None):
+    """(game_id, player_id, team_id) pairs still missing shot records.
+
+    With a game_id this checks that game directly. Without one, only games
+    the ShotDetailLedger marks incomplete are grouped, so the cost follows
+    the backlog rather than the size of ShotRecord.
+    """
+    if game_id is not None:
+        return _shot_gap_query(sess, lambda column: column == game_id, player_id)
+    incomplete = sess.query(ShotDetailLedger.game_id).filter(ShotDetailLedger.is_complete == false())
+    return _shot_gap_query(sess, lambda column: column.in_(incomplete), player_id)
+
+
+def _shot_completeness(sess, game_ids):
+    """Per game: (expected FGA, stored attempts, missing attempts), from one grouped query per table."""
+    expected = defaultdict(int)
+    for gid, pid, tid, fga in (
+        sess.query(PlayerGameStats.game_id, PlayerGameStats.player_id, PlayerGameStats.team_id,
+                   func.coalesce(func.sum(PlayerGameStats.fga), 0))
+        .filter(PlayerGameStats.game_id.in_(game_ids))
+        .group_by(PlayerGameStats.game_id, PlayerGameStats.player_id, PlayerGameStats.team_id)
+    ):
+        expected[(str(gid), str(pid), str(tid))] += int(fga or 0)
+    stored = {
+        (str(gid), str(pid), str(tid)): int(count)
+        for gid, pid, tid, count in (
+            sess.query(ShotRecord.game_id, ShotRecord.player_id, ShotRecord.team_id, func.count())
+            .filter(ShotRecord.game_id.in_(game_ids))
+            .group_by(ShotRecord.game_id, ShotRecord.player_id, ShotRecord.team_id)
+        )
+    }
+    totals = {str(gid): [0, 0, 0] for gid in game_ids}
+    for pair, fga in expected.items():
+        game = totals[pair[0]]
+        game[0] += fga
+        game[2] += max(fga - stored.get(pair, 0), 0)
+    for pair, count in stored.items():
+        totals[pair[0]][1] += count
+    return {gid: tuple(values) for gid, values in totals.items()}
+
+
+def _is_shot_complete(stored_attempts, missing_attempts):
     # A real NBA game always has shot attempts. If zero ShotRecords exist,
     # the game has never been backfilled regardless of PlayerGameStats.fga.
-    if sess.query(ShotRecord).filter(ShotRecord.game_id == game_id).limit(1).count() == 0:
-        return False
-    return len(list(get_un_back_filled_game_and_player(sess, game_id, None))) == 0
+    return stored_attempts > 0 and missing_attempts == 0
+
+
+def record_shot_detail_completeness(sess, game_ids):
+    """Recompute and store ShotDetailLedger rows for ``game_ids``; returns {game_id: complete}."""
+    game_ids = sorted({str(gid) for gid in game_ids})
+    if not game_ids:
+        return {}
+    sess.flush()
+    now = datetime.utcnow()
+    seasons = dict(sess.query(Game.game_id, Game.season).filter(Game.game_id.in_(game_ids)))
+    rows = []
+    for gid, (expected_fga, stored_attempts, missing_attempts) in _shot_completeness(sess, game_ids).items():
+        if gid not in seasons:
+            continue
+        rows.append({
+            'game_id': gid,
+            'season': seasons[gid],
+            'expected_fga': expected_fga,
+            'stored_attempts': stored_attempts,
+            'missing_attempts': missing_attempts,
+            'is_complete': _is_shot_complete(stored_attempts, missing_attempts),
+            'verified_at': now,
+        })
+    if rows and sess.get_bind().dialect.name == 'mysql':
+        stmt = mysql_insert(ShotDetailLedger).values(rows)
+        sess.execute(stmt.on_duplicate_key_update({name: stmt.inserted[name] for name in rows[0] if name != 'game_id'}))
+    else:
+        for row in rows:
+            sess.merge(ShotDetailLedger(**row))
+    return {row['game_id']: row['is_complete'] for row in rows}
+
+
+def refresh_shot_detail_ledger(sess, season=None, batch_size=LEDGER_BATCH_GAMES):
+    """Verify games that have no ShotDetailLedger row yet, a batch at a time.
+
+    The ledger row is the per-game watermark: a rerun only visits games added
+    since the last one. Commits after each batch; returns the games verified.
+    """
+    q = (
+        sess.query(Game.game_id)
+        .outerjoin(ShotDetailLedger, ShotDetailLedger.game_id == Game.game_id)
+        .filter(ShotDetailLedger.game_id.is_(None), Game.game_date.isnot(None))
+    )
+    if season:
+        q = q.filter(Game.season.like(f"{season}%"))
+    game_ids = [gid for (gid,) in q.order_by(Game.game_id.asc())]
+    for start in range(0, len(game_ids), batch_size):
+        record_shot_detail_completeness(sess, game_ids[start:start + batch_size])
+        sess.commit()
+    return len(game_ids)
+
+
+def is_game_shot_back_filled(sess, game_id):
+    _, stored_attempts, missing_attempts = _shot_completeness(sess, [str(game_id)])[str(game_id)]
+    return _is_shot_complete(stored_attempts, missing_attempts)
 
 
 SEASON_TYPES = ['Regular Season', 'Playoffs']
@@ -170,9 +282,17 @@ def get_season_and_type_from_season_id(season_id):
 
 
 def back_fill_game_shot_record(sess, game_id, commit=False):
-    if is_game_shot_back_filled(sess, game_id):
+    """Fill missing shot records for one game; returns whether the game is now complete."""
+    # Store the check in the ledger even when nothing is fetched, so a stale
+    # incomplete row stops listing the game as a gap.
+    complete = record_shot_detail_completeness(sess, [game_id]).get(str(game_id))
+    if complete is None:  # no Game row, so no ledger row either
+        complete = is_game_shot_back_filled(sess, game_id)
+    if complete:
         logger.info('skip game {} as it has back filled'.format(game_id))
-        return
+        if commit:
+            sess.commit()
+        return True
 
     # One API call per game for both teams/all players.
     # ShotChartDetail supports team_id=0, player_id=0 with game_id filter,
@@ -230,12 +350,16 @@ def back_fill_game_shot_record(sess, game_id, commit=False):
                     shot_made=bool(shot['SHOT_MADE_FLAG']),
                 ))
 
+    complete = record_shot_detail_completeness(sess, [game_id]).get(str(game_id), False)
+
     if commit:
         try:
             sess.commit()
         except Exception as e:
             logger.info(f"Failed to back fill shot record {game_id}, {player_id}: {e}")
             sess.rollback()
+            return False
+    return complete
 
 
 def back_fill_game_shot_record_from_api(sess, game_id, commit=False, replace_existing=False):
@@ -275,6 +399,8 @@ def back_fill_game_shot_record_from_api(sess, game_id, commit=False, replace_exi
             shot_made=bool(shot['SHOT_MADE_FLAG']),
         ))
 
+    record_shot_detail_completeness(sess, [game_id])
+
     if commit:
         try:
             sess.commit()
@@ -292,20 +418,20 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Backfill shot chart data per game.")
     parser.add_argument("--season", default=None, help="Season ID prefix to backfill (e.g. 22024). Defaults to all seasons.")
     parser.add_argument("--workers", type=int, default=3, help="Parallel workers (default: 3).")
+    parser.add_argument("--ledger-only", action="store_true", help="Only verify games missing from ShotDetailLedger.")
     args = parser.parse_args()
 
     sess = Session()
-    q = sess.query(Game.game_id, Game.season).filter(Game.game_date.isnot(None))
+    verified = refresh_shot_detail_ledger(sess, args.season)
+    logger.info("Verified %d games new to the shot detail ledger.", verified)
+    if args.ledger_only:
+        sess.close()
+        raise SystemExit(0)
+
+    q = sess.query(ShotDetailLedger.game_id).filter(ShotDetailLedger.is_complete == false())
     if args.season:
-        q = q.filter(Game.season.like(f"{args.season}%"))
-    q = q.order_by(Game.game_date.asc(), Game.game_id.asc())
-    games = q.all()
-
-    # Filter to games not yet fully backfilled
-    jobs = []
-    for game_id, season in games:
-        if not is_game_shot_back_filled(sess, game_id):
-            jobs.append(game_id)
+        q = q.filter(ShotDetailLedger.season.like(f"{args.season}%"))
+    jobs = [game_id for (game_id,) in q.order_by(ShotDetailLedger.game_id.asc())]
     sess.close()
 
     logger.info("Found %d games needing shot backfill.", len(jobs))
@@ -313,7 +439,9 @@ if __name__ == "__main__":
     def _process(game_id):
         s = Session()
         try:
-            back_fill_game_shot_record(s, game_id, commit=True)
+            # These games are known to be short of shots: do not trust cached shot charts for them.
+            with refreshing_responses():
+                back_fill_game_shot_record(s, game_id, commit=True)
             logger.info("Done: %s", game_id)
         except Exception as e:
             logger.error("Failed %s: %s", game_id, e)
@@ -19,10 +19,11 @@ from sqlalchemy import func
 from sqlalchemy.exc import OperationalError
 
 from db.backfill_nba_game_detail import (
-    create_player_period_stats,
     fetch_all_period_stats,
+    store_player_period_stats,
 )
 from db.models import Game, PlayerGamePeriodStats, engine
+from db.nba_response_cache import refreshing_responses
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", datefmt="%H:%M:%S")
 logger = logging.getLogger(__name__)
@@ -32,7 +33,9 @@ def _backfill_one(session_factory, game_id: str, slug: str):
     """Backfill one game and return status metadata."""
     for attempt in range(1, 4):
         try:
-            periods = fetch_all_period_stats(game_id)
+            # Games picked here are missing period rows: refetch rather than trust cached box scores.
+            with refreshing_responses():
+                periods = fetch_all_period_stats(game_id)
             if not periods:
                 return {
                     "slug": slug,
@@ -46,10 +49,7 @@ def _backfill_one(session_factory, game_id: str, slug: str):
                     PlayerGamePeriodStats.game_id == game_id,
                 ).delete(synchronize_session=False)
 
-                for period, rows in periods.items():
-                    for ps in rows:
-                        create_player_period_stats(session, game_id, period, ps)
-
+                store_player_period_stats(session, game_id, periods)
                 session.commit()
 
             return {
@@ -43,18 +43,11 @@ from datetime import date, datetime
 from typing import Iterable
 
 from nba_api.stats.endpoints import commonteamroster
-from requests.exceptions import ConnectionError, Timeout
 from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
-from tenacity import (
-    before_sleep_log,
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
 
 from db.models import TeamCoachStint, TeamRosterStint, engine
+from db.nba_fetch import scheduled
 
 logging.basicConfig(
     level=logging.INFO,
@@ -200,12 +193,7 @@ def insert_derived_stints(session, stints: list[dict]) -> int:
 # ─────────────────────────────────────────────────────────────────────────
 
 
-@retry(
-    wait=wait_exponential(multiplier=1, max=30),
-    stop=stop_after_attempt(4),
-    retry=retry_if_exception_type((ConnectionError, Timeout, Exception)),
-    before_sleep=before_sleep_log(logger, logging.INFO),
-)
+@scheduled("lookup", retry_on=(Exception,), attempts=4, max_wait=30)
 def _fetch_roster(team_id: int, season_str: str):
     r = commonteamroster.CommonTeamRoster(team_id=team_id, season=season_str, timeout=30)
     dfs = r.get_data_frames()
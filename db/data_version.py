@@ -0,0 +1,124 @@
+"""Data-version tokens for caches of rendered pages.
+
+Each token is a Redis counter, ``funba:dataver:v1:<name>``, that writers bump
+after committing data a family of pages depends on:
+
+- ``games``: box scores, schedules and scores (ingest / schedule sync);
+- ``metrics``: any MetricResult pool (reduce and season-metric tasks);
+- ``metric:<family base key>``: one metric family's results;
+- ``metric-defs``: MetricDefinition edits (names, status, descriptions);
+- ``players`` / ``teams``: rosters, contracts, transactions, draft, logos;
+- ``awards``: the Award table.
+
+Readers fold the counters they depend on into their cache key, so a bump
+makes every older entry unreachable without enumerating or deleting keys.
+The granularity is a data family rather than a single player or team on
+purpose: a reduce re-ranks every entity in the pool it touched, so one
+game's metrics change numbers on pages of players who did not play in it.
+
+Without Redis ``data_version_token`` returns ``None`` and callers must not
+cache, since they could not tell when an entry went stale.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+_REDIS_URL = os.getenv("FUNBA_PAGE_CACHE_REDIS_URL") or os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+_CHECK_SECONDS = float(os.getenv("FUNBA_PAGE_CACHE_VERSION_CHECK_SECONDS", "2"))
+_REDIS_RETRY_SECONDS = 30
+_KEY_PREFIX = "funba:dataver:v1"
+
+_redis_client = None
+_redis_unavailable_until = 0.0
+_token_lock = threading.Lock()
+# name -> (counter, read_at); read through at most every _CHECK_SECONDS.
+_recent: dict[str, tuple[int, float]] = {}
+
+
+def _counter_key(name: str) -> str:
+    return f"{_KEY_PREFIX}:{name}"
+
+
+def _redis_or_none():
+    global _redis_client, _redis_unavailable_until
+    now = time.monotonic()
+    if _redis_unavailable_until and now < _redis_unavailable_until:
+        return None
+    if _redis_client is not None:
+        return _redis_client
+    try:
+        import redis as _redis
+
+        _redis_client = _redis.Redis.from_url(_REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+        return _redis_client
+    except Exception:
+        _redis_unavailable_until = now + _REDIS_RETRY_SECONDS
+        logger.exception("data version Redis unavailable")
+        return None
+
+
+def _redis_failed(action: str) -> None:
+    global _redis_client, _redis_unavailable_until
+    _redis_client = None
+    _redis_unavailable_until = time.monotonic() + _REDIS_RETRY_SECONDS
+    logger.warning("data version Redis %s failed; page caching paused for %ds", action, _REDIS_RETRY_SECONDS, exc_info=True)
+
+
+def bump_data_versions(*names: str) -> None:
+    """Invalidate cached pages that depend on ``names``.
+
+    Call after the writing transaction commits. Failures are logged and
+    swallowed: a missed bump costs staleness bounded by the page cache TTL,
+    never the write itself.
+    """
+    names = tuple(dict.fromkeys(name for name in names if name))
+    if not names:
+        return
+    client = _redis_or_none()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline()
+        for name in names:
+            pipe.incr(_counter_key(name))
+        counters = pipe.execute()
+    except Exception:
+        _redis_failed("bump")
+        return
+    now = time.monotonic()
+    with _token_lock:
+        for name, counter in zip(names, counters):
+            _recent[name] = (int(counter), now)
+
+
+def data_version_token(names) -> str | None:
+    """Current counters for ``names`` joined into one cache-key fragment.
+
+    Counters are re-read from Redis at most every
+    ``FUNBA_PAGE_CACHE_VERSION_CHECK_SECONDS``, so a bump reaches other
+    processes within that window.
+    """
+    names = tuple(names)
+    now = time.monotonic()
+    with _token_lock:
+        stale = [name for name in names if name not in _recent or now - _recent[name][1] >= _CHECK_SECONDS]
+    if stale:
+        client = _redis_or_none()
+        if client is None:
+            return None
+        try:
+            values = client.mget([_counter_key(name) for name in stale])
+        except Exception:
+            _redis_failed("read")
+            return None
+        with _token_lock:
+            for name, value in zip(stale, values):
+                _recent[name] = (int(value or 0), now)
+    with _token_lock:
+        return ".".join(str(_recent[name][0]) for name in names)
@@ -0,0 +1,116 @@
+"""Read and write the per-game ``GameArtifactStatus`` ledger.
+
+``tasks.ingest._load_game_artifact_status`` probes every artifact table for a
+game. Its result is stored here in full (``store_game_artifact_status``).
+After that, each ingest step and the metric runner flip only the flags they
+just made true (``mark_game_artifacts``), inside the caller's transaction,
+so the row cannot claim data that was rolled back. The metric flags move to
+True as results and run logs are written, and back to False only through
+``clear_metric_flags``, which whoever deletes those rows calls in the same
+transaction. Deleting a game's data by hand leaves its row stale until the
+next full probe.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import and_, literal, or_
+
+from db.models import GameArtifactStatus
+
+ARTIFACT_FLAGS = ("has_detail", "has_pbp", "has_shot", "has_line", "has_period")
+METRIC_FLAGS = ("has_metric_run_logs", "has_metric_results")
+
+
+def store_game_artifact_status(session, status: dict, *, game_date: date | None = None) -> None:
+    """Write a full artifact probe for one existing game; metric flags are kept."""
+    values = {flag: bool(status.get(flag)) for flag in ARTIFACT_FLAGS}
+    values.update(
+        season=status.get("season"),
+        game_date=game_date,
+        complete=bool(status.get("complete")),
+        updated_at=datetime.utcnow(),
+    )
+    updated = (
+        session.query(GameArtifactStatus)
+        .filter(GameArtifactStatus.game_id == status["game_id"])
+        .update(values, synchronize_session=False)
+    )
+    if not updated:
+        session.execute(
+            GameArtifactStatus.__table__.insert(),
+            [{"game_id": status["game_id"], **values, **{flag: False for flag in METRIC_FLAGS}}],
+        )
+
+
+def mark_game_artifacts(session, game_ids, **flags: bool) -> int:
+    """Set ``flags`` on existing rows for ``game_ids`` and recompute ``complete``.
+
+    Games without a row are left alone; their first full probe creates it.
+    """
+    game_ids = sorted({str(game_id) for game_id in game_ids if game_id})
+    unknown = set(flags) - set(ARTIFACT_FLAGS) - set(METRIC_FLAGS)
+    if unknown:
+        raise ValueError(f"unknown GameArtifactStatus flags: {sorted(unknown)}")
+    if not game_ids or not flags:
+        return 0
+    values = {flag: bool(value) for flag, value in flags.items()}
+    if set(flags) & set(ARTIFACT_FLAGS):
+        values["complete"] = and_(
+            *(
+                literal(values[flag]) if flag in values else getattr(GameArtifactStatus, flag)
+                for flag in ARTIFACT_FLAGS
+            )
+        )
+    query = session.query(GameArtifactStatus).filter(GameArtifactStatus.game_id.in_(game_ids))
+    if not set(flags) & set(ARTIFACT_FLAGS):
+        # Metric flags are set by every metric write; skip the rows that already carry them.
+        query = query.filter(or_(*(getattr(GameArtifactStatus, flag).is_(not values[flag]) for flag in flags)))
+    values["updated_at"] = datetime.utcnow()
+    return query.update(values, synchronize_session=False)
+
+
+def clear_metric_flags(session, game_ids, *flags: str) -> int:
+    """Reset metric ``flags`` (default: both) to False for ``game_ids``.
+
+    Call it in the transaction that deletes the MetricRunLog / MetricResult
+    rows, before the delete. ``game_ids`` may be a list or a SELECT of game ids.
+    """
+    flags = flags or METRIC_FLAGS
+    unknown = set(flags) - set(METRIC_FLAGS)
+    if unknown:
+        raise ValueError(f"unknown GameArtifactStatus metric flags: {sorted(unknown)}")
+    if isinstance(game_ids, (list, tuple, set, frozenset)):
+        game_ids = sorted({str(game_id) for game_id in game_ids if game_id})
+        if not game_ids:
+            return 0
+    return (
+        session.query(GameArtifactStatus)
+        .filter(
+            GameArtifactStatus.game_id.in_(game_ids),
+            or_(*(getattr(GameArtifactStatus, flag).is_(True) for flag in flags)),
+        )
+        .update({**{flag: False for flag in flags}, "updated_at": datetime.utcnow()}, synchronize_session=False)
+    )
+
+
+def game_artifact_flag(session, game_id: str, flag: str) -> bool:
+    """True only when the ledger row for ``game_id`` exists and has ``flag`` set."""
+    column = getattr(GameArtifactStatus, flag)
+    return (
+        session.query(GameArtifactStatus.game_id)
+        .filter(GameArtifactStatus.game_id == game_id, column.is_(True))
+        .first()
+    ) is not None
+
+
+def load_game_completeness(session, game_ids) -> dict[str, bool]:
+    """{game_id: complete} for the games that have a ledger row."""
+    game_ids = sorted({str(game_id) for game_id in game_ids})
+    if not game_ids:
+        return {}
+    return {
+        game_id: bool(complete)
+        for game_id, complete in session.query(GameArtifactStatus.game_id, GameArtifactStatus.complete)
+        .filter(GameArtifactStatus.game_id.in_(game_ids))
+    }
@@ -0,0 +1,230 @@
+"""Cache invalidation events from writers (Celery tasks, admin routes) to web workers.
+
+Writers ``publish`` a typed event after their transaction commits; every web
+worker's listener hands it to the handlers registered with ``subscribe``,
+which drop whatever their cache holds for it. Events:
+
+- ``GameIngested(game_id)``: box score / play-by-play / shots written;
+- ``MetricReduced(metric_key, season)``: a MetricResult pool rewritten, by a
+  reduce or by the map phase of a non-incremental metric;
+- ``MetricDefinitionPublished(metric_key)``: a definition created, edited,
+  published or toggled;
+- ``SlugChanged(kind, entity_id, slug)``: an existing id got a new slug;
+- ``BusReconnected()``: synthesised locally when a listener re-subscribes
+  after losing Redis; events in the gap are lost, so handlers should drop
+  everything.
+
+Delivery is Redis pub/sub on ``funba:invalidate:v1``: at most once, no
+history. Caches keep a TTL (hours, not minutes) as the bound for a missed
+event, and the durable version tokens (``db.data_version``, the slug change
+feed, the MetricDefinition token) stay authoritative.
+
+``FUNBA_INVALIDATION_BUS=local`` (or ``set_bus(LocalInvalidationBus())`` in
+tests) swaps in an in-process bus that dispatches synchronously.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Callable, ClassVar
+
+
+logger = logging.getLogger(__name__)
+
+_REDIS_URL = os.getenv("FUNBA_INVALIDATION_REDIS_URL") or os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+_BUS_KIND = os.getenv("FUNBA_INVALIDATION_BUS", "redis").strip().lower()
+_CHANNEL = "funba:invalidate:v1"
+_RECONNECT_SECONDS = (1, 2, 5, 10, 30)
+_REDIS_RETRY_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class InvalidationEvent:
+    type_name: ClassVar[str] = ""
+
+    def to_json(self) -> str:
+        return json.dumps({"type": self.type_name, **asdict(self)}, sort_keys=True)
+
+
+@dataclass(frozen=True)
+class GameIngested(InvalidationEvent):
+    type_name: ClassVar[str] = "game_ingested"
+    game_id: str
+
+
+@dataclass(frozen=True)
+class MetricReduced(InvalidationEvent):
+    type_name: ClassVar[str] = "metric_reduced"
+    metric_key: str
+    season: str | None = None
+
+
+@dataclass(frozen=True)
+class MetricDefinitionPublished(InvalidationEvent):
+    type_name: ClassVar[str] = "metric_definition_published"
+    metric_key: str | None = None
+
+
+@dataclass(frozen=True)
+class SlugChanged(InvalidationEvent):
+    type_name: ClassVar[str] = "slug_changed"
+    kind: str
+    entity_id: str
+    slug: str | None = None
+
+
+@dataclass(frozen=True)
+class BusReconnected(InvalidationEvent):
+    type_name: ClassVar[str] = "bus_reconnected"
+
+
+_EVENT_TYPES = {
+    cls.type_name: cls
+    for cls in (GameIngested, MetricReduced, MetricDefinitionPublished, SlugChanged, BusReconnected)
+}
+
+
+def event_from_json(raw) -> InvalidationEvent | None:
+    try:
+        payload = json.loads(raw.decode("utf-8") if isinstance(raw, bytes) else raw)
+        event_type = _EVENT_TYPES[payload.pop("type")]
+        return event_type(**payload)
+    except Exception:
+        logger.warning("ignoring malformed invalidation event %r", raw, exc_info=True)
+        return None
+
+
+# Handlers live at module level, not on a bus, so caches that subscribe at
+# import time keep receiving events when tests swap the bus.
+_handlers: dict[type, list[Callable]] = defaultdict(list)
+_handlers_lock = threading.Lock()
+
+
+def subscribe(event_type: type, handler: Callable | None = None):
+    """Register ``handler(event)`` for ``event_type``; usable as a decorator."""
+    def _register(fn: Callable) -> Callable:
+        with _handlers_lock:
+            _handlers[event_type].append(fn)
+        return fn
+
+    return _register(handler) if handler is not None else _register
+
+
+def dispatch(event: InvalidationEvent) -> None:
+    """Run this process's handlers for ``event``; one failing cache never blocks the rest."""
+    with _handlers_lock:
+        handlers = list(_handlers.get(type(event), ()))
+    for handler in handlers:
+        try:
+            handler(event)
+        except Exception:
+            logger.exception("invalidation handler %s failed for %s", getattr(handler, "__name__", handler), event)
+
+
+class LocalInvalidationBus:
+    """In-process bus: ``publish`` dispatches synchronously to local handlers."""
+
+    def publish(self, event: InvalidationEvent) -> None:
+        dispatch(event)
+
+    def ensure_listening(self) -> None:
+        pass
+
+
+class RedisInvalidationBus:
+    """Redis pub/sub bus; each process listens on a daemon thread of its own."""
+
+    def __init__(self, url: str = _REDIS_URL, channel: str = _CHANNEL, *, client_factory: Callable | None = None) -> None:
+        self._url = url
+        self._channel = channel
+        self._client_factory = client_factory or self._connect
+        self._client = None
+        self._unavailable_until = 0.0
+        self._lock = threading.Lock()
+        self._listener_pid: int | None = None
+
+    def _connect(self):
+        import redis as _redis
+
+        return _redis.Redis.from_url(self._url, socket_connect_timeout=1, health_check_interval=30)
+
+    def _client_or_none(self):
+        if self._unavailable_until and time.monotonic() < self._unavailable_until:
+            return None
+        if self._client is None:
+            try:
+                self._client = self._client_factory()
+            except Exception:
+                self._unavailable_until = time.monotonic() + _REDIS_RETRY_SECONDS
+                logger.exception("invalidation bus Redis unavailable")
+                return None
+        return self._client
+
+    def publish(self, event: InvalidationEvent) -> None:
+        """Broadcast ``event``; failures are logged, never raised into the writer."""
+        client = self._client_or_none()
+        if client is None:
+            return
+        try:
+            client.publish(self._channel, event.to_json())
+        except Exception:
+            self._client = None
+            self._unavailable_until = time.monotonic() + _REDIS_RETRY_SECONDS
+            logger.warning("invalidation bus publish failed for %s; pausing for %ds", event, _REDIS_RETRY_SECONDS, exc_info=True)
+
+    def ensure_listening(self) -> None:
+        """Start this process's listener thread (again after a fork)."""
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            # A forked child inherits the parent's socket but not its thread.
+            self._client = None
+            self._listener_pid = pid
+            threading.Thread(target=self._listen_forever, name="invalidation-bus", daemon=True).start()
+
+    def _listen_forever(self) -> None:
+        failures = 0
+        while True:
+            try:
+                pubsub = self._client_factory().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                if failures:
+                    dispatch(BusReconnected())
+                failures = 0
+                for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    event = event_from_json(message.get("data"))
+                    if event is not None:
+                        dispatch(event)
+            except Exception:
+                logger.warning("invalidation bus listener lost Redis; reconnecting", exc_info=True)
+            failures += 1
+            time.sleep(_RECONNECT_SECONDS[min(failures, len(_RECONNECT_SECONDS)) - 1])
+
+
+_bus = None
+
+
+def get_bus():
+    global _bus
+    if _bus is None:
+        _bus = LocalInvalidationBus() if _BUS_KIND == "local" else RedisInvalidationBus()
+    return _bus
+
+
+def set_bus(bus) -> None:
+    global _bus
+    _bus = bus
+
+
+def publish(event: InvalidationEvent) -> None:
+    get_bus().publish(event)
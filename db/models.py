@@ -423,6 +423,59 @@ Index('ix_ShotRecord_player_id_season', ShotRecord.player_id, ShotRecord.season)
 Index('ix_ShotRecord_season_zone', ShotRecord.season, ShotRecord.shot_zone_area)
 
 
+class ShotDetailLedger(Base):
+    """Shot-chart completeness per game.
+
+    Rewritten whenever ingest stores a game's box score or shot records, and
+    seeded for older games by ``refresh_shot_detail_ledger``. The shot gap
+    finder reads incomplete games off ``ix_ShotDetailLedger_complete_season``
+    instead of grouping all of ShotRecord and PlayerGameStats.
+    ``missing_attempts`` sums the shortfall per (player, team), so one
+    player's surplus rows cannot hide another player's gap.
+    """
+    __tablename__ = 'ShotDetailLedger'
+
+    game_id          = Column(String(50), ForeignKey('Game.game_id'), primary_key=True)
+    season           = Column(String(50))
+    expected_fga     = Column(Integer, nullable=False, default=0)
+    stored_attempts  = Column(Integer, nullable=False, default=0)
+    missing_attempts = Column(Integer, nullable=False, default=0)
+    is_complete      = Column(Boolean, nullable=False, default=False)
+    verified_at      = Column(DateTime, nullable=False)
+
+
+Index('ix_ShotDetailLedger_complete_season', ShotDetailLedger.is_complete, ShotDetailLedger.season)
+
+
+class GameArtifactStatus(Base):
+    """Ingest and metric completeness per game (see ``db.game_artifact_status``).
+
+    Ingest steps set their artifact flag in the transaction that stores the
+    artifact, and the metric runner sets the metric flags when it writes a
+    game's run logs or results. ``ingest_recent_games`` reads ``complete`` for
+    its discovered games with a single primary-key lookup instead of probing
+    every artifact table per game. Artifacts nba_api never had (PBP, shots
+    and period stats before 1996-97) are stored as present.
+    """
+    __tablename__ = 'GameArtifactStatus'
+
+    game_id             = Column(String(50), ForeignKey('Game.game_id'), primary_key=True)
+    season              = Column(String(50))
+    game_date           = Column(DATE)
+    has_detail          = Column(Boolean, nullable=False, default=False)
+    has_pbp             = Column(Boolean, nullable=False, default=False)
+    has_shot            = Column(Boolean, nullable=False, default=False)
+    has_line            = Column(Boolean, nullable=False, default=False)
+    has_period          = Column(Boolean, nullable=False, default=False)
+    has_metric_run_logs = Column(Boolean, nullable=False, default=False)
+    has_metric_results  = Column(Boolean, nullable=False, default=False)
+    complete            = Column(Boolean, nullable=False, default=False)
+    updated_at          = Column(DateTime, nullable=False)
+
+
+Index('ix_GameArtifactStatus_game_date_complete', GameArtifactStatus.game_date, GameArtifactStatus.complete)
+
+
 class GameLineScore(Base):
     __tablename__ = 'GameLineScore'
 
@@ -470,6 +523,11 @@ class MetricResult(Base):
     noteworthiness = Column(Float, nullable=True)      # 0.0–1.0, AI-scored
     notable_reason = Column(Text, nullable=True)
     computed_at = Column(DateTime, nullable=False)
+    # Materialized at reduce time by metrics.framework.runner.refresh_metric_pool:
+    # 1 + peers with a better value, and peer count, within
+    # (metric_key, season, entity_type, sub_key, rank_group). NULL = not ranked yet.
+    peer_rank = Column(Integer, nullable=True)
+    peer_total = Column(Integer, nullable=True)
 
     __table_args__ = (
         Index('uq_MetricResult_key_entity_season_subkey', 'metric_key', 'entity_type', 'entity_id', 'season', 'sub_key', unique=True),
@@ -601,10 +659,48 @@ class MetricRunLog(Base):
         Index('ix_MetricRunLog_metric_game', 'metric_key', 'game_id'),
         Index('ix_MetricRunLog_qualifying', 'metric_key', 'entity_id', 'qualified'),
         Index('ix_MetricRunLog_reduce', 'metric_key', 'season', 'entity_type', 'entity_id'),
+        Index('ix_MetricRunLog_reduce_computed_at', 'metric_key', 'season', 'computed_at'),
         Index('ix_MetricRunLog_season', 'season'),
     )
 
 
+class MetricRunningTotal(Base):
+    """Checkpointed reduce state: folded MetricRunLog deltas per entity.
+
+    Lets a post-ingest reduce fold only the deltas mapped since the last
+    reduce instead of re-merging the whole season. Rebuilt wholesale by a
+    full `reduce_metric`; `folded_count` counts every MetricRunLog row folded
+    (including NULL deltas) so the incremental path can detect late inserts.
+    """
+    __tablename__ = 'MetricRunningTotal'
+
+    metric_key    = Column(String(64), primary_key=True)
+    season        = Column(String(16), primary_key=True)
+    entity_type   = Column(String(16), primary_key=True)
+    entity_id     = Column(String(50), primary_key=True)
+    totals_json   = Column(Text, nullable=False)
+    last_game_id  = Column(String(20), nullable=True)   # highest folded game_id
+    folded_count  = Column(Integer, nullable=False, default=0)
+    updated_at    = Column(DateTime, nullable=False)
+
+
+class MetricResultCount(Base):
+    """MetricResult row count per (metric_key, season).
+
+    Kept current by the runner whenever it rewrites a pool (under the metric's
+    MetricResult write lock) and rebuilt wholesale by the periodic
+    ``reconcile_metric_result_counts`` task, so catalog badges read a few
+    thousand rows instead of grouping the whole MetricResult table. NULL
+    MetricResult seasons are stored as ''.
+    """
+    __tablename__ = 'MetricResultCount'
+
+    metric_key = Column(String(64), primary_key=True)
+    season     = Column(String(16), primary_key=True)
+    row_count  = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+
 class MetricPerfLog(Base):
     __tablename__ = "MetricPerfLog"
 
@@ -614,6 +710,7 @@ class MetricPerfLog(Base):
     duration_ms = Column(Integer, nullable=False)
     db_reads = Column(Integer, nullable=True)
     db_writes = Column(Integer, nullable=True)
+    lock_wait_ms = Column(Integer, nullable=True)       # time blocked on MetricResult write locks
 
     __table_args__ = (
         Index("ix_MetricPerfLog_metric_key_recorded_at", "metric_key", "recorded_at"),
@@ -0,0 +1,263 @@
+"""One rate-limited scheduler for every stats.nba.com fetch in this process.
+
+Before this, each backfill fetcher retried on its own with tenacity, and
+``fetch_all_period_stats`` paced itself with ``time.sleep(0.5)``. Nothing
+stopped a Celery process with several ingests in flight from hitting
+stats.nba.com all at once. When throttled, the retries of every
+caller backed off in lockstep. Fetchers decorated with ``@scheduled`` now
+share:
+
+- a token bucket per endpoint family (``FAMILIES``): box score, play-by-play,
+  shot chart, box score summary, league-wide lists and per-player/per-team
+  lookups each have their own request rate and burst;
+- bounded concurrency: a cap per family, plus ``FUNBA_NBA_API_MAX_CONCURRENCY``
+  across all families;
+- jittered exponential backoff. A 429 (or 503) also pauses the whole
+  family's bucket, so the other callers back off as well, instead of each
+  one discovering the throttle on its own;
+- coalescing: a call whose function and arguments match one already in
+  flight waits for that call's result instead of sending a second request.
+  Every waiter gets the same object, so treat results as read-only.
+
+When the attempts run out, the scheduler raises ``tenacity.RetryError``, as the
+decorators it replaces did. Errors that are not retryable propagate
+unchanged. ``FUNBA_NBA_API_RATE_SCALE`` multiplies every family's rate,
+for example ``0.5`` for a cautious full-season re-ingest.
+"""
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable
+
+from requests.exceptions import ConnectionError, HTTPError, Timeout
+from tenacity import RetryError
+
+logger = logging.getLogger(__name__)
+
+_MAX_CONCURRENCY = int(os.getenv("FUNBA_NBA_API_MAX_CONCURRENCY", "4"))
+_RATE_SCALE = float(os.getenv("FUNBA_NBA_API_RATE_SCALE", "1"))
+_THROTTLE_STATUSES = frozenset({429, 503})
+
+
+@dataclass(frozen=True)
+class EndpointFamily:
+    rate_per_second: float
+    burst: int
+    concurrency: int
+
+
+FAMILIES = {
+    "boxscore": EndpointFamily(rate_per_second=2.0, burst=4, concurrency=4),
+    "playbyplay": EndpointFamily(rate_per_second=1.0, burst=2, concurrency=2),
+    "shotchart": EndpointFamily(rate_per_second=1.0, burst=2, concurrency=2),
+    "summary": EndpointFamily(rate_per_second=1.0, burst=2, concurrency=2),
+    "league": EndpointFamily(rate_per_second=0.5, burst=1, concurrency=1),
+    "lookup": EndpointFamily(rate_per_second=1.0, burst=2, concurrency=2),
+}
+
+
+class TokenBucket:
+    """Blocking token bucket that can be paused when upstream says slow down."""
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: int,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._rate = max(float(rate_per_second), 1e-6)
+        self._capacity = float(max(int(burst), 1))
+        self._tokens = self._capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                    self._updated = now
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return
+                    wait = (1.0 - self._tokens) / self._rate
+            self._sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = max(self._updated, self._paused_until)
+
+
+def _status_code(exc: BaseException) -> int | None:
+    return getattr(getattr(exc, "response", None), "status_code", None)
+
+
+def _retry_after_seconds(exc: BaseException) -> float | None:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class FetchScheduler:
+    def __init__(
+        self,
+        families: dict[str, EndpointFamily] | None = None,
+        *,
+        max_concurrency: int = _MAX_CONCURRENCY,
+        rate_scale: float = _RATE_SCALE,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[], float] = random.random,
+    ) -> None:
+        families = families or FAMILIES
+        self._buckets = {
+            name: TokenBucket(family.rate_per_second * rate_scale, family.burst, sleep=sleep)
+            for name, family in families.items()
+        }
+        self._slots = {name: threading.BoundedSemaphore(family.concurrency) for name, family in families.items()}
+        self._global = threading.BoundedSemaphore(max(int(max_concurrency), 1))
+        self._sleep = sleep
+        self._jitter = jitter
+        self._lock = threading.Lock()
+        self._inflight: dict[object, Future] = {}
+
+    def call(
+        self,
+        family: str,
+        key,
+        fn: Callable,
+        *args,
+        retry_on: tuple[type[BaseException], ...] = (ConnectionError, Timeout),
+        attempts: int = 4,
+        max_wait: float = 4.0,
+        **kwargs,
+    ):
+        """``fn(*args, **kwargs)`` under ``family``'s limits; joins an in-flight call with the same ``key``."""
+        if key is None:
+            return self._run(family, fn, args, kwargs, retry_on, attempts, max_wait)
+        with self._lock:
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = Future()
+        if not owner:
+            return pending.result()
+        try:
+            result = self._run(family, fn, args, kwargs, retry_on, attempts, max_wait)
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        else:
+            pending.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _run(self, family, fn, args, kwargs, retry_on, attempts, max_wait):
+        bucket = self._buckets[family]
+        attempts = max(int(attempts), 1)
+        for attempt in range(1, attempts + 1):
+            bucket.acquire()
+            with self._global, self._slots[family]:
+                try:
+                    return fn(*args, **kwargs)
+                except Exception as exc:
+                    status = _status_code(exc)
+                    throttled = status in _THROTTLE_STATUSES
+                    server_error = isinstance(exc, HTTPError) and status is not None and status >= 500
+                    if not (throttled or server_error or isinstance(exc, retry_on)):
+                        raise
+                    last_error = exc
+            if attempt == attempts:
+                break
+            # Equal jitter: at least half the exponential step, so retries spread out but still back off.
+            step = min(float(max_wait), 2.0 ** (attempt - 1))
+            delay = step / 2 + self._jitter() * step / 2
+            if throttled:
+                delay = max(delay, _retry_after_seconds(last_error) or 0.0)
+                bucket.pause(delay)
+            logger.info(
+                "%s %s failed (%s); retry %d/%d in %.1fs",
+                family,
+                getattr(fn, "__qualname__", fn),
+                last_error,
+                attempt,
+                attempts - 1,
+                delay,
+            )
+            self._sleep(delay)
+        final_attempt = Future()
+        final_attempt.set_exception(last_error)
+        raise RetryError(final_attempt) from last_error
+
+
+_SCHEDULER: FetchScheduler | None = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_scheduler() -> FetchScheduler:
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        with _SCHEDULER_LOCK:
+            if _SCHEDULER is None:
+                _SCHEDULER = FetchScheduler()
+    return _SCHEDULER
+
+
+def _reset_after_fork() -> None:
+    # Celery prefork children must not inherit the parent's locks or in-flight calls.
+    global _SCHEDULER, _SCHEDULER_LOCK
+    _SCHEDULER = None
+    _SCHEDULER_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def scheduled(
+    family: str,
+    *,
+    retry_on: tuple[type[BaseException], ...] = (ConnectionError, Timeout),
+    attempts: int = 4,
+    max_wait: float = 4.0,
+):
+    """Route a fetch function through the shared scheduler (replaces a tenacity ``@retry``)."""
+    if family not in FAMILIES:
+        raise ValueError(f"unknown nba_api endpoint family: {family}")
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (fn.__module__, fn.__qualname__, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                key = None
+            return get_scheduler().call(
+                family, key, fn, *args, retry_on=retry_on, attempts=attempts, max_wait=max_wait, **kwargs
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,322 @@
+"""On-disk cache of raw stats.nba.com responses, with a replay mode.
+
+Re-ingesting a game (force refresh, ``retry_pbp_backfill``,
+``backfill_period_stats_overnight``) used to download the same box score,
+play-by-play and shot chart JSON again. Fetchers decorated with
+``@cached_response`` keep the raw payload, before any normalisation, under
+``FUNBA_NBA_RESPONSE_CACHE_DIR``:
+
+    <root>/<endpoint>/<key[:2]>/<key>.json.gz
+
+``key`` is a SHA-256 over the endpoint name and the fetcher's bound
+arguments, so the same request always lands on the same file whatever
+process or argument order produced it. How long an entry stays valid
+depends on the game's status when it was written (``_ttl_seconds``):
+completed games that are past the stat-correction window never expire, live
+games are refetched after a minute, and upcoming games are not stored.
+
+``FUNBA_NBA_RESPONSE_CACHE_MODE``:
+
+- ``readwrite`` (default when the directory is set): serve fresh entries,
+  fetch and store the rest;
+- ``replay``: serve only from the cache and ignore expiry. A miss raises
+  ``ResponseCacheMiss`` and never reaches the network, so a normaliser change
+  (``_normalize_pbp``, ``_normalize_player_stats``) can be re-run over all
+  cached history without touching the rate limits;
+- ``off``: bypass the cache.
+
+A forced re-ingest must see corrections to games that have already settled,
+whose entries never expire. Under ``refreshing_responses()`` (or with
+``refresh_cache=True`` on a single decorated call) fetchers skip the cached
+entry and overwrite it with what stats.nba.com returns. Replay mode ignores
+the refresh, because it never reaches the network. The repair CLIs
+(``db.backfill_period_stats``, the shot gap backfill) always refresh: the
+games they pick are the ones whose stored data is missing or wrong.
+
+stats.nba.com sometimes answers with a payload that is well-formed but
+useless: an empty shot chart, or a period box score that is really the
+full-game totals. ``cached_response(endpoint, cacheable=...)`` names a check
+for those. A payload that fails it is returned to the caller but not
+stored, and an entry already stored that fails it is treated as a miss
+(outside replay), so a bad answer is never pinned to a settled game.
+
+The decorator goes above ``@scheduled``, so cache hits take neither rate
+tokens nor concurrency slots.
+
+Usage:
+    FUNBA_NBA_RESPONSE_CACHE_MODE=replay .venv/bin/python -m db.retry_pbp_backfill
+    .venv/bin/python -m db.nba_response_cache stats
+    .venv/bin/python -m db.nba_response_cache prune
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import contextvars
+import functools
+import gzip
+import hashlib
+import inspect
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable
+
+from db.game_status import GAME_STATUS_COMPLETED, GAME_STATUS_LIVE, GAME_STATUS_UPCOMING
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+MODE_READWRITE = "readwrite"
+MODE_REPLAY = "replay"
+MODE_OFF = "off"
+_MODES = {MODE_READWRITE, MODE_REPLAY, MODE_OFF}
+
+# Stats corrections land within a few days of a game; until then completed games are revalidated.
+_SETTLE_DAYS = 3
+_TTL_SECONDS = {
+    GAME_STATUS_COMPLETED: 6 * 3600,
+    GAME_STATUS_LIVE: 60,
+    GAME_STATUS_UPCOMING: 0,
+    None: 600,
+}
+_NO_GAME_TTL_SECONDS = 24 * 3600
+_REFRESH = contextvars.ContextVar("nba_response_cache_refresh", default=False)
+
+
+class ResponseCacheMiss(LookupError):
+    """Replay mode was asked for a response that was never cached."""
+
+
+def _game_status_from_db(game_id: str) -> tuple[str | None, date | None]:
+    from sqlalchemy.orm import Session
+
+    from db.game_status import get_game_status
+    from db.models import Game, engine
+
+    with Session(engine) as session:
+        game = session.query(Game).filter(Game.game_id == str(game_id)).first()
+        if game is None:
+            return None, None
+        return get_game_status(game), game.game_date
+
+
+def _ttl_seconds(status: str | None, game_date: date | None, today: date) -> float | None:
+    """Seconds an entry stays valid; None never expires, 0 is not stored."""
+    if status == GAME_STATUS_COMPLETED and game_date is not None and game_date <= today - timedelta(days=_SETTLE_DAYS):
+        return None
+    return _TTL_SECONDS.get(status, _TTL_SECONDS[None])
+
+
+def _cache_key(endpoint: str, params: dict) -> str:
+    canonical = json.dumps([CACHE_FORMAT_VERSION, endpoint, params], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        root: str | os.PathLike,
+        *,
+        mode: str = MODE_READWRITE,
+        status_of: Callable[[str], tuple[str | None, date | None]] = _game_status_from_db,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if mode not in _MODES:
+            raise ValueError(f"unknown nba response cache mode: {mode}")
+        self.root = Path(root)
+        self.mode = mode
+        self._status_of = status_of
+        self._clock = clock
+
+    def path(self, endpoint: str, params: dict) -> Path:
+        key = _cache_key(endpoint, params)
+        return self.root / endpoint / key[:2] / f"{key}.json.gz"
+
+    def get(self, endpoint: str, params: dict):
+        """The cached payload, or None when missing or (outside replay) expired."""
+        path = self.path(endpoint, params)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("ignoring unreadable nba response cache entry %s", path, exc_info=True)
+            return None
+        expires_at = entry.get("expires_at")
+        if self.mode != MODE_REPLAY and expires_at is not None and self._clock() >= expires_at:
+            return None
+        return entry["payload"]
+
+    def put(self, endpoint: str, params: dict, payload, *, game_id: str | None = None) -> bool:
+        if game_id:
+            try:
+                status, game_date = self._status_of(str(game_id))
+            except Exception:
+                logger.warning("game status lookup failed for %s; caching briefly", game_id, exc_info=True)
+                status, game_date = None, None
+            ttl = _ttl_seconds(status, game_date, date.today())
+        else:
+            ttl = _NO_GAME_TTL_SECONDS
+        if ttl == 0:
+            return False
+        now = self._clock()
+        entry = {
+            "endpoint": endpoint,
+            "params": params,
+            "fetched_at": now,
+            "expires_at": None if ttl is None else now + ttl,
+            "payload": payload,
+        }
+        path = self.path(endpoint, params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so a concurrent reader never sees a half-written entry.
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as handle:
+                handle.write(json.dumps(entry, separators=(",", ":"), default=str).encode("utf-8"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        return True
+
+    def fetch(
+        self,
+        endpoint: str,
+        params: dict,
+        fetch: Callable[[], object],
+        *,
+        game_id: str | None = None,
+        refresh: bool = False,
+        cacheable: Callable[[object, dict], bool] | None = None,
+    ):
+        payload = None if refresh and self.mode != MODE_REPLAY else self.get(endpoint, params)
+        if payload is not None and (self.mode == MODE_REPLAY or cacheable is None or cacheable(payload, params)):
+            return payload
+        if self.mode == MODE_REPLAY:
+            raise ResponseCacheMiss(f"{endpoint} {params} is not in {self.root}")
+        payload = fetch()
+        if payload is not None and cacheable is not None and not cacheable(payload, params):
+            logger.info("not caching a %s payload that failed its check: %s", endpoint, params)
+        elif payload is not None:
+            try:
+                self.put(endpoint, params, payload, game_id=game_id)
+            except OSError:
+                logger.warning("could not store nba response cache entry for %s", endpoint, exc_info=True)
+        return payload
+
+    def entries(self):
+        return self.root.glob("*/*/*.json.gz")
+
+
+_UNSET = object()
+_CACHE = _UNSET
+
+
+def get_response_cache() -> ResponseCache | None:
+    """The cache configured by the environment, or None when it is off."""
+    global _CACHE
+    if _CACHE is _UNSET:
+        root = os.getenv("FUNBA_NBA_RESPONSE_CACHE_DIR")
+        mode = os.getenv("FUNBA_NBA_RESPONSE_CACHE_MODE", MODE_READWRITE).strip().lower()
+        _CACHE = ResponseCache(root, mode=mode) if root and mode != MODE_OFF else None
+    return _CACHE
+
+
+@contextlib.contextmanager
+def refreshing_responses(enabled: bool = True):
+    """Within the block, cached fetchers refetch and overwrite their entries.
+
+    Worker threads do not inherit the setting; submit their work through
+    ``contextvars.copy_context().run``.
+    """
+    token = _REFRESH.set(bool(enabled) or _REFRESH.get())
+    try:
+        yield
+    finally:
+        _REFRESH.reset(token)
+
+
+def cached_response(endpoint: str, *, cacheable: Callable[[object, dict], bool] | None = None):
+    """Serve a raw-payload fetcher from the response cache (place above ``@scheduled``).
+
+    ``cacheable(payload, params)`` returning False keeps a payload out of the
+    cache. The wrapper also takes ``refresh_cache=True`` to skip the cached
+    entry for one call.
+    """
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, refresh_cache: bool = False, **kwargs):
+            cache = get_response_cache()
+            if cache is None:
+                return fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            return cache.fetch(
+                endpoint,
+                params,
+                lambda: fn(*args, **kwargs),
+                game_id=params.get("game_id"),
+                refresh=refresh_cache or _REFRESH.get(),
+                cacheable=cacheable,
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def _cache_stats(cache: ResponseCache) -> dict:
+    stats: dict[str, dict] = {}
+    for path in cache.entries():
+        endpoint = stats.setdefault(path.parent.parent.name, {"entries": 0, "bytes": 0})
+        endpoint["entries"] += 1
+        endpoint["bytes"] += path.stat().st_size
+    return stats
+
+
+def prune_expired(cache: ResponseCache) -> int:
+    """Delete expired and unreadable entries; returns how many were removed."""
+    removed = 0
+    now = time.time()
+    for path in cache.entries():
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                expires_at = json.load(handle).get("expires_at")
+        except (OSError, ValueError):
+            expires_at = now
+        if expires_at is not None and now >= expires_at:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or prune the raw nba_api response cache.")
+    parser.add_argument("command", choices=["stats", "prune"])
+    parser.add_argument("--dir", default=os.getenv("FUNBA_NBA_RESPONSE_CACHE_DIR"))
+    args = parser.parse_args(argv)
+    if not args.dir:
+        parser.error("--dir or FUNBA_NBA_RESPONSE_CACHE_DIR is required")
+    cache = ResponseCache(args.dir)
+    if args.command == "stats":
+        print(json.dumps(_cache_stats(cache), indent=2, sort_keys=True))
+    else:
+        print(f"removed {prune_expired(cache)} expired entries")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
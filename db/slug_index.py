@@ -0,0 +1,311 @@
+"""Shared slug lookups for players, games and teams.
+
+Web workers used to hold a full ``{id: slug}`` dict per table (every game
+ever) and reload it every five minutes. ``SlugIndex`` answers point lookups
+instead, through three tiers:
+
+1. a bounded per-process LRU whose entries expire after
+   ``FUNBA_SLUG_CACHE_TTL_SECONDS`` (misses are remembered for a minute);
+2. a Redis hash per kind, ``funba:slug:v1:<kind>``, shared by every worker;
+3. a single-row query on the entity table, written back to both tiers.
+
+Writers that change existing slugs call ``publish_slug_changes``: it updates
+the Redis hash, appends the ids to a per-kind change feed, a sorted set
+scored by a version counter, and broadcasts a ``SlugChanged`` event on the
+invalidation bus (``db.invalidation``) so web workers evict at once. Each
+process also reads the counter at most every
+``FUNBA_SLUG_CACHE_CHECK_SECONDS`` and evicts only the ids that changed
+since its last check, dropping its whole LRU only if it fell behind the
+trimmed feed. Without Redis the index degrades to LRU + database, with the
+TTL as the staleness bound.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from db.invalidation import SlugChanged, publish
+from db.models import Game, Player, Team
+
+
+logger = logging.getLogger(__name__)
+
+_REDIS_URL = os.getenv("FUNBA_SLUG_CACHE_REDIS_URL") or os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+_MAX_ENTRIES = int(os.getenv("FUNBA_SLUG_CACHE_SIZE", "5000"))
+_TTL_SECONDS = float(os.getenv("FUNBA_SLUG_CACHE_TTL_SECONDS", "3600"))
+_MISS_TTL_SECONDS = 60.0
+_CHECK_SECONDS = float(os.getenv("FUNBA_SLUG_CACHE_CHECK_SECONDS", "5"))
+_FEED_LIMIT = 10000
+_REDIS_RETRY_SECONDS = 30
+_KEY_PREFIX = "funba:slug:v1"
+
+# kind -> (model, id attribute); every model carries a ``slug`` column.
+_KINDS = {
+    "player": (Player, "player_id"),
+    "game": (Game, "game_id"),
+    "team": (Team, "team_id"),
+}
+
+_redis_client = None
+_redis_unavailable_until = 0.0
+
+
+def _hash_key(kind: str) -> str:
+    return f"{_KEY_PREFIX}:{kind}"
+
+
+def _version_key(kind: str) -> str:
+    return f"{_KEY_PREFIX}:{kind}:version"
+
+
+def _feed_key(kind: str) -> str:
+    return f"{_KEY_PREFIX}:{kind}:changes"
+
+
+def _redis_or_none():
+    global _redis_client, _redis_unavailable_until
+    now = time.monotonic()
+    if _redis_unavailable_until and now < _redis_unavailable_until:
+        return None
+    if _redis_client is not None:
+        return _redis_client
+    try:
+        import redis as _redis
+
+        _redis_client = _redis.Redis.from_url(_REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+        return _redis_client
+    except Exception:
+        _redis_unavailable_until = now + _REDIS_RETRY_SECONDS
+        logger.exception("slug index Redis unavailable")
+        return None
+
+
+def _redis_failed(action: str) -> None:
+    global _redis_client, _redis_unavailable_until
+    _redis_client = None
+    _redis_unavailable_until = time.monotonic() + _REDIS_RETRY_SECONDS
+    logger.warning("slug index Redis %s failed; using the database for %ds", action, _REDIS_RETRY_SECONDS, exc_info=True)
+
+
+def _text(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+class SlugIndex:
+    """Point lookups of ``entity_id -> slug`` for one entity kind.
+
+    ``get`` mirrors ``dict.get`` so call sites and templates that used the
+    old full maps keep working.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        session_factory: Callable,
+        *,
+        max_entries: int = _MAX_ENTRIES,
+        ttl_seconds: float = _TTL_SECONDS,
+        redis_factory: Callable = _redis_or_none,
+    ) -> None:
+        self.kind = kind
+        model, id_attr = _KINDS[kind]
+        self._id_column = getattr(model, id_attr)
+        self._slug_column = model.slug
+        self._session_factory = session_factory
+        self._max_entries = max(int(max_entries), 1)
+        self._ttl_seconds = ttl_seconds
+        self._redis_factory = redis_factory
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[str | None, float]] = OrderedDict()
+        self._version: int | None = None
+        self._checked_at = float("-inf")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, entity_id, default=None):
+        if entity_id is None:
+            return default
+        key = str(entity_id)
+        self._sync_changes()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                return entry[0] if entry[0] is not None else default
+        slug = self._load(key)
+        self._remember(key, slug, now)
+        return slug if slug is not None else default
+
+    def get_many(self, entity_ids) -> dict[str, str]:
+        """``{entity_id: slug}`` for the ids that have one.
+
+        For list and leaderboard pages: ids missing from the LRU cost one
+        HMGET and at most one ``IN`` query between them, instead of a round
+        trip each. Every id is remembered, so per-row ``get`` calls while the
+        page renders are LRU hits.
+        """
+        keys = list(dict.fromkeys(str(entity_id) for entity_id in entity_ids if entity_id is not None))
+        if not keys:
+            return {}
+        self._sync_changes()
+        now = time.monotonic()
+        found: dict[str, str] = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    if entry[0] is not None:
+                        found[key] = entry[0]
+                else:
+                    missing.append(key)
+        if missing:
+            loaded = self._load_many(missing)
+            for key in missing:
+                self._remember(key, loaded.get(key), now)
+            found.update(loaded)
+        return found
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def forget(self, entity_id) -> None:
+        with self._lock:
+            self._entries.pop(str(entity_id), None)
+
+    def _remember(self, key: str, slug: str | None, now: float) -> None:
+        expires_at = now + (self._ttl_seconds if slug is not None else min(self._ttl_seconds, _MISS_TTL_SECONDS))
+        with self._lock:
+            self._entries[key] = (slug, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, key: str) -> str | None:
+        client = self._redis_factory()
+        if client is not None:
+            try:
+                value = client.hget(_hash_key(self.kind), key)
+            except Exception:
+                _redis_failed("read")
+                client = None
+            else:
+                if value is not None:
+                    return _text(value)
+        with self._session_factory() as session:
+            slug = session.query(self._slug_column).filter(self._id_column == key).scalar()
+        if slug is not None and client is not None:
+            try:
+                # HSETNX: never overwrite a slug a publisher wrote after our read.
+                client.hsetnx(_hash_key(self.kind), key, slug)
+            except Exception:
+                _redis_failed("write")
+        return slug
+
+    def _load_many(self, keys: list[str]) -> dict[str, str]:
+        found: dict[str, str] = {}
+        client = self._redis_factory()
+        if client is not None:
+            try:
+                values = client.hmget(_hash_key(self.kind), keys)
+            except Exception:
+                _redis_failed("read")
+                client = None
+            else:
+                found = {key: _text(value) for key, value in zip(keys, values) if value is not None}
+        rest = [key for key in keys if key not in found]
+        if not rest:
+            return found
+        with self._session_factory() as session:
+            loaded = {
+                str(entity_id): slug
+                for entity_id, slug in session.query(self._id_column, self._slug_column).filter(
+                    self._id_column.in_(rest), self._slug_column.isnot(None)
+                )
+            }
+        if loaded and client is not None:
+            try:
+                pipe = client.pipeline()
+                for key, slug in loaded.items():
+                    pipe.hsetnx(_hash_key(self.kind), key, slug)
+                pipe.execute()
+            except Exception:
+                _redis_failed("write")
+        found.update(loaded)
+        return found
+
+    def _sync_changes(self) -> None:
+        """Evict ids whose slug changed since the last check of the change feed."""
+        now = time.monotonic()
+        if now - self._checked_at < _CHECK_SECONDS:
+            return
+        self._checked_at = now
+        client = self._redis_factory()
+        if client is None:
+            return
+        try:
+            version = int(client.get(_version_key(self.kind)) or 0)
+            if self._version is None or version == self._version:
+                self._version = version
+                return
+            if version < self._version:
+                # Counter was reset (Redis flushed): nothing cached can be trusted.
+                with self._lock:
+                    self._entries.clear()
+                self._version = version
+                return
+            pipe = client.pipeline()
+            pipe.zrangebyscore(_feed_key(self.kind), f"({self._version}", "+inf", withscores=True)
+            pipe.zcard(_feed_key(self.kind))
+            pipe.zrange(_feed_key(self.kind), 0, 0, withscores=True)
+            changed, feed_size, oldest = pipe.execute()
+        except Exception:
+            _redis_failed("change check")
+            return
+        with self._lock:
+            if feed_size >= _FEED_LIMIT and oldest and oldest[0][1] > self._version + 1:
+                # Feed trimmed past our last check.
+                self._entries.clear()
+            else:
+                for entity_id, _score in changed:
+                    self._entries.pop(_text(entity_id), None)
+        # Advance only to what the feed shows: the counter is bumped before a
+        # publisher adds its ids, so a racing check picks them up next time.
+        if changed:
+            self._version = int(max(score for _entity_id, score in changed))
+
+
+def publish_slug_changes(kind: str, changes: dict[str, str]) -> None:
+    """Share new slugs for existing ids with every process's ``SlugIndex``.
+
+    Call after the writing transaction commits. Newly slugged ids need no
+    call (cached misses expire within a minute), but rewriting an id's slug
+    does, or pages keep the old one until the LRU TTL expires.
+    """
+    if kind not in _KINDS:
+        raise ValueError(f"Unknown slug kind: {kind!r}")
+    changes = {str(entity_id): slug for entity_id, slug in changes.items() if slug}
+    if not changes:
+        return
+    client = _redis_or_none()
+    if client is not None:
+        try:
+            version = int(client.incr(_version_key(kind)))
+            pipe = client.pipeline()
+            pipe.hset(_hash_key(kind), mapping=changes)
+            pipe.zadd(_feed_key(kind), {entity_id: version for entity_id in changes})
+            pipe.zremrangebyrank(_feed_key(kind), 0, -(_FEED_LIMIT + 1))
+            pipe.execute()
+        except Exception:
+            _redis_failed("publish")
+    # After the shared hash is updated, so evicting workers refill the new slug.
+    for entity_id, slug in changes.items():
+        publish(SlugChanged(kind=kind, entity_id=entity_id, slug=slug))
@@ -13,6 +13,9 @@ import os
 import signal
 
 preload_app = True
+# More than one thread switches workers to gthread, which the live game SSE
+# stream (FUNBA_LIVE_STREAM_ENABLED) needs: each open stream holds a thread.
+threads = int(os.getenv("FUNBA_GUNICORN_THREADS", "1"))
 
 _log = logging.getLogger("gunicorn.error")
 _WARMUP_TIMEOUT_SECONDS = float(os.getenv("FUNBA_GUNICORN_WARMUP_TIMEOUT_SECONDS", "8"))
@@ -77,3 +80,13 @@ def post_fork(server, worker):
         engine.dispose()
     except Exception as exc:
         _log.warning("post_fork engine.dispose failed: %s", exc)
+
+
+def worker_exit(server, worker):
+    """Write this worker's buffered page views before it goes away."""
+    try:
+        from web.app import _page_view_writer
+
+        _page_view_writer.close()
+    except Exception as exc:
+        _log.warning("worker_exit page view flush failed: %s", exc)
@@ -0,0 +1,405 @@
+"""Columnar per-season snapshots of game facts for metric backfills.
+
+A full-history backfill maps every metric over ~60k games, and each game
+re-reads PlayerGameStats / TeamGameStats / ShotRecord / GamePlayByPlay through
+the ORM. This module exports those tables once per season into a directory of
+memory-mappable NumPy ``.npy`` columns and serves the per-game helper lookups
+in ``metrics.helpers`` from it:
+
+    <root>/<season>/manifest.json
+    <root>/<season>/<Table>/<column>.npy        values (NULLs hold a filler)
+    <root>/<season>/<Table>/<column>.null.npy   NULL mask, only when needed
+    <root>/<season>/stale_game_ids.txt         games rewritten since the export
+
+Rows are sorted by game_id (then by the helper's own ORDER BY), so one game
+is a contiguous slice located with a binary search. Only completed games are
+exported; any other game falls back to the database, and so does a game whose
+facts were rewritten after the export (``mark_fact_snapshot_stale``, called by
+``tasks.ingest`` when it re-stores an existing game) until the next export.
+
+Usage:
+    .venv/bin/python -m metrics.fact_snapshot export --season 22025 --out /data/fact_snapshots
+    .venv/bin/python -m metrics.fact_snapshot export --season all --out /data/fact_snapshots
+
+Map tasks pick the snapshot up when ``METRIC_FACT_SNAPSHOT_DIR`` points at the
+export root (see ``metrics.framework.runner``).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from db.game_status import completed_game_clause
+from db.models import Game, GamePlayByPlay, PlayerGameStats, ShotRecord, TeamGameStats
+
+logger = logging.getLogger(__name__)
+
+FACT_SNAPSHOT_INFO_KEY = "fact_snapshot"
+SNAPSHOT_FORMAT_VERSION = 1
+_STALE_GAMES_FILE = "stale_game_ids.txt"
+_EXPORT_FETCH_SIZE = 20000
+# Games whose rows are held in memory at once while exporting.
+_EXPORT_CHUNK_GAMES = 500
+
+# Table name → (model, in-game ORDER BY matching the metrics.helpers query).
+_SNAPSHOT_TABLES = {
+    "PlayerGameStats": (PlayerGameStats, (PlayerGameStats.team_id.asc(), PlayerGameStats.player_id.asc())),
+    "TeamGameStats": (TeamGameStats, (TeamGameStats.team_id.asc(),)),
+    "ShotRecord": (
+        ShotRecord,
+        (
+            ShotRecord.player_id.asc(),
+            ShotRecord.period.asc(),
+            ShotRecord.min.desc(),
+            ShotRecord.sec.desc(),
+            ShotRecord.id.asc(),
+        ),
+    ),
+    "GamePlayByPlay": (
+        GamePlayByPlay,
+        (GamePlayByPlay.period.asc(), GamePlayByPlay.event_num.asc(), GamePlayByPlay.id.asc()),
+    ),
+}
+
+_NUMPY_KINDS = {int: "int64", float: "float64", bool: "bool", str: "str"}
+
+
+def _column_kind(column) -> str | None:
+    try:
+        return _NUMPY_KINDS.get(column.type.python_type)
+    except NotImplementedError:
+        return None
+
+
+def _snapshot_columns(model) -> list:
+    return [column for column in model.__table__.columns if _column_kind(column) is not None]
+
+
+def _column_arrays(values: list, kind: str) -> tuple[np.ndarray, np.ndarray | None]:
+    nulls = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+    if kind == "str":
+        filled = ["" if value is None else str(value) for value in values]
+        array = np.array(filled, dtype=str) if filled else np.array([], dtype="U1")
+    elif kind == "float64":
+        array = np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+    elif kind == "bool":
+        array = np.array([bool(value) for value in values], dtype=bool)
+    else:
+        array = np.array([0 if value is None else int(value) for value in values], dtype=np.int64)
+    return array, (nulls if nulls.any() else None)
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+
+def _season_game_filter(query, season: str):
+    query = query.filter(completed_game_clause(Game))
+    if season != "all":
+        query = query.filter(Game.season == season)
+    return query
+
+
+def export_season_snapshot(session: Session, season: str, root: str | os.PathLike) -> Path:
+    """Write the columnar snapshot for one season and return its directory.
+
+    ``season="all"`` exports every completed game into a single snapshot.
+    Rows are read ``_EXPORT_CHUNK_GAMES`` games at a time and each chunk's
+    columns are spilled to disk before the next one is read, so memory stays
+    bounded by one chunk even for the whole history. The manifest is written
+    last, so a half-written export is never loaded.
+    """
+    season_dir = Path(root) / season
+    season_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = season_dir / "manifest.json"
+    if manifest_path.exists():
+        manifest_path.unlink()
+    # Cleared before reading, so a game rewritten during the export stays stale.
+    (season_dir / _STALE_GAMES_FILE).unlink(missing_ok=True)
+
+    game_ids = [
+        row.game_id
+        for row in _season_game_filter(session.query(Game.game_id), season)
+        .order_by(Game.game_id.asc())
+        .all()
+    ]
+    chunks = [game_ids[start:start + _EXPORT_CHUNK_GAMES] for start in range(0, len(game_ids), _EXPORT_CHUNK_GAMES)]
+    tables = {
+        table_name: _export_table(session, season, chunks, model, order_by, season_dir / table_name)
+        for table_name, (model, order_by) in _SNAPSHOT_TABLES.items()
+    }
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "season": season,
+        "exported_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "game_ids": game_ids,
+        "tables": tables,
+    }
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    return season_dir
+
+
+def _export_table(session: Session, season: str, chunks: list[list[str]], model, order_by, table_dir: Path) -> dict:
+    """Write one table's columns chunk by chunk, then join the parts into one ``.npy`` per column."""
+    columns = _snapshot_columns(model)
+    table_dir.mkdir(exist_ok=True)
+    parts_dir = table_dir / ".parts"
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    parts_dir.mkdir()
+    parts: list[tuple[int, dict[str, bool]]] = []
+    for index, chunk in enumerate(chunks):
+        query = _season_game_filter(
+            session.query(*columns).join(Game, model.game_id == Game.game_id),
+            season,
+        ).filter(model.game_id >= chunk[0], model.game_id <= chunk[-1])
+        values: dict[str, list] = {column.key: [] for column in columns}
+        row_count = 0
+        for row in query.order_by(model.game_id.asc(), *order_by).yield_per(_EXPORT_FETCH_SIZE):
+            row_count += 1
+            for column, value in zip(columns, row):
+                values[column.key].append(value)
+        has_nulls = {}
+        for column in columns:
+            array, nulls = _column_arrays(values.pop(column.key), _column_kind(column))
+            np.save(parts_dir / f"{column.key}.{index}.npy", array, allow_pickle=False)
+            if nulls is not None:
+                np.save(parts_dir / f"{column.key}.{index}.null.npy", nulls, allow_pickle=False)
+            has_nulls[column.key] = nulls is not None
+        parts.append((row_count, has_nulls))
+
+    row_count = sum(rows for rows, _ in parts)
+    nullable: list[str] = []
+    for column in columns:
+        column_parts = [np.load(parts_dir / f"{column.key}.{index}.npy", mmap_mode="r") for index in range(len(parts))]
+        dtype = np.result_type(*column_parts) if column_parts else _column_arrays([], _column_kind(column))[0].dtype
+        _join_parts(table_dir / f"{column.key}.npy", dtype, row_count, column_parts)
+        null_path = table_dir / f"{column.key}.null.npy"
+        if any(has_nulls[column.key] for _, has_nulls in parts):
+            null_parts = [
+                np.load(parts_dir / f"{column.key}.{index}.null.npy", mmap_mode="r")
+                if has_nulls[column.key] else np.zeros(rows, dtype=bool)
+                for index, (rows, has_nulls) in enumerate(parts)
+            ]
+            _join_parts(null_path, bool, row_count, null_parts)
+            nullable.append(column.key)
+        elif null_path.exists():
+            null_path.unlink()
+        del column_parts
+    shutil.rmtree(parts_dir)
+    logger.info("fact snapshot %s: %s → %d rows", season, table_dir.name, row_count)
+    return {
+        "rows": row_count,
+        "columns": [column.key for column in columns],
+        "nullable": nullable,
+    }
+
+
+def _join_parts(path: Path, dtype, row_count: int, parts: list[np.ndarray]) -> None:
+    if not row_count:
+        np.save(path, np.array([], dtype=dtype), allow_pickle=False)
+        return
+    joined = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(row_count,))
+    offset = 0
+    for part in parts:
+        joined[offset:offset + len(part)] = part
+        offset += len(part)
+    joined.flush()
+    del joined
+
+
+# ── Read ──────────────────────────────────────────────────────────────────────
+
+class FactSnapshot:
+    """Memory-mapped view over one exported season."""
+
+    def __init__(self, season_dir: str | os.PathLike):
+        self.path = Path(season_dir)
+        manifest = json.loads((self.path / "manifest.json").read_text(encoding="utf-8"))
+        if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported fact snapshot format in {self.path}")
+        self.season = manifest["season"]
+        self.game_ids = frozenset(manifest["game_ids"]) - _stale_game_ids(self.path)
+        self._tables = manifest["tables"]
+        self._columns: dict[tuple[str, str], np.ndarray] = {}
+        self._nulls: dict[tuple[str, str], np.ndarray | None] = {}
+
+    def covers(self, game_id: str) -> bool:
+        return str(game_id) in self.game_ids
+
+    def _column(self, table_name: str, column: str) -> np.ndarray:
+        key = (table_name, column)
+        array = self._columns.get(key)
+        if array is None:
+            array = np.load(self.path / table_name / f"{column}.npy", mmap_mode="r", allow_pickle=False)
+            self._columns[key] = array
+            if column in self._tables[table_name]["nullable"]:
+                self._nulls[key] = np.load(
+                    self.path / table_name / f"{column}.null.npy", mmap_mode="r", allow_pickle=False
+                )
+            else:
+                self._nulls[key] = None
+        return array
+
+    def _game_slice(self, table_name: str, game_id: str) -> slice:
+        game_ids = self._column(table_name, "game_id")
+        start = int(np.searchsorted(game_ids, game_id, side="left"))
+        stop = int(np.searchsorted(game_ids, game_id, side="right"))
+        return slice(start, stop)
+
+    def rows(self, table_name: str, game_id: str) -> list:
+        """Rows of one table for one game, as detached model instances in helper order."""
+        model = _SNAPSHOT_TABLES[table_name][0]
+        table = self._tables[table_name]
+        if not table["rows"]:
+            return []
+        span = self._game_slice(table_name, str(game_id))
+        if span.start == span.stop:
+            return []
+        column_values: dict[str, list] = {}
+        for column in table["columns"]:
+            values = self._column(table_name, column)[span].tolist()
+            nulls = self._nulls[(table_name, column)]
+            if nulls is not None:
+                values = [None if is_null else value for value, is_null in zip(values, nulls[span].tolist())]
+            column_values[column] = values
+        columns = list(column_values)
+        return [
+            model(**dict(zip(columns, values)))
+            for values in zip(*(column_values[column] for column in columns))
+        ]
+
+
+def _stale_game_ids(season_dir: Path) -> frozenset[str]:
+    try:
+        text = (season_dir / _STALE_GAMES_FILE).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return frozenset()
+    return frozenset(line.strip() for line in text.splitlines() if line.strip())
+
+
+def _stale_stamp(season_dir: Path) -> tuple[int, int] | None:
+    try:
+        stat = (season_dir / _STALE_GAMES_FILE).stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@lru_cache(maxsize=32)
+def _open_snapshot(season_dir: str, _manifest_mtime_ns: int, _stale_stamp) -> FactSnapshot:
+    return FactSnapshot(season_dir)
+
+
+def load_fact_snapshot(root: str | os.PathLike, season: str) -> FactSnapshot | None:
+    """Return the snapshot for ``season`` under ``root``, or None when not exported.
+
+    Opened snapshots are reused per process until the export is rewritten or
+    another game is marked stale.
+    """
+    season_dir = Path(root) / season
+    try:
+        mtime_ns = (season_dir / "manifest.json").stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _open_snapshot(str(season_dir), mtime_ns, _stale_stamp(season_dir))
+
+
+def mark_fact_snapshot_stale(root: str | os.PathLike, season: str | None, game_ids) -> None:
+    """Stop serving ``game_ids`` from the ``season`` and "all" snapshots under ``root``.
+
+    For games whose facts were rewritten after the export; they fall back to
+    the database until the next export. Ids are appended one per line, so
+    concurrent ingests cannot drop each other's entries.
+    """
+    lines = "".join(f"{game_id}\n" for game_id in sorted({str(game_id) for game_id in game_ids}))
+    if not lines:
+        return
+    for bucket in dict.fromkeys(bucket for bucket in (season, "all") if bucket):
+        season_dir = Path(root) / bucket
+        if not (season_dir / "manifest.json").exists():
+            continue
+        with open(season_dir / _STALE_GAMES_FILE, "a", encoding="utf-8") as handle:
+            handle.write(lines)
+
+
+def attach_fact_snapshot(session: Session, snapshot: FactSnapshot | None) -> None:
+    """Serve metrics.helpers fact lookups for covered games from ``snapshot``."""
+    if snapshot is None:
+        session.info.pop(FACT_SNAPSHOT_INFO_KEY, None)
+    else:
+        session.info[FACT_SNAPSHOT_INFO_KEY] = snapshot
+
+
+class FactSnapshotSession:
+    """Read-only session adapter backed by a fact snapshot.
+
+    Passing this to generated metric code (or the helpers directly) serves
+    every snapshot-covered game from local columns. Anything else goes to the
+    wrapped session, or raises when none was given, so a fully offline
+    backfill fails loudly instead of silently reaching MySQL.
+    """
+
+    def __init__(self, snapshot: FactSnapshot, session: Session | None = None):
+        self._session = session
+        self.info: dict = {FACT_SNAPSHOT_INFO_KEY: snapshot}
+
+    @property
+    def bind(self):
+        return self._session.bind if self._session is not None else None
+
+    def _require_session(self, operation: str) -> Session:
+        if self._session is None:
+            raise RuntimeError(f"FactSnapshotSession has no database session for {operation}()")
+        return self._session
+
+    def query(self, *args, **kwargs):
+        return self._require_session("query").query(*args, **kwargs)
+
+    def get(self, *args, **kwargs):
+        return self._require_session("get").get(*args, **kwargs)
+
+    def scalar(self, *args, **kwargs):
+        return self._require_session("scalar").scalar(*args, **kwargs)
+
+    def scalars(self, *args, **kwargs):
+        return self._require_session("scalars").scalars(*args, **kwargs)
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Export columnar per-season fact snapshots.")
+    sub = p.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export")
+    export.add_argument("--season", action="append", required=True,
+                        help="Season id like 22025, or 'all'. Repeatable.")
+    export.add_argument("--out", required=True, help="Snapshot root directory")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    from sqlalchemy.orm import sessionmaker
+
+    from db.models import engine
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    args = _parse_args(argv)
+    Session = sessionmaker(bind=engine)
+    for season in args.season:
+        with Session() as session:
+            season_dir = export_season_snapshot(session, season, args.out)
+        print(f"exported {season} → {season_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
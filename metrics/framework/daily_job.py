@@ -1,7 +1,9 @@
 """**DEPRECATED** — Use ``python -m tasks.dispatch`` instead.
 
-This script runs metrics locally via ThreadPoolExecutor without the Celery
-pipeline. It is kept only for reference. All metric computation should go
+This script runs metrics locally without the Celery pipeline, either in a
+process pool (default: games partitioned by season/date, one engine per
+worker, batched MetricRunLog writes) or in a thread pool. It is kept only for
+reference and local season backfills. All metric computation should go
 through the event-driven architecture (RabbitMQ + Celery workers).
 
 Replacement commands:
@@ -16,16 +18,28 @@ from __future__ import annotations
 
 import argparse
 import logging
+import os
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import date, timedelta
+from itertools import groupby
 from threading import Lock
 
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
 
 from db.game_status import completed_game_clause
 from db.models import Game, engine
-from metrics.framework.runner import already_processed, run_for_game
+from metrics.framework.runner import (
+    _flush_run_logs,
+    _map_game,
+    already_processed,
+    reduce_metric_incremental,
+    run_deltas_for_game,
+)
+from metrics.framework.runtime import get_all_metrics
 
 logging.basicConfig(
     level=logging.INFO,
@@ -35,18 +49,50 @@ logging.basicConfig(
 logger = logging.getLogger("daily_job")
 
 _DEFAULT_WORKERS = 4
+_DEFAULT_EXECUTOR = "process"
+_WORKER_FLUSH_GAMES = 25  # games per MetricRunLog flush + commit in a process worker
+
+# Set by _init_process_worker: each process owns a single-connection engine.
+_worker_engine = None
+
+
+def _session_factory():
+    return sessionmaker(bind=_worker_engine if _worker_engine is not None else engine)
+
+
+def _is_deadlock(exc: Exception) -> bool:
+    return isinstance(exc, OperationalError) and "1213" in str(exc)
+
+
+def _game_metric_keys() -> list[str]:
+    with _session_factory()() as session:
+        return [
+            m.key for m in get_all_metrics(session=session)
+            if getattr(m, "trigger", "game") != "season"
+        ]
+
 
+def _touched_pairs(season: str, produced: dict[str, bool]) -> set[tuple[str, str]]:
+    return {(key, season) for key, was_produced in produced.items() if was_produced}
 
-def _process_one(game, total: int, skip_existing: bool, counter: list, lock: Lock) -> tuple:
-    """Process a single game. Returns (n_results, skipped).
+
+# ── Thread executor ───────────────────────────────────────────────────────────
+
+def _process_one(
+    game,
+    metric_keys: list[str],
+    total: int,
+    skip_existing: bool,
+    counter: list,
+    lock: Lock,
+) -> tuple:
+    """Process a single game. Returns (n_produced, skipped, touched (metric_key, season) pairs).
 
     Retries up to 3 times on MySQL deadlock (errno 1213).
     """
     import random
-    import time
-    from sqlalchemy.exc import OperationalError
 
-    SessionLocal = sessionmaker(bind=engine)
+    SessionLocal = _session_factory()
 
     if skip_existing:
         with SessionLocal() as session:
@@ -54,7 +100,7 @@ def _process_one(game, total: int, skip_existing: bool, counter: list, lock: Loc
                 with lock:
                     counter[0] += 1
                     logger.info("[%d/%d] Skipping %s (already processed)", counter[0], total, game.game_id)
-                return 0, True
+                return 0, True, set()
 
     with lock:
         counter[0] += 1
@@ -64,50 +110,233 @@ def _process_one(game, total: int, skip_existing: bool, counter: list, lock: Loc
     for attempt in range(3):
         try:
             with SessionLocal() as session:
-                results = run_for_game(session, game.game_id, commit=True)
+                produced = run_deltas_for_game(session, game.game_id, metric_keys, commit=True)
             break
         except OperationalError as exc:
-            if "1213" in str(exc) and attempt < 2:
+            if _is_deadlock(exc) and attempt < 2:
                 wait = 0.5 * (attempt + 1) + random.random()
                 logger.warning("Deadlock on %s, retrying in %.1fs (attempt %d)…", game.game_id, wait, attempt + 1)
                 time.sleep(wait)
             else:
                 raise
 
-    return len(results), False
+    return sum(produced.values()), False, _touched_pairs(game.season, produced)
 
 
-def _run_games(games: list, skip_existing: bool = False, workers: int = _DEFAULT_WORKERS) -> None:
+def _run_games_threaded(games: list, metric_keys: list[str], skip_existing: bool, workers: int) -> tuple:
     total = len(games)
     total_results = 0
     skipped = 0
+    touched: set[tuple[str, str]] = set()
     counter = [0]  # mutable for use inside threads
     lock = Lock()
 
     with ThreadPoolExecutor(max_workers=workers) as pool:
         futures = {
-            pool.submit(_process_one, game, total, skip_existing, counter, lock): game
+            pool.submit(_process_one, game, metric_keys, total, skip_existing, counter, lock): game
             for game in games
         }
         for future in as_completed(futures):
             try:
-                n_results, was_skipped = future.result()
+                n_results, was_skipped, game_touched = future.result()
                 if was_skipped:
                     skipped += 1
                 else:
                     total_results += n_results
+                    touched |= game_touched
             except Exception as exc:
                 game = futures[future]
                 logger.error("Game %s failed: %s", game.game_id, exc, exc_info=True)
 
-    processed = total - skipped
+        _reduce_touched(pool, touched)
+    return skipped, total_results
+
+
+# ── Process executor ──────────────────────────────────────────────────────────
+
+def _partition_games(games: list, workers: int) -> list[list[tuple[str, str]]]:
+    """Split games into at most ``workers`` partitions of (game_id, season).
+
+    Games of one (season, game_date) stay in the same partition, so workers
+    never write MetricRunLog rows for the same day concurrently. Days are
+    assigned largest-first to the lightest partition to balance the load.
+    """
+    days = [
+        [(game.game_id, game.season) for game in day_games]
+        for _, day_games in groupby(
+            sorted(games, key=lambda g: (g.season or "", g.game_date or date.min, g.game_id)),
+            key=lambda g: (g.season, g.game_date),
+        )
+    ]
+    partitions: list[list[tuple[str, str]]] = [[] for _ in range(max(min(workers, len(days)), 1))]
+    for day in sorted(days, key=len, reverse=True):
+        min(partitions, key=len).extend(day)
+    for partition in partitions:
+        partition.sort()
+    return [partition for partition in partitions if partition]
+
+
+def _init_process_worker() -> None:
+    """Give each worker process its own engine instead of the parent's forked pool."""
+    global _worker_engine
+    engine.dispose(close=False)
+    _worker_engine = create_engine(engine.url, pool_size=1, max_overflow=0, pool_pre_ping=True)
+
+
+def _map_batch(session, batch: list[tuple[str, str]], metric_keys: list[str]) -> tuple:
+    """Map a batch of games and write their MetricRunLog rows in one flush + commit."""
+    produced_total = 0
+    run_log_rows: list[dict] = []
+    touched: set[tuple[str, str]] = set()
+    for game_id, season in batch:
+        produced, rows = _map_game(session, game_id, metric_keys)
+        produced_total += sum(produced.values())
+        run_log_rows.extend(rows)
+        touched |= _touched_pairs(season, produced)
+    _flush_run_logs(session, run_log_rows)
+    session.commit()
+    return produced_total, len(run_log_rows), touched
+
+
+def _run_partition(
+    worker_index: int,
+    partition: list[tuple[str, str]],
+    metric_keys: list[str],
+    skip_existing: bool,
+) -> dict:
+    """Map one partition inside a worker process; returns its throughput report.
+
+    Games are mapped in chunks of _WORKER_FLUSH_GAMES, each in its own session
+    with one MetricRunLog flush + commit, so the per-session helper caches
+    (``session.info``) and identity map never outgrow a chunk. A chunk that
+    fails (typically a deadlock) is rolled back and re-mapped one game at a
+    time, so a single bad game does not sink its neighbours. The report
+    counts mapped and failed games separately.
+    """
+    started = time.monotonic()
+    report = {
+        "worker": worker_index,
+        "mapped": 0,
+        "failed": 0,
+        "skipped": 0,
+        "produced": 0,
+        "run_log_rows": 0,
+        "touched": set(),
+    }
+
+    def _record(result: tuple) -> None:
+        produced, rows, touched = result
+        report["produced"] += produced
+        report["run_log_rows"] += rows
+        report["touched"] |= touched
+
+    SessionLocal = _session_factory()
+    for start in range(0, len(partition), _WORKER_FLUSH_GAMES):
+        chunk = partition[start:start + _WORKER_FLUSH_GAMES]
+        with SessionLocal() as session:
+            pending = [game for game in chunk if not (skip_existing and already_processed(session, game[0]))]
+            report["skipped"] += len(chunk) - len(pending)
+            if not pending:
+                continue
+            try:
+                _record(_map_batch(session, pending, metric_keys))
+                report["mapped"] += len(pending)
+            except Exception as exc:
+                session.rollback()
+                logger.warning("worker %d: %d-game batch failed (%s); re-mapping per game",
+                               worker_index, len(pending), "deadlock" if _is_deadlock(exc) else exc)
+                for game in pending:
+                    try:
+                        _record(_map_batch(session, [game], metric_keys))
+                        report["mapped"] += 1
+                    except Exception as game_exc:
+                        session.rollback()
+                        report["failed"] += 1
+                        logger.error("Game %s failed: %s", game[0], game_exc, exc_info=True)
+        logger.info("worker %d: %d/%d games done (%d failed)", worker_index,
+                    report["mapped"] + report["failed"] + report["skipped"], len(partition), report["failed"])
+
+    report["seconds"] = time.monotonic() - started
+    return report
+
+
+def _reduce_one(metric_key: str, season: str) -> int:
+    with _session_factory()() as session:
+        return reduce_metric_incremental(session, metric_key, season, commit=True)
+
+
+def _reduce_touched(pool, touched: set[tuple[str, str]]) -> None:
+    """Fold the freshly mapped deltas of every touched (metric_key, season) into MetricResult."""
+    if not touched:
+        return
+    started = time.monotonic()
+    futures = {pool.submit(_reduce_one, key, season): (key, season) for key, season in sorted(touched)}
+    for future in as_completed(futures):
+        key, season = futures[future]
+        try:
+            future.result()
+        except Exception as exc:
+            logger.error("Reduce %s/%s failed: %s", key, season, exc, exc_info=True)
+    logger.info("Reduced %d metric/season pair(s) in %.1fs.", len(touched), time.monotonic() - started)
+
+
+def _run_games_in_processes(games: list, metric_keys: list[str], skip_existing: bool, workers: int) -> tuple:
+    partitions = _partition_games(games, workers)
+    skipped = mapped = failed = 0
+    total_results = 0
+    touched: set[tuple[str, str]] = set()
+    started = time.monotonic()
+
+    with ProcessPoolExecutor(max_workers=len(partitions), initializer=_init_process_worker) as pool:
+        futures = {
+            pool.submit(_run_partition, index, partition, metric_keys, skip_existing): index
+            for index, partition in enumerate(partitions)
+        }
+        for future in as_completed(futures):
+            try:
+                report = future.result()
+            except Exception as exc:
+                logger.error("Worker %d failed: %s", futures[future], exc, exc_info=True)
+                continue
+            skipped += report["skipped"]
+            mapped += report["mapped"]
+            failed += report["failed"]
+            total_results += report["produced"]
+            touched |= report["touched"]
+            logger.info(
+                "worker %d: %d games mapped, %d failed, %d skipped, %d run-log rows in %.1fs — %.2f games/s",
+                report["worker"], report["mapped"], report["failed"], report["skipped"], report["run_log_rows"],
+                report["seconds"], report["mapped"] / report["seconds"] if report["seconds"] else 0.0,
+            )
+
+        elapsed = time.monotonic() - started
+        logger.info("Mapped %d games (%d failed) on %d worker(s) in %.1fs — %.2f games/s overall.",
+                    mapped, failed, len(partitions), elapsed, mapped / elapsed if elapsed else 0.0)
+        _reduce_touched(pool, touched)
+    return skipped, total_results
+
+
+def _run_games(
+    games: list,
+    skip_existing: bool = False,
+    workers: int = _DEFAULT_WORKERS,
+    executor: str = _DEFAULT_EXECUTOR,
+) -> None:
+    metric_keys = _game_metric_keys()
+    if executor == "process":
+        skipped, total_results = _run_games_in_processes(games, metric_keys, skip_existing, workers)
+    else:
+        skipped, total_results = _run_games_threaded(games, metric_keys, skip_existing, workers)
+
+    processed = len(games) - skipped
     logger.info(
-        "Done: %d games processed, %d skipped, %d total metric results.",
+        "Done: %d games processed, %d skipped, %d metric(s) produced output.",
         processed, skipped, total_results,
     )
 
 
-def run_date(target_date: date, skip_existing: bool = False, workers: int = _DEFAULT_WORKERS) -> None:
+def run_date(target_date: date, skip_existing: bool = False, workers: int = _DEFAULT_WORKERS,
+             executor: str = _DEFAULT_EXECUTOR) -> None:
     SessionLocal = sessionmaker(bind=engine)
     with SessionLocal() as session:
         games = session.query(Game).filter(Game.game_date == target_date, completed_game_clause(Game)).all()
@@ -117,10 +346,11 @@ def run_date(target_date: date, skip_existing: bool = False, workers: int = _DEF
         return
 
     logger.info("Found %d game(s) on %s.", len(games), target_date)
-    _run_games(games, skip_existing=skip_existing, workers=workers)
+    _run_games(games, skip_existing=skip_existing, workers=workers, executor=executor)
 
 
-def run_season(season_year: str, skip_existing: bool = False, workers: int = _DEFAULT_WORKERS) -> None:
+def run_season(season_year: str, skip_existing: bool = False, workers: int = _DEFAULT_WORKERS,
+               executor: str = _DEFAULT_EXECUTOR) -> None:
     """Run metrics for all games whose season starts with season_year (e.g. '22025')."""
     SessionLocal = sessionmaker(bind=engine)
     with SessionLocal() as session:
@@ -136,10 +366,11 @@ def run_season(season_year: str, skip_existing: bool = False, workers: int = _DE
         return
 
     logger.info("Found %d games for season year %s.", len(games), season_year)
-    _run_games(games, skip_existing=skip_existing, workers=workers)
+    _run_games(games, skip_existing=skip_existing, workers=workers, executor=executor)
 
 
-def run_since(since_date: date, skip_existing: bool = False, workers: int = _DEFAULT_WORKERS) -> None:
+def run_since(since_date: date, skip_existing: bool = False, workers: int = _DEFAULT_WORKERS,
+              executor: str = _DEFAULT_EXECUTOR) -> None:
     SessionLocal = sessionmaker(bind=engine)
     with SessionLocal() as session:
         games = (
@@ -154,7 +385,7 @@ def run_since(since_date: date, skip_existing: bool = False, workers: int = _DEF
         return
 
     logger.info("Found %d games since %s.", len(games), since_date)
-    _run_games(games, skip_existing=skip_existing, workers=workers)
+    _run_games(games, skip_existing=skip_existing, workers=workers, executor=executor)
 
 
 def main() -> None:
@@ -171,21 +402,25 @@ def main() -> None:
     group.add_argument("--season", default=None, help="Season year prefix, e.g. 2025 for 2025-26 season.")
     group.add_argument("--since", default=None, help="Run all games from this date onward (YYYY-MM-DD).")
     parser.add_argument("--force", action="store_true", help="Reprocess games already in MetricRunLog (risks double-counting career totals).")
-    parser.add_argument("--workers", type=int, default=_DEFAULT_WORKERS, help=f"Parallel workers (default: {_DEFAULT_WORKERS}).")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"Parallel workers (default: CPU count for --executor process, {_DEFAULT_WORKERS} for thread).")
+    parser.add_argument("--executor", choices=("process", "thread"), default=_DEFAULT_EXECUTOR,
+                        help="process: one engine per worker process, games partitioned by season/date, "
+                             f"batched MetricRunLog writes (default). thread: {_DEFAULT_WORKERS}-thread pool in one process.")
     args = parser.parse_args()
 
     skip_existing = not args.force
-    workers = args.workers
+    workers = args.workers or ((os.cpu_count() or _DEFAULT_WORKERS) if args.executor == "process" else _DEFAULT_WORKERS)
 
     if args.season:
-        run_season(args.season, skip_existing=skip_existing, workers=workers)
+        run_season(args.season, skip_existing=skip_existing, workers=workers, executor=args.executor)
     elif args.since:
         try:
             since = date.fromisoformat(args.since)
         except ValueError:
             print(f"Invalid date: {args.since!r}. Use YYYY-MM-DD.", file=sys.stderr)
             sys.exit(1)
-        run_since(since, skip_existing=skip_existing, workers=workers)
+        run_since(since, skip_existing=skip_existing, workers=workers, executor=args.executor)
     else:
         if args.date:
             try:
@@ -195,7 +430,7 @@ def main() -> None:
                 sys.exit(1)
         else:
             target = date.today() - timedelta(days=1)
-        run_date(target, skip_existing=skip_existing, workers=workers)
+        run_date(target, skip_existing=skip_existing, workers=workers, executor=args.executor)
 
 
 if __name__ == "__main__":
@@ -6,7 +6,7 @@ from datetime import datetime, timezone
 import time
 from typing import Mapping, Protocol, Sequence
 
-from sqlalchemy import and_, case, func, or_
+from sqlalchemy import and_, case, func, literal, or_
 from sqlalchemy.orm import Session, aliased
 
 from db.models import Game, MetricMilestone, MetricResult, Player, PlayerGameStats, Team, TeamGameStats
@@ -18,6 +18,7 @@ from metrics.framework.base import (
     window_type_from_season,
 )
 from metrics.framework.family import family_base_key, family_window_key
+from metrics.framework.rank_index import RankIndex
 from metrics.framework.runtime import _metric_window_types, get_all_metrics, get_metric
 
 logger = logging.getLogger(__name__)
@@ -393,8 +394,27 @@ def _double_digit_category_count_expr():
     )
 
 
-def _aggregate_player_pool_sql(session: Session, metric, season: str, cutoff_game_date, cutoff_game_id: str) -> dict[str, float]:
+def _player_pool_row_value(metric):
+    """Per-row contribution of one PlayerGameStats row to the player's pool value."""
     kind = str(_metric_attr(metric, "metric_kind", "") or "")
+    if kind == "season_total":
+        return _player_value_expr(_metric_attr(metric, "value_field", None))
+    if kind == "games_played":
+        return literal(1)
+    if kind == "games_started":
+        return case((PlayerGameStats.starter.is_(True), 1), else_=0)
+    if kind in {"count_threshold", "count_combo", "count_exact"}:
+        criteria = tuple(_metric_attr(metric, "criteria", ()) or ())
+        comparator = str(_metric_attr(metric, "comparator", ">=") or ">=")
+        return case((_criteria_clause(criteria, comparator), 1), else_=0)
+    if kind == "double_double":
+        return case((_double_digit_category_count_expr() >= 2, 1), else_=0)
+    if kind == "triple_double":
+        return case((_double_digit_category_count_expr() >= 3, 1), else_=0)
+    raise ValueError(f"Unsupported player metric_kind for pool aggregation: {kind}")
+
+
+def _aggregate_player_pool_sql(session: Session, metric, season: str, cutoff_game_date, cutoff_game_id: str) -> dict[str, float]:
     min_sample = max(int(getattr(metric, "min_sample", 1) or 1), 1)
     split_key = _metric_attr(metric, "split_key", None)
     base_filters = [
@@ -404,23 +424,7 @@ def _aggregate_player_pool_sql(session: Session, metric, season: str, cutoff_gam
         *_game_filter_clauses(season, cutoff_game_date, cutoff_game_id),
     ]
     games_count = func.count(PlayerGameStats.game_id)
-
-    if kind == "season_total":
-        value_expr = func.sum(_player_value_expr(_metric_attr(metric, "value_field", None)))
-    elif kind == "games_played":
-        value_expr = games_count
-    elif kind == "games_started":
-        value_expr = func.sum(case((PlayerGameStats.starter.is_(True), 1), else_=0))
-    elif kind in {"count_threshold", "count_combo", "count_exact"}:
-        criteria = tuple(_metric_attr(metric, "criteria", ()) or ())
-        comparator = str(_metric_attr(metric, "comparator", ">=") or ">=")
-        value_expr = func.sum(case((_criteria_clause(criteria, comparator), 1), else_=0))
-    elif kind == "double_double":
-        value_expr = func.sum(case((_double_digit_category_count_expr() >= 2, 1), else_=0))
-    elif kind == "triple_double":
-        value_expr = func.sum(case((_double_digit_category_count_expr() >= 3, 1), else_=0))
-    else:
-        raise ValueError(f"Unsupported player metric_kind for pool aggregation: {kind}")
+    value_expr = func.sum(_player_pool_row_value(metric))
 
     rows = (
         session.query(PlayerGameStats.player_id, value_expr.label("value"), games_count.label("games"))
@@ -471,28 +475,31 @@ def _team_metric_value_expr(row, opponent, game, stat_field: str | None):
     return func.coalesce(getattr(row, stat_field or "", 0), 0)
 
 
-def _aggregate_team_pool_sql(session: Session, metric, season: str, cutoff_game_date, cutoff_game_id: str) -> dict[str, float]:
+def _team_pool_row_value(row, opponent, metric):
+    """Per-row contribution of one TeamGameStats row to the team's pool value."""
     kind = str(_metric_attr(metric, "metric_kind", "") or "")
     if kind != "count":
         raise ValueError(f"Unsupported team metric_kind for pool aggregation: {kind}")
+    stat_field = _metric_attr(metric, "stat_field", None)
+    threshold = _metric_attr(metric, "threshold", None)
+    if stat_field == "win":
+        return case((row.win.is_(True), 1), else_=0)
+    if stat_field == "loss":
+        return case((or_(row.win.is_(False), row.win.is_(None)), 1), else_=0)
+    raw_value = _team_metric_value_expr(row, opponent, Game, stat_field)
+    if threshold is not None:
+        return case((raw_value >= float(threshold), 1), else_=0)
+    return raw_value
+
+
+def _aggregate_team_pool_sql(session: Session, metric, season: str, cutoff_game_date, cutoff_game_id: str) -> dict[str, float]:
     row = aliased(TeamGameStats)
     opponent = aliased(TeamGameStats)
+    value_expr = func.sum(_team_pool_row_value(row, opponent, metric))
     min_sample = max(int(getattr(metric, "min_sample", 1) or 1), 1)
-    stat_field = _metric_attr(metric, "stat_field", None)
-    threshold = _metric_attr(metric, "threshold", None)
     split_key = _metric_attr(metric, "split_key", None)
     games_count = func.count(row.game_id)
 
-    raw_value = _team_metric_value_expr(row, opponent, Game, stat_field)
-    if stat_field == "win":
-        value_expr = func.sum(case((row.win.is_(True), 1), else_=0))
-    elif stat_field == "loss":
-        value_expr = func.sum(case((or_(row.win.is_(False), row.win.is_(None)), 1), else_=0))
-    elif threshold is not None:
-        value_expr = func.sum(case((raw_value >= float(threshold), 1), else_=0))
-    else:
-        value_expr = func.sum(raw_value)
-
     rows = (
         session.query(row.team_id, value_expr.label("value"), games_count.label("games"))
         .join(Game, row.game_id == Game.game_id)
@@ -509,6 +516,12 @@ def _aggregate_team_pool_sql(session: Session, metric, season: str, cutoff_game_
     return _positive_pool({str(entity_id): _clean_number(value) for entity_id, value, _games in rows if entity_id})
 
 
+_POOL_METRIC_KINDS = frozenset({
+    "season_total", "count_threshold", "count_combo", "count_exact", "games_played",
+    "games_started", "count", "double_double", "triple_double",
+})
+
+
 def aggregate_pool_as_of(
     session: Session,
     metric,
@@ -519,8 +532,7 @@ def aggregate_pool_as_of(
     """Return the additive metric pool immediately before cutoff game."""
     started = time.perf_counter()
     kind = str(_metric_attr(metric, "metric_kind", "") or "")
-    supported_kinds = {"season_total", "count_threshold", "count_combo", "count_exact", "games_played", "games_started", "count", "double_double", "triple_double"}
-    if kind not in supported_kinds:
+    if kind not in _POOL_METRIC_KINDS:
         raise ValueError(f"Unsupported metric_kind for pool aggregation: {kind}")
 
     scope = str(getattr(metric, "scope", "") or "")
@@ -543,10 +555,170 @@ def aggregate_pool_as_of(
     return pool
 
 
+def _pool_game_filter_key(season: str):
+    """Seasons sharing a key share _game_filter_clauses (all last-N windows of a type do)."""
+    if is_career_season(season):
+        return ("type", career_season_type_code(season))
+    return ("season", season)
+
+
+def _split_sum(split, value):
+    if split is True:
+        return func.sum(value)
+    return func.sum(case((split, value), else_=0))
+
+
+def _grouped_pools(rows, columns: Mapping[str, tuple[str, str]], metrics_by_key: Mapping[str, object]) -> dict[str, dict[str, float]]:
+    pools: dict[str, dict[str, float]] = {key: {} for key in metrics_by_key}
+    for row in rows:
+        values = row._mapping
+        entity_id = row[0]
+        if not entity_id:
+            continue
+        for metric_key, metric in metrics_by_key.items():
+            games_label, value_label = columns[metric_key]
+            min_sample = max(int(getattr(metric, "min_sample", 1) or 1), 1)
+            if int(values[games_label] or 0) >= min_sample:
+                pools[metric_key][str(entity_id)] = _clean_number(values[value_label])
+    return {key: _positive_pool(pool) for key, pool in pools.items()}
+
+
+def _aggregate_player_pools_sql(
+    session: Session,
+    metrics: Sequence,
+    season: str,
+    cutoff_game_date,
+    cutoff_game_id: str,
+) -> dict[str, dict[str, float]]:
+    """One grouped PlayerGameStats scan producing the pool of every metric.
+
+    Each metric's split becomes a CASE inside its SUM instead of a WHERE
+    clause, and games-per-split counts are shared between metrics.
+    """
+    metrics_by_key = {metric.key: metric for metric in metrics}
+    selected = [PlayerGameStats.player_id]
+    games_labels: dict[str | None, str] = {}
+    columns: dict[str, tuple[str, str]] = {}
+    for metric_key, metric in metrics_by_key.items():
+        split_key = _metric_attr(metric, "split_key", None) or None
+        split = _player_split_clause(split_key)
+        if split_key not in games_labels:
+            games_labels[split_key] = f"games_{len(games_labels)}"
+            selected.append(_split_sum(split, literal(1)).label(games_labels[split_key]))
+        value_label = f"value_{len(columns)}"
+        selected.append(_split_sum(split, _player_pool_row_value(metric)).label(value_label))
+        columns[metric_key] = (games_labels[split_key], value_label)
+
+    rows = (
+        session.query(*selected)
+        .join(Game, PlayerGameStats.game_id == Game.game_id)
+        .filter(
+            PlayerGameStats.player_id.isnot(None),
+            _player_played_clause(),
+            *_game_filter_clauses(season, cutoff_game_date, cutoff_game_id),
+        )
+        .group_by(PlayerGameStats.player_id)
+        .all()
+    )
+    return _grouped_pools(rows, columns, metrics_by_key)
+
+
+def _aggregate_team_pools_sql(
+    session: Session,
+    metrics: Sequence,
+    season: str,
+    cutoff_game_date,
+    cutoff_game_id: str,
+) -> dict[str, dict[str, float]]:
+    """One grouped TeamGameStats × opponent scan producing the pool of every metric."""
+    row = aliased(TeamGameStats)
+    opponent = aliased(TeamGameStats)
+    metrics_by_key = {metric.key: metric for metric in metrics}
+    selected = [row.team_id]
+    games_labels: dict[str | None, str] = {}
+    columns: dict[str, tuple[str, str]] = {}
+    for metric_key, metric in metrics_by_key.items():
+        split_key = _metric_attr(metric, "split_key", None) or None
+        split = _team_split_clause(row, Game, split_key)
+        if split_key not in games_labels:
+            games_labels[split_key] = f"games_{len(games_labels)}"
+            selected.append(_split_sum(split, literal(1)).label(games_labels[split_key]))
+        value_label = f"value_{len(columns)}"
+        selected.append(_split_sum(split, _team_pool_row_value(row, opponent, metric)).label(value_label))
+        columns[metric_key] = (games_labels[split_key], value_label)
+
+    rows = (
+        session.query(*selected)
+        .join(Game, row.game_id == Game.game_id)
+        .join(opponent, and_(opponent.game_id == row.game_id, opponent.team_id != row.team_id))
+        .filter(
+            row.team_id.isnot(None),
+            *_game_filter_clauses(season, cutoff_game_date, cutoff_game_id),
+        )
+        .group_by(row.team_id)
+        .all()
+    )
+    return _grouped_pools(rows, columns, metrics_by_key)
+
+
+def aggregate_pools_as_of(
+    session: Session,
+    metric_seasons: Sequence[tuple[object, str]],
+    cutoff_game_date,
+    cutoff_game_id: str,
+) -> dict[tuple[str, str], dict[str, float]]:
+    """aggregate_pool_as_of for many (metric, season) pairs sharing one cutoff game.
+
+    Pairs are grouped by scope and by the game filter their season implies
+    (career and last-N windows of one season type share a filter), and each
+    group is answered by a single grouped scan. Returns {(metric_key, season): pool}.
+    Metrics the grouped scan cannot express go through aggregate_pool_as_of.
+    """
+    started = time.perf_counter()
+    groups: dict[tuple, list[tuple[object, str]]] = {}
+    pools: dict[tuple[str, str], dict[str, float]] = {}
+    for metric, season in metric_seasons:
+        kind = str(_metric_attr(metric, "metric_kind", "") or "")
+        scope = str(getattr(metric, "scope", "") or "")
+        if scope == "team":
+            supported = kind == "count"
+        else:
+            supported = scope == "player" and kind in _POOL_METRIC_KINDS - {"count"}
+        if not supported:
+            pools[(metric.key, season)] = aggregate_pool_as_of(
+                session, metric, season, cutoff_game_date=cutoff_game_date, cutoff_game_id=cutoff_game_id
+            )
+            continue
+        groups.setdefault((scope, _pool_game_filter_key(season)), []).append((metric, season))
+
+    for (scope, _filter_key), pairs in groups.items():
+        aggregate = _aggregate_player_pools_sql if scope == "player" else _aggregate_team_pools_sql
+        grouped = aggregate(
+            session,
+            [metric for metric, _season in pairs],
+            pairs[0][1],
+            cutoff_game_date,
+            cutoff_game_id,
+        )
+        for metric, season in pairs:
+            pools[(metric.key, season)] = grouped[metric.key]
+
+    logger.info(
+        "aggregate_pools_as_of cutoff=%s pairs=%d scans=%d ms=%d",
+        cutoff_game_id,
+        len(pools),
+        len(groups),
+        int((time.perf_counter() - started) * 1000),
+    )
+    return pools
+
+
 def _rank_in_pool(pool: Mapping[str, float], entity_id: str) -> int | None:
     value = pool.get(entity_id)
     if value is None or value <= 0:
         return None
+    if isinstance(pool, RankIndex):
+        return pool.rank_for_value(value)
     better = sum(1 for other_id, other_value in pool.items() if other_id != entity_id and other_value > value)
     return better + 1
 
@@ -652,7 +824,13 @@ def _metric_season_pairs(
     return pairs
 
 
-def _load_current_metric_pool(session: Session, metric_key: str, season: str, entity_type: str) -> dict[str, float]:
+def _load_current_metric_pool(session: Session, metric_key: str, season: str, entity_type: str) -> RankIndex:
+    """Rank index over the stored MetricResult pool.
+
+    Built per detection call, which reads each (metric_key, season) pool
+    once; it is not kept on the session, where later MetricResult writes
+    through that session would leave it stale.
+    """
     rows = (
         session.query(MetricResult.entity_id, MetricResult.value_num)
         .filter(
@@ -663,7 +841,7 @@ def _load_current_metric_pool(session: Session, metric_key: str, season: str, en
         )
         .all()
     )
-    return _positive_pool({str(entity_id): _clean_number(value) for entity_id, value in rows if entity_id})
+    return RankIndex(_positive_pool({str(entity_id): _clean_number(value) for entity_id, value in rows if entity_id}))
 
 
 class BoxScoreSliceProvider:
@@ -706,6 +884,8 @@ class InMemoryBatchProvider:
         self._totals: dict[tuple[str, str], dict[str, float]] = {}
         self._games: dict[tuple[str, str], dict[str, int]] = {}
         self._min_samples: dict[tuple[str, str], int] = {}
+        # Qualified positive totals per (metric_key, season), kept sorted as games are recorded.
+        self._indexes: dict[tuple[str, str], RankIndex] = {}
         self._emitted_events: set[tuple[str, str, str, str, str, str]] = set()
         self.event_lookup_authoritative = bool(event_lookup_authoritative)
 
@@ -721,6 +901,22 @@ class InMemoryBatchProvider:
         self._totals[key] = {str(entity_id): _clean_number(value) for entity_id, value in pool.items()}
         self._games[key] = {str(entity_id): max(int(min_sample or 1), 1) for entity_id in pool}
         self._min_samples[key] = max(int(min_sample or 1), 1)
+        self._indexes[key] = RankIndex(_positive_pool(self._totals[key]))
+
+    def _rebuild_index(self, key: tuple[str, str]) -> RankIndex:
+        min_sample = self._min_samples.get(key, 1)
+        games = self._games.get(key, {})
+        index = RankIndex(
+            _positive_pool(
+                {
+                    entity_id: value
+                    for entity_id, value in self._totals.get(key, {}).items()
+                    if games.get(entity_id, 0) >= min_sample
+                }
+            )
+        )
+        self._indexes[key] = index
+        return index
 
     def record_game_deltas(
         self,
@@ -736,25 +932,30 @@ class InMemoryBatchProvider:
         key = (metric_key, season)
         totals = self._totals.setdefault(key, {})
         games = self._games.setdefault(key, {})
-        self._min_samples[key] = max(int(min_sample or 1), 1)
+        min_sample = max(int(min_sample or 1), 1)
+        if self._min_samples.get(key) != min_sample:
+            self._min_samples[key] = min_sample
+            self._indexes.pop(key, None)
+        index = self._indexes.get(key)
         for entity_id, count in game_counts.items():
             entity = str(entity_id)
             totals[entity] = totals.get(entity, 0.0) + _clean_number(deltas.get(entity, 0.0))
             games[entity] = games.get(entity, 0) + int(count or 0)
+            if index is None:
+                continue
+            if games[entity] >= min_sample and totals[entity] > 0:
+                index.set(entity, totals[entity])
+            else:
+                index.discard(entity)
 
-    def current_pool(self, session: Session, metric_key: str, season: str, entity_type: str) -> dict[str, float]:
+    def current_pool(self, session: Session, metric_key: str, season: str, entity_type: str) -> RankIndex:
         del session
         del entity_type
         key = (metric_key, season)
-        min_sample = self._min_samples.get(key, 1)
-        games = self._games.get(key, {})
-        return _positive_pool(
-            {
-                entity_id: value
-                for entity_id, value in self._totals.get(key, {}).items()
-                if games.get(entity_id, 0) >= min_sample
-            }
-        )
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._rebuild_index(key)
+        return index
 
     def __call__(
         self,
@@ -819,11 +1020,14 @@ def _current_pool_from_provider(
     metric_key: str,
     season: str,
     entity_type: str,
-) -> dict[str, float]:
+) -> RankIndex:
     current_pool_fn = getattr(provider, "current_pool", None)
-    if callable(current_pool_fn):
-        return _positive_pool(current_pool_fn(session, metric_key, season, entity_type))
-    return _load_current_metric_pool(session, metric_key, season, entity_type)
+    if not callable(current_pool_fn):
+        return _load_current_metric_pool(session, metric_key, season, entity_type)
+    pool = current_pool_fn(session, metric_key, season, entity_type)
+    if isinstance(pool, RankIndex):
+        return pool
+    return RankIndex(_positive_pool(pool))
 
 
 def _record_provider_game(
@@ -951,6 +1155,9 @@ def _entity_payloads(
 
 
 def _target_player_id(entity_id: str, new_value: float, current_pool: Mapping[str, float]) -> str | None:
+    if isinstance(current_pool, RankIndex):
+        found = current_pool.next_above(new_value, exclude=entity_id)
+        return found[0] if found is not None else None
     better = [
         (other_id, value)
         for other_id, value in current_pool.items()
@@ -983,8 +1190,14 @@ def _gap_tightness(gap: float | int | None) -> float:
     return 0.10
 
 
+def _count_reached(current_pool: Mapping[str, float], threshold: float) -> int:
+    if isinstance(current_pool, RankIndex):
+        return current_pool.count_at_least(threshold)
+    return sum(1 for value in current_pool.values() if value is not None and float(value) >= threshold)
+
+
 def _absolute_threshold_severity(threshold: float, current_pool: Mapping[str, float]) -> float:
-    count_reached = sum(1 for value in current_pool.values() if value is not None and float(value) >= threshold)
+    count_reached = _count_reached(current_pool, threshold)
     if count_reached <= 3:
         return 0.95
     if count_reached <= 10:
@@ -1276,7 +1489,7 @@ def _build_absolute_threshold_event(
     payloads = _entity_payloads(session, entity_type, [entity_id])
     entity_payload = payloads.get(entity_id) or _fallback_entity_payload(entity_type, entity_id)
     label_zh, label_en = _threshold_label(threshold, stat_label, stat_label_en)
-    count_reached = sum(1 for value in current_pool.values() if value is not None and float(value) >= threshold)
+    count_reached = _count_reached(current_pool, threshold)
     context = {
         "source": "milestone",
         "event_type": ABSOLUTE_THRESHOLD_EVENT_TYPE,
@@ -1483,12 +1696,15 @@ def detect_milestones_for_metric(
         return []
 
     prev_pool = _current_pool_from_provider(prev_values_provider, session, metric_key, season, entity_type)
-    prev_pool = _positive_pool(prev_pool)
     prev_values = prev_values_provider(session, game_id, metric_key, season, entity_type, event_deltas, prev_pool)
-    current_pool = dict(prev_pool)
+    current_pool = prev_pool.copy()
     for entity_id, delta in event_deltas.items():
-        current_pool[str(entity_id)] = _clean_number(prev_pool.get(str(entity_id), 0.0)) + _clean_number(delta)
-    current_pool = _positive_pool(current_pool)
+        new_total = _clean_number(prev_pool.get(str(entity_id), 0.0)) + _clean_number(delta)
+        if new_total > 0:
+            current_pool.set(str(entity_id), new_total)
+        else:
+            current_pool.discard(str(entity_id))
+    max_approach_threshold = approaching_thresholds[-1]
 
     events: list[dict] = []
     for player_id, delta in event_deltas.items():
@@ -1501,7 +1717,12 @@ def detect_milestones_for_metric(
         prev_rank = _rank_in_pool(prev_pool, player_id)
         new_rank = _rank_in_pool(current_pool, player_id)
 
-        for target_id in sorted(set(prev_pool) | set(current_pool)):
+        # Entities outside the game keep their value, so only those between
+        # prev_value and new_value + the widest approach gap can be crossed or
+        # approached; the rest of the pool is never visited.
+        candidate_ids = set(prev_pool.entity_ids_between(prev_value, new_value + max_approach_threshold))
+        candidate_ids.update(event_deltas)
+        for target_id in sorted(candidate_ids):
             try:
                 if target_id == player_id:
                     continue
@@ -1792,21 +2013,35 @@ def detect_batch_incremental(
 
     provider = InMemoryBatchProvider()
     metrics = _applicable_additive_metrics(session, metric_keys)
+    # Each (metric, season) pool is seeded as of the first batch game it
+    # applies to; pairs sharing that cutoff are aggregated in grouped scans.
+    pairs_by_cutoff: dict[str, list[tuple[object, str]]] = {}
     seeded: set[tuple[str, str]] = set()
     for game in games:
         for metric, season in _metric_season_pairs(session, game, metrics, None):
             key = (metric.key, season)
             if key in seeded:
                 continue
-            pool = aggregate_pool_as_of(
-                session,
-                metric,
+            pairs_by_cutoff.setdefault(game.game_id, []).append((metric, season))
+            seeded.add(key)
+
+    for game in games:
+        pairs = pairs_by_cutoff.get(game.game_id)
+        if not pairs:
+            continue
+        pools = aggregate_pools_as_of(
+            session,
+            pairs,
+            cutoff_game_date=game.game_date,
+            cutoff_game_id=game.game_id,
+        )
+        for metric, season in pairs:
+            provider.seed(
+                metric.key,
                 season,
-                cutoff_game_date=game.game_date,
-                cutoff_game_id=game.game_id,
+                pools[(metric.key, season)],
+                min_sample=int(getattr(metric, "min_sample", 1) or 1),
             )
-            provider.seed(metric.key, season, pool, min_sample=int(getattr(metric, "min_sample", 1) or 1))
-            seeded.add(key)
 
     events: list[dict] = []
     for game in games:
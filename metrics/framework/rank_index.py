@@ -0,0 +1,109 @@
+"""Sorted rank index over a metric pool ({entity_id: value}).
+
+Milestone detection asks the same questions of a pool for every scorer in
+every game: what rank does this value hold, who sits just above it, which
+entities fall between two values, how many reached a threshold. ``RankIndex``
+keeps the pool as a dict plus two parallel ascending arrays — values and
+(value, entity_id) entries — so each of those is a bisect instead of a scan.
+It is a read-only ``Mapping`` to callers that only need ``pool.get(...)``.
+
+Ranks are competition ranks with "higher is better": an entity's rank is one
+plus the number of entities with a strictly greater value, so ties share a
+rank.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from typing import Iterator
+
+
+class RankIndex(Mapping):
+    """Sorted (value, entity_id) index with O(log n) rank and range queries."""
+
+    __slots__ = ("_pool", "_values", "_entries")
+
+    def __init__(self, pool: Mapping[str, float] | None = None) -> None:
+        self._pool: dict[str, float] = {str(entity_id): float(value) for entity_id, value in (pool or {}).items()}
+        self._entries: list[tuple[float, str]] = sorted((value, entity_id) for entity_id, value in self._pool.items())
+        self._values: list[float] = [value for value, _entity_id in self._entries]
+
+    # ── Mapping ──────────────────────────────────────────────────────────────
+
+    def __getitem__(self, entity_id: str) -> float:
+        return self._pool[entity_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._pool)
+
+    def __len__(self) -> int:
+        return len(self._pool)
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self._pool
+
+    def copy(self) -> RankIndex:
+        clone = RankIndex.__new__(RankIndex)
+        clone._pool = dict(self._pool)
+        clone._entries = list(self._entries)
+        clone._values = list(self._values)
+        return clone
+
+    # ── Updates ──────────────────────────────────────────────────────────────
+
+    def discard(self, entity_id: str) -> None:
+        entity_id = str(entity_id)
+        value = self._pool.pop(entity_id, None)
+        if value is None:
+            return
+        position = bisect_left(self._entries, (value, entity_id))
+        del self._entries[position]
+        del self._values[position]
+
+    def set(self, entity_id: str, value: float) -> None:
+        entity_id = str(entity_id)
+        value = float(value)
+        if self._pool.get(entity_id) == value:
+            return
+        self.discard(entity_id)
+        self._pool[entity_id] = value
+        position = bisect_left(self._entries, (value, entity_id))
+        self._entries.insert(position, (value, entity_id))
+        self._values.insert(position, value)
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def count_above(self, value: float) -> int:
+        """Number of entities with a value strictly greater than ``value``."""
+        return len(self._values) - bisect_right(self._values, float(value))
+
+    def count_at_least(self, value: float) -> int:
+        """Number of entities with a value greater than or equal to ``value``."""
+        return len(self._values) - bisect_left(self._values, float(value))
+
+    def rank_for_value(self, value: float) -> int:
+        """Rank an entity holding ``value`` would have in this pool."""
+        return self.count_above(value) + 1
+
+    def rank_of(self, entity_id: str) -> int | None:
+        value = self._pool.get(str(entity_id))
+        if value is None:
+            return None
+        return self.rank_for_value(value)
+
+    def next_above(self, value: float, exclude: str | None = None) -> tuple[str, float] | None:
+        """Lowest-valued entity strictly above ``value`` (ties broken by entity_id)."""
+        position = bisect_right(self._values, float(value))
+        while position < len(self._entries):
+            entry_value, entity_id = self._entries[position]
+            if entity_id != exclude:
+                return entity_id, entry_value
+            position += 1
+        return None
+
+    def entity_ids_between(self, low: float, high: float) -> list[str]:
+        """Entities with ``low <= value <= high``, in ascending value order."""
+        start = bisect_left(self._values, float(low))
+        stop = bisect_right(self._values, float(high))
+        return [entity_id for _value, entity_id in self._entries[start:stop]]
+
@@ -23,7 +23,7 @@ import logging
 from typing import Any
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from sqlalchemy import and_, func, case
 
 from db.game_status import completed_game_clause
 from db.models import Game, GamePlayByPlay, PlayerGameStats, ShotRecord, Team, TeamGameStats
@@ -31,6 +31,9 @@ from metrics.framework.base import CAREER_SEASON, is_career_season, career_seaso
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on bound parameters in one entity-id IN (...) list.
+_ENTITY_ID_BATCH_SIZE = 1000
+
 # ── Field maps ────────────────────────────────────────────────────────────────
 
 _PGS_FIELDS: dict[str, Any] = {
@@ -235,8 +238,89 @@ def _resolve_entity_context(
     return context
 
 
+def _latest_player_team_ids(session: Session, player_ids: list[str]) -> dict[str, str]:
+    """Most recent non-null team_id per player, one windowed query per id batch."""
+    latest: dict[str, str] = {}
+    for start in range(0, len(player_ids), _ENTITY_ID_BATCH_SIZE):
+        batch = player_ids[start:start + _ENTITY_ID_BATCH_SIZE]
+        ranked = (
+            session.query(
+                PlayerGameStats.player_id.label("player_id"),
+                PlayerGameStats.team_id.label("team_id"),
+                func.row_number().over(
+                    partition_by=PlayerGameStats.player_id,
+                    order_by=(Game.game_date.desc(), Game.game_id.desc()),
+                ).label("recency"),
+            )
+            .join(Game, PlayerGameStats.game_id == Game.game_id)
+            .filter(PlayerGameStats.player_id.in_(batch), PlayerGameStats.team_id.isnot(None))
+            .subquery()
+        )
+        for row in session.query(ranked.c.player_id, ranked.c.team_id).filter(ranked.c.recency == 1):
+            latest[row.player_id] = row.team_id
+    return latest
+
+
+def _team_franchise_ids(session: Session, team_ids) -> dict[str, str]:
+    team_ids = sorted({team_id for team_id in team_ids if team_id})
+    franchises = {team_id: team_id for team_id in team_ids}
+    for start in range(0, len(team_ids), _ENTITY_ID_BATCH_SIZE):
+        batch = team_ids[start:start + _ENTITY_ID_BATCH_SIZE]
+        rows = (
+            session.query(Team.team_id, Team.canonical_team_id)
+            .filter(Team.team_id.in_(batch))
+            .all()
+        )
+        for row in rows:
+            franchises[row.team_id] = row.canonical_team_id or row.team_id
+    return franchises
+
+
+def _resolve_entity_contexts(
+    session: Session,
+    scope: str,
+    entity_ids: list[str],
+) -> dict[str, dict[str, Any]]:
+    """Bulk _resolve_entity_context: a fixed number of queries for any entity count."""
+    entity_ids = list(dict.fromkeys(entity_ids))
+    if scope == "player":
+        team_ids = _latest_player_team_ids(session, entity_ids)
+        franchises = _team_franchise_ids(session, team_ids.values())
+        contexts = {}
+        for entity_id in entity_ids:
+            current_team_id = team_ids.get(entity_id)
+            current_franchise_id = franchises.get(current_team_id) if current_team_id else None
+            contexts[entity_id] = {
+                "id": entity_id,
+                "entity_id": entity_id,
+                "player_id": entity_id,
+                "current_team_id": current_team_id,
+                "current_franchise_id": current_franchise_id,
+                "franchise_id": current_franchise_id,
+            }
+        return contexts
+    if scope == "team":
+        franchises = _team_franchise_ids(session, entity_ids)
+        return {
+            entity_id: {
+                "id": entity_id,
+                "entity_id": entity_id,
+                "current_team_id": entity_id,
+                "current_franchise_id": franchises.get(entity_id),
+                "franchise_id": franchises.get(entity_id),
+            }
+            for entity_id in entity_ids
+        }
+    # player_franchise / game / league contexts are derived from the id alone.
+    return {entity_id: _resolve_entity_context(session, scope, entity_id) for entity_id in entity_ids}
+
+
+def _is_dynamic_value(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith("entity.")
+
+
 def _resolve_dynamic_value(value: Any, entity_context: dict[str, Any]) -> Any:
-    if isinstance(value, str) and value.startswith("entity."):
+    if _is_dynamic_value(value):
         return entity_context.get(value.split(".", 1)[1])
     return value
 
@@ -318,7 +402,8 @@ def _format_value(definition: dict, value: float | None) -> str | None:
     return rendered
 
 
-def _apply_filters(q, field_map: dict, filters: list[dict], entity_context: dict[str, Any]):
+def _filter_clauses(field_map: dict, filters: list[dict], entity_context: dict[str, Any]) -> list:
+    clauses = []
     for f in filters:
         field = f["field"]
         col = field_map.get(field)
@@ -326,10 +411,20 @@ def _apply_filters(q, field_map: dict, filters: list[dict], entity_context: dict
             raise ValueError(f"Unknown field {field!r} for this source")
         raw_value = f.get("value_from", f.get("value"))
         value = _resolve_dynamic_value(raw_value, entity_context)
-        q = q.filter(_build_filter(col, f["op"], value))
+        clauses.append(_build_filter(col, f["op"], value))
+    return clauses
+
+
+def _apply_filters(q, field_map: dict, filters: list[dict], entity_context: dict[str, Any]):
+    for clause in _filter_clauses(field_map, filters, entity_context):
+        q = q.filter(clause)
     return q
 
 
+def _has_dynamic_filters(filters: list[dict]) -> bool:
+    return any(_is_dynamic_value(f.get("value_from", f.get("value"))) for f in filters)
+
+
 # ── Core compute ──────────────────────────────────────────────────────────────
 
 def compute_result(
@@ -488,6 +583,225 @@ def compute_result(
     raise ValueError(f"Unsupported aggregation: {aggregation!r}")
 
 
+def _season_entity_ids(session: Session, definition: dict, season: str, scope: str) -> list[str]:
+    """Distinct entity ids with source rows in ``season`` (same scoping as compute_result)."""
+    source = _definition_source(definition)
+    source_spec = _SOURCE_MAP[source]
+    model = source_spec["model"]
+    field_map = source_spec["field_map"]
+    if scope == "player_franchise":
+        player_col = source_spec["id_cols"].get("player")
+        franchise_col = field_map.get("franchise_id")
+        if player_col is None or franchise_col is None:
+            raise ValueError(f"Source {source!r} does not support scope {scope!r}")
+        entity_q = (
+            session.query(player_col, franchise_col)
+            .join(Game, model.game_id == Game.game_id)
+            .filter(player_col.isnot(None), franchise_col.isnot(None))
+        )
+    else:
+        id_col = source_spec["id_cols"].get(scope)
+        if id_col is None:
+            raise ValueError(f"Source {source!r} does not support scope {scope!r}")
+        entity_q = (
+            session.query(id_col)
+            .join(Game, model.game_id == Game.game_id)
+            .filter(id_col.isnot(None))
+        )
+    team_join_col = source_spec.get("team_join_col")
+    if team_join_col is not None:
+        entity_q = entity_q.outerjoin(Team, team_join_col == Team.team_id)
+    entity_q = _apply_season_scope(entity_q, season, definition)
+    if scope == "player_franchise":
+        return [
+            _player_franchise_entity_id(row[0], row[1])
+            for row in entity_q.distinct().all()
+            if _player_franchise_entity_id(row[0], row[1]) is not None
+        ]
+    return [row[0] for row in entity_q.distinct().all()]
+
+
+def compute_results_for_season(
+    session: Session,
+    definition: dict,
+    season: str,
+    scope: str,
+    entity_ids: list[str] | None = None,
+) -> dict[str, dict[str, Any]]:
+    """Run a rule definition for every entity in a season with one GROUP BY.
+
+    Returns ``{entity_id: result}`` where each result has the same shape as
+    compute_result(). Filters become conditional aggregates over the entity's
+    season rows, so value, matched-row and total-row counts come back from a
+    single query; the pct_of_total denominator is computed once. ``entity_ids``
+    narrows the batch to known targets (e.g. the players in one game).
+
+    Rules whose filters reference ``entity.*`` values differ per entity and
+    cannot be grouped; those fall back to compute_result() per entity.
+    """
+    definition = _normalize_definition(definition)
+    source = _definition_source(definition)
+    filters = definition.get("filters", [])
+    aggregation = definition["aggregation"]
+
+    if source not in _SOURCE_MAP:
+        raise ValueError(f"Unknown source: {source!r}")
+
+    if _has_dynamic_filters(filters):
+        if entity_ids is None:
+            entity_ids = _season_entity_ids(session, definition, season, scope)
+        results: dict[str, dict[str, Any]] = {}
+        for entity_id in entity_ids:
+            result = compute_result(session, definition, entity_id, season, scope)
+            if result is not None:
+                results[entity_id] = result
+        return results
+
+    source_spec = _SOURCE_MAP[source]
+    model = source_spec["model"]
+    field_map = source_spec["field_map"]
+    team_join_col = source_spec.get("team_join_col")
+
+    if scope == "player_franchise":
+        player_col = source_spec["id_cols"].get("player")
+        franchise_col = field_map.get("franchise_id")
+        if player_col is None or franchise_col is None:
+            raise ValueError(f"Source {source!r} does not support scope {scope!r}")
+        group_cols = [player_col.label("player_id"), franchise_col.label("franchise_id")]
+        id_filters = [player_col.isnot(None), franchise_col.isnot(None)]
+        if entity_ids is not None:
+            player_ids = sorted({
+                player_id
+                for player_id, franchise_id in map(_parse_player_franchise_entity_id, entity_ids)
+                if player_id and franchise_id
+            })
+            id_filters.append(player_col.in_(player_ids))
+    else:
+        id_col = source_spec["id_cols"].get(scope)
+        if id_col is None:
+            raise ValueError(f"Source {source!r} does not support scope {scope!r}")
+        group_cols = [id_col.label("entity_id")]
+        id_filters = [id_col.isnot(None)]
+        if entity_ids is not None:
+            id_filters.append(id_col.in_(list(dict.fromkeys(entity_ids))))
+
+    matched = and_(*_filter_clauses(field_map, filters, {})) if filters else None
+
+    def _matched_only(expr):
+        return expr if matched is None else case((matched, expr), else_=None)
+
+    aggregates = [
+        func.count().label("total_rows"),
+        (func.count() if matched is None else func.sum(case((matched, 1), else_=0))).label("matched_rows"),
+    ]
+    stat_col = None
+    if aggregation in ("avg", "sum", "max", "pct_of_total"):
+        stat_col = field_map.get(definition["stat"])
+        if stat_col is None:
+            raise ValueError(f"Unknown stat: {definition['stat']!r}")
+        agg_fn = {"avg": func.avg, "max": func.max}.get(aggregation, func.sum)
+        aggregates.append(agg_fn(_matched_only(func.coalesce(stat_col, 0))).label("value"))
+    elif aggregation == "ratio":
+        num_col = field_map.get(definition["numerator"])
+        den_col = field_map.get(definition["denominator"])
+        if num_col is None or den_col is None:
+            raise ValueError("ratio requires numerator and denominator fields")
+        aggregates.append(func.sum(_matched_only(func.coalesce(num_col, 0))).label("numerator"))
+        aggregates.append(func.sum(_matched_only(func.coalesce(den_col, 0))).label("denominator"))
+    elif aggregation not in ("count", "pct_rows"):
+        raise ValueError(f"Unsupported aggregation: {aggregation!r}")
+
+    grouped_q = (
+        session.query(*group_cols, *aggregates)
+        .select_from(model)
+        .join(Game, model.game_id == Game.game_id)
+    )
+    if team_join_col is not None:
+        grouped_q = grouped_q.outerjoin(Team, team_join_col == Team.team_id)
+    grouped_q = _apply_season_scope(grouped_q.filter(*id_filters), season, definition)
+    grouped_q = grouped_q.group_by(*group_cols)
+
+    total_sum = None
+    if aggregation == "pct_of_total":
+        total_q = (
+            session.query(func.sum(func.coalesce(stat_col, 0)))
+            .select_from(model)
+            .join(Game, model.game_id == Game.game_id)
+        )
+        if team_join_col is not None:
+            total_q = total_q.outerjoin(Team, team_join_col == Team.team_id)
+        total_q = _apply_season_scope(total_q, season, definition)
+        total_q = _apply_filters(total_q, field_map, filters, {})
+        total_sum = total_q.scalar() or 0
+        if not total_sum:
+            return {}
+
+    rows: dict[str, Any] = {}
+    for row in grouped_q.all():
+        if scope == "player_franchise":
+            entity_id = _player_franchise_entity_id(row.player_id, row.franchise_id)
+        else:
+            entity_id = row.entity_id
+        if entity_id is not None:
+            rows[entity_id] = row
+
+    wanted = list(rows) if entity_ids is None else list(dict.fromkeys(entity_ids))
+    # compute_result() reports count / pct_of_total as 0 for entities with no
+    # rows at all; keep that when callers ask for specific entities.
+    keep_empty = aggregation in ("count", "pct_of_total")
+    wanted = [entity_id for entity_id in wanted if entity_id in rows or keep_empty]
+
+    ranking = definition.get("ranking") or {}
+    partition_by = ranking.get("partition_by") or []
+    if any(_is_dynamic_value(item) for item in partition_by):
+        contexts = _resolve_entity_contexts(session, scope, wanted)
+    else:
+        contexts = {}
+
+    results = {}
+    for entity_id in wanted:
+        rank_group = _resolve_partition_group(partition_by, contexts.get(entity_id, {}))
+        row = rows.get(entity_id)
+        matched_rows = int(row.matched_rows or 0) if row is not None else 0
+
+        if aggregation == "count":
+            value = float(matched_rows)
+            context = _context_with_counts(source, scope, matched_rows, rank_group)
+        elif aggregation == "pct_rows":
+            total_rows = int(row.total_rows or 0)
+            if not total_rows:
+                continue
+            value = matched_rows / total_rows
+            context = _context_with_counts(source, scope, total_rows, rank_group)
+            context["matched_rows"] = matched_rows
+        elif aggregation in ("avg", "sum", "max"):
+            if row.value is None:
+                continue
+            value = float(row.value)
+            context = _context_with_counts(source, scope, matched_rows, rank_group)
+        elif aggregation == "ratio":
+            if not row.denominator:
+                continue
+            value = float(row.numerator) / float(row.denominator)
+            context = _context_with_counts(source, scope, matched_rows, rank_group)
+            context["numerator_sum"] = float(row.numerator or 0)
+            context["denominator_sum"] = float(row.denominator or 0)
+        else:
+            entity_sum = (row.value if row is not None else None) or 0
+            value = float(entity_sum) / float(total_sum)
+            context = _context_with_counts(source, scope, matched_rows, rank_group)
+            context["entity_sum"] = float(entity_sum)
+            context["group_sum"] = float(total_sum)
+
+        results[entity_id] = {
+            "value_num": value,
+            "value_str": _format_value(definition, value),
+            "context": context,
+            "rank_group": rank_group,
+        }
+    return results
+
+
 def compute(
     session: Session,
     definition: dict,
@@ -517,6 +831,22 @@ def compute_baseline(
     return compute(session, merged, entity_id, season, scope)
 
 
+def compute_baselines_for_season(
+    session: Session,
+    definition: dict,
+    season: str,
+    scope: str,
+    entity_ids: list[str] | None = None,
+) -> dict[str, float]:
+    """Batch form of compute_baseline(): ``{entity_id: baseline value}``."""
+    baseline_def = definition.get("baseline")
+    if not baseline_def:
+        return {}
+    merged = {**definition, **baseline_def, "filters": baseline_def.get("filters", [])}
+    results = compute_results_for_season(session, merged, season, scope, entity_ids=entity_ids)
+    return {entity_id: result["value_num"] for entity_id, result in results.items()}
+
+
 # ── Preview: top N results across all entities ────────────────────────────────
 
 def preview(
@@ -532,57 +862,24 @@ def preview(
     if source not in _SOURCE_MAP:
         raise ValueError(f"Unknown source: {source!r}")
 
-    source_spec = _SOURCE_MAP[source]
-    model = source_spec["model"]
-    field_map = source_spec["field_map"]
-    # Get distinct entity_ids for this season
-    if scope == "player_franchise":
-        player_col = source_spec["id_cols"].get("player")
-        franchise_col = field_map.get("franchise_id")
-        if player_col is None or franchise_col is None:
-            raise ValueError(f"Source {source!r} does not support scope {scope!r}")
-        entity_q = (
-            session.query(player_col, franchise_col)
-            .join(Game, model.game_id == Game.game_id)
-            .filter(player_col.isnot(None), franchise_col.isnot(None))
-        )
-    else:
-        id_col = source_spec["id_cols"].get(scope)
-        if id_col is None:
-            raise ValueError(f"Source {source!r} does not support scope {scope!r}")
-        entity_q = (
-            session.query(id_col)
-            .join(Game, model.game_id == Game.game_id)
-            .filter(id_col.isnot(None))
-        )
-    team_join_col = source_spec.get("team_join_col")
-    if team_join_col is not None:
-        entity_q = entity_q.outerjoin(Team, team_join_col == Team.team_id)
     if str(definition.get("time_scope") or "").lower() == "career":
         from metrics.framework.base import career_season_for
         preview_season = career_season_for(season) or "all_regular"
     else:
         preview_season = season
-    entity_q = _apply_season_scope(entity_q, preview_season, definition)
-    if scope == "player_franchise":
-        entity_ids = [
-            _player_franchise_entity_id(row[0], row[1])
-            for row in entity_q.distinct().all()
-            if _player_franchise_entity_id(row[0], row[1]) is not None
-        ]
-    else:
-        entity_ids = [row[0] for row in entity_q.distinct().all()]
+
+    try:
+        results = compute_results_for_season(session, definition, preview_season, scope)
+        baselines = compute_baselines_for_season(
+            session, definition, preview_season, scope, entity_ids=list(results)
+        )
+    except Exception as exc:
+        logger.debug("preview compute failed for %s: %s", preview_season, exc)
+        return []
 
     rows = []
-    for eid in entity_ids:
-        try:
-            result = compute_result(session, definition, eid, preview_season, scope)
-        except Exception as exc:
-            logger.debug("preview compute failed for %s: %s", eid, exc)
-            continue
-        if result is None:
-            continue
-        baseline = compute_baseline(session, definition, eid, preview_season, scope)
+    for eid, result in results.items():
+        baseline = baselines.get(eid)
         rows.append({
             "entity_id": eid,
             "value_num": round(result["value_num"], 4),
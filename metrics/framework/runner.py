@@ -5,17 +5,33 @@ Phase 2 (Reduce): aggregate all deltas per entity → write MetricResult once.
 """
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from contextlib import contextmanager
 import json
 import logging
+import os
 from datetime import datetime
+from itertools import groupby
 import time
+from typing import NamedTuple
+import zlib
 
-from sqlalchemy import event, func, text
+from sqlalchemy import and_, event, func, or_, text, tuple_, update
 from sqlalchemy.orm import Session
 
+from db.game_artifact_status import mark_game_artifacts
 from db.game_status import is_game_completed
-from db.models import Game, MetricPerfLog, MetricResult as MetricResultModel, MetricRunLog, PlayerGameStats, Team
+from db.models import (
+    Game,
+    MetricPerfLog,
+    MetricResult as MetricResultModel,
+    MetricResultCount,
+    MetricRunLog,
+    MetricRunningTotal,
+    PlayerGameStats,
+    Team,
+)
 from metrics.framework.base import (
     MetricResult,
     career_season_for,
@@ -28,9 +44,15 @@ from metrics.framework.runtime import _metric_declares_career_reducer, get_all_m
 logger = logging.getLogger(__name__)
 
 _BULK_WRITE_BATCH_SIZE = 1000
+_REDUCE_STREAM_FETCH_SIZE = 5000
 _PERF_WINDOW = 5
 _METRIC_RESULT_WRITE_LOCK_NAME = "metric_result_write"
 _METRIC_RESULT_WRITE_LOCK_TIMEOUT_SECONDS = 300
+# MetricResult writes are serialized per shard of metric_key rather than
+# globally, so reduces for unrelated metrics do not queue behind each other.
+_METRIC_RESULT_WRITE_LOCK_SHARDS = max(int(os.getenv("METRIC_RESULT_WRITE_LOCK_SHARDS", "16")), 1)
+# Session.info key accumulating time spent waiting for MetricResult write locks.
+_LOCK_WAIT_INFO_KEY = "metric_result_lock_wait_ms"
 
 
 def _batched(rows: list, batch_size: int = _BULK_WRITE_BATCH_SIZE):
@@ -69,8 +91,34 @@ def _upsert_result(session: Session, result: MetricResult) -> None:
         context_json=stmt.inserted.context_json,
         computed_at=stmt.inserted.computed_at,
     )
-    with _metric_result_write_lock(session):
+    with _metric_result_write_lock(session, [result.metric_key]):
+        # Look the row up rather than trusting rowcount: with CLIENT_FOUND_ROWS an
+        # update reports 1 affected row, the same as an insert. The write lock
+        # keeps other runner writers of this metric out between the two statements.
+        exists = (
+            session.query(MetricResultModel.id)
+            .filter(
+                MetricResultModel.metric_key == result.metric_key,
+                MetricResultModel.entity_type == result.entity_type,
+                MetricResultModel.entity_id == result.entity_id,
+                MetricResultModel.season == result.season,
+                MetricResultModel.sub_key == (result.sub_key or ""),
+            )
+            .first()
+            is not None
+        )
         session.execute(stmt)
+        if not exists:
+            _bump_result_count(session, result.metric_key, result.season)
+
+
+def _mark_games_with_results(session: Session, results: list[MetricResult]) -> None:
+    """Flag the GameArtifactStatus rows of games that now have a numeric MetricResult."""
+    mark_game_artifacts(
+        session,
+        {result.game_id for result in results if result.game_id and result.value_num is not None},
+        has_metric_results=True,
+    )
 
 
 def _flush_results(session: Session, results: list[MetricResult]) -> None:
@@ -80,7 +128,7 @@ def _flush_results(session: Session, results: list[MetricResult]) -> None:
 
     from sqlalchemy.dialects.mysql import insert
 
-    with _metric_result_write_lock(session):
+    with _metric_result_write_lock(session, [result.metric_key for result in results]):
         for batch in _batched(results):
             stmt = insert(MetricResultModel).values([_result_row(result) for result in batch])
             stmt = stmt.on_duplicate_key_update(
@@ -92,34 +140,243 @@ def _flush_results(session: Session, results: list[MetricResult]) -> None:
                 computed_at=stmt.inserted.computed_at,
             )
             session.execute(stmt)
+    _mark_games_with_results(session, results)
+
+
+def _metric_result_lock_name(metric_key: str | None) -> str:
+    """Advisory lock name for the MetricResult write shard owning ``metric_key``.
+
+    crc32 keeps the mapping stable across processes (``hash()`` is salted per
+    interpreter), so every worker serializes a given metric on the same lock.
+    """
+    shard = zlib.crc32(str(metric_key or "").encode("utf-8")) % _METRIC_RESULT_WRITE_LOCK_SHARDS
+    return f"{_METRIC_RESULT_WRITE_LOCK_NAME}:{shard:02d}"
+
+
+def _metric_result_lock_names(metric_keys) -> list[str]:
+    """Distinct shard lock names for ``metric_keys`` in acquisition order.
+
+    Every writer acquires its shards in ascending name order, so two writers
+    spanning overlapping shards can never wait on each other in a cycle.
+    """
+    return sorted({_metric_result_lock_name(metric_key) for metric_key in metric_keys})
+
+
+def _lock_wait_ms(session: Session) -> float:
+    """Total MetricResult write-lock wait recorded on ``session`` so far."""
+    info = getattr(session, "info", None)
+    if not isinstance(info, dict):
+        return 0.0
+    return float(info.get(_LOCK_WAIT_INFO_KEY, 0.0))
 
 
 @contextmanager
 def _metric_result_write_lock(
     session: Session,
+    metric_keys,
     timeout_seconds: int = _METRIC_RESULT_WRITE_LOCK_TIMEOUT_SECONDS,
 ):
-    """Serialize MetricResult upserts to avoid cross-metric InnoDB deadlocks."""
+    """Serialize MetricResult upserts per metric_key shard.
+
+    Writers for the same metric (and any metric hashing to the same shard)
+    still run one at a time, which is what prevents InnoDB deadlocks on the
+    shared unique-index range; unrelated metrics proceed in parallel. Time
+    spent waiting is accumulated on ``session.info`` for MetricPerfLog.
+    """
     connection = session.connection()
-    acquired = connection.execute(
-        text("SELECT GET_LOCK(:name, :timeout_seconds)"),
-        {
-            "name": _METRIC_RESULT_WRITE_LOCK_NAME,
-            "timeout_seconds": int(timeout_seconds),
-        },
-    ).scalar()
-    if acquired != 1:
-        raise RuntimeError(f"Failed to acquire MetricResult write lock: {_METRIC_RESULT_WRITE_LOCK_NAME}")
+    held: list[str] = []
+    started_at = time.perf_counter()
     try:
+        for lock_name in _metric_result_lock_names(metric_keys):
+            acquired = connection.execute(
+                text("SELECT GET_LOCK(:name, :timeout_seconds)"),
+                {
+                    "name": lock_name,
+                    "timeout_seconds": int(timeout_seconds),
+                },
+            ).scalar()
+            if acquired != 1:
+                raise RuntimeError(f"Failed to acquire MetricResult write lock: {lock_name}")
+            held.append(lock_name)
+        info = getattr(session, "info", None)
+        if isinstance(info, dict):
+            waited_ms = (time.perf_counter() - started_at) * 1000
+            info[_LOCK_WAIT_INFO_KEY] = info.get(_LOCK_WAIT_INFO_KEY, 0.0) + waited_ms
         yield
     finally:
-        try:
-            connection.execute(
-                text("SELECT RELEASE_LOCK(:name)"),
-                {"name": _METRIC_RESULT_WRITE_LOCK_NAME},
+        for lock_name in reversed(held):
+            try:
+                connection.execute(
+                    text("SELECT RELEASE_LOCK(:name)"),
+                    {"name": lock_name},
+                )
+            except Exception:
+                logger.exception("Failed to release MetricResult write lock %s", lock_name)
+
+
+def _ranks_maintained(metric_def) -> bool:
+    """True when ``refresh_metric_pool`` owns peer_rank/peer_total for this metric.
+
+    Only the reduce and season paths rewrite a whole (metric_key, season) pool;
+    per-game upserts of non-incremental metrics leave the columns NULL, and
+    split metrics are never peer-ranked (the pages show them as 1 of 1).
+    """
+    if metric_def is None or getattr(metric_def, "sub_key_type", None):
+        return False
+    return bool(getattr(metric_def, "incremental", False)) or getattr(metric_def, "trigger", "game") == "season"
+
+
+def _count_pool(session: Session, metric_key: str, season: str | None) -> int:
+    return int(
+        session.query(func.count(MetricResultModel.id))
+        .filter(MetricResultModel.metric_key == metric_key, MetricResultModel.season == season)
+        .scalar()
+        or 0
+    )
+
+
+def _store_result_count(session: Session, metric_key: str, season: str | None, row_count: int) -> None:
+    """Overwrite the MetricResultCount row for one pool.
+
+    Callers hold the metric's MetricResult write lock, so update-then-insert
+    cannot race another writer of the same pool.
+    """
+    now = datetime.utcnow()
+    updated = (
+        session.query(MetricResultCount)
+        .filter(MetricResultCount.metric_key == metric_key, MetricResultCount.season == (season or ""))
+        .update({"row_count": row_count, "updated_at": now}, synchronize_session=False)
+    )
+    if not updated:
+        session.execute(
+            MetricResultCount.__table__.insert(),
+            [{"metric_key": metric_key, "season": season or "", "row_count": row_count, "updated_at": now}],
+        )
+
+
+def _bump_result_count(session: Session, metric_key: str, season: str | None) -> None:
+    """Count one newly inserted MetricResult row; callers hold the write lock."""
+    updated = (
+        session.query(MetricResultCount)
+        .filter(MetricResultCount.metric_key == metric_key, MetricResultCount.season == (season or ""))
+        .update(
+            {"row_count": MetricResultCount.row_count + 1, "updated_at": datetime.utcnow()},
+            synchronize_session=False,
+        )
+    )
+    if not updated:
+        # First write to this pool since the last reconcile: count it outright.
+        _store_result_count(session, metric_key, season, _count_pool(session, metric_key, season))
+
+
+def clear_result_counts(session: Session, metric_keys) -> None:
+    """Drop MetricResultCount rows for metrics whose results were deleted wholesale."""
+    metric_keys = list(metric_keys)
+    if metric_keys:
+        session.query(MetricResultCount).filter(
+            MetricResultCount.metric_key.in_(metric_keys)
+        ).delete(synchronize_session=False)
+
+
+def reconcile_result_counts(session: Session) -> dict[str, int]:
+    """Rebuild MetricResultCount from one GROUP BY over MetricResult.
+
+    Safety net for writers that bypass the runner (manual deletes,
+    migrations). A pool rewritten while the scan runs may be stored with the
+    count the scan saw; the next reduce of that pool or the next reconcile
+    corrects it.
+    """
+    actual: dict[tuple[str, str], int] = defaultdict(int)
+    for metric_key, season, row_count in (
+        session.query(
+            MetricResultModel.metric_key,
+            MetricResultModel.season,
+            func.count(MetricResultModel.id),
+        )
+        .group_by(MetricResultModel.metric_key, MetricResultModel.season)
+        .all()
+    ):
+        actual[(metric_key, season or "")] += int(row_count)
+    stored = {
+        (row.metric_key, row.season): int(row.row_count)
+        for row in session.query(MetricResultCount.metric_key, MetricResultCount.season, MetricResultCount.row_count)
+    }
+    now = datetime.utcnow()
+    changed = [
+        {"metric_key": key[0], "season": key[1], "row_count": count, "updated_at": now}
+        for key, count in actual.items()
+        if stored.get(key) != count
+    ]
+    stale = [key for key in stored if key not in actual]
+    for batch in _batched([*[(row["metric_key"], row["season"]) for row in changed], *stale]):
+        session.query(MetricResultCount).filter(
+            tuple_(MetricResultCount.metric_key, MetricResultCount.season).in_(batch)
+        ).delete(synchronize_session=False)
+    for batch in _batched(changed):
+        session.execute(MetricResultCount.__table__.insert(), batch)
+    return {"pools": len(actual), "updated": len(changed), "removed": len(stale)}
+
+
+def refresh_metric_pool(session: Session, metric_key: str, season: str, metric_def=None) -> int:
+    """Rewrite the derived data of one (metric_key, season) MetricResult pool.
+
+    Records the pool's row count in MetricResultCount and, for metrics whose
+    ranks are stored (see `_ranks_maintained`), rewrites peer_rank /
+    peer_total. Peers share entity_type and rank_group and have a value; rank
+    is one plus the number of peers with a better value (higher, or lower for
+    ``rank_order="asc"``), so ties share a rank. Reads the pool once and
+    writes only rows whose stored rank or total changed, in one bulk
+    UPDATE by primary key. Returns the number of rows re-ranked.
+    """
+    if metric_def is None:
+        metric_def = get_metric(metric_key, session=session)
+
+    with _metric_result_write_lock(session, [metric_key]):
+        if not _ranks_maintained(metric_def):
+            _store_result_count(session, metric_key, season, _count_pool(session, metric_key, season))
+            return 0
+        descending = getattr(metric_def, "rank_order", "desc") != "asc"
+        rows = (
+            session.query(
+                MetricResultModel.id,
+                MetricResultModel.entity_type,
+                MetricResultModel.rank_group,
+                MetricResultModel.value_num,
+                MetricResultModel.peer_rank,
+                MetricResultModel.peer_total,
+            )
+            .filter(
+                MetricResultModel.metric_key == metric_key,
+                MetricResultModel.season == season,
             )
-        except Exception:
-            logger.exception("Failed to release MetricResult write lock %s", _METRIC_RESULT_WRITE_LOCK_NAME)
+            .all()
+        )
+        _store_result_count(session, metric_key, season, len(rows))
+        pools: dict[tuple, list[float]] = defaultdict(list)
+        for row in rows:
+            if row.value_num is not None:
+                pools[(row.entity_type, row.rank_group)].append(float(row.value_num))
+        for values in pools.values():
+            values.sort()
+
+        updates = []
+        for row in rows:
+            if row.value_num is None:
+                rank = total = None
+            else:
+                values = pools[(row.entity_type, row.rank_group)]
+                value = float(row.value_num)
+                if descending:
+                    rank = len(values) - bisect_right(values, value) + 1
+                else:
+                    rank = bisect_left(values, value) + 1
+                total = len(values)
+            if (row.peer_rank, row.peer_total) != (rank, total):
+                updates.append({"id": row.id, "peer_rank": rank, "peer_total": total})
+
+        for batch in _batched(updates):
+            session.execute(update(MetricResultModel), batch)
+    return len(updates)
 
 
 def _log_run(
@@ -161,6 +418,11 @@ def _flush_run_logs(session: Session, rows: list[dict]) -> None:
             qualified=stmt.inserted.qualified,
         )
         session.execute(stmt)
+    mark_game_artifacts(
+        session,
+        {row["game_id"] for row in rows if row.get("entity_type") in ("player", "team")},
+        has_metric_run_logs=True,
+    )
 
 
 def _classify_sql_statement(statement: str) -> str | None:
@@ -200,6 +462,7 @@ def _record_metric_perf(
     *,
     db_reads: int | None = None,
     db_writes: int | None = None,
+    lock_wait_ms: int | None = None,
 ) -> None:
     session.add(
         MetricPerfLog(
@@ -208,6 +471,7 @@ def _record_metric_perf(
             duration_ms=duration_ms,
             db_reads=db_reads,
             db_writes=db_writes,
+            lock_wait_ms=lock_wait_ms,
         )
     )
     session.flush()
@@ -259,48 +523,86 @@ def _get_targets(session: Session, scope: str, game: Game, player_ids: list[str]
     return []
 
 
-# ── Phase 1 (Map): compute delta only ────────────────────────────────────────
+def _compute_batch_results(session: Session, metric_def, targets, season: str, game_id: str):
+    """Evaluate all targets in one call when the metric supports it (rule metrics).
 
-def run_delta_only(
-    session: Session,
-    game_id: str,
-    metric_key: str,
-    commit: bool = True,
-) -> bool:
-    """Compute per-game deltas and write MetricRunLog only.
-
-    No MetricResult reads, writes, or locks. Returns True if any delta was produced.
-    Non-incremental metrics write their full-recompute result directly to MetricResult
-    (they have no delta concept and no lock contention).
+    Returns None when the metric has no compute_batch() or the batch call fails,
+    so the caller falls back to per-entity compute().
     """
+    compute_batch = getattr(metric_def, "compute_batch", None)
+    if compute_batch is None:
+        return None
+    try:
+        return compute_batch(session, [entity_id for _, entity_id in targets], season, game_id)
+    except Exception as exc:
+        logger.error("Metric %s batch compute failed for game %s: %s",
+                     metric_def.key, game_id, exc, exc_info=True)
+        return None
+
+
+# ── Phase 1 (Map): compute delta only ────────────────────────────────────────
+
+def _game_targets_context(session: Session, game_id: str):
+    """Load the Game plus its player/team ids once for every metric mapped over it."""
     game = session.query(Game).filter(Game.game_id == game_id).first()
     if game is None:
         logger.warning("Game %s not found; skipping.", game_id)
-        return False
+        return None
     if not is_game_completed(game):
-        logger.info("Game %s is not completed; skipping metric %s.", game_id, metric_key)
-        return False
+        logger.info("Game %s is not completed; skipping metrics.", game_id)
+        return None
+
+    snapshot = _attach_game_fact_snapshot(session, game)
+    if snapshot is not None:
+        player_ids = list(dict.fromkeys(
+            row.player_id for row in snapshot.rows("PlayerGameStats", game_id) if row.player_id
+        ))
+    else:
+        player_ids = [
+            row.player_id
+            for row in session.query(PlayerGameStats.player_id)
+            .filter(PlayerGameStats.game_id == game_id)
+            .distinct()
+            .all()
+        ]
+    team_ids: list[str] = [t for t in [game.home_team_id, game.road_team_id] if t]
+    return game, player_ids, team_ids
 
-    season = game.season
 
-    player_ids: list[str] = [
-        row.player_id
-        for row in session.query(PlayerGameStats.player_id)
-        .filter(PlayerGameStats.game_id == game_id)
-        .distinct()
-        .all()
-    ]
-    team_ids: list[str] = [t for t in [game.home_team_id, game.road_team_id] if t]
+def _attach_game_fact_snapshot(session: Session, game: Game):
+    """Attach the exported fact snapshot covering ``game`` when METRIC_FACT_SNAPSHOT_DIR is set.
 
-    metric_def = get_metric(metric_key, session=session)
-    if metric_def is None:
-        logger.warning("Metric key %r not found in registry; skipping.", metric_key)
-        return False
+    metrics.helpers then serves PlayerGameStats / TeamGameStats / ShotRecord /
+    GamePlayByPlay lookups for the game from local columns instead of MySQL.
+    """
+    root = os.getenv("METRIC_FACT_SNAPSHOT_DIR")
+    if not root:
+        return None
+    from metrics.fact_snapshot import attach_fact_snapshot, load_fact_snapshot
+
+    for bucket in (game.season, "all"):
+        snapshot = load_fact_snapshot(root, bucket) if bucket else None
+        if snapshot is not None and snapshot.covers(game.game_id):
+            attach_fact_snapshot(session, snapshot)
+            return snapshot
+    return None
 
-    if getattr(metric_def, "trigger", "game") == "season":
-        logger.debug("Skipping trigger=season metric %s in game pipeline.", metric_key)
-        return False
 
+def _map_metric_for_game(
+    session: Session,
+    game: Game,
+    player_ids: list[str],
+    team_ids: list[str],
+    metric_def,
+) -> tuple[bool, list[dict]]:
+    """Compute one metric's per-game output; returns (produced_any, MetricRunLog rows).
+
+    Non-incremental results are upserted straight into MetricResult, and the
+    game is flagged once they are all written; the caller flushes the
+    returned run-log rows.
+    """
+    game_id = game.game_id
+    season = game.season
     targets = _get_targets(session, metric_def.scope, game, player_ids, team_ids)
     produced_any = False
     run_log_rows: list[dict] = []
@@ -308,9 +610,14 @@ def run_delta_only(
     if not metric_def.incremental:
         # Non-incremental metrics (game-scope, rank-based) do a full recompute.
         # No running totals → no lock contention → write result directly.
+        batch_results = _compute_batch_results(session, metric_def, targets, season, game_id)
+        written: list[MetricResult] = []
         for entity_type, entity_id in targets:
             try:
-                result = metric_def.compute(session, entity_id, season, game_id)
+                if batch_results is not None:
+                    result = batch_results.get(entity_id)
+                else:
+                    result = metric_def.compute(session, entity_id, season, game_id)
             except Exception as exc:
                 logger.error("Metric %s failed for %s %s: %s",
                              metric_def.key, entity_type, entity_id, exc, exc_info=True)
@@ -318,6 +625,7 @@ def run_delta_only(
             result_list = result if isinstance(result, list) else [result] if result else []
             for r in result_list:
                 _upsert_result(session, r)
+            written.extend(result_list)
             run_log_rows.append(
                 _log_run(
                     game_id,
@@ -331,42 +639,71 @@ def run_delta_only(
             )
             if result_list:
                 produced_any = True
+        _mark_games_with_results(session, written)
+        return produced_any, run_log_rows
+
+    # Incremental metrics: compute delta → write MetricRunLog only.
+    if metric_def.career:
+        bucket_season = career_season_for(season)
+        if bucket_season is None:
+            return False, []  # skip preseason / all-star for career
     else:
-        # Incremental metrics: compute delta → write MetricRunLog only.
-        if metric_def.career:
-            bucket_season = career_season_for(season)
-            if bucket_season is None:
-                if commit:
-                    session.commit()
-                return False  # skip preseason / all-star for career
-        else:
-            bucket_season = season
+        bucket_season = season
 
-        for entity_type, entity_id in targets:
-            try:
-                delta = metric_def.compute_delta(session, entity_id, game_id)
-            except Exception as exc:
-                logger.error("compute_delta %s failed for %s %s: %s",
-                             metric_def.key, entity_type, entity_id, exc, exc_info=True)
-                continue
+    for entity_type, entity_id in targets:
+        try:
+            delta = metric_def.compute_delta(session, entity_id, game_id)
+        except Exception as exc:
+            logger.error("compute_delta %s failed for %s %s: %s",
+                         metric_def.key, entity_type, entity_id, exc, exc_info=True)
+            continue
+
+        if delta is None:
+            continue
+
+        produced_any = True
+        run_log_rows.append(
+            _log_run(
+                game_id,
+                metric_def.key,
+                entity_type,
+                entity_id or "",
+                bucket_season,
+                delta,
+                True,
+                qualified=delta.pop("_qualified", None),
+            )
+        )
+    return produced_any, run_log_rows
 
-            if delta is None:
-                continue
 
-            produced_any = True
-            run_log_rows.append(
-                _log_run(
-                    game_id,
-                    metric_def.key,
-                    entity_type,
-                    entity_id or "",
-                    bucket_season,
-                    delta,
-                    True,
-                    qualified=delta.pop("_qualified", None),
-                )
-            )
+def run_delta_only(
+    session: Session,
+    game_id: str,
+    metric_key: str,
+    commit: bool = True,
+) -> bool:
+    """Compute per-game deltas and write MetricRunLog only.
+
+    No MetricResult reads, writes, or locks. Returns True if any delta was produced.
+    Non-incremental metrics write their full-recompute result directly to MetricResult
+    (they have no delta concept and no lock contention).
+    """
+    context = _game_targets_context(session, game_id)
+    if context is None:
+        return False
+    game, player_ids, team_ids = context
+
+    metric_def = get_metric(metric_key, session=session)
+    if metric_def is None:
+        logger.warning("Metric key %r not found in registry; skipping.", metric_key)
+        return False
 
+    if getattr(metric_def, "trigger", "game") == "season":
+        logger.debug("Skipping trigger=season metric %s in game pipeline.", metric_key)
+        return False
+
+    produced_any, run_log_rows = _map_metric_for_game(session, game, player_ids, team_ids, metric_def)
     _flush_run_logs(session, run_log_rows)
 
     if commit:
@@ -377,18 +714,264 @@ def run_delta_only(
     return produced_any
 
 
+def _map_game(session: Session, game_id: str, metric_keys: list[str]) -> tuple[dict[str, bool], list[dict]]:
+    """Map many metrics over one game without flushing MetricRunLog.
+
+    Returns ({metric_key: produced}, run-log rows) so callers can batch the
+    run-log upsert across metrics (run_deltas_for_game) or across games
+    (daily_job process workers).
+    """
+    produced: dict[str, bool] = {key: False for key in metric_keys}
+    context = _game_targets_context(session, game_id)
+    if context is None:
+        return produced, []
+    game, player_ids, team_ids = context
+
+    run_log_rows: list[dict] = []
+    for metric_key in metric_keys:
+        metric_def = get_metric(metric_key, session=session)
+        if metric_def is None:
+            logger.warning("Metric key %r not found in registry; skipping.", metric_key)
+            continue
+        if getattr(metric_def, "trigger", "game") == "season":
+            logger.debug("Skipping trigger=season metric %s in game pipeline.", metric_key)
+            continue
+        try:
+            metric_produced, metric_rows = _map_metric_for_game(
+                session, game, player_ids, team_ids, metric_def
+            )
+        except Exception as exc:
+            logger.error("Game %s metric %s: map failed: %s", game_id, metric_key, exc, exc_info=True)
+            continue
+        produced[metric_key] = metric_produced
+        run_log_rows.extend(metric_rows)
+    return produced, run_log_rows
+
+
+def run_deltas_for_game(
+    session: Session,
+    game_id: str,
+    metric_keys: list[str],
+    commit: bool = True,
+) -> dict[str, bool]:
+    """run_delta_only for many metrics of one game in a single session.
+
+    The Game row, player/team targets and the session's metric helper cache are
+    shared across metrics, and every MetricRunLog row is flushed in one bulk
+    upsert at the end. A metric that raises is logged and reported as not
+    produced; the others still commit. Returns {metric_key: produced}.
+    """
+    produced, run_log_rows = _map_game(session, game_id, metric_keys)
+    _flush_run_logs(session, run_log_rows)
+
+    if commit:
+        session.commit()
+
+    logger.info("Game %s: delta_only done for %d metric(s) (%d produced, %d run-log rows).",
+                game_id, len(metric_keys), sum(produced.values()), len(run_log_rows))
+    return produced
+
+
 # ── Phase 2 (Reduce): aggregate deltas → write MetricResult ──────────────────
 
+class _DeltaFold(NamedTuple):
+    """Running totals for one entity plus the checkpoint bookkeeping."""
+    totals: dict
+    last_game_id: str | None
+    row_count: int
+
+
+def _fold_delta_rows(rows, start: _DeltaFold | None = None) -> _DeltaFold:
+    """Fold ordered ``(game_id, delta_json)`` rows into running totals.
+
+    ``start`` resumes from a checkpoint; folding is a left fold over
+    ``merge_totals`` so resuming yields exactly what a fold from scratch would.
+    NULL / unparseable deltas still count towards ``row_count``.
+    """
+    totals = dict(start.totals) if start else {}
+    last_game_id = start.last_game_id if start else None
+    row_count = start.row_count if start else 0
+    for game_id, delta_json in rows:
+        row_count += 1
+        if last_game_id is None or game_id > last_game_id:
+            last_game_id = game_id
+        if delta_json is None:
+            continue
+        try:
+            delta = json.loads(delta_json)
+        except (ValueError, TypeError):
+            continue
+        totals = merge_totals(totals, delta)
+    return _DeltaFold(totals, last_game_id, row_count)
+
+
+def _iter_entity_totals_per_entity(session: Session, metric_key: str, season: str):
+    """Yield ``(entity_type, entity_id, _DeltaFold)`` with one delta query per entity.
+
+    Legacy reduce path, kept for comparison and as a fallback.
+    """
+    # Find all distinct entities that have deltas for this (metric, season).
+    # Order by (entity_type, entity_id) so concurrent reduces on different metrics
+    # acquire InnoDB gap locks in the same order, avoiding deadlocks.
+    entity_rows = (
+        session.query(MetricRunLog.entity_type, MetricRunLog.entity_id)
+        .filter(
+            MetricRunLog.metric_key == metric_key,
+            MetricRunLog.season == season,
+        )
+        .distinct()
+        .order_by(MetricRunLog.entity_type, MetricRunLog.entity_id)
+        .all()
+    )
+    for entity_type, entity_id in entity_rows:
+        yield entity_type, entity_id, _fold_delta_rows(
+            _entity_delta_rows(session, metric_key, season, entity_type, entity_id)
+        )
+
+
+def _entity_delta_rows(session: Session, metric_key: str, season: str, entity_type: str, entity_id: str):
+    """All ``(game_id, delta_json)`` rows for one entity, ordered by game_id (chronological)."""
+    return (
+        session.query(MetricRunLog.game_id, MetricRunLog.delta_json)
+        .filter(
+            MetricRunLog.metric_key == metric_key,
+            MetricRunLog.entity_type == entity_type,
+            MetricRunLog.entity_id == entity_id,
+            MetricRunLog.season == season,
+        )
+        .order_by(MetricRunLog.game_id)
+        .all()
+    )
+
+
+def _iter_entity_totals_streaming(session: Session, metric_key: str, season: str):
+    """Yield ``(entity_type, entity_id, _DeltaFold)`` from one ordered cursor.
+
+    Reads every delta for the (metric_key, season) in a single query walking
+    ``ix_MetricRunLog_reduce``. InnoDB secondary indexes carry the primary key,
+    so ``game_id`` is already the trailing sort column and the ORDER BY needs
+    no filesort. Entities are grouped on the fly as the cursor advances, so
+    memory stays bounded by one entity's deltas plus the fetch buffer.
+    Entity order matches the per-entity path, which keeps MetricResult write
+    ordering (and therefore InnoDB lock ordering) unchanged.
+    """
+    rows = (
+        session.query(
+            MetricRunLog.entity_type,
+            MetricRunLog.entity_id,
+            MetricRunLog.game_id,
+            MetricRunLog.delta_json,
+        )
+        .filter(
+            MetricRunLog.metric_key == metric_key,
+            MetricRunLog.season == season,
+        )
+        .order_by(MetricRunLog.entity_type, MetricRunLog.entity_id, MetricRunLog.game_id)
+        .yield_per(_REDUCE_STREAM_FETCH_SIZE)
+    )
+    for (entity_type, entity_id), group in groupby(rows, key=lambda row: (row[0], row[1])):
+        yield entity_type, entity_id, _fold_delta_rows((row[2], row[3]) for row in group)
+
+
+def _reduced_result(
+    metric_def,
+    metric_key: str,
+    season: str,
+    entity_type: str,
+    entity_id: str,
+    totals: dict,
+) -> tuple[MetricResult | None, bool]:
+    """Run compute_value() for one entity.
+
+    Returns ``(result_to_persist, qualified)``. Entities below min_sample still
+    persist a value-less row carrying their totals; ``(None, False)`` means
+    compute_value raised and nothing should be written.
+    """
+    try:
+        result = metric_def.compute_value(totals, season, entity_id)
+    except Exception as exc:
+        logger.error("reduce compute_value %s failed for %s %s: %s",
+                     metric_key, entity_type, entity_id, exc, exc_info=True)
+        return None, False
+
+    if result:
+        result.context = totals
+        return result, True
+    # Below min_sample — persist totals so they are visible
+    return MetricResult(
+        metric_key=metric_key,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        season=season,
+        game_id=None,
+        value_num=None,
+        context=totals,
+    ), False
+
+
+def _running_total_row(
+    metric_key: str,
+    season: str,
+    entity_type: str,
+    entity_id: str,
+    fold: _DeltaFold,
+    now: datetime,
+) -> dict:
+    return {
+        "metric_key": metric_key,
+        "season": season,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "totals_json": json.dumps(fold.totals),
+        "last_game_id": fold.last_game_id,
+        "folded_count": fold.row_count,
+        "updated_at": now,
+    }
+
+
+def _replace_running_totals(
+    session: Session,
+    metric_key: str,
+    season: str,
+    rows: list[dict],
+    entity_keys: list[tuple[str, str]] | None = None,
+) -> None:
+    """Replace MetricRunningTotal checkpoints for a (metric_key, season).
+
+    ``entity_keys=None`` drops every checkpoint for the season first (full
+    rebuild); otherwise only the listed ``(entity_type, entity_id)`` pairs are
+    replaced. Plain DELETE + INSERT keeps this dialect-neutral.
+    """
+    q = session.query(MetricRunningTotal).filter(
+        MetricRunningTotal.metric_key == metric_key,
+        MetricRunningTotal.season == season,
+    )
+    if entity_keys is None:
+        q.delete(synchronize_session=False)
+    else:
+        for batch in _batched(entity_keys):
+            q.filter(
+                tuple_(MetricRunningTotal.entity_type, MetricRunningTotal.entity_id).in_(batch)
+            ).delete(synchronize_session=False)
+    for batch in _batched(rows):
+        session.execute(MetricRunningTotal.__table__.insert(), batch)
+
+
 def reduce_metric(
     session: Session,
     metric_key: str,
     season: str,
     commit: bool = True,
+    streaming: bool = True,
 ) -> int:
     """Aggregate all deltas for a (metric_key, season) and write MetricResults.
 
     Reads all MetricRunLog rows, groups by entity, merges all deltas,
     calls compute_value(), and upserts one MetricResult per entity.
+    ``streaming=True`` reads every delta in one ordered cursor; ``False`` uses
+    the legacy one-query-per-entity path. Both produce identical results.
+    This is the full rebuild: MetricRunningTotal checkpoints for the season are
+    rewritten so later `reduce_metric_incremental` calls resume from here.
     Returns the number of MetricResult rows written.
     """
     metric_def = get_metric(metric_key, session=session)
@@ -400,73 +983,236 @@ def reduce_metric(
         # Non-incremental metrics are fully computed in Phase 1; nothing to reduce.
         return 0
 
+    iter_entity_totals = (
+        _iter_entity_totals_streaming if streaming else _iter_entity_totals_per_entity
+    )
+
+    started_at = time.perf_counter()
+    lock_wait_before = _lock_wait_ms(session)
+    now = datetime.utcnow()
+    with _count_db_ops(session) as get_counts:
+        results_written = 0
+        entity_count = 0
+        persisted_results: list[MetricResult] = []
+        checkpoint_rows: list[dict] = []
+        for entity_type, entity_id, fold in iter_entity_totals(session, metric_key, season):
+            entity_count += 1
+            checkpoint_rows.append(
+                _running_total_row(metric_key, season, entity_type, entity_id, fold, now)
+            )
+            result, qualified = _reduced_result(
+                metric_def, metric_key, season, entity_type, entity_id, fold.totals
+            )
+            if result is None:
+                continue
+            persisted_results.append(result)
+            if qualified:
+                results_written += 1
+
+        _flush_results(session, persisted_results)
+        refresh_metric_pool(session, metric_key, season, metric_def)
+        _replace_running_totals(session, metric_key, season, checkpoint_rows)
+
+    duration_ms = max(int((time.perf_counter() - started_at) * 1000), 0)
+    db_reads, db_writes = get_counts()
+    _record_metric_perf(
+        session,
+        metric_key,
+        duration_ms,
+        db_reads=db_reads,
+        db_writes=db_writes,
+        lock_wait_ms=int(_lock_wait_ms(session) - lock_wait_before),
+    )
+
+    if commit:
+        session.commit()
+
+    logger.info("reduce %s season=%s: %d results written (%d entities).",
+                metric_key, season, results_written, entity_count)
+    return results_written
+
+
+def reduce_metric_incremental(
+    session: Session,
+    metric_key: str,
+    season: str,
+    commit: bool = True,
+) -> int:
+    """Fold only newly mapped deltas into MetricRunningTotal and re-reduce touched entities.
+
+    Intended for the post-ingest path, where one new game adds a handful of
+    MetricRunLog rows to a season that already has a checkpoint. Per entity:
+
+    - counts and max game_id match the checkpoint → untouched, no compute_value;
+    - every new row sorts after the checkpoint's last_game_id → resume the fold;
+    - anything else (late insert of an older game, deleted rows, or a row at or
+      before the checkpoint whose computed_at is not older than the
+      checkpoint's updated_at, i.e. a re-mapped game) → refold that entity
+      from all of its deltas.
+
+    The resulting totals, and therefore ``MetricResult.context_json``, are
+    identical to what `reduce_metric` would write. Falls back to the full
+    rebuild when no checkpoint exists yet for the (metric_key, season).
+    Returns the number of MetricResult rows written with a value.
+    """
+    metric_def = get_metric(metric_key, session=session)
+    if metric_def is None:
+        logger.warning("reduce: metric %r not found; skipping.", metric_key)
+        return 0
+
+    if not metric_def.incremental:
+        return 0
+
+    checkpoints = {}
+    oldest_checkpoint = None
+    for row in session.query(MetricRunningTotal).filter(
+        MetricRunningTotal.metric_key == metric_key,
+        MetricRunningTotal.season == season,
+    ):
+        checkpoints[(row.entity_type, row.entity_id)] = _DeltaFold(
+            json.loads(row.totals_json), row.last_game_id, int(row.folded_count or 0)
+        )
+        if oldest_checkpoint is None or row.updated_at < oldest_checkpoint:
+            oldest_checkpoint = row.updated_at
+    if not checkpoints:
+        logger.info("reduce %s season=%s: no checkpoint; running full rebuild.", metric_key, season)
+        return reduce_metric(session, metric_key, season, commit=commit)
+
     started_at = time.perf_counter()
+    lock_wait_before = _lock_wait_ms(session)
+    now = datetime.utcnow()
     with _count_db_ops(session) as get_counts:
-        # Find all distinct entities that have deltas for this (metric, season).
-        # Order by (entity_type, entity_id) so concurrent reduces on different metrics
-        # acquire InnoDB gap locks in the same order, avoiding deadlocks.
-        entity_rows = (
-            session.query(MetricRunLog.entity_type, MetricRunLog.entity_id)
+        # Index-only summary over ix_MetricRunLog_reduce: no delta_json reads.
+        summary = {
+            (entity_type, entity_id): (int(row_count), last_game_id)
+            for entity_type, entity_id, row_count, last_game_id in (
+                session.query(
+                    MetricRunLog.entity_type,
+                    MetricRunLog.entity_id,
+                    func.count(),
+                    func.max(MetricRunLog.game_id),
+                )
+                .filter(
+                    MetricRunLog.metric_key == metric_key,
+                    MetricRunLog.season == season,
+                )
+                .group_by(MetricRunLog.entity_type, MetricRunLog.entity_id)
+                .all()
+            )
+        }
+
+        # Only rows past each entity's checkpoint (or every row of new entities).
+        new_rows = (
+            session.query(
+                MetricRunLog.entity_type,
+                MetricRunLog.entity_id,
+                MetricRunLog.game_id,
+                MetricRunLog.delta_json,
+            )
+            .outerjoin(
+                MetricRunningTotal,
+                and_(
+                    MetricRunningTotal.metric_key == MetricRunLog.metric_key,
+                    MetricRunningTotal.season == MetricRunLog.season,
+                    MetricRunningTotal.entity_type == MetricRunLog.entity_type,
+                    MetricRunningTotal.entity_id == MetricRunLog.entity_id,
+                ),
+            )
             .filter(
                 MetricRunLog.metric_key == metric_key,
                 MetricRunLog.season == season,
+                or_(
+                    MetricRunningTotal.last_game_id.is_(None),
+                    MetricRunLog.game_id > MetricRunningTotal.last_game_id,
+                ),
             )
-            .distinct()
-            .order_by(MetricRunLog.entity_type, MetricRunLog.entity_id)
+            .order_by(MetricRunLog.entity_type, MetricRunLog.entity_id, MetricRunLog.game_id)
             .all()
         )
-
-        results_written = 0
-        persisted_results: list[MetricResult] = []
-        for entity_type, entity_id in entity_rows:
-            # Read all deltas for this entity, ordered by game_id (chronological)
-            delta_rows = (
-                session.query(MetricRunLog.delta_json)
+        new_rows_by_entity = {
+            key: [(row[2], row[3]) for row in group]
+            for key, group in groupby(new_rows, key=lambda row: (row[0], row[1]))
+        }
+
+        # Rows at or before the checkpoint that were written after it: a re-map
+        # (``dispatch game --force`` or an ON DUPLICATE KEY UPDATE of delta_json)
+        # changed a game the checkpoint already folded, with count and max unchanged.
+        # ``>=`` because DATETIME columns keep whole seconds only. The constant lower
+        # bound lets ix_MetricRunLog_reduce_computed_at range-scan only rows written
+        # since the oldest checkpoint instead of the whole season.
+        rewritten = {
+            (entity_type, entity_id)
+            for entity_type, entity_id in (
+                session.query(MetricRunLog.entity_type, MetricRunLog.entity_id)
+                .join(
+                    MetricRunningTotal,
+                    and_(
+                        MetricRunningTotal.metric_key == MetricRunLog.metric_key,
+                        MetricRunningTotal.season == MetricRunLog.season,
+                        MetricRunningTotal.entity_type == MetricRunLog.entity_type,
+                        MetricRunningTotal.entity_id == MetricRunLog.entity_id,
+                    ),
+                )
                 .filter(
                     MetricRunLog.metric_key == metric_key,
-                    MetricRunLog.entity_type == entity_type,
-                    MetricRunLog.entity_id == entity_id,
                     MetricRunLog.season == season,
-                    MetricRunLog.delta_json.isnot(None),
+                    MetricRunLog.computed_at >= oldest_checkpoint,
+                    MetricRunLog.game_id <= MetricRunningTotal.last_game_id,
+                    MetricRunLog.computed_at >= MetricRunningTotal.updated_at,
                 )
-                .order_by(MetricRunLog.game_id)
+                .distinct()
                 .all()
             )
+        }
+
+        folds: dict[tuple[str, str], _DeltaFold] = {}
+        refolded = 0
+        for key in sorted(summary):
+            row_count, last_game_id = summary[key]
+            checkpoint = checkpoints.get(key)
+            if (
+                key not in rewritten
+                and checkpoint is not None
+                and (checkpoint.row_count, checkpoint.last_game_id) == (row_count, last_game_id)
+            ):
+                continue
+            resumed = None
+            if key not in rewritten:
+                resumed = _fold_delta_rows(new_rows_by_entity.get(key, []), checkpoint)
+            if resumed is None or resumed.row_count != row_count or resumed.last_game_id != last_game_id:
+                # Rows appeared before the checkpoint, were removed or re-mapped: refold this entity.
+                refolded += 1
+                resumed = _fold_delta_rows(_entity_delta_rows(session, metric_key, season, *key))
+            folds[key] = resumed
 
-            # Merge all deltas into final totals
-            totals: dict = {}
-            for (delta_json,) in delta_rows:
-                try:
-                    delta = json.loads(delta_json)
-                except (ValueError, TypeError):
-                    continue
-                totals = merge_totals(totals, delta)
+        vanished = [key for key in checkpoints if key not in summary]
 
-            # Compute final value
-            try:
-                result = metric_def.compute_value(totals, season, entity_id)
-            except Exception as exc:
-                logger.error("reduce compute_value %s failed for %s %s: %s",
-                             metric_key, entity_type, entity_id, exc, exc_info=True)
+        results_written = 0
+        persisted_results: list[MetricResult] = []
+        checkpoint_rows: list[dict] = []
+        for (entity_type, entity_id), fold in folds.items():
+            checkpoint_rows.append(
+                _running_total_row(metric_key, season, entity_type, entity_id, fold, now)
+            )
+            result, qualified = _reduced_result(
+                metric_def, metric_key, season, entity_type, entity_id, fold.totals
+            )
+            if result is None:
                 continue
-
-            if result:
-                result.context = totals
-                persisted_results.append(result)
+            persisted_results.append(result)
+            if qualified:
                 results_written += 1
-            else:
-                # Below min_sample — persist totals so they are visible
-                persisted_results.append(MetricResult(
-                    metric_key=metric_key,
-                    entity_type=entity_type,
-                    entity_id=entity_id,
-                    season=season,
-                    game_id=None,
-                    value_num=None,
-                    context=totals,
-                ))
 
         _flush_results(session, persisted_results)
+        if folds or vanished:
+            refresh_metric_pool(session, metric_key, season, metric_def)
+        _replace_running_totals(
+            session,
+            metric_key,
+            season,
+            checkpoint_rows,
+            entity_keys=[*folds, *vanished],
+        )
 
     duration_ms = max(int((time.perf_counter() - started_at) * 1000), 0)
     db_reads, db_writes = get_counts()
@@ -476,13 +1222,16 @@ def reduce_metric(
         duration_ms,
         db_reads=db_reads,
         db_writes=db_writes,
+        lock_wait_ms=int(_lock_wait_ms(session) - lock_wait_before),
     )
 
     if commit:
         session.commit()
 
-    logger.info("reduce %s season=%s: %d results written (%d entities).",
-                metric_key, season, results_written, len(entity_rows))
+    logger.info(
+        "reduce %s season=%s (incremental): %d results written (%d entities touched, %d refolded, %d dropped).",
+        metric_key, season, results_written, len(folds), refolded, len(vanished),
+    )
     return results_written
 
 
@@ -522,6 +1271,7 @@ def run_season_metric(
         return 0
 
     started_at = time.perf_counter()
+    lock_wait_before = _lock_wait_ms(session)
     with _count_db_ops(session) as get_counts:
         try:
             results = metric_def.compute_season(session, season)
@@ -598,6 +1348,8 @@ def run_season_metric(
                     metric_key, season, len(stale_ids), cap,
                 )
 
+        refresh_metric_pool(session, metric_key, season, metric_def)
+
         if commit:
             session.commit()
 
@@ -643,6 +1395,7 @@ def run_season_metric(
         duration_ms,
         db_reads=db_reads,
         db_writes=db_writes,
+        lock_wait_ms=int(_lock_wait_ms(session) - lock_wait_before),
     )
 
     if commit:
@@ -5,13 +5,18 @@ import ast
 import builtins as py_builtins
 import json
 import logging
+import os
+import threading
+import time
+import weakref
 from contextlib import contextmanager
 from functools import lru_cache
 from typing import Iterable
 
 logger = logging.getLogger(__name__)
 
-from sqlalchemy import func
+from sqlalchemy import func, inspect as sa_inspect
+from sqlalchemy.exc import NoInspectionAvailable
 from sqlalchemy.orm import Session, sessionmaker
 
 from db import models as db_models
@@ -817,6 +822,37 @@ class RuleMetricDefinition(MetricDefinition):
             for window_type in _metric_window_types(self)
         ]
 
+    def _target_season(self, season: str | None) -> str | None:
+        if season is None:
+            return None
+        if self.career:
+            return window_season_for(season, self.window_type or "career")
+        return season
+
+    def _metric_result(
+        self,
+        entity_id: str,
+        target_season: str,
+        game_id: str | None,
+        rule_result: dict,
+        baseline: float | None,
+    ) -> MetricResult:
+        context = dict(rule_result.get("context") or {})
+        if baseline is not None:
+            context["baseline"] = baseline
+
+        return MetricResult(
+            metric_key=self.key,
+            entity_type=self.scope,
+            entity_id=entity_id,
+            season=target_season,
+            game_id=game_id if self.scope == "game" else None,
+            rank_group=rule_result.get("rank_group"),
+            value_num=float(rule_result["value_num"]),
+            value_str=rule_result.get("value_str"),
+            context=context,
+        )
+
     def compute(
         self,
         session,
@@ -829,32 +865,50 @@ class RuleMetricDefinition(MetricDefinition):
         if entity_id is None or season is None:
             return None
 
-        if self.career:
-            target_season = window_season_for(season, self.window_type or "career")
-            if target_season is None:
-                return None
-        else:
-            target_season = season
+        target_season = self._target_season(season)
+        if target_season is None:
+            return None
         rule_result = compute_result(session, self.definition, entity_id, target_season, self.scope)
         if rule_result is None:
             return None
 
         baseline = compute_baseline(session, self.definition, entity_id, target_season, self.scope)
-        context = dict(rule_result.get("context") or {})
-        if baseline is not None:
-            context["baseline"] = baseline
+        return self._metric_result(entity_id, target_season, game_id, rule_result, baseline)
 
-        return MetricResult(
-            metric_key=self.key,
-            entity_type=self.scope,
-            entity_id=entity_id,
-            season=target_season,
-            game_id=game_id if self.scope == "game" else None,
-            rank_group=rule_result.get("rank_group"),
-            value_num=float(rule_result["value_num"]),
-            value_str=rule_result.get("value_str"),
-            context=context,
+    def compute_batch(
+        self,
+        session,
+        entity_ids: list[str] | None,
+        season: str | None,
+        game_id: str | None = None,
+    ) -> dict[str, MetricResult]:
+        """compute() for many entities at once via one grouped rule query.
+
+        ``entity_ids=None`` evaluates every entity with rows in the season.
+        Entities without a result are absent from the returned mapping.
+        """
+        from metrics.framework.rule_engine import compute_baselines_for_season, compute_results_for_season
+
+        target_season = self._target_season(season)
+        if target_season is None:
+            return {}
+        if entity_ids is not None:
+            entity_ids = [entity_id for entity_id in entity_ids if entity_id is not None]
+        rule_results = compute_results_for_season(
+            session, self.definition, target_season, self.scope, entity_ids=entity_ids
+        )
+        baselines = compute_baselines_for_season(
+            session, self.definition, target_season, self.scope, entity_ids=list(rule_results)
         )
+        return {
+            entity_id: self._metric_result(
+                entity_id, target_season, game_id, rule_result, baselines.get(entity_id)
+            )
+            for entity_id, rule_result in rule_results.items()
+        }
+
+    def compute_season(self, session, season: str) -> list[MetricResult]:
+        return list(self.compute_batch(session, None, season).values())
 
 
 def load_code_metric(code: str) -> MetricDefinition:
@@ -1053,6 +1107,7 @@ def _load_published_code_metrics(session: Session) -> list[CodeMetricDefinition]
         .order_by(MetricDefinitionModel.created_at.asc(), MetricDefinitionModel.id.asc())
         .all()
     )
+    rows = [_detached_row(row) for row in rows]
     metrics: list[CodeMetricDefinition] = []
     existing_keys = {row.key for row in rows}
     for row in rows:
@@ -1077,6 +1132,7 @@ def _load_published_rule_metrics(session: Session) -> list[RuleMetricDefinition]
         .order_by(MetricDefinitionModel.created_at.asc(), MetricDefinitionModel.id.asc())
         .all()
     )
+    rows = [_detached_row(row) for row in rows]
     metrics: list[RuleMetricDefinition] = []
     existing_keys = {row.key for row in rows}
     for row in rows:
@@ -1115,7 +1171,7 @@ def _build_runtime_metric(
 
 
 def _lookup_published_metric_row(session: Session, key: str) -> MetricDefinitionModel | None:
-    return (
+    row = (
         session.query(MetricDefinitionModel)
         .filter(
             MetricDefinitionModel.status == "published",
@@ -1123,6 +1179,7 @@ def _lookup_published_metric_row(session: Session, key: str) -> MetricDefinition
         )
         .first()
     )
+    return _detached_row(row) if row is not None else None
 
 
 def _load_metric_by_key(session: Session, key: str) -> MetricDefinition | None:
@@ -1151,20 +1208,151 @@ def _load_metric_by_key(session: Session, key: str) -> MetricDefinition | None:
     return _build_runtime_metric(base_row, career=True, window_type=window_type)
 
 
+# ── Registry cache ────────────────────────────────────────────────────────────
+#
+# Runtime metrics are cached per process and per database. Every process
+# derives the same version token from MetricDefinition (row count + latest
+# updated_at), so a publish/edit/archive made by any web or Celery worker is
+# picked up everywhere once the token is re-checked. Within
+# METRIC_REGISTRY_CHECK_SECONDS of the last check, cache hits cost no DB
+# round trip; a key that is not cached always re-checks the token first so
+# a freshly published metric is never reported missing.
+
+_REGISTRY_CHECK_SECONDS = float(os.getenv("METRIC_REGISTRY_CHECK_SECONDS", "5"))
+
+
+class _MetricRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version: tuple | None = None
+        self.checked_at = float("-inf")
+        self.all_metrics: list[MetricDefinition] | None = None
+        self.by_key: dict[str, MetricDefinition] = {}
+
+    def is_fresh(self) -> bool:
+        return self.version is not None and time.monotonic() - self.checked_at < _REGISTRY_CHECK_SECONDS
+
+    def sync(self, session: Session) -> None:
+        """Re-read the version token and drop cached metrics if it moved."""
+        version = tuple(
+            session.query(
+                func.count(MetricDefinitionModel.id),
+                func.max(MetricDefinitionModel.updated_at),
+            ).one()
+        )
+        with self.lock:
+            if version != self.version:
+                self.version = version
+                self.all_metrics = None
+                self.by_key = {}
+            self.checked_at = time.monotonic()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.version = None
+            self.checked_at = float("-inf")
+            self.all_metrics = None
+            self.by_key = {}
+
+
+_registries: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_registries_lock = threading.Lock()
+
+
+def _metric_registry(bind) -> _MetricRegistry:
+    with _registries_lock:
+        registry = _registries.get(bind)
+        if registry is None:
+            registry = _registries[bind] = _MetricRegistry()
+        return registry
+
+
+def _session_registry(session: Session) -> _MetricRegistry:
+    return _metric_registry(session.get_bind())
+
+
+def invalidate_metric_registry() -> None:
+    """Drop every cached runtime metric in this process.
+
+    Other processes notice the change through the MetricDefinition version
+    token within METRIC_REGISTRY_CHECK_SECONDS.
+    """
+    with _registries_lock:
+        registries = list(_registries.values())
+    for registry in registries:
+        registry.clear()
+
+
+def _detached_row(row):
+    """Copy a MetricDefinition row so cached metrics never touch a caller's session.
+
+    Cached runtime metrics outlive the session that loaded them; holding the
+    session-bound row would break once that session commits (attributes
+    expire) or closes.
+    """
+    try:
+        state = sa_inspect(row)
+    except NoInspectionAvailable:
+        return row
+    loaded = state.dict
+    return MetricDefinitionModel(**{
+        attr.key: loaded[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key in loaded
+    })
+
+
+def _cached_all_metrics(session: Session) -> list[MetricDefinition]:
+    registry = _session_registry(session)
+    if registry.all_metrics is None or not registry.is_fresh():
+        registry.sync(session)
+    with registry.lock:
+        metrics = registry.all_metrics
+    if metrics is None:
+        metrics = _dedupe_by_key(_load_all_db_metrics(session))
+        with registry.lock:
+            registry.all_metrics = metrics
+            for metric in metrics:
+                registry.by_key.setdefault(metric.key, metric)
+    return list(metrics)
+
+
+def _cached_metric_by_key(session: Session, key: str) -> MetricDefinition | None:
+    registry = _session_registry(session)
+    if registry.is_fresh():
+        metric = registry.by_key.get(key)
+        if metric is not None:
+            return metric
+    registry.sync(session)
+    metric = registry.by_key.get(key)
+    if metric is None:
+        metric = _load_metric_by_key(session, key)
+        if metric is not None:
+            with registry.lock:
+                registry.by_key[key] = metric
+    return metric
+
+
 def get_all_metrics(session: Session | None = None) -> list[MetricDefinition]:
     if session is not None:
-        return _dedupe_by_key(_load_all_db_metrics(session))
+        return _cached_all_metrics(session)
 
+    registry = _metric_registry(engine)
+    if registry.is_fresh() and registry.all_metrics is not None:
+        return list(registry.all_metrics)
     with SessionLocal() as owned:
-        return _dedupe_by_key(_load_all_db_metrics(owned))
+        return _cached_all_metrics(owned)
 
 
 def get_metric(key: str, session: Session | None = None) -> MetricDefinition | None:
     if session is not None:
-        return _load_metric_by_key(session, key)
+        return _cached_metric_by_key(session, key)
 
+    registry = _metric_registry(engine)
+    if registry.is_fresh() and key in registry.by_key:
+        return registry.by_key[key]
     with SessionLocal() as owned:
-        return _load_metric_by_key(owned, key)
+        return _cached_metric_by_key(owned, key)
 
 
 def expand_metric_keys(metric_keys: Iterable[str], session: Session | None = None) -> list[str]:
@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 
 from db.game_status import completed_game_clause
 from db.models import Game, GameLineScore, GamePlayByPlay, PlayerGameStats, ShotRecord, Team, TeamGameStats
+from metrics.fact_snapshot import FACT_SNAPSHOT_INFO_KEY
 from metrics.framework.base import career_season_type_code, is_career_season
 
 
@@ -19,6 +20,14 @@ def _metric_helper_cache(session: Session) -> dict:
     return session.info.setdefault("_metric_helper_cache", {})
 
 
+def _snapshot_rows(session: Session, table_name: str, game_id: str) -> list | None:
+    """Rows from an attached fact snapshot (metrics.fact_snapshot), or None to query the DB."""
+    snapshot = session.info.get(FACT_SNAPSHOT_INFO_KEY)
+    if snapshot is None or not snapshot.covers(game_id):
+        return None
+    return snapshot.rows(table_name, str(game_id))
+
+
 def _game_line_score_rows(session: Session, game_id: str) -> list[GameLineScore]:
     return (
         session.query(GameLineScore)
@@ -47,14 +56,16 @@ def _player_game_stats_by_game(session: Session, game_id: str) -> dict[str, Play
     if cached is not None:
         return cached
 
-    rows = (
-        session.query(PlayerGameStats)
-        .filter(
-            PlayerGameStats.game_id == game_id,
-            PlayerGameStats.player_id.isnot(None),
+    rows = _snapshot_rows(session, "PlayerGameStats", game_id)
+    if rows is None:
+        rows = (
+            session.query(PlayerGameStats)
+            .filter(
+                PlayerGameStats.game_id == game_id,
+                PlayerGameStats.player_id.isnot(None),
+            )
+            .all()
         )
-        .all()
-    )
     result = {str(row.player_id): row for row in rows if row.player_id is not None}
     cache[cache_key] = result
     return result
@@ -87,14 +98,16 @@ def _team_game_stats_by_game(session: Session, game_id: str) -> dict[str, TeamGa
     if cached is not None:
         return cached
 
-    rows = (
-        session.query(TeamGameStats)
-        .filter(
-            TeamGameStats.game_id == game_id,
-            TeamGameStats.team_id.isnot(None),
+    rows = _snapshot_rows(session, "TeamGameStats", game_id)
+    if rows is None:
+        rows = (
+            session.query(TeamGameStats)
+            .filter(
+                TeamGameStats.game_id == game_id,
+                TeamGameStats.team_id.isnot(None),
+            )
+            .all()
         )
-        .all()
-    )
     result = {str(row.team_id): row for row in rows if row.team_id is not None}
     cache[cache_key] = result
     return result
@@ -112,22 +125,26 @@ def _attempted_shots_by_game(session: Session, game_id: str) -> dict[str, list[S
     if cached is not None:
         return cached
 
-    rows = (
-        session.query(ShotRecord)
-        .filter(
-            ShotRecord.game_id == game_id,
-            ShotRecord.player_id.isnot(None),
-            ShotRecord.shot_attempted.is_(True),
-        )
-        .order_by(
-            ShotRecord.player_id.asc(),
-            ShotRecord.period.asc(),
-            ShotRecord.min.desc(),
-            ShotRecord.sec.desc(),
-            ShotRecord.id.asc(),
+    rows = _snapshot_rows(session, "ShotRecord", game_id)
+    if rows is not None:
+        rows = [row for row in rows if row.player_id is not None and row.shot_attempted is True]
+    else:
+        rows = (
+            session.query(ShotRecord)
+            .filter(
+                ShotRecord.game_id == game_id,
+                ShotRecord.player_id.isnot(None),
+                ShotRecord.shot_attempted.is_(True),
+            )
+            .order_by(
+                ShotRecord.player_id.asc(),
+                ShotRecord.period.asc(),
+                ShotRecord.min.desc(),
+                ShotRecord.sec.desc(),
+                ShotRecord.id.asc(),
+            )
+            .all()
         )
-        .all()
-    )
     grouped: dict[str, list[ShotRecord]] = defaultdict(list)
     for row in rows:
         grouped[str(row.player_id)].append(row)
@@ -149,16 +166,18 @@ def game_pbp_rows(session: Session, game_id: str) -> list[GamePlayByPlay]:
     if cached is not None:
         return cached
 
-    rows = (
-        session.query(GamePlayByPlay)
-        .filter(GamePlayByPlay.game_id == game_id)
-        .order_by(
-            GamePlayByPlay.period.asc(),
-            GamePlayByPlay.event_num.asc(),
-            GamePlayByPlay.id.asc(),
+    rows = _snapshot_rows(session, "GamePlayByPlay", game_id)
+    if rows is None:
+        rows = (
+            session.query(GamePlayByPlay)
+            .filter(GamePlayByPlay.game_id == game_id)
+            .order_by(
+                GamePlayByPlay.period.asc(),
+                GamePlayByPlay.event_num.asc(),
+                GamePlayByPlay.id.asc(),
+            )
+            .all()
         )
-        .all()
-    )
     cache[cache_key] = rows
     return rows
 
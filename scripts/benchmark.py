@@ -0,0 +1,530 @@
+"""Benchmarks for the batched/streamed database paths, against a scratch database.
+
+Each subcommand seeds throwaway tables, times the old path against the new one
+and asserts that both produce the same result before printing timings:
+
+    reduce-metric      per-entity vs streaming MetricRunLog fold in
+                       ``metrics.framework.runner.reduce_metric``
+    milestone-batch    per-(metric, season) vs grouped pool seeding in
+                       ``metrics.framework.milestones.detect_batch_incremental``
+    metric-page-ranks  live peer self-join vs stored peer_rank / peer_total on
+                       the player page
+    page-view-writer   synchronous PageView insert per request vs
+                       ``web.page_view_writer.PageViewWriter``
+
+The default in-memory SQLite database has no network round trip, so gaps
+against MySQL in production are larger than what is shown here — the query
+count column is the number to watch.
+
+Usage:
+    .venv/bin/python -m scripts.benchmark reduce-metric --entities 1000 --games 82
+    .venv/bin/python -m scripts.benchmark milestone-batch --metrics 200 --games 15 --nights 60
+    .venv/bin/python -m scripts.benchmark metric-page-ranks --players 2000 --metrics 150 --pages 50
+    .venv/bin/python -m scripts.benchmark page-view-writer --requests 20000 --threads 16
+    .venv/bin/python -m scripts.benchmark reduce-metric --db-url mysql+pymysql://.../scratch_db
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import cycle
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from metrics.framework.runner import _batched
+
+_SEASON = "22025"
+
+
+@contextlib.contextmanager
+def _scratch_tables(engine, tables):
+    for table in tables:
+        table.create(engine, checkfirst=True)
+    try:
+        yield sessionmaker(bind=engine)
+    finally:
+        for table in reversed(tables):
+            table.drop(engine, checkfirst=True)
+
+
+def _time(session_factory, fn, repeat: int) -> tuple[float, int, object]:
+    """Best wall time of ``fn(session)`` over ``repeat`` fresh sessions, its statement count and result."""
+    best = float("inf")
+    statements = 0
+    result = None
+    for _ in range(repeat):
+        with session_factory() as session:
+            count = 0
+
+            def _count(*_args, **_kwargs):
+                nonlocal count
+                count += 1
+
+            connection = session.connection()
+            event.listen(connection, "before_cursor_execute", _count)
+            started = time.perf_counter()
+            result = fn(session)
+            best = min(best, time.perf_counter() - started)
+            event.remove(connection, "before_cursor_execute", _count)
+            statements = count
+    return best, statements, result
+
+
+def _compare(paths: dict[str, tuple[float, int, object]], error: str, *, per: int | None = None) -> int:
+    """Print the timing table for two paths (old first), or report that their results differ."""
+    (old_name, old), (new_name, new) = paths.items()
+    if old[2] != new[2]:
+        print(f"ERROR: {error}", file=sys.stderr)
+        return 1
+    width = max(len(name) for name in paths) + 2
+    per_column = f" {'ms/page':>9}" if per else ""
+    print(f"{'path':<{width}} {'best_s':>9}{per_column} {'queries':>9}")
+    for name, (seconds, statements, _result) in paths.items():
+        per_value = f" {seconds / per * 1000:>9.1f}" if per else ""
+        print(f"{name:<{width}} {seconds:>9.3f}{per_value} {statements:>9d}")
+    if new[0] > 0:
+        print(f"speedup: {old[0] / new[0]:.1f}x")
+    return 0
+
+
+# --- reduce-metric -----------------------------------------------------------
+
+_REDUCE_METRIC_KEY = "bench_reduce_metric"
+
+
+def _seed_run_log(session, entities: int, games: int) -> int:
+    from db.models import MetricRunLog
+
+    rng = random.Random(20251021)
+    now = datetime.utcnow()
+    rows = []
+    for game_index in range(games):
+        game_id = f"00225{game_index:05d}"
+        for entity_index in range(entities):
+            rows.append({
+                "game_id": game_id,
+                "metric_key": _REDUCE_METRIC_KEY,
+                "entity_type": "player",
+                "entity_id": f"{1000000 + entity_index}",
+                "season": _SEASON,
+                "computed_at": now,
+                "produced_result": True,
+                "delta_json": json.dumps({
+                    "games": 1,
+                    "pts": rng.randint(0, 40),
+                    "fga": rng.randint(0, 25),
+                    "last_game_id": game_id,
+                }),
+                "qualified": None,
+            })
+    for batch in _batched(rows):
+        session.execute(MetricRunLog.__table__.insert(), batch)
+    session.commit()
+    return len(rows)
+
+
+def _reduce_metric(args: argparse.Namespace) -> int:
+    from db.models import MetricRunLog
+    from metrics.framework.runner import _iter_entity_totals_per_entity, _iter_entity_totals_streaming
+
+    def _fold(iter_entity_totals):
+        return lambda session: {
+            (entity_type, entity_id): fold.totals
+            for entity_type, entity_id, fold in iter_entity_totals(session, _REDUCE_METRIC_KEY, _SEASON)
+        }
+
+    with _scratch_tables(create_engine(args.db_url), (MetricRunLog.__table__,)) as Session:
+        with Session() as session:
+            seeded = _seed_run_log(session, args.entities, args.games)
+        print(f"seeded {seeded} MetricRunLog rows ({args.entities} entities x {args.games} games)")
+        return _compare(
+            {
+                "per_entity": _time(Session, _fold(_iter_entity_totals_per_entity), args.repeat),
+                "streaming": _time(Session, _fold(_iter_entity_totals_streaming), args.repeat),
+            },
+            "streaming totals differ from per-entity totals",
+        )
+
+
+# --- milestone-batch ---------------------------------------------------------
+
+_MILESTONE_SEASONS = (_SEASON, "all_regular", "last3_regular", "last5_regular", "last10_regular")
+_PLAYER_FIELDS = ("pts", "reb", "ast", "stl", "blk", "fgm", "fga", "fg3m", "fg3a", "ftm", "fta", "min")
+_PLAYER_SPLITS = (None, "wins", "losses", "home", "road", "starter", "bench")
+_TEAM_SPLITS = (None, "wins", "losses", "home", "road")
+_TEAM_FIELDS = ("win", "loss", "pts", "opp_pts", "point_diff", "close_game", "blowout_win", "fg3m")
+
+
+def _seed_season(session, players: int, nights: int, games_per_night: int) -> tuple[date, str]:
+    from db.models import Game, PlayerGameStats, TeamGameStats
+
+    rng = random.Random(20251021)
+    roster = {f"t{team}": [f"{1000000 + p}" for p in range(team, players, 30)] for team in range(30)}
+    teams = list(roster)
+    game_rows, team_rows, player_rows = [], [], []
+    first_night = date(2025, 10, 21)
+    cutoff = None
+    for night in range(nights + 1):
+        game_date = first_night + timedelta(days=night)
+        rng.shuffle(teams)
+        for slot in range(games_per_night):
+            home, road = teams[2 * slot % 30], teams[(2 * slot + 1) % 30]
+            game_id = f"00225{night:03d}{slot:02d}"
+            if night == nights and cutoff is None:
+                cutoff = (game_date, game_id)
+            home_pts, road_pts = rng.randint(85, 135), rng.randint(85, 135)
+            if home_pts == road_pts:
+                home_pts += 1
+            game_rows.append({
+                "game_id": game_id, "season": _SEASON, "game_date": game_date,
+                "home_team_id": home, "road_team_id": road,
+                "home_team_score": home_pts, "road_team_score": road_pts,
+                "wining_team_id": home if home_pts > road_pts else road,
+                "game_status": "completed", "backfill_mismatch": False,
+            })
+            for team_id, pts, opp in ((home, home_pts, road_pts), (road, road_pts, home_pts)):
+                team_rows.append({"game_id": game_id, "team_id": team_id, "pts": pts, "fg_pct": rng.random(),
+                                  "fg3m": rng.randint(5, 20), "win": pts > opp})
+                for index, player_id in enumerate(roster[team_id]):
+                    row = {field: rng.randint(0, 12) for field in _PLAYER_FIELDS if field != "min"}
+                    row.update(game_id=game_id, team_id=team_id, player_id=player_id,
+                               min=rng.randint(0, 40), sec=rng.randint(0, 59), starter=index < 5)
+                    player_rows.append(row)
+    for table, rows in ((Game.__table__, game_rows), (TeamGameStats.__table__, team_rows),
+                        (PlayerGameStats.__table__, player_rows)):
+        for batch in _batched(rows):
+            session.execute(table.insert(), batch)
+    session.commit()
+    return cutoff
+
+
+def _milestone_metrics(count: int) -> list[SimpleNamespace]:
+    shapes = []
+    for split in _PLAYER_SPLITS:
+        shapes += [dict(scope="player", metric_kind="season_total", value_field=f, split_key=split) for f in _PLAYER_FIELDS]
+        shapes += [dict(scope="player", metric_kind="count_threshold", criteria=[(f, 10)], comparator=">=", split_key=split)
+                   for f in ("pts", "reb", "ast")]
+        shapes += [dict(scope="player", metric_kind=kind, split_key=split)
+                   for kind in ("games_played", "double_double", "triple_double")]
+    for split in _TEAM_SPLITS:
+        shapes += [dict(scope="team", metric_kind="count", stat_field=f, split_key=split) for f in _TEAM_FIELDS]
+    rng = random.Random(count)
+    rng.shuffle(shapes)
+    return [
+        SimpleNamespace(key=f"bench_metric_{index}", min_sample=1, **shape)
+        for index, shape in zip(range(count), cycle(shapes))
+    ]
+
+
+def _milestone_batch(args: argparse.Namespace) -> int:
+    from db.models import Game, PlayerGameStats, TeamGameStats
+    from metrics.framework.milestones import aggregate_pool_as_of, aggregate_pools_as_of
+
+    tables = (Game.__table__, PlayerGameStats.__table__, TeamGameStats.__table__)
+    with _scratch_tables(create_engine(args.db_url), tables) as Session:
+        with Session() as session:
+            cutoff_date, cutoff_game_id = _seed_season(session, args.players, args.nights, args.games)
+        metrics = _milestone_metrics(args.metrics)
+        pairs = [(metric, season) for season in _MILESTONE_SEASONS for metric in metrics]
+        print(f"seeded {args.nights} nights + 1 night of {args.games} games; "
+              f"{args.metrics} metrics x {len(_MILESTONE_SEASONS)} seasons = {len(pairs)} pools")
+        return _compare(
+            {
+                "per_pair": _time(
+                    Session,
+                    lambda session: {
+                        (metric.key, season): aggregate_pool_as_of(session, metric, season, cutoff_date, cutoff_game_id)
+                        for metric, season in pairs
+                    },
+                    args.repeat,
+                ),
+                "grouped": _time(
+                    Session,
+                    lambda session: aggregate_pools_as_of(session, pairs, cutoff_date, cutoff_game_id),
+                    args.repeat,
+                ),
+            },
+            "grouped pools differ from per-pair pools",
+        )
+
+
+# --- metric-page-ranks -------------------------------------------------------
+
+_SEASON_BASE = 22025
+
+
+def _rank_metric_defs(count: int) -> dict[str, SimpleNamespace]:
+    return {
+        f"bench_rank_metric_{index}": SimpleNamespace(
+            incremental=True,
+            trigger="game",
+            sub_key_type=None,
+            rank_order="asc" if index % 5 == 0 else "desc",
+        )
+        for index in range(count)
+    }
+
+
+def _seed_metric_results(session, players: int, metric_keys: list[str], seasons: list[str]) -> None:
+    from db.models import MetricResult
+
+    rng = random.Random(20251021)
+    now = datetime.utcnow()
+    rows = []
+    for metric_index, metric_key in enumerate(metric_keys):
+        for season in seasons:
+            for player_index in range(players):
+                rows.append({
+                    "metric_key": metric_key,
+                    "entity_type": "player",
+                    "entity_id": f"{1000000 + player_index}",
+                    "season": season,
+                    "sub_key": "",
+                    "rank_group": "guard" if metric_index % 4 == 0 and player_index % 2 else None,
+                    "value_num": float(rng.randint(0, 400)) / 10,
+                    "computed_at": now,
+                })
+    for batch in _batched(rows):
+        session.execute(MetricResult.__table__.insert(), batch)
+    session.commit()
+
+
+def _entity_rows(session, entity_id: str):
+    from db.models import MetricResult
+
+    return (
+        session.query(MetricResult.id, MetricResult.metric_key, MetricResult.peer_rank, MetricResult.peer_total)
+        .filter(
+            MetricResult.entity_type == "player",
+            MetricResult.entity_id == entity_id,
+            MetricResult.value_num.isnot(None),
+        )
+        .all()
+    )
+
+
+def _metric_page_ranks(args: argparse.Namespace) -> int:
+    from db.models import MetricResult, MetricResultCount
+    from metrics.framework import runner
+    from web.app import _peer_rank_map
+
+    engine = create_engine(args.db_url)
+    metric_defs = _rank_metric_defs(args.metrics)
+    seasons = [str(_SEASON_BASE - offset) for offset in range(args.seasons)]
+    asc_keys = {key for key, metric in metric_defs.items() if metric.rank_order == "asc"}
+    # GET_LOCK is MySQL-only; the scratch run is single-writer anyway.
+    write_lock = (
+        contextlib.nullcontext()
+        if engine.dialect.name == "mysql"
+        else patch.object(runner, "_metric_result_write_lock", lambda _session, _keys: contextlib.nullcontext())
+    )
+
+    def _self_join_pages(session, entity_ids):
+        ranks = {}
+        for entity_id in entity_ids:
+            rows = _entity_rows(session, entity_id)
+            ranks.update(_peer_rank_map(session, {row.id for row in rows}, asc_keys))
+        return ranks
+
+    def _stored_pages(session, entity_ids):
+        ranks = {}
+        for entity_id in entity_ids:
+            ranks.update({row.id: (row.peer_rank, row.peer_total) for row in _entity_rows(session, entity_id)})
+        return ranks
+
+    with _scratch_tables(engine, (MetricResult.__table__, MetricResultCount.__table__)) as Session:
+        with Session() as session, write_lock:
+            _seed_metric_results(session, args.players, list(metric_defs), seasons)
+            started = time.perf_counter()
+            for metric_key, metric in metric_defs.items():
+                for season in seasons:
+                    runner.refresh_metric_pool(session, metric_key, season, metric)
+            session.commit()
+            rank_s = time.perf_counter() - started
+        pools = len(metric_defs) * len(seasons)
+        print(f"seeded {args.players} players x {args.metrics} metrics x {args.seasons} seasons; "
+              f"ranked {pools} pools in {rank_s:.3f}s ({rank_s / pools * 1000:.1f} ms/pool at reduce time)")
+
+        entity_ids = [f"{1000000 + index}" for index in random.Random(7).sample(range(args.players), args.pages)]
+        return _compare(
+            {
+                "self_join": _time(Session, lambda session: _self_join_pages(session, entity_ids), args.repeat),
+                "stored": _time(Session, lambda session: _stored_pages(session, entity_ids), args.repeat),
+            },
+            "stored ranks differ from the live self-join",
+            per=args.pages,
+        )
+
+
+# --- page-view-writer --------------------------------------------------------
+
+
+def _page_view_row(index: int) -> dict:
+    return {
+        "visitor_id": f"bench-visitor-{index % 500}",
+        "path": f"/players/bench-{index % 2000}",
+        "referrer": "",
+        "user_agent": "Mozilla/5.0 (benchmark)",
+        "is_crawler": False,
+        "crawler_name": None,
+        "ip_address": "203.0.113.9",
+        "created_at": datetime.utcnow(),
+    }
+
+
+def _measure_page_views(engine, session_factory, args, make_recorder):
+    """Drive ``args.requests`` requests through a recorder; statements include the COMMITs."""
+    from db.models import PageView
+
+    statements = 0
+    lock = threading.Lock()
+
+    def _count(*_args, **_kwargs):
+        nonlocal statements
+        with lock:
+            statements += 1
+
+    def _request(index: int) -> float:
+        started = time.perf_counter()
+        record(_page_view_row(index))
+        return time.perf_counter() - started
+
+    with engine.begin() as conn:
+        conn.execute(PageView.__table__.delete())
+    event.listen(engine, "before_cursor_execute", _count)
+    event.listen(engine, "commit", _count)
+    try:
+        record, finish = make_recorder()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            latencies = list(pool.map(_request, range(args.requests)))
+        finish()
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+        event.remove(engine, "commit", _count)
+    with session_factory() as session:
+        rows = session.execute(select(func.count()).select_from(PageView)).scalar_one()
+    return latencies, statements, elapsed, rows
+
+
+def _page_view_writer(args: argparse.Namespace) -> int:
+    from db.models import PageView
+    from web.page_view_writer import PageViewWriter
+
+    scratch = None
+    db_url = args.db_url
+    if db_url is None:
+        # The writer's flusher thread needs a database shared across connections.
+        fd, scratch = tempfile.mkstemp(suffix=".db", prefix="funba_page_views_")
+        os.close(fd)
+        db_url = f"sqlite:///{scratch}"
+    engine = create_engine(db_url)
+    try:
+        with _scratch_tables(engine, (PageView.__table__,)) as session_factory:
+            def _sync():
+                def _record(row):
+                    with session_factory() as session:
+                        session.add(PageView(**row))
+                        session.commit()
+                return _record, lambda: None
+
+            def _buffered():
+                writer = PageViewWriter(
+                    session_factory, lambda: PageView, max_queue=args.requests, batch_size=args.batch_size
+                )
+                return writer.submit, lambda: writer.close(timeout=60)
+
+            results = {
+                "sync": _measure_page_views(engine, session_factory, args, _sync),
+                "buffered": _measure_page_views(engine, session_factory, args, _buffered),
+            }
+    finally:
+        engine.dispose()
+        if scratch:
+            os.unlink(scratch)
+    if {rows for *_rest, rows in results.values()} != {args.requests}:
+        print(
+            "ERROR: row counts differ: " + ", ".join(f"{name}={r[3]}" for name, r in results.items()),
+            file=sys.stderr,
+        )
+        return 1
+
+    print(f"{args.requests} requests on {args.threads} threads, batch size {args.batch_size}")
+    print(f"{'path':<10} {'p50_ms':>9} {'p95_ms':>9} {'max_ms':>9} {'db_stmts':>9} {'db stmts/s':>11}")
+    for name, (latencies, statements, elapsed, _rows) in results.items():
+        ordered = sorted(latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        print(
+            f"{name:<10} {statistics.median(ordered) * 1000:>9.3f} {p95 * 1000:>9.3f} "
+            f"{ordered[-1] * 1000:>9.3f} {statements:>9d} {statements / elapsed:>11.0f}"
+        )
+    sync_p50 = statistics.median(results["sync"][0])
+    buffered_p50 = statistics.median(results["buffered"][0])
+    if buffered_p50 > 0:
+        print(f"p50 speedup: {sync_p50 / buffered_p50:.0f}x; "
+              f"statements: {results['sync'][1]} -> {results['buffered'][1]}")
+    return 0
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Time an old database path against its batched replacement.")
+    sub = p.add_subparsers(dest="benchmark", required=True)
+
+    def _add(name: str, run, help_text: str, *, repeat: bool = True, db_url: str | None = "sqlite://"):
+        parser = sub.add_parser(name, help=help_text)
+        parser.set_defaults(run=run)
+        if repeat:
+            parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--db-url",
+            default=db_url,
+            help="Scratch database (tables are created and dropped)"
+            + ("" if db_url else "; default is a temp-file SQLite"),
+        )
+        return parser
+
+    reduce = _add("reduce-metric", _reduce_metric, "per-entity vs streaming reduce over MetricRunLog")
+    reduce.add_argument("--entities", type=int, default=1000)
+    reduce.add_argument("--games", type=int, default=82)
+
+    milestone = _add("milestone-batch", _milestone_batch, "per-pair vs grouped milestone pool seeding")
+    milestone.add_argument("--players", type=int, default=450)
+    milestone.add_argument("--nights", type=int, default=60, help="Game nights already played before the benchmarked night")
+    milestone.add_argument("--games", type=int, default=15, help="Games on the benchmarked night")
+    milestone.add_argument("--metrics", type=int, default=200)
+
+    ranks = _add("metric-page-ranks", _metric_page_ranks, "live peer self-join vs stored peer_rank")
+    ranks.add_argument("--players", type=int, default=1000)
+    ranks.add_argument("--metrics", type=int, default=100)
+    ranks.add_argument("--seasons", type=int, default=3)
+    ranks.add_argument("--pages", type=int, default=20, help="Player pages rendered per timing run")
+
+    views = _add("page-view-writer", _page_view_writer, "per-request PageView insert vs the buffered writer",
+                 repeat=False, db_url=None)
+    views.add_argument("--requests", type=int, default=5000)
+    views.add_argument("--threads", type=int, default=8, help="Concurrent request threads")
+    views.add_argument("--batch-size", type=int, default=200)
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
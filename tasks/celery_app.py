@@ -40,10 +40,13 @@ app.conf.update(
         "tasks.ingest.ingest_recent_games": {"queue": "ingest"},
         "tasks.ingest.sync_schedule_window": {"queue": "ingest"},
         "tasks.metrics.compute_game_delta": {"queue": "metrics"},
+        "tasks.metrics.compute_game_deltas": {"queue": "metrics"},
         "tasks.metrics.sweep_metric_compute_runs": {"queue": "reduce"},
+        "tasks.metrics.reconcile_metric_result_counts": {"queue": "reduce"},
         "tasks.metrics.reduce_metric_compute_run": {"queue": "reduce"},
         "tasks.metrics.reduce_metric_season": {"queue": "reduce"},
         "tasks.metrics.chord_reduce_callback": {"queue": "reduce"},
+        "tasks.metrics.chord_reduce_runs_callback": {"queue": "reduce"},
         "tasks.metrics.reduce_after_ingest": {"queue": "reduce"},
         "tasks.metrics.compute_season_metric": {"queue": "metrics"},
         "tasks.metrics.enqueue_career_metric_family": {"queue": "metrics"},
@@ -81,6 +84,10 @@ app.conf.update(
             "task": "tasks.metrics.sweep_metric_compute_runs",
             "schedule": 120,
         },
+        "reconcile-metric-result-counts": {
+            "task": "tasks.metrics.reconcile_metric_result_counts",
+            "schedule": 60 * 60 * 6,
+        },
         "ensure-recent-content-analysis": {
             "task": "tasks.content.ensure_recent_content_analysis",
             "schedule": 600,
@@ -44,6 +44,7 @@ from db.game_status import (
     completed_game_clause,
     infer_game_status,
 )
+from db.game_artifact_status import clear_metric_flags
 from db.models import Game, MetricComputeRun, MetricRunLog, Team, engine
 from tasks.celery_app import app as celery_app  # noqa: F401 — ensures tasks are registered
 
@@ -124,6 +125,7 @@ def _clear_run_logs(game_ids: list[str], metric_keys: list[str] | None = None) -
     """
     sess = _session()
     try:
+        clear_metric_flags(sess, game_ids, "has_metric_run_logs")
         q = sess.query(MetricRunLog).filter(MetricRunLog.game_id.in_(game_ids))
         if metric_keys is not None:
             q = q.filter(MetricRunLog.metric_key.in_(metric_keys))
@@ -628,7 +630,7 @@ def cmd_backfill(args: argparse.Namespace) -> None:
 
 
 def cmd_metric_backfill(args: argparse.Namespace) -> None:
-    """Enqueue Phase 1 (map) delta tasks via Celery chord.
+    """Enqueue Phase 1 (map) delta tasks via Celery chord, one task per game.
 
     Skips the ingest queue since artifacts should already exist for backfill.
     Use 'backfill' or 'discover' commands first if data is missing.
@@ -637,7 +639,7 @@ def cmd_metric_backfill(args: argparse.Namespace) -> None:
     """
     from celery import chord
 
-    from tasks.metrics import chord_reduce_callback, compute_game_delta, create_metric_compute_run
+    from tasks.metrics import chord_reduce_runs_callback, compute_game_deltas, create_metric_compute_run
     from metrics.framework.runtime import expand_metric_keys, get_all_metrics
 
     if args.metric:
@@ -669,10 +671,10 @@ def cmd_metric_backfill(args: argparse.Namespace) -> None:
         deleted = _clear_run_logs(game_ids, metric_keys)
         print(f"--force: cleared {deleted} run log(s).")
 
-    # Register one MetricComputeRun per concrete metric key, then enqueue
-    # map tasks as a Celery chord with a reduce callback.
-    task_count = 0
-    run_count = 0
+    # Register one MetricComputeRun per concrete metric key, then enqueue one
+    # map task per game covering every registered metric, as a single Celery
+    # chord whose callback promotes all runs to reduce.
+    run_ids: dict[str, str] = {}
     skipped_active: list[str] = []
     for key in metric_keys:
         run, created = create_metric_compute_run(
@@ -685,19 +687,21 @@ def cmd_metric_backfill(args: argparse.Namespace) -> None:
         if not created:
             skipped_active.append(f"{key} ({run.id})")
             continue
-        run_count += 1
+        run_ids[key] = run.id
 
+    task_count = 0
+    if run_ids:
         map_tasks = [
-            compute_game_delta.s(gid, key, run_id=run.id)
+            compute_game_deltas.s(gid, list(run_ids), run_ids=run_ids)
             for gid in game_ids
         ]
-        callback = chord_reduce_callback.s(run_id=run.id)
+        callback = chord_reduce_runs_callback.s(run_ids=list(run_ids.values()))
         chord(map_tasks)(callback)
-        task_count += len(game_ids)
+        task_count = len(map_tasks)
 
     print(
-        f"Enqueued {task_count} delta task(s) as chord(s) → Queue: metrics "
-        f"for {run_count} compute run(s). "
+        f"Enqueued {task_count} per-game delta task(s) as a chord → Queue: metrics "
+        f"for {len(run_ids)} compute run(s). "
         f"Reduce will be triggered automatically by chord callback."
     )
     if skipped_active:
@@ -726,10 +730,12 @@ def cmd_metric_reduce(args: argparse.Namespace) -> None:
         print("No MetricRunLog data found for the given filters.")
         return
 
+    incremental = bool(getattr(args, "incremental", False))
     for metric_key, season in pairs:
-        reduce_metric_season_task.delay(metric_key, season)
+        reduce_metric_season_task.delay(metric_key, season, incremental=incremental)
 
-    print(f"Enqueued {len(pairs)} reduce task(s) → Queue: reduce.")
+    mode = "incremental" if incremental else "full rebuild"
+    print(f"Enqueued {len(pairs)} reduce task(s) ({mode}) → Queue: reduce.")
 
 
 def cmd_metric_retry_failed(args: argparse.Namespace) -> None:
@@ -944,6 +950,8 @@ def main() -> None:
     )
     p_mr.add_argument("--metric", default=None, help="Single metric key, or omit for all.")
     p_mr.add_argument("--season", default=None, help="Season filter, e.g. 22025 or all_regular")
+    p_mr.add_argument("--incremental", action="store_true",
+                      help="Fold only new deltas into stored running totals instead of a full rebuild.")
     p_mr.set_defaults(func=cmd_metric_reduce)
 
     # --- metric-retry-failed ---
@@ -9,6 +9,7 @@ Flow per task:
 from __future__ import annotations
 
 import logging
+import os
 from datetime import date, timedelta
 
 from celery import shared_task
@@ -16,9 +17,9 @@ from sqlalchemy.orm import sessionmaker
 
 from db.backfill_nba_game_detail import (
     fetch_all_period_stats,
-    create_player_period_stats,
     has_game_period_stats,
     is_game_detail_back_filled,
+    store_player_period_stats,
 )
 from db.backfill_nba_game_line_score import back_fill_game_line_score, has_game_line_score
 from db.backfill_nba_game_pbp import is_game_pbp_back_filled
@@ -27,6 +28,16 @@ from db.backfill_nba_player_shot_detail import (
     back_fill_game_shot_record,
     is_game_shot_back_filled,
 )
+from db.nba_fetch import scheduled
+from db.nba_response_cache import refreshing_responses
+from db.data_version import bump_data_versions
+from db.game_artifact_status import (
+    game_artifact_flag,
+    load_game_completeness,
+    mark_game_artifacts,
+    store_game_artifact_status,
+)
+from db.invalidation import GameIngested, publish as publish_invalidation
 from db.game_status import GAME_STATUS_COMPLETED, completed_game_clause, get_game_status, infer_game_status
 from db.models import Game, MetricResult, MetricRunLog, Team, TeamGameStats, engine
 from metrics.framework.runtime import expand_metric_keys, get_all_metrics
@@ -39,19 +50,43 @@ def _session_factory():
     return sessionmaker(bind=engine)
 
 
+def _mark_fact_snapshot_stale(game_id: str, season: str | None) -> None:
+    """Stop map tasks serving a re-stored game from an exported fact snapshot."""
+    root = os.getenv("METRIC_FACT_SNAPSHOT_DIR")
+    if not root:
+        return
+    from metrics.fact_snapshot import mark_fact_snapshot_stale
+
+    try:
+        mark_fact_snapshot_stale(root, season, [game_id])
+    except OSError:
+        logger.warning("could not mark game %s stale in the fact snapshot under %s", game_id, root, exc_info=True)
+
+
+@scheduled("league", attempts=3)
+def _league_game_finder_frame(**params):
+    from nba_api.stats.endpoints import leaguegamefinder
+
+    return leaguegamefinder.LeagueGameFinder(**params).get_data_frames()[0]
+
+
+@scheduled("lookup", attempts=2)
+def _team_roster_frames(team_id: int, season: str):
+    from nba_api.stats.endpoints import commonteamroster
+
+    return commonteamroster.CommonTeamRoster(team_id=team_id, season=season, timeout=20).get_data_frames()
+
+
 def _fetch_api_row(game_id: str) -> dict | None:
     """Fetch one game row from LeagueGameFinder (used to refresh game detail/PBP).
 
     Note: game_id_nullable is ignored by the NBA Stats API (nba_api issue #446),
     so we filter client-side after fetching.
     """
-    from nba_api.stats.endpoints import leaguegamefinder
-
-    finder = leaguegamefinder.LeagueGameFinder(
+    df = _league_game_finder_frame(
         game_id_nullable=game_id,
         league_id_nullable="00",
     )
-    df = finder.get_data_frames()[0]
     if "WL" in df.columns:
         df = df[df["WL"].notna()]
     # Client-side filter since game_id_nullable is ignored by the API
@@ -106,7 +141,11 @@ def _artifacts_available_from_nba_api(season: str | None) -> bool:
 
 
 def _load_game_artifact_status(sess, game_id: str, *, season_hint: str | None = None) -> dict:
-    """Return current ingest completeness for one game."""
+    """Return current ingest completeness for one game.
+
+    Probes every artifact table and records the result in GameArtifactStatus
+    (the caller commits).
+    """
     game = sess.query(Game).filter(Game.game_id == game_id).first()
     season = season_hint or (game.season if game is not None else None)
     artifacts_supported = _artifacts_available_from_nba_api(season)
@@ -119,7 +158,7 @@ def _load_game_artifact_status(sess, game_id: str, *, season_hint: str | None =
         has_line = has_game_line_score(sess, game_id)
         has_period = True if not artifacts_supported else has_game_period_stats(sess, game_id)
 
-    return {
+    status = {
         "game_id": game_id,
         "season": season,
         "exists_game": game is not None,
@@ -132,6 +171,9 @@ def _load_game_artifact_status(sess, game_id: str, *, season_hint: str | None =
         "has_period": has_period,
         "complete": bool(game is not None and has_detail and has_pbp and has_shot and has_line and has_period),
     }
+    if game is not None:
+        store_game_artifact_status(sess, status, game_date=game.game_date)
+    return status
 
 
 def _missing_artifacts(status: dict) -> list[str]:
@@ -151,6 +193,8 @@ def _missing_artifacts(status: dict) -> list[str]:
 
 
 def _has_entity_metric_run_logs(sess, game_id: str) -> bool:
+    if game_artifact_flag(sess, game_id, "has_metric_run_logs"):
+        return True
     return (
         sess.query(MetricRunLog.game_id)
         .filter(
@@ -162,6 +206,8 @@ def _has_entity_metric_run_logs(sess, game_id: str) -> bool:
 
 
 def _has_metric_results(sess, game_id: str) -> bool:
+    if game_artifact_flag(sess, game_id, "has_metric_results"):
+        return True
     return (
         sess.query(MetricResult.game_id)
         .filter(
@@ -188,13 +234,22 @@ def _metric_refresh_reason_for_game(
 
 
 def _list_incomplete_game_ids(game_ids: list[str]) -> list[str]:
+    """Games not yet complete, read from GameArtifactStatus.
+
+    Only games without a ledger row are probed table by table (which also
+    creates their row), so the beat scan stays one lookup per run.
+    """
     SessionLocal = _session_factory()
     with SessionLocal() as sess:
-        return [
-            gid
-            for gid in sorted(set(game_ids))
-            if not _load_game_artifact_status(sess, gid).get("complete")
-        ]
+        known = load_game_completeness(sess, game_ids)
+        incomplete = []
+        for gid in sorted(set(game_ids)):
+            complete = known[gid] if gid in known else _load_game_artifact_status(sess, gid).get("complete")
+            if not complete:
+                incomplete.append(gid)
+        if len(known) < len(set(game_ids)):
+            sess.commit()
+        return incomplete
 
 
 @shared_task(
@@ -215,7 +270,13 @@ def ingest_game(self, game_id: str, metric_keys: list[str] | None = None, force:
     Handles both new games (not yet in DB) and existing games with missing data.
     Retries are explicit (no autoretry_for) so fan-out only happens after all
     ingestion steps succeed — preventing duplicate metric tasks on retry.
+    ``force`` also refetches from stats.nba.com instead of the raw response cache.
     """
+    with refreshing_responses(force):
+        return _ingest_game(self, game_id, metric_keys, force)
+
+
+def _ingest_game(task, game_id: str, metric_keys: list[str] | None, force: bool) -> dict:
     SessionLocal = _session_factory()
 
     try:
@@ -229,6 +290,7 @@ def ingest_game(self, game_id: str, metric_keys: list[str] | None = None, force:
             has_pbp = status_before["has_pbp"]
             has_shot = status_before["has_shot"]
             existing_game_row = _build_existing_game_row(sess, game_id) if game_exists else None
+            sess.commit()
 
         if game_exists and game_status != GAME_STATUS_COMPLETED and not force:
             logger.info("ingest_game %s: skipping %s game already stored in DB.", game_id, game_status or "non-completed")
@@ -271,6 +333,15 @@ def ingest_game(self, game_id: str, metric_keys: list[str] | None = None, force:
                 raise RuntimeError(f"No API data for game {game_id}")
             with SessionLocal() as sess:
                 process_and_store_game(sess, row)
+                mark_game_artifacts(
+                    sess,
+                    [game_id],
+                    has_detail=is_game_detail_back_filled(game_id, sess),
+                    has_pbp=True if not artifacts_supported else is_game_pbp_back_filled(game_id, sess),
+                )
+                sess.commit()
+            if game_exists:
+                _mark_fact_snapshot_stale(game_id, status_before.get("season"))
 
         # Which artifacts block metrics is controlled by runtime flags
         # (configurable in admin settings). Non-blocking artifacts are
@@ -281,8 +352,11 @@ def ingest_game(self, game_id: str, metric_keys: list[str] | None = None, force:
         if shot_blocks and needs_shot:
             logger.info("ingest_game %s: backfilling shot records (blocking mode) …", game_id)
             with SessionLocal() as sess:
-                back_fill_game_shot_record(sess, game_id, False)
+                shot_complete = back_fill_game_shot_record(sess, game_id, False)
+                mark_game_artifacts(sess, [game_id], has_shot=shot_complete)
                 sess.commit()
+            if game_exists:
+                _mark_fact_snapshot_stale(game_id, status_before.get("season"))
             needs_shot = False  # already done
 
         if period_blocks:
@@ -290,9 +364,8 @@ def ingest_game(self, game_id: str, metric_keys: list[str] | None = None, force:
                 if not has_game_period_stats(sess, game_id):
                     logger.info("ingest_game %s: backfilling period stats (blocking mode) …", game_id)
                     period_data = fetch_all_period_stats(game_id)
-                    for period, period_rows in period_data.items():
-                        for ps in period_rows:
-                            create_player_period_stats(sess, game_id, period, ps)
+                    store_player_period_stats(sess, game_id, period_data)
+                    mark_game_artifacts(sess, [game_id], has_period=has_game_period_stats(sess, game_id))
                     sess.commit()
 
         non_blocking = set()
@@ -304,6 +377,7 @@ def ingest_game(self, game_id: str, metric_keys: list[str] | None = None, force:
             non_blocking.add("period_stats")
         with SessionLocal() as sess:
             status_after = _load_game_artifact_status(sess, game_id)
+            sess.commit()
         missing_core = [
             a for a in _missing_artifacts(status_after) if a not in non_blocking
         ]
@@ -342,10 +416,10 @@ def ingest_game(self, game_id: str, metric_keys: list[str] | None = None, force:
 
     except Exception as exc:
         # Explicit retry with exponential backoff — fan-out has NOT happened yet
-        wait = 30 * (3 ** self.request.retries)  # 30s, 90s, 270s
+        wait = 30 * (3 ** task.request.retries)  # 30s, 90s, 270s
         logger.warning("ingest_game %s: failed (attempt %d): %s — retrying in %ds",
-                       game_id, self.request.retries + 1, exc, wait)
-        raise self.retry(exc=exc, countdown=wait)
+                       game_id, task.request.retries + 1, exc, wait)
+        raise task.retry(exc=exc, countdown=wait)
 
     line_score_rows = 0
     if metric_keys is None:
@@ -354,7 +428,9 @@ def ingest_game(self, game_id: str, metric_keys: list[str] | None = None, force:
         if not has_line:
             try:
                 with SessionLocal() as sess:
-                    line_score_rows = back_fill_game_line_score(sess, game_id, commit=True)
+                    line_score_rows = back_fill_game_line_score(sess, game_id, commit=False)
+                    mark_game_artifacts(sess, [game_id], has_line=has_game_line_score(sess, game_id))
+                    sess.commit()
                 logger.info(
                     "ingest_game %s: ensured line score inline (%d rows).",
                     game_id,
@@ -371,7 +447,7 @@ def ingest_game(self, game_id: str, metric_keys: list[str] | None = None, force:
     # deprecated per-game metric pipeline. Current production metrics are
     # season-triggered, so this path is off by default.
     from celery import chord
-    from tasks.metrics import compute_game_delta, reduce_after_ingest  # local import avoids circular at module load
+    from tasks.metrics import compute_game_deltas, reduce_after_ingest  # local import avoids circular at module load
 
     legacy_game_metric_fanout = get_runtime_flag("legacy_game_metric_fanout")
     keys_to_run = []
@@ -382,8 +458,7 @@ def ingest_game(self, game_id: str, metric_keys: list[str] | None = None, force:
             else [m.key for m in get_all_metrics() if getattr(m, "trigger", "game") != "season"]
         )
     if keys_to_run:
-        map_tasks = [compute_game_delta.s(game_id, key) for key in keys_to_run]
-        chord(map_tasks)(reduce_after_ingest.s(game_id=game_id))
+        chord([compute_game_deltas.s(game_id, keys_to_run)])(reduce_after_ingest.s(game_id=game_id))
     elif metric_keys is not None and not legacy_game_metric_fanout:
         logger.info(
             "ingest_game %s: legacy game metric fan-out disabled; skipped explicit metric_keys=%s",
@@ -433,9 +508,8 @@ def ingest_game(self, game_id: str, metric_keys: list[str] | None = None, force:
             logger.info("ingest_game %s: backfilling period stats …", game_id)
             with SessionLocal() as sess:
                 period_data = fetch_all_period_stats(game_id)
-                for period, period_rows in period_data.items():
-                    for ps in period_rows:
-                        create_player_period_stats(sess, game_id, period, ps)
+                store_player_period_stats(sess, game_id, period_data)
+                mark_game_artifacts(sess, [game_id], has_period=has_game_period_stats(sess, game_id))
                 sess.commit()
                 if period_data:
                     logger.info("ingest_game %s: stored period stats for %d periods.", game_id, len(period_data))
@@ -450,8 +524,11 @@ def ingest_game(self, game_id: str, metric_keys: list[str] | None = None, force:
         try:
             logger.info("ingest_game %s: backfilling shot records (post-metric) …", game_id)
             with SessionLocal() as sess:
-                back_fill_game_shot_record(sess, game_id, False)
+                shot_complete = back_fill_game_shot_record(sess, game_id, False)
+                mark_game_artifacts(sess, [game_id], has_shot=shot_complete)
                 sess.commit()
+            if game_exists:
+                _mark_fact_snapshot_stale(game_id, status_before.get("season"))
             shot_refreshed = True
         except Exception as exc:
             logger.warning(
@@ -461,6 +538,8 @@ def ingest_game(self, game_id: str, metric_keys: list[str] | None = None, force:
             )
     result["shot_refreshed"] = shot_refreshed
 
+    bump_data_versions("games")
+    publish_invalidation(GameIngested(game_id=game_id))
     logger.info(
         "ingest_game %s: done (new_game=%s, needed_detail_pbp_refresh=%s, shot_refreshed=%s, line_score_rows=%d, legacy_game_metric_fanout=%s) → %d metric tasks enqueued.",
         game_id, not game_exists, needed_detail_pbp_refresh, shot_refreshed, line_score_rows, legacy_game_metric_fanout, len(keys_to_run),
@@ -475,19 +554,16 @@ def _recent_target_dates(lookback_days: int) -> list[date]:
 
 def _discover_game_ids_for_date(target_date: date) -> list[str]:
     """Discover game IDs from NBA API for a given date (finds newly finished games)."""
-    from nba_api.stats.endpoints import leaguegamefinder
-
     date_str = target_date.strftime("%m/%d/%Y")
     game_ids: set[str] = set()
     for season_type in ("Regular Season", "Playoffs", "PlayIn"):
         try:
-            finder = leaguegamefinder.LeagueGameFinder(
+            df = _league_game_finder_frame(
                 date_from_nullable=date_str,
                 date_to_nullable=date_str,
                 season_type_nullable=season_type,
                 league_id_nullable="00",
             )
-            df = finder.get_data_frames()[0]
             if "WL" in df.columns:
                 df = df[df["WL"].notna()]
             for gid in df["GAME_ID"].astype(str).unique():
@@ -644,6 +720,7 @@ def sync_schedule_window(
     except Exception as exc:
         logger.warning("sync_schedule_window: slug sweep failed: %s", exc, exc_info=True)
 
+    bump_data_versions("games")
     logger.info(
         "sync_schedule_window: synced %d game(s) for %s -> %s, live_patched=%d, slug_patched=%d",
         len(game_ids),
@@ -950,14 +1027,12 @@ def sync_current_team_rosters(self) -> dict:
     """
     import os
     import sys
-    import time as _time
     from datetime import date as _date, datetime as _datetime, timedelta as _timedelta
 
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     if project_root not in sys.path:
         sys.path.insert(0, project_root)
 
-    from nba_api.stats.endpoints import commonteamroster
     from sqlalchemy import text
 
     today = _date.today()
@@ -985,17 +1060,13 @@ def sync_current_team_rosters(self) -> dict:
             except (TypeError, ValueError):
                 continue
             try:
-                r = commonteamroster.CommonTeamRoster(
-                    team_id=tid_int, season=season_str, timeout=20
-                )
-                dfs = r.get_data_frames()
+                dfs = _team_roster_frames(tid_int, season_str)
                 players_df = dfs[0] if len(dfs) > 0 else None
                 coaches_df = dfs[1] if len(dfs) > 1 else None
             except Exception as exc:
                 api_failures += 1
                 logger.warning("sync_current_team_rosters: %s %s failed: %s",
                                team_id, season_str, exc)
-                _time.sleep(0.6)
                 continue
 
             # ── Players ──────────────────────────────────────────────
@@ -1117,7 +1188,6 @@ def sync_current_team_rosters(self) -> dict:
                 inserted_coach += 1
 
             session.commit()
-            _time.sleep(0.6)
 
     result = {
         "season": season_str,
@@ -1127,6 +1197,7 @@ def sync_current_team_rosters(self) -> dict:
         "closed_coach": closed_coach,
         "api_failures": api_failures,
     }
+    bump_data_versions("players", "teams")
     logger.info("sync_current_team_rosters: %s", result)
     return result
 
@@ -1209,7 +1280,9 @@ def refresh_active_contracts(self) -> dict:
     sitemap. Returns counts (sitemap_urls, ok, errors, unmatched, duration).
     """
     from db.refresh_active_contracts import run as run_refresh
-    return run_refresh()
+    result = run_refresh()
+    bump_data_versions("players")
+    return result
 
 
 @shared_task(
@@ -1228,4 +1301,5 @@ def refresh_recent_transactions(self) -> dict:
     season_end = now.year if now.month <= 7 else now.year + 1
     # previous + current covers the rolling boundary at season change
     run_scrape(season_end - 1, season_end)
+    bump_data_versions("players", "teams")
     return {"scraped_years": [season_end - 1, season_end]}
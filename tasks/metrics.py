@@ -1,7 +1,9 @@
 """Celery tasks for metric computation.
 
 Two-phase MapReduce pipeline:
-  Phase 1 (metrics queue): compute_game_delta — compute delta, write MetricRunLog only.
+  Phase 1 (metrics queue): compute_game_deltas — compute deltas for all metrics of one
+                           game, write MetricRunLog only (compute_game_delta is the
+                           single-metric form).
   Phase 2 (reduce queue):  reduce_metric_season / reduce_metric_compute_run — aggregate deltas, write MetricResult.
 
 Completion detection:
@@ -28,10 +30,21 @@ from sqlalchemy import and_, func, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import OperationalError as SAOperationalError
 
+from db.data_version import bump_data_versions
 from db.game_status import completed_game_clause
+from db.invalidation import MetricReduced, publish as publish_invalidation
 from db.models import Game, MetricComputeRun, MetricResult, MetricRunLog, engine
 from metrics.framework.base import is_career_season
-from metrics.framework.runner import run_delta_only, reduce_metric, run_season_metric
+from metrics.framework.family import family_base_key
+from metrics.framework.runtime import get_metric
+from metrics.framework.runner import (
+    reconcile_result_counts,
+    reduce_metric,
+    reduce_metric_incremental,
+    run_delta_only,
+    run_deltas_for_game,
+    run_season_metric,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -144,6 +157,35 @@ class AdvisoryLockUnavailable(RuntimeError):
 _SessionLocal = sessionmaker(bind=engine)
 
 
+def _announce_metric_results(metric_key: str, seasons) -> None:
+    """Tell web caches that (metric_key, season) pools were rewritten.
+
+    Bumps the page-cache data versions (db.data_version) and publishes one
+    MetricReduced event per season on the invalidation bus.
+    """
+    bump_data_versions("metrics", f"metric:{family_base_key(metric_key)}")
+    for season in seasons:
+        publish_invalidation(MetricReduced(metric_key=metric_key, season=season))
+
+
+def _announce_map_results(session, game_id: str, produced: dict[str, bool]) -> None:
+    """Announce the metrics whose map phase upserted MetricResult directly.
+
+    Non-incremental (game-scope, rank-based) metrics have no reduce step, so
+    their pages would otherwise keep serving the pre-ingest render.
+    """
+    metric_keys = [
+        key
+        for key, wrote in produced.items()
+        if wrote and (metric_def := get_metric(key, session=session)) is not None and not metric_def.incremental
+    ]
+    if not metric_keys:
+        return
+    season = session.query(Game.season).filter(Game.game_id == game_id).scalar()
+    for metric_key in metric_keys:
+        _announce_metric_results(metric_key, [season] if season else [])
+
+
 def _session_factory():
     return _SessionLocal
 
@@ -330,6 +372,30 @@ def _is_already_computed(session, game_id: str, metric_key: str) -> bool:
     ) is not None
 
 
+def _already_computed_metric_keys(session, game_id: str, metric_keys: list[str]) -> set[str]:
+    """Metric keys that already have MetricRunLog rows for this game (one query)."""
+    if not metric_keys:
+        return set()
+    return {
+        row.metric_key
+        for row in session.query(MetricRunLog.metric_key)
+        .filter(MetricRunLog.game_id == game_id, MetricRunLog.metric_key.in_(metric_keys))
+        .distinct()
+        .all()
+    }
+
+
+def _flatten_map_results(results) -> list:
+    """Chord results hold one dict per compute_game_delta or one list per compute_game_deltas."""
+    flat: list = []
+    for r in (results or []):
+        if isinstance(r, list):
+            flat.extend(r)
+        else:
+            flat.append(r)
+    return flat
+
+
 def _metric_seasons(session, metric_key: str) -> list[str]:
     return [
         r.season
@@ -537,6 +603,7 @@ def compute_game_delta(self, game_id: str, metric_key: str, run_id: str | None =
     try:
         with SessionLocal() as session:
             produced = run_delta_only(session, game_id, metric_key, commit=True)
+            _announce_map_results(session, game_id, {metric_key: produced})
     except Exception as exc:
         logger.error(
             "compute_game_delta: game=%s metric=%s failed: %s",
@@ -562,6 +629,71 @@ def compute_game_delta(self, game_id: str, metric_key: str, run_id: str | None =
     }
 
 
+@shared_task(
+    bind=True,
+    name="tasks.metrics.compute_game_deltas",
+    max_retries=3,
+    default_retry_delay=10,
+    queue="metrics",
+    ignore_result=False,
+)
+def compute_game_deltas(
+    self,
+    game_id: str,
+    metric_keys: list[str],
+    run_ids: dict[str, str] | None = None,
+) -> list[dict]:
+    """Phase 1 for one game and many metrics: one task, one session, one bulk flush.
+
+    Same idempotency as compute_game_delta, checked for all metric keys in a
+    single MetricRunLog query. ``run_ids`` maps metric_key → MetricComputeRun id
+    for chord backfills; each run's done counter is bumped when its metric
+    produced output. Returns one result dict per metric key, in the shape
+    compute_game_delta returns.
+    """
+    SessionLocal = _session_factory()
+    metric_keys = list(dict.fromkeys(metric_keys))
+
+    with SessionLocal() as session:
+        already_computed = _already_computed_metric_keys(session, game_id, metric_keys)
+    pending = [key for key in metric_keys if key not in already_computed]
+
+    produced: dict[str, bool] = {}
+    if pending:
+        try:
+            with SessionLocal() as session:
+                produced = run_deltas_for_game(session, game_id, pending, commit=True)
+                _announce_map_results(session, game_id, produced)
+        except Exception as exc:
+            logger.error(
+                "compute_game_deltas: game=%s metrics=%d failed: %s",
+                game_id, len(pending), exc, exc_info=True,
+            )
+            raise self.retry(exc=exc, countdown=10)
+
+    produced_run_ids = [
+        run_ids[key]
+        for key in pending
+        if produced.get(key) and run_ids and key in run_ids
+    ]
+    if produced_run_ids:
+        with SessionLocal() as session:
+            session.query(MetricComputeRun).filter(
+                MetricComputeRun.id.in_(produced_run_ids),
+            ).update(
+                {"done_game_count": MetricComputeRun.done_game_count + 1},
+                synchronize_session=False,
+            )
+            session.commit()
+
+    return [
+        {"game_id": game_id, "metric_key": key, "skipped": True, "reason": "already_computed"}
+        if key in already_computed
+        else {"game_id": game_id, "metric_key": key, "produced": bool(produced.get(key))}
+        for key in metric_keys
+    ]
+
+
 _CHORD_FALLBACK_SECONDS = 7200  # 2 hours — sweep promotes stuck mapping runs
 
 
@@ -575,6 +707,23 @@ _CHORD_FALLBACK_SECONDS = 7200  # 2 hours — sweep promotes stuck mapping runs
 )
 def chord_reduce_callback(self, results: list, run_id: str) -> dict:
     """Chord callback: all map tasks finished. Promote run and trigger reduce."""
+    return _promote_run_and_enqueue_reduce(run_id)
+
+
+@shared_task(
+    bind=True,
+    name="tasks.metrics.chord_reduce_runs_callback",
+    max_retries=2,
+    default_retry_delay=30,
+    queue="reduce",
+    ignore_result=True,
+)
+def chord_reduce_runs_callback(self, results: list, run_ids: list[str]) -> dict:
+    """Chord callback for a multi-metric backfill: promote every run and trigger reduce."""
+    return {"runs": [_promote_run_and_enqueue_reduce(run_id) for run_id in run_ids]}
+
+
+def _promote_run_and_enqueue_reduce(run_id: str) -> dict:
     SessionLocal = _session_factory()
 
     with SessionLocal() as session:
@@ -749,6 +898,7 @@ def reduce_metric_compute_run_task(self, run_id: str) -> dict:
 
             with SessionLocked() as session:
                 _mark_run_complete(session, run_id)
+        _announce_metric_results(metric_key, seasons)
     except AdvisoryLockUnavailable as exc:
         logger.info(
             "reduce_metric_compute_run: run_id=%s metric=%s waiting for reduce lock",
@@ -785,8 +935,9 @@ def reduce_after_ingest(self, results: list, game_id: str) -> dict:
     """Chord callback after all metric deltas for one ingested game complete.
 
     Collects the (metric_key, season) pairs that produced data, deduplicates,
-    and dispatches one reduce_metric_season per unique pair. Also updates
-    target_game_count on complete MetricComputeRuns.
+    and dispatches one incremental reduce_metric_season per unique pair, so
+    only this game's deltas are folded into the MetricRunningTotal checkpoints.
+    Also updates target_game_count on complete MetricComputeRuns.
     """
     from db.models import Game
     SessionLocal = _session_factory()
@@ -799,13 +950,13 @@ def reduce_after_ingest(self, results: list, game_id: str) -> dict:
 
     # Collect metric keys that produced data
     metric_keys = set()
-    for r in (results or []):
+    for r in _flatten_map_results(results):
         if isinstance(r, dict) and r.get("produced") and not r.get("skipped"):
             metric_keys.add(r["metric_key"])
 
     enqueued = 0
     for key in metric_keys:
-        reduce_metric_season_task.delay(key, season)
+        reduce_metric_season_task.delay(key, season, incremental=True)
         enqueued += 1
 
     # Update target_game_count on complete runs so progress stays at 100%
@@ -842,6 +993,7 @@ def compute_season_metric_task(self, metric_key: str, season: str, run_id: str |
         with _reduce_locked_session_factory(lock_name, timeout_seconds=0) as SessionLocked:
             with SessionLocked() as session:
                 count = run_season_metric(session, metric_key, season, commit=True)
+        _announce_metric_results(metric_key, [season])
     except AdvisoryLockUnavailable:
         logger.info(
             "compute_season_metric: metric=%s season=%s already running; skipping duplicate dispatch",
@@ -1152,13 +1304,19 @@ def milestone_detection_complete_task(
     default_retry_delay=30,
     queue="reduce",
 )
-def reduce_metric_season_task(self, metric_key: str, season: str) -> dict:
-    """Phase 2: aggregate all deltas for (metric_key, season) → write MetricResults."""
+def reduce_metric_season_task(self, metric_key: str, season: str, incremental: bool = False) -> dict:
+    """Phase 2: aggregate all deltas for (metric_key, season) → write MetricResults.
+
+    ``incremental=True`` folds only deltas mapped since the last reduce into the
+    stored running totals; the default is a full rebuild.
+    """
+    reduce_fn = reduce_metric_incremental if incremental else reduce_metric
     try:
         lock_name = _reduce_lock_name(metric_key)
         with _reduce_locked_session_factory(lock_name, timeout_seconds=0) as SessionLocked:
             with SessionLocked() as session:
-                count = reduce_metric(session, metric_key, season, commit=True)
+                count = reduce_fn(session, metric_key, season, commit=True)
+        _announce_metric_results(metric_key, [season])
     except AdvisoryLockUnavailable as exc:
         logger.info(
             "reduce_metric_season: metric=%s season=%s waiting for reduce lock",
@@ -1175,10 +1333,38 @@ def reduce_metric_season_task(self, metric_key: str, season: str) -> dict:
     return {
         "metric_key": metric_key,
         "season": season,
+        "incremental": incremental,
         "results_written": count,
     }
 
 
+@shared_task(
+    bind=True,
+    name="tasks.metrics.reconcile_metric_result_counts",
+    max_retries=1,
+    default_retry_delay=60,
+    queue="reduce",
+)
+def reconcile_metric_result_counts_task(self) -> dict:
+    """Rebuild the MetricResultCount summary behind the /metrics catalog badges.
+
+    The runner updates counts as it writes; this periodic pass catches rows
+    changed outside it (manual deletes, migrations, failed writers).
+    """
+    try:
+        with _session_factory()() as session:
+            summary = reconcile_result_counts(session)
+            session.commit()
+    except Exception as exc:
+        logger.error("reconcile_metric_result_counts failed: %s", exc, exc_info=True)
+        raise self.retry(exc=exc, countdown=60)
+    logger.info(
+        "reconcile_metric_result_counts: %d pools, %d updated, %d removed.",
+        summary["pools"], summary["updated"], summary["removed"],
+    )
+    return summary
+
+
 @shared_task(
     bind=True,
     name="tasks.metrics.refresh_current_season_metrics",
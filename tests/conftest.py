@@ -0,0 +1,19 @@
+import pytest
+
+from tests.db_model_stubs import use_real_db_models
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "real_db_models(model_names, modules=None, reload=()): bind the real db.models into the test module "
+        "for each test (see tests.db_model_stubs.use_real_db_models)",
+    )
+
+
+@pytest.fixture(autouse=True)
+def _real_db_models(request, monkeypatch):
+    """Load the real models for modules marked ``pytestmark = pytest.mark.real_db_models(...)``."""
+    marker = request.node.get_closest_marker("real_db_models")
+    if marker is not None:
+        use_real_db_models(monkeypatch, request.module.__dict__, *marker.args, **marker.kwargs)
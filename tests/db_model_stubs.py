@@ -10,6 +10,7 @@ WEB_APP_DB_MODEL_NAMES = (
     "Award",
     "Feedback",
     "Game",
+    "GameArtifactStatus",
     "GameContentAnalysisIssue",
     "GameContentAnalysisIssuePost",
     "GameLineScore",
@@ -70,3 +71,37 @@ def install_fake_db_module(
     sys.modules["db"] = fake_db
 
     return fake_models
+
+
+def use_real_db_models(monkeypatch, namespace: dict, model_names=(), modules=None, reload=()):
+    """Bind the real ``db.models`` into a test module's ``namespace`` for one test.
+
+    ``install_fake_db_module`` leaves stubs in sys.modules for the rest of a
+    full ``pytest tests/`` run, so sqlite-backed tests cannot import models at
+    module top. This drops the stubs, re-imports ``modules`` ({global name:
+    dotted module}) against the real models, and binds them together with
+    ``model_names``. ``reload`` names packages whose modules must be imported
+    afresh too: dependencies that bind models at import, or that another
+    test module replaced with fakes. monkeypatch restores sys.modules after
+    the test. Test modules opt in with ``pytestmark =
+    pytest.mark.real_db_models(model_names, modules, reload=...)``, which the
+    autouse fixture in tests/conftest.py turns into this call.
+    """
+    import importlib
+
+    modules = modules or {}
+    importlib.import_module("db")
+    reloaded = [name for name in sys.modules if any(name == r or name.startswith(f"{r}.") for r in reload)]
+    for dotted in ("db.models", *reloaded, *modules.values()):
+        parent_name, _, child = dotted.rpartition(".")
+        parent = sys.modules.get(parent_name)
+        if parent is not None:
+            monkeypatch.setattr(parent, child, getattr(parent, child, None), raising=False)
+        monkeypatch.delitem(sys.modules, dotted, raising=False)
+
+    models = importlib.import_module("db.models")
+    for name in model_names:
+        monkeypatch.setitem(namespace, name, getattr(models, name))
+    for name, dotted in modules.items():
+        monkeypatch.setitem(namespace, name, importlib.import_module(dotted))
+    return models
@@ -0,0 +1,160 @@
+"""Offline stand-in for nba_api's live endpoints.
+
+``FakeLiveNBA`` holds a small mutable slate of games and, inside
+``install()``, answers ``ScoreBoard()``, ``BoxScore(game_id)`` and
+``PlayByPlay(game_id)`` from it with payloads shaped like cdn.nba.com's
+live JSON. ``calls`` counts upstream requests per endpoint, so tests can
+assert how often the site would have hit nba_api.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import types
+from collections import Counter
+from contextlib import contextmanager
+from unittest.mock import patch
+
+
+class FakeLiveNBA:
+    def __init__(self):
+        self.games: dict[str, dict] = {}
+        self.actions: dict[str, list[dict]] = {}
+        self.calls: Counter = Counter()
+        self.delay = 0.0
+        self._lock = threading.Lock()
+
+    def add_game(
+        self,
+        game_id: str,
+        *,
+        status: int = 2,
+        period: int = 3,
+        clock: str = "PT04M22.00S",
+        home_team_id: str = "1610612738",
+        road_team_id: str = "1610612747",
+        home_score: int = 0,
+        road_score: int = 0,
+    ) -> None:
+        self.games[game_id] = {
+            "status": status,
+            "period": period,
+            "clock": clock,
+            "home_team_id": home_team_id,
+            "road_team_id": road_team_id,
+            "home_score": home_score,
+            "road_score": road_score,
+        }
+        self.actions.setdefault(game_id, [])
+
+    def update(self, game_id: str, **fields) -> None:
+        self.games[game_id].update(fields)
+
+    def add_action(self, game_id: str, **action) -> dict:
+        actions = self.actions.setdefault(game_id, [])
+        action.setdefault("actionNumber", len(actions) + 1)
+        actions.append(action)
+        return action
+
+    # -- payloads ----------------------------------------------------------
+
+    def _record(self, endpoint: str) -> None:
+        with self._lock:
+            self.calls[endpoint] += 1
+        if self.delay:
+            time.sleep(self.delay)
+
+    def _status_text(self, game: dict) -> str:
+        if game["status"] >= 3:
+            return "Final"
+        if game["status"] == 2:
+            return f"Q{game['period']}"
+        return "7:30 pm ET"
+
+    def _team(self, team_id: str, score: int, *, box: bool) -> dict:
+        team = {"teamId": int(team_id), "score": score}
+        if box:
+            team["statistics"] = {
+                "reboundsTotal": 30,
+                "assists": 20,
+                "fieldGoalsPercentage": 0.5,
+                "threePointersPercentage": 0.35,
+                "freeThrowsPercentage": 0.8,
+            }
+            team["players"] = [{
+                "personId": int(team_id[-4:]),
+                "nameI": f"Player {team_id[-4:]}",
+                "played": "1",
+                "starter": "1",
+                "statistics": {"points": score, "reboundsTotal": 8, "assists": 5, "minutes": "PT30M00.00S"},
+            }]
+            team["periods"] = [{"period": 1, "score": score}]
+        return team
+
+    def scoreboard_payload(self) -> dict:
+        return {"scoreboard": {"games": [self._game_payload(game_id, box=False) for game_id in self.games]}}
+
+    def boxscore_payload(self, game_id: str) -> dict:
+        if game_id not in self.games:
+            raise ValueError(f"unknown game {game_id}")
+        return {"game": self._game_payload(game_id, box=True)}
+
+    def playbyplay_payload(self, game_id: str) -> dict:
+        if game_id not in self.games:
+            raise ValueError(f"unknown game {game_id}")
+        return {"game": {"gameId": game_id, "actions": [dict(action) for action in self.actions[game_id]]}}
+
+    def _game_payload(self, game_id: str, *, box: bool) -> dict:
+        game = self.games[game_id]
+        return {
+            "gameId": game_id,
+            "gameStatus": game["status"],
+            "gameStatusText": self._status_text(game),
+            "period": game["period"],
+            "gameClock": game["clock"],
+            "gameEt": "2026-03-01T19:30:00Z",
+            "gameTimeUTC": "2026-03-02T00:30:00Z",
+            "homeTeam": self._team(game["home_team_id"], game["home_score"], box=box),
+            "awayTeam": self._team(game["road_team_id"], game["road_score"], box=box),
+        }
+
+    # -- installation ------------------------------------------------------
+
+    @contextmanager
+    def install(self):
+        fake = self
+
+        class ScoreBoard:
+            def __init__(self, *args, **kwargs):
+                fake._record("scoreboard")
+                self._payload = fake.scoreboard_payload()
+
+            def get_dict(self):
+                return self._payload
+
+        class BoxScore:
+            def __init__(self, game_id, *args, **kwargs):
+                fake._record("boxscore")
+                self._payload = fake.boxscore_payload(str(game_id))
+
+            def get_dict(self):
+                return self._payload
+
+        class PlayByPlay:
+            def __init__(self, game_id, *args, **kwargs):
+                fake._record("playbyplay")
+                self._payload = fake.playbyplay_payload(str(game_id))
+
+            def get_dict(self):
+                return self._payload
+
+        modules = {}
+        for name in ("nba_api", "nba_api.live", "nba_api.live.nba", "nba_api.live.nba.endpoints"):
+            modules[name] = types.ModuleType(name)
+        for name, cls in (("scoreboard", ScoreBoard), ("boxscore", BoxScore), ("playbyplay", PlayByPlay)):
+            module = types.ModuleType(f"nba_api.live.nba.endpoints.{name}")
+            setattr(module, cls.__name__, cls)
+            modules[module.__name__] = module
+        with patch.dict(sys.modules, modules):
+            yield self
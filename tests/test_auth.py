@@ -259,16 +259,12 @@ class TestCrawlerTracking(unittest.TestCase):
     def test_meta_webindexer_is_blocked_but_recorded(self):
         captured = []
 
-        class FakePageView:
-            def __init__(self, **kwargs):
-                captured.append(kwargs)
-
         with self.app.test_request_context(
             "/players/201939",
             headers={"User-Agent": "meta-webindexer/1.1 (+https://developers.facebook.com/docs/sharing/webmasters/crawler)"},
             environ_base={"REMOTE_ADDR": "8.8.8.8"},
         ):
-            with patch("web.app.PageView", FakePageView), \
+            with patch("web.app._page_view_writer.submit", captured.append), \
                  patch("web.app.SessionLocal", return_value=self._session_ctx()):
                 response = self.web_app._block_bots()
 
@@ -280,10 +276,6 @@ class TestCrawlerTracking(unittest.TestCase):
     def test_meta_webindexer_is_blocked_through_cloudflare_tunnel(self):
         captured = []
 
-        class FakePageView:
-            def __init__(self, **kwargs):
-                captured.append(kwargs)
-
         with self.app.test_request_context(
             "/players/201939",
             headers={
@@ -292,7 +284,7 @@ class TestCrawlerTracking(unittest.TestCase):
             },
             environ_base={"REMOTE_ADDR": "127.0.0.1"},
         ):
-            with patch("web.app.PageView", FakePageView), \
+            with patch("web.app._page_view_writer.submit", captured.append), \
                  patch("web.app.SessionLocal", return_value=self._session_ctx()):
                 response = self.web_app._block_bots()
 
@@ -340,10 +332,6 @@ class TestCrawlerTracking(unittest.TestCase):
     def test_gptbot_remains_blocked(self):
         captured = []
 
-        class FakePageView:
-            def __init__(self, **kwargs):
-                captured.append(kwargs)
-
         with self.app.test_request_context(
             "/metrics/lowest_second_quarter_fg_pct_last3",
             headers={
@@ -354,7 +342,7 @@ class TestCrawlerTracking(unittest.TestCase):
             },
             environ_base={"REMOTE_ADDR": "8.8.8.8"},
         ):
-            with patch("web.app.PageView", FakePageView), \
+            with patch("web.app._page_view_writer.submit", captured.append), \
                  patch("web.app.SessionLocal", return_value=self._session_ctx()):
                 response = self.web_app._block_bots()
 
@@ -366,16 +354,12 @@ class TestCrawlerTracking(unittest.TestCase):
     def test_chatgpt_user_is_excluded_from_pageview_analytics(self):
         captured = []
 
-        class FakePageView:
-            def __init__(self, **kwargs):
-                captured.append(kwargs)
-
         with self.app.test_request_context(
             "/metrics/lowest_second_quarter_fg_pct_last3",
             headers={"User-Agent": "ChatGPT-User/1.0"},
             environ_base={"REMOTE_ADDR": "8.8.8.8"},
         ):
-            with patch("web.app.PageView", FakePageView), \
+            with patch("web.app._page_view_writer.submit", captured.append), \
                  patch("web.app.SessionLocal", return_value=self._session_ctx()):
                 self.web_app._track_page_view()
 
@@ -384,10 +368,6 @@ class TestCrawlerTracking(unittest.TestCase):
     def test_unconfigured_external_curl_is_blocked(self):
         captured = []
 
-        class FakePageView:
-            def __init__(self, **kwargs):
-                captured.append(kwargs)
-
         with patch.dict("os.environ", {"FUNBA_CURL_ALLOWED_IPS": "203.0.113.5"}, clear=False):
             with self.app.test_request_context(
                 "/",
@@ -397,7 +377,7 @@ class TestCrawlerTracking(unittest.TestCase):
                 },
                 environ_base={"REMOTE_ADDR": "127.0.0.1"},
             ):
-                with patch("web.app.PageView", FakePageView), \
+                with patch("web.app._page_view_writer.submit", captured.append), \
                      patch("web.app.SessionLocal", return_value=self._session_ctx()):
                     response = self.web_app._block_bots()
 
@@ -409,16 +389,12 @@ class TestCrawlerTracking(unittest.TestCase):
     def test_googlebot_is_allowed_and_recorded_as_crawler(self):
         captured = []
 
-        class FakePageView:
-            def __init__(self, **kwargs):
-                captured.append(kwargs)
-
         with self.app.test_request_context(
             "/sitemap.xml",
             headers={"User-Agent": "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"},
             environ_base={"REMOTE_ADDR": "8.8.8.8"},
         ):
-            with patch("web.app.PageView", FakePageView), \
+            with patch("web.app._page_view_writer.submit", captured.append), \
                  patch("web.app.SessionLocal", return_value=self._session_ctx()):
                 self.assertIsNone(self.web_app._block_bots())
                 self.web_app._track_page_view()
@@ -430,10 +406,6 @@ class TestCrawlerTracking(unittest.TestCase):
     def test_probe_path_is_blocked_and_recorded(self):
         captured = []
 
-        class FakePageView:
-            def __init__(self, **kwargs):
-                captured.append(kwargs)
-
         with self.app.test_request_context(
             "/.git/config",
             headers={
@@ -444,7 +416,7 @@ class TestCrawlerTracking(unittest.TestCase):
             },
             environ_base={"REMOTE_ADDR": "8.8.8.8"},
         ):
-            with patch("web.app.PageView", FakePageView), \
+            with patch("web.app._page_view_writer.submit", captured.append), \
                  patch("web.app.SessionLocal", return_value=self._session_ctx()):
                 response = self.web_app._block_bots()
 
@@ -456,10 +428,6 @@ class TestCrawlerTracking(unittest.TestCase):
     def test_recent_repeat_crawler_ip_is_blocked_and_recorded(self):
         captured = []
 
-        class FakePageView:
-            def __init__(self, **kwargs):
-                captured.append(kwargs)
-
         with self.app.test_request_context(
             "/players/201939",
             headers={
@@ -470,7 +438,7 @@ class TestCrawlerTracking(unittest.TestCase):
             },
             environ_base={"REMOTE_ADDR": "8.8.8.8"},
         ):
-            with patch("web.app.PageView", FakePageView), \
+            with patch("web.app._page_view_writer.submit", captured.append), \
                  patch("web.app.SessionLocal", return_value=self._session_ctx()), \
                  patch("web.app._recent_repeat_crawler_ip", return_value=True):
                 response = self.web_app._block_bots()
@@ -483,10 +451,6 @@ class TestCrawlerTracking(unittest.TestCase):
     def test_dynamic_cookie_churn_scraper_is_blocked_and_recorded(self):
         captured = []
 
-        class FakePageView:
-            def __init__(self, **kwargs):
-                captured.append(kwargs)
-
         original_testing = self.app.config["TESTING"]
         self.app.config["TESTING"] = False
         try:
@@ -500,7 +464,7 @@ class TestCrawlerTracking(unittest.TestCase):
                 },
                 environ_base={"REMOTE_ADDR": "8.8.8.8"},
             ):
-                with patch("web.app.PageView", FakePageView), \
+                with patch("web.app._page_view_writer.submit", captured.append), \
                      patch("web.app.SessionLocal", return_value=self._session_ctx()), \
                      patch("web.app._recent_repeat_crawler_ip", return_value=False), \
                      patch("web.app._dynamic_pageview_crawler_name", return_value="network-cookie-churn-scraper"):
@@ -539,10 +503,6 @@ class TestCrawlerTracking(unittest.TestCase):
     def test_human_page_views_remain_non_crawler(self):
         captured = []
 
-        class FakePageView:
-            def __init__(self, **kwargs):
-                captured.append(kwargs)
-
         with self.app.test_request_context(
             "/",
             headers={
@@ -553,7 +513,7 @@ class TestCrawlerTracking(unittest.TestCase):
             },
             environ_base={"REMOTE_ADDR": "8.8.8.8"},
         ):
-            with patch("web.app.PageView", FakePageView), \
+            with patch("web.app._page_view_writer.submit", captured.append), \
                  patch("web.app.SessionLocal", return_value=self._session_ctx()):
                 self.web_app._track_page_view()
 
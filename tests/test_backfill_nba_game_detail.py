@@ -4,7 +4,7 @@ import types
 import unittest
 from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
@@ -120,19 +120,14 @@ def _load_module():
     return importlib.import_module("db.backfill_nba_game_detail")
 
 
-class TestCreateTeamGameStats(unittest.TestCase):
+class TestTeamGameStatsRows(unittest.TestCase):
     def setUp(self):
         self.module = _load_module()
 
-    def test_updates_existing_record_instead_of_skipping(self):
-        existing = self.module.TeamGameStats(game_id="g1", team_id="t1", pts=0, win=False, min=0)
-        query = MagicMock()
-        query.filter_by.return_value.first.return_value = existing
-        session = MagicMock()
-        session.query.return_value = query
+    def test_queues_the_full_team_line(self):
+        rows = self.module.BoxScoreRows()
 
-        self.module.create_team_game_stats(
-            session,
+        rows.add_team_game_stats(
             "g1",
             {
                 "TEAM_ID": "t1",
@@ -160,37 +155,23 @@ class TestCreateTeamGameStats(unittest.TestCase):
             win=True,
         )
 
-        self.assertEqual(existing.pts, 111)
-        self.assertEqual(existing.min, 48)
-        self.assertTrue(existing.on_road)
-        self.assertTrue(existing.win)
-        session.add.assert_called_once_with(existing)
+        values = rows.team_game_stats[("g1", "t1")]
+        self.assertEqual((values["game_id"], values["team_id"]), ("g1", "t1"))
+        self.assertEqual(values["pts"], 111)
+        self.assertEqual(values["min"], 48)
+        self.assertTrue(values["on_road"])
+        self.assertTrue(values["win"])
+        self.assertEqual(rows.game_ids, {"g1"})
 
 
-class TestCreatePlayerGameStats(unittest.TestCase):
+class TestPlayerGameStatsRows(unittest.TestCase):
     def setUp(self):
         self.module = _load_module()
 
-    def test_updates_existing_record_instead_of_skipping(self):
-        existing_player = self.module.Player(player_id="p1")
-        existing_stats = self.module.PlayerGameStats(
-            game_id="g1",
-            team_id="t1",
-            player_id="p1",
-            pts=0,
-            starter=False,
-            position="",
-        )
-
-        player_query = MagicMock()
-        player_query.filter_by.return_value.first.return_value = existing_player
-        stats_query = MagicMock()
-        stats_query.filter_by.return_value.first.return_value = existing_stats
-        session = MagicMock()
-        session.query.side_effect = [player_query, stats_query]
+    def test_queues_the_full_player_line(self):
+        rows = self.module.BoxScoreRows()
 
-        started = self.module.create_player_game_stats(
-            session,
+        started = rows.add_player_game_stats(
             {
                 "GAME_ID": "g1",
                 "TEAM_ID": "t1",
@@ -222,25 +203,19 @@ class TestCreatePlayerGameStats(unittest.TestCase):
             },
         )
 
+        values = rows.player_game_stats[("g1", "t1", "p1")]
         self.assertTrue(started)
-        self.assertEqual(existing_stats.pts, 27)
-        self.assertEqual(existing_stats.min, 35)
-        self.assertEqual(existing_stats.sec, 21)
-        self.assertTrue(existing_stats.starter)
-        self.assertEqual(existing_stats.position, "G")
-        self.assertEqual(existing_stats.plus, 14)
-        session.add.assert_called_once_with(existing_stats)
-
-    def test_creates_missing_player_as_active(self):
-        player_query = MagicMock()
-        player_query.filter_by.return_value.first.return_value = None
-        stats_query = MagicMock()
-        stats_query.filter_by.return_value.first.return_value = None
-        session = MagicMock()
-        session.query.side_effect = [player_query, stats_query]
+        self.assertEqual(values["pts"], 27)
+        self.assertEqual(values["min"], 35)
+        self.assertEqual(values["sec"], 21)
+        self.assertTrue(values["starter"])
+        self.assertEqual(values["position"], "G")
+        self.assertEqual(values["plus"], 14)
+
+    def test_queues_missing_player_as_active(self):
+        rows = self.module.BoxScoreRows()
 
-        started = self.module.create_player_game_stats(
-            session,
+        started = rows.add_player_game_stats(
             {
                 "GAME_ID": "g2",
                 "TEAM_ID": "t2",
@@ -272,13 +247,10 @@ class TestCreatePlayerGameStats(unittest.TestCase):
             },
         )
 
-        created_player = session.add.call_args_list[0].args[0]
-        created_stats = session.add.call_args_list[1].args[0]
-
         self.assertFalse(started)
-        self.assertEqual(created_player.player_id, "p2")
-        self.assertTrue(created_player.is_active)
-        self.assertEqual(created_stats.player_id, "p2")
+        self.assertEqual(rows.new_players["p2"]["full_name"], "Rookie Example")
+        self.assertTrue(rows.new_players["p2"]["is_active"])
+        self.assertEqual(rows.player_game_stats[("g2", "t2", "p2")]["player_id"], "p2")
 
 
 class TestPeriodStatsSanity(unittest.TestCase):
@@ -301,6 +273,60 @@ class TestPeriodStatsSanity(unittest.TestCase):
         self.assertFalse(self.module._rows_look_like_single_period(rows, 1))
 
 
+class TestFetchPeriodStats(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_module()
+
+    def test_refetches_past_the_response_cache_when_a_payload_fails_to_normalise(self):
+        calls = []
+
+        def _fetch(game_id, period, refresh_cache=False):
+            calls.append(refresh_cache)
+            return {"attempt": len(calls)}
+
+        def _rows(raw, game_id, period):
+            if raw["attempt"] < 3:
+                raise ValueError("truncated payload")
+            return [{"PLAYER_ID": "p1"}]
+
+        with patch.object(self.module, "fetch_box_score_raw", _fetch), \
+                patch.object(self.module, "_period_stats_rows", _rows):
+            self.assertEqual(self.module.fetch_period_stats("g1", 1), [{"PLAYER_ID": "p1"}])
+
+        self.assertEqual(calls, [False, True, True])
+
+
+    def test_period_box_scores_that_are_full_game_totals_are_not_cached(self):
+        import tempfile
+
+        def _player(person_id, minutes):
+            return {"personId": person_id, "firstName": "P", "familyName": person_id,
+                    "statistics": {"minutes": minutes, "points": 10}}
+
+        totals = {"boxScoreTraditional": {
+            "homeTeam": {"teamId": "t1", "players": [_player(f"h{i}", "36:00") for i in range(5)]},
+            "awayTeam": {"teamId": "t2", "players": [_player(f"a{i}", "36:00") for i in range(5)]},
+        }}
+        requests = []
+
+        class _Endpoint:
+            def __init__(self, **kwargs):
+                requests.append(kwargs.get("start_period"))
+
+            def get_dict(self):
+                return totals
+
+        cache_module = sys.modules[self.module.cached_response.__module__]
+        with tempfile.TemporaryDirectory() as root, \
+                patch.object(cache_module, "_CACHE", cache_module.ResponseCache(root, status_of=lambda game_id: (None, None))), \
+                patch.object(self.module.boxscoretraditionalv3, "BoxScoreTraditionalV3", _Endpoint):
+            self.assertIsNone(self.module.fetch_period_stats("g1", 1))
+            self.assertIsNone(self.module.fetch_period_stats("g1", 1))
+            self.assertEqual(list(Path(root).rglob("*.json.gz")), [])
+
+        self.assertEqual(requests, ["1", "1"])
+
+
 class TestIsGameDetailBackFilled(unittest.TestCase):
     def setUp(self):
         self.module = _load_module()
@@ -351,5 +377,115 @@ class TestIsGameDetailBackFilled(unittest.TestCase):
         self.assertTrue(self.module.is_game_detail_back_filled("g1", session))
 
 
+_REAL_MODULE = []
+
+
+def _load_module_with_real_models():
+    """The module bound to the real SQLAlchemy models; the stubs above are put back afterwards."""
+    if not _REAL_MODULE:
+        stubbed = {name: module for name, module in sys.modules.items() if name.split(".")[0] in {"db", "nba_api", "tenacity"}}
+        for name in stubbed:
+            del sys.modules[name]
+        try:
+            _REAL_MODULE.append(importlib.import_module("db.backfill_nba_game_detail"))
+        finally:
+            sys.modules.update(stubbed)
+    return _REAL_MODULE[0]
+
+
+def _box_line(game_id, team_id, player_id, pts, *, starter=True):
+    return {
+        "GAME_ID": game_id, "TEAM_ID": team_id, "PLAYER_ID": player_id,
+        "PLAYER_NAME": f"Player {player_id}", "NICKNAME": f"P. {player_id}", "COMMENT": "",
+        "MIN": "30:15", "START_POSITION": "F" if starter else "",
+        "PTS": pts, "FGM": 5, "FGA": 10, "FG_PCT": 0.5, "FG3M": 1, "FG3A": 3, "FG3_PCT": 0.33,
+        "FTM": 2, "FTA": 2, "FT_PCT": 1.0, "OREB": 1, "DREB": 4, "REB": 5, "AST": 3,
+        "STL": 1, "BLK": 0, "TO": 2, "PF": 3, "PLUS_MINUS": 4,
+    }
+
+
+def _team_line(team_id, pts):
+    line = _box_line("", team_id, "", pts)
+    return {key: value for key, value in line.items() if key not in {"GAME_ID", "PLAYER_ID", "PLAYER_NAME", "NICKNAME", "COMMENT", "START_POSITION", "PLUS_MINUS"}}
+
+
+class TestBoxScoreRows(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_module_with_real_models()
+
+    def _queue_games(self, rows, pts):
+        for game_id in ("g1", "g2"):
+            rows.add_team_game_stats(game_id, _team_line("t1", pts), False, True)
+            rows.add_team_game_stats(game_id, _team_line("t2", pts - 10), True, False)
+            for player_id in ("p1", "p2", "p3"):
+                rows.add_player_game_stats(_box_line(game_id, "t1", player_id, pts // 5))
+            rows.add_period_data(game_id, {1: [_box_line(game_id, "t1", "p1", 4)], 2: [_box_line(game_id, "t1", "p1", 6)]})
+
+    def test_writes_a_batch_of_games_in_one_statement_per_table_on_mysql(self):
+        from sqlalchemy.dialects import mysql
+
+        session = MagicMock()
+        session.get_bind.return_value.dialect.name = "mysql"
+        session.query.return_value.filter.return_value.all.return_value = [SimpleNamespace(player_id="p1")]
+        rows = self.module.BoxScoreRows()
+        self._queue_games(rows, 100)
+
+        rows.write(session)
+
+        statements = [str(call.args[0].compile(dialect=mysql.dialect())) for call in session.execute.call_args_list]
+        self.assertEqual(len(statements), 4)
+        self.assertTrue(statements[0].startswith("INSERT IGNORE INTO `Player`"))
+        self.assertEqual(statements[0].count("VALUES") + statements[0].count("), ("), 2)  # p2 and p3 only
+        for table, statement in zip(("TeamGameStats", "PlayerGameStats", "PlayerGamePeriodStats"), statements[1:]):
+            self.assertIn(f"INSERT INTO `{table}`", statement)
+            self.assertIn("ON DUPLICATE KEY UPDATE", statement)
+            self.assertNotIn("game_id = VALUES(game_id)", statement)
+        session.add.assert_not_called()
+        self.assertEqual(rows.player_game_stats, {})
+
+    def test_games_queued_separately_are_written_together(self):
+        session = MagicMock()
+        session.get_bind.return_value.dialect.name = "mysql"
+        session.query.return_value.filter.return_value.all.return_value = []
+        batch = self.module.BoxScoreRows()
+        for game_id in ("g1", "g2", "g3"):
+            game_rows = self.module.BoxScoreRows()
+            game_rows.add_team_game_stats(game_id, _team_line("t1", 100), False, True)
+            game_rows.add_player_game_stats(_box_line(game_id, "t1", "p1", 20))
+            batch.extend(game_rows)
+
+        self.assertEqual(batch.game_ids, {"g1", "g2", "g3"})
+        batch.write(session)
+
+        self.assertEqual(session.execute.call_count, 3)  # Player, TeamGameStats, PlayerGameStats
+        self.assertEqual(batch.game_ids, set())
+
+    def test_other_dialects_merge_rows_and_update_existing_ones(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import Session
+
+        metadata = self.module.Player.metadata
+        engine = create_engine("sqlite://")
+        metadata.create_all(engine, tables=[
+            self.module.Player.__table__,
+            self.module.TeamGameStats.__table__,
+            self.module.PlayerGameStats.__table__,
+            self.module.PlayerGamePeriodStats.__table__,
+        ])
+        rows = self.module.BoxScoreRows()
+        with Session(engine) as session:
+            self._queue_games(rows, 100)
+            rows.write(session)
+            self._queue_games(rows, 110)
+            rows.write(session)
+            session.commit()
+
+            self.assertEqual(session.query(self.module.Player).count(), 3)
+            stats = session.query(self.module.PlayerGameStats).filter_by(game_id="g2", player_id="p3").one()
+            self.assertEqual((stats.pts, stats.min, stats.sec, stats.starter), (22, 30, 15, True))
+            self.assertEqual(session.query(self.module.TeamGameStats).filter_by(team_id="t2").first().pts, 100)
+            self.assertEqual(session.query(self.module.PlayerGamePeriodStats).count(), 4)
+
+
 if __name__ == "__main__":
     unittest.main()
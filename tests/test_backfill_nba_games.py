@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+
+pytestmark = pytest.mark.real_db_models(
+    ("Base", "Player", "PlayerGamePeriodStats", "PlayerGameStats", "TeamGameStats"),
+    {"games": "db.backfill_nba_games"},
+    reload=("db.backfill_nba_game_detail", "db.backfill_nba_player_shot_detail", "nba_api"),
+)
+
+
+def _box_line(game_id, player_id):
+    return {
+        "GAME_ID": game_id, "TEAM_ID": "t1", "PLAYER_ID": player_id,
+        "PLAYER_NAME": f"Player {player_id}", "NICKNAME": "", "COMMENT": "",
+        "MIN": "30:00", "START_POSITION": "F",
+        "PTS": 20, "FGM": 8, "FGA": 15, "FG_PCT": 0.53, "FG3M": 2, "FG3A": 5, "FG3_PCT": 0.4,
+        "FTM": 2, "FTA": 2, "FT_PCT": 1.0, "OREB": 1, "DREB": 4, "REB": 5, "AST": 3,
+        "STL": 1, "BLK": 0, "TO": 2, "PF": 3, "PLUS_MINUS": 4,
+    }
+
+
+def test_a_failed_batch_is_retried_one_game_at_a_time(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        Player.__table__, TeamGameStats.__table__, PlayerGameStats.__table__, PlayerGamePeriodStats.__table__,
+    ])
+    rows = games.BoxScoreRows()
+    for game_id, player_id in (("g1", "p1"), ("g2", "p2"), ("g3", "p3")):
+        rows.add_player_game_stats(_box_line(game_id, player_id))
+        rows.add_player_period_stats(game_id, 1, _box_line(game_id, player_id))
+
+    ledger_calls = []
+
+    def _record(_session, game_ids):
+        ledger_calls.append(list(game_ids))
+        if "g2" in game_ids:
+            raise RuntimeError("ledger write failed")
+
+    monkeypatch.setattr(games, "record_shot_detail_completeness", _record)
+    with Session(engine) as session:
+        games.write_box_score_batch(session, rows)
+
+        written = session.query(PlayerGameStats.game_id, PlayerGameStats.player_id).order_by(PlayerGameStats.game_id).all()
+        assert [tuple(row) for row in written] == [("g1", "p1"), ("g3", "p3")]
+        assert {row.player_id for row in session.query(Player)} == {"p1", "p3"}
+        assert session.query(PlayerGamePeriodStats).count() == 2
+    assert ledger_calls == [["g1", "g2", "g3"], ["g1"], ["g2"], ["g3"]]
+    assert rows.game_ids == set()
@@ -0,0 +1,142 @@
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from web.crawler_signals import CrawlerSignalStore, WindowFamily
+
+_NOW = datetime(2026, 3, 1, 12, 0, 0)
+_FAMILIES = {
+    "ip-cookie-churn": WindowFamily(
+        seconds=3 * 3600,
+        key=lambda row: row.get("ip_address") if not row.get("is_crawler") else None,
+        counts=lambda row: {"direct_refs": 0 if row.get("referrer") else 1},
+        distinct=("visitor_id", "user_agent"),
+    ),
+    "auth-spray-ip": WindowFamily(
+        seconds=30 * 86400,
+        key=lambda row: row.get("ip_address") if row.get("crawler_name") == "auth-spray-bot" else None,
+    ),
+}
+
+
+def _row(minutes_ago: float, *, ip="198.51.100.7", visitor="v1", ua="Mozilla/5.0 A", crawler_name=None):
+    return {
+        "visitor_id": visitor,
+        "path": "/games",
+        "referrer": "",
+        "user_agent": ua,
+        "is_crawler": crawler_name is not None,
+        "crawler_name": crawler_name,
+        "ip_address": ip,
+        "created_at": _NOW - timedelta(minutes=minutes_ago),
+    }
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_windows_warm_from_history_then_slide_with_live_views():
+    clock = [_NOW.replace(tzinfo=timezone.utc).timestamp()]
+    release = threading.Event()
+    watermarks = []
+
+    def _seed(watermark):
+        watermarks.append(watermark)
+        release.wait(5)
+        yield _row(60 * 24 * 20, crawler_name="auth-spray-bot")
+        yield _row(200)  # older than the 3h window
+        yield _row(90, visitor="v2", ua="Mozilla/5.0 B")
+
+    store = CrawlerSignalStore(_FAMILIES, seed=_seed, shared=False, clock=lambda: clock[0])
+    store.observe(_row(0, visitor="v3"))
+    assert store.window("ip-cookie-churn", "198.51.100.7") == {}  # still warming: let requests through
+    assert watermarks == [_NOW]
+
+    release.set()
+    _wait_until(lambda: store.ready)
+    assert store.window("ip-cookie-churn", "198.51.100.7") == {
+        "pv": 2,
+        "direct_refs": 2,
+        "visitor_id": 2,
+        "user_agent": 2,
+    }
+    assert store.window("auth-spray-ip", "198.51.100.7") == {"pv": 1}
+    assert store.window("ip-cookie-churn", "203.0.113.1") == {}
+
+    clock[0] += 2 * 3600
+    assert store.window("ip-cookie-churn", "198.51.100.7") == {"pv": 1, "direct_refs": 1, "visitor_id": 1, "user_agent": 1}
+    clock[0] += 3600 + 180  # counters expire a bucket (1/60th of the window) late
+    assert store.window("ip-cookie-churn", "198.51.100.7") == {}
+    assert store.window("auth-spray-ip", "198.51.100.7") == {"pv": 1}
+
+
+class _FakeRedis:
+    """Pub/sub fan-out shared by every "worker" in the test."""
+
+    def __init__(self):
+        self.subscribers: list[queue.Queue] = []
+        self.published = 0
+
+    def publish(self, channel, payload):
+        self.published += 1
+        for subscriber in list(self.subscribers):
+            subscriber.put(payload)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return _FakePubSub(self)
+
+
+class _FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.inbox = queue.Queue()
+
+    def subscribe(self, channel):
+        self.redis.subscribers.append(self.inbox)
+
+    def listen(self):
+        while True:
+            yield {"type": "message", "data": self.inbox.get().encode()}
+
+
+def test_views_flushed_by_one_worker_reach_the_others_once():
+    redis = _FakeRedis()
+    first = CrawlerSignalStore(_FAMILIES, client_factory=lambda: redis, clock=lambda: _NOW.replace(tzinfo=timezone.utc).timestamp())
+    second = CrawlerSignalStore(_FAMILIES, client_factory=lambda: redis, clock=lambda: _NOW.replace(tzinfo=timezone.utc).timestamp())
+    first.start()
+    second.start()
+    _wait_until(lambda: len(redis.subscribers) == 2)
+
+    rows = [_row(1, visitor=f"v{index}") for index in range(30)]
+    for row in rows:
+        first.observe(row)
+    first.publish(rows)
+
+    _wait_until(lambda: second.window("ip-cookie-churn", "198.51.100.7").get("pv") == 30)
+    assert second.window("ip-cookie-churn", "198.51.100.7")["visitor_id"] == 30
+    time.sleep(0.05)
+    assert first.window("ip-cookie-churn", "198.51.100.7")["pv"] == 30  # its own batch is not counted twice
+    assert redis.published == 1
+
+
+def test_each_family_has_its_own_key_cap_and_drops_expired_windows_on_insert():
+    clock = [_NOW.replace(tzinfo=timezone.utc).timestamp()]
+    store = CrawlerSignalStore(_FAMILIES, shared=False, max_keys=2, clock=lambda: clock[0])
+    store.observe(_row(60 * 24 * 10, ip="192.0.2.1", crawler_name="auth-spray-bot"))
+    store.observe(_row(60 * 5, ip="192.0.2.9"))  # older than the 3h window: not counted
+    for index in range(5):
+        store.observe(_row(1, ip=f"203.0.113.{index}"))
+
+    assert store.window("auth-spray-ip", "192.0.2.1") == {"pv": 1}
+    assert store.window("ip-cookie-churn", "192.0.2.9") == {}
+    assert list(store._windows["ip-cookie-churn"]) == ["203.0.113.3", "203.0.113.4"]
+
+    clock[0] += 4 * 3600
+    store.observe(_row(-4 * 60, ip="198.51.100.7"))
+    assert list(store._windows["ip-cookie-churn"]) == ["198.51.100.7"]
+    assert store.window("auth-spray-ip", "192.0.2.1") == {"pv": 1}
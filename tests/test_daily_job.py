@@ -0,0 +1,85 @@
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.exc import OperationalError
+
+from metrics.framework import daily_job
+
+
+def _game(game_id, season, day):
+    return SimpleNamespace(game_id=game_id, season=season, game_date=date(2025, 11, day))
+
+
+def test_partition_keeps_each_day_on_one_worker_and_balances_load():
+    games = [_game(f"g{day}{n}", "22025", day) for day in range(1, 7) for n in range(day % 3 + 1)]
+    games.append(_game("p1", "12025", 1))
+
+    partitions = daily_job._partition_games(games, 3)
+
+    assert len(partitions) == 3
+    assert sorted(gid for part in partitions for gid, _ in part) == sorted(g.game_id for g in games)
+    owner = {gid: index for index, part in enumerate(partitions) for gid, _ in part}
+    for game in games:
+        same_day = [g for g in games if (g.season, g.game_date) == (game.season, game.game_date)]
+        assert {owner[g.game_id] for g in same_day} == {owner[game.game_id]}
+    sizes = sorted(len(part) for part in partitions)
+    assert sizes[-1] - sizes[0] <= 3
+    assert daily_job._partition_games(games[:1], 8) == [[("g10", "22025")]]
+
+
+def _session_factory(session):
+    factory = MagicMock()
+    factory.return_value.return_value.__enter__.return_value = session
+    return factory
+
+
+def test_worker_batches_run_log_flushes_and_reports_touched_pairs():
+    session = MagicMock()
+    factory = _session_factory(session)
+    partition = [(f"g{i:03d}", "22025") for i in range(60)]
+    flushed = []
+
+    def _map_game(_session, game_id, metric_keys):
+        return {"pts": True, "reb": False}, [{"game_id": game_id}]
+
+    with (
+        patch.object(daily_job, "_session_factory", factory),
+        patch.object(daily_job, "_map_game", side_effect=_map_game),
+        patch.object(daily_job, "_flush_run_logs", side_effect=lambda _s, rows: flushed.append(len(rows))),
+        patch.object(daily_job, "already_processed", side_effect=lambda _s, gid: gid == "g000"),
+    ):
+        report = daily_job._run_partition(2, partition, ["pts", "reb"], skip_existing=True)
+
+    assert flushed == [24, 25, 10]
+    assert session.commit.call_count == 3
+    assert factory.return_value.call_count == 3  # one session per chunk
+    assert report["worker"] == 2
+    assert (report["mapped"], report["failed"], report["skipped"], report["produced"]) == (59, 0, 1, 59)
+    assert report["touched"] == {("pts", "22025")}
+    assert report["seconds"] >= 0
+
+
+def test_failed_batch_is_rolled_back_and_remapped_per_game():
+    session = MagicMock()
+    partition = [("g1", "22025"), ("g2", "22025"), ("g3", "22025")]
+    deadlock = OperationalError("INSERT", {}, Exception(1213, "Deadlock found when trying to get lock"))
+    flush_calls = []
+
+    def _flush(_session, rows):
+        flush_calls.append([row["game_id"] for row in rows])
+        if len(flush_calls) == 1 or rows == [{"game_id": "g2"}]:
+            raise deadlock
+
+    with (
+        patch.object(daily_job, "_session_factory", _session_factory(session)),
+        patch.object(daily_job, "_map_game", side_effect=lambda _s, gid, keys: ({"pts": True}, [{"game_id": gid}])),
+        patch.object(daily_job, "_flush_run_logs", side_effect=_flush),
+    ):
+        report = daily_job._run_partition(0, partition, ["pts"], skip_existing=False)
+
+    assert flush_calls == [["g1", "g2", "g3"], ["g1"], ["g2"], ["g3"]]
+    assert session.rollback.call_count == 2
+    assert (report["mapped"], report["failed"]) == (2, 1)
+    assert report["produced"] == 2
+    assert report["run_log_rows"] == 2
@@ -0,0 +1,180 @@
+from datetime import date
+
+import numpy as np
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from db.models import Base, Game, GamePlayByPlay, PlayerGameStats, ShotRecord, TeamGameStats
+from metrics import fact_snapshot, helpers
+from metrics.fact_snapshot import (
+    FactSnapshotSession,
+    attach_fact_snapshot,
+    export_season_snapshot,
+    load_fact_snapshot,
+    mark_fact_snapshot_stale,
+)
+
+
+_SEASON = "22025"
+
+
+def _session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(
+        engine,
+        tables=[
+            Game.__table__,
+            PlayerGameStats.__table__,
+            TeamGameStats.__table__,
+            ShotRecord.__table__,
+            GamePlayByPlay.__table__,
+        ],
+    )
+    session = sessionmaker(bind=engine)()
+    for index, status in enumerate(("completed", "completed", "live"), start=1):
+        game_id = f"00225000{index:02d}"
+        session.add(
+            Game(
+                game_id=game_id,
+                season=_SEASON,
+                game_date=date(2025, 11, index),
+                game_status=status,
+                backfill_mismatch=False,
+            )
+        )
+        for team_id, player_ids in (("t1", ("p1", "p2")), ("t2", ("p3",))):
+            session.add(TeamGameStats(game_id=game_id, team_id=team_id, pts=100 + index, win=team_id == "t1"))
+            for player_id in player_ids:
+                session.add(
+                    PlayerGameStats(
+                        game_id=game_id,
+                        team_id=team_id,
+                        player_id=player_id,
+                        pts=index * 10 if player_id != "p2" else None,
+                        starter=player_id != "p2",
+                        fg_pct=0.5,
+                        comment=None if player_id != "p3" else "DNP",
+                    )
+                )
+        for period, minute, made in ((2, 5, True), (1, 3, False), (1, 9, True)):
+            session.add(
+                ShotRecord(
+                    game_id=game_id,
+                    team_id="t1",
+                    player_id="p1",
+                    season=_SEASON,
+                    period=period,
+                    min=minute,
+                    sec=0,
+                    shot_attempted=True,
+                    shot_made=made,
+                )
+            )
+        for event_num, period in ((3, 2), (1, 1), (2, 1)):
+            session.add(
+                GamePlayByPlay(
+                    game_id=game_id,
+                    event_num=event_num,
+                    period=period,
+                    event_msg_type=1,
+                    score_margin=None if event_num == 2 else str(event_num),
+                    player1_id="p1",
+                )
+            )
+    session.commit()
+    return session
+
+
+def _row_dicts(rows, columns):
+    return [{column: getattr(row, column) for column in columns} for row in rows]
+
+
+def test_snapshot_helpers_match_database_helpers_without_fact_queries(tmp_path):
+    db_session = _session()
+    export_season_snapshot(db_session, _SEASON, tmp_path)
+    snapshot = load_fact_snapshot(tmp_path, _SEASON)
+    game_id = "0022500002"
+
+    pgs_columns = ("player_id", "team_id", "pts", "starter", "fg_pct", "comment")
+    shot_columns = ("period", "min", "shot_made")
+    pbp_columns = ("event_num", "period", "score_margin")
+
+    def lookups(session):
+        return (
+            _row_dicts([helpers.player_game_stat(session, game_id, "p2")], pgs_columns),
+            _row_dicts(helpers.team_player_stats(session, game_id, "t1"), pgs_columns),
+            helpers.team_game_stat(session, game_id, "t2").pts,
+            _row_dicts(helpers.player_attempted_shots(session, game_id, "p1"), shot_columns),
+            _row_dicts(helpers.game_pbp_rows(session, game_id), pbp_columns),
+        )
+
+    expected = lookups(db_session)
+    snap_session = sessionmaker(bind=db_session.get_bind())()
+    attach_fact_snapshot(snap_session, snapshot)
+    statements = []
+    event.listen(snap_session.get_bind(), "before_cursor_execute", lambda *a, **k: statements.append(a[2]))
+
+    assert lookups(snap_session) == expected
+    assert [row["event_num"] for row in expected[4]] == [1, 2, 3]
+    assert statements == []
+
+
+def test_uncovered_games_fall_back_to_the_database(tmp_path):
+    db_session = _session()
+    export_season_snapshot(db_session, _SEASON, tmp_path)
+    snapshot = load_fact_snapshot(tmp_path, _SEASON)
+
+    assert not snapshot.covers("0022500003")  # live game is not exported
+    attach_fact_snapshot(db_session, snapshot)
+    assert helpers.player_game_stat(db_session, "0022500003", "p1").pts == 30
+
+
+def test_offline_snapshot_session_serves_helpers_and_refuses_db_access(tmp_path):
+    export_season_snapshot(_session(), _SEASON, tmp_path)
+    offline = FactSnapshotSession(load_fact_snapshot(tmp_path, _SEASON))
+
+    assert helpers.player_game_stat(offline, "0022500001", "p3").comment == "DNP"
+    assert load_fact_snapshot(tmp_path, "22024") is None
+    try:
+        offline.query(Game)
+    except RuntimeError as exc:
+        assert "no database session" in str(exc)
+    else:
+        raise AssertionError("offline snapshot session must not reach the database")
+
+
+def test_games_marked_stale_fall_back_until_the_next_export(tmp_path):
+    db_session = _session()
+    export_season_snapshot(db_session, _SEASON, tmp_path)
+    assert load_fact_snapshot(tmp_path, _SEASON).covers("0022500001")
+
+    mark_fact_snapshot_stale(tmp_path, _SEASON, ["0022500001"])
+    snapshot = load_fact_snapshot(tmp_path, _SEASON)
+    assert not snapshot.covers("0022500001")
+    assert snapshot.covers("0022500002")
+
+    db_session.query(PlayerGameStats).filter_by(game_id="0022500001", player_id="p1").update({"pts": 99})
+    attach_fact_snapshot(db_session, snapshot)
+    assert helpers.player_game_stat(db_session, "0022500001", "p1").pts == 99
+
+    export_season_snapshot(db_session, _SEASON, tmp_path)
+    assert load_fact_snapshot(tmp_path, _SEASON).covers("0022500001")
+
+
+def test_export_in_game_chunks_matches_a_single_pass(tmp_path, monkeypatch):
+    db_session = _session()
+    export_season_snapshot(db_session, "all", tmp_path / "single")
+    monkeypatch.setattr(fact_snapshot, "_EXPORT_CHUNK_GAMES", 1)
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute", lambda *a, **k: statements.append(a[2]))
+    export_season_snapshot(db_session, "all", tmp_path / "chunked")
+
+    # One game-id query, then one query per table per game.
+    assert len(statements) == 1 + 2 * 4
+    single, chunked = (tmp_path / "single" / "all", tmp_path / "chunked" / "all")
+    files = sorted(path.relative_to(single) for path in single.rglob("*.npy"))
+    assert files == sorted(path.relative_to(chunked) for path in chunked.rglob("*.npy"))
+    assert not list(chunked.rglob(".parts"))
+    for path in files:
+        np.testing.assert_array_equal(np.load(single / path), np.load(chunked / path))
+    assert load_fact_snapshot(tmp_path / "chunked", "all").rows("PlayerGameStats", "0022500002")[2].comment == "DNP"
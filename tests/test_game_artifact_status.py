@@ -0,0 +1,116 @@
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+import tasks.ingest as ingest_tasks
+
+
+pytestmark = pytest.mark.real_db_models(
+    ("Base", "Game", "GameArtifactStatus"),
+    {"artifact_status": "db.game_artifact_status"},
+)
+
+
+def _session_factory():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine, tables=[Game.__table__, GameArtifactStatus.__table__])
+    return sessionmaker(bind=engine)
+
+
+def _status(game_id, **flags):
+    status = {"game_id": game_id, "season": "22025", "has_detail": True, "has_pbp": True, "has_shot": True,
+              "has_line": True, "has_period": True}
+    status.update(flags)
+    status["complete"] = all(status[flag] for flag in ("has_detail", "has_pbp", "has_shot", "has_line", "has_period"))
+    return status
+
+
+def test_steps_flip_flags_and_recompute_complete_without_touching_metric_flags():
+    session = _session_factory()()
+    artifact_status.store_game_artifact_status(
+        session, _status("g1", has_shot=False, has_period=False), game_date=date(2026, 3, 1)
+    )
+    artifact_status.mark_game_artifacts(session, ["g1"], has_metric_run_logs=True)
+    session.commit()
+
+    artifact_status.mark_game_artifacts(session, ["g1"], has_shot=True)
+    assert artifact_status.load_game_completeness(session, ["g1", "g2"]) == {"g1": False}
+    artifact_status.mark_game_artifacts(session, ["g1", "g2"], has_period=True)
+    assert artifact_status.load_game_completeness(session, ["g1", "g2"]) == {"g1": True}
+
+    artifact_status.store_game_artifact_status(session, _status("g1"), game_date=date(2026, 3, 1))
+    row = session.get(GameArtifactStatus, "g1")
+    assert (row.complete, row.has_metric_run_logs, row.has_metric_results) == (True, True, False)
+
+
+def test_recent_scan_reads_the_ledger_and_probes_only_unknown_games():
+    factory = _session_factory()
+    with factory() as session:
+        artifact_status.store_game_artifact_status(session, _status("g_done"))
+        artifact_status.store_game_artifact_status(session, _status("g_gap", has_pbp=False))
+        session.commit()
+
+    def _probe(sess, game_id, **kwargs):
+        status = _status(game_id, has_line=False)
+        artifact_status.store_game_artifact_status(sess, status)
+        return status
+
+    with patch.object(ingest_tasks, "_session_factory", return_value=factory), patch.object(
+        ingest_tasks, "_load_game_artifact_status", side_effect=_probe
+    ) as probe:
+        assert ingest_tasks._list_incomplete_game_ids(["g_done", "g_gap", "g_new"]) == ["g_gap", "g_new"]
+        assert [call.args[1] for call in probe.call_args_list] == ["g_new"]
+
+        probe.reset_mock()
+        assert ingest_tasks._list_incomplete_game_ids(["g_done", "g_gap", "g_new"]) == ["g_gap", "g_new"]
+        probe.assert_not_called()
+
+
+def test_metric_flags_are_only_written_when_they_change_and_clear_resets_them():
+    session = _session_factory()()
+    for game_id in ("g1", "g2"):
+        artifact_status.store_game_artifact_status(session, _status(game_id), game_date=date(2026, 3, 1))
+
+    assert artifact_status.mark_game_artifacts(session, ["g1"], has_metric_run_logs=True) == 1
+    assert artifact_status.mark_game_artifacts(session, ["g1", "g2"], has_metric_run_logs=True) == 1
+    assert artifact_status.mark_game_artifacts(session, ["g1", "g2"], has_metric_results=True) == 2
+
+    assert artifact_status.clear_metric_flags(session, ["g1"], "has_metric_run_logs") == 1
+    assert not artifact_status.game_artifact_flag(session, "g1", "has_metric_run_logs")
+    assert artifact_status.game_artifact_flag(session, "g1", "has_metric_results")
+
+    assert artifact_status.clear_metric_flags(session, select(GameArtifactStatus.game_id).where(GameArtifactStatus.complete.is_(True))) == 2
+    assert not artifact_status.game_artifact_flag(session, "g2", "has_metric_results")
+    with pytest.raises(ValueError):
+        artifact_status.clear_metric_flags(session, ["g1"], "has_pbp")
+
+
+def test_ingest_records_detail_and_pbp_once_the_game_is_stored():
+    factory = _session_factory()
+    with factory() as session:
+        artifact_status.store_game_artifact_status(session, _status("g1", has_detail=False, has_pbp=False))
+        session.commit()
+    before = {"exists_game": True, "game_status": "completed", "artifacts_supported": True,
+              "has_detail": False, "has_pbp": False, "has_shot": True, "season": "22025"}
+    task = SimpleNamespace(request=SimpleNamespace(retries=0), retry=MagicMock(side_effect=RuntimeError("retrying")))
+
+    with patch.object(ingest_tasks, "_session_factory", return_value=factory), patch.object(
+        ingest_tasks, "_load_game_artifact_status", side_effect=[before, RuntimeError("stop after step 2")]
+    ), patch.object(ingest_tasks, "_build_existing_game_row", return_value={"GAME_ID": "g1"}), patch.object(
+        ingest_tasks, "process_and_store_game"
+    ) as process_mock, patch.object(ingest_tasks, "is_game_detail_back_filled", return_value=True), patch.object(
+        ingest_tasks, "is_game_pbp_back_filled", return_value=True
+    ), patch.object(ingest_tasks, "_mark_fact_snapshot_stale"), patch.object(
+        ingest_tasks, "get_runtime_flag", return_value=False
+    ):
+        with pytest.raises(RuntimeError, match="retrying"):
+            ingest_tasks._ingest_game(task, "g1", None, False)
+
+    process_mock.assert_called_once()
+    with factory() as session:
+        row = session.get(GameArtifactStatus, "g1")
+        assert (row.has_detail, row.has_pbp, row.complete) == (True, True, True)
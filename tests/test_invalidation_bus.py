@@ -0,0 +1,83 @@
+import threading
+from unittest.mock import patch
+
+from db import invalidation, slug_index
+
+
+def test_local_bus_delivers_typed_events_and_isolates_failing_handlers():
+    seen = []
+
+    def _broken(event):
+        raise RuntimeError("cache exploded")
+
+    with patch.dict(invalidation._handlers, clear=True), patch.object(invalidation, "_bus", invalidation.LocalInvalidationBus()):
+        invalidation.subscribe(invalidation.MetricReduced, _broken)
+        invalidation.subscribe(invalidation.MetricReduced, seen.append)
+        invalidation.subscribe(invalidation.SlugChanged, seen.append)
+
+        invalidation.publish(invalidation.MetricReduced(metric_key="pts", season="22025"))
+        with patch.object(slug_index, "_redis_or_none", return_value=None):
+            slug_index.publish_slug_changes("game", {"0022500001": "20251021-okc-hou"})
+        invalidation.publish(invalidation.GameIngested(game_id="0022500001"))  # no subscriber
+
+    assert seen == [
+        invalidation.MetricReduced(metric_key="pts", season="22025"),
+        invalidation.SlugChanged(kind="game", entity_id="0022500001", slug="20251021-okc-hou"),
+    ]
+    for event in seen:
+        assert invalidation.event_from_json(event.to_json()) == event
+    assert invalidation.event_from_json(b'{"type": "unknown"}') is None
+
+
+class _FakePubSub:
+    def __init__(self, fail: bool, messages: list):
+        self.fail = fail
+        self.messages = messages
+
+    def subscribe(self, channel):
+        if self.fail:
+            raise ConnectionError("redis went away")
+
+    def listen(self):
+        yield {"type": "subscribe", "data": 1}
+        yield from self.messages
+        threading.Event().wait()  # park the daemon listener like an idle channel
+
+
+class _FakeRedis:
+    def __init__(self, pubsubs):
+        self.pubsubs = pubsubs
+        self.published = []
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return self.pubsubs.pop(0)
+
+    def publish(self, channel, payload):
+        self.published.append((channel, payload))
+
+
+def test_redis_listener_dispatches_messages_and_signals_resync_after_reconnect():
+    event = invalidation.GameIngested(game_id="0022500001")
+    redis = _FakeRedis([
+        _FakePubSub(True, []),
+        _FakePubSub(False, [{"type": "message", "data": event.to_json().encode()}]),
+    ])
+    bus = invalidation.RedisInvalidationBus(client_factory=lambda: redis)
+    seen = []
+    delivered = threading.Event()
+
+    def _record(received):
+        seen.append(received)
+        if isinstance(received, invalidation.GameIngested):
+            delivered.set()
+
+    with patch.dict(invalidation._handlers, clear=True), patch.object(invalidation, "_RECONNECT_SECONDS", (0,)):
+        invalidation.subscribe(invalidation.GameIngested, _record)
+        invalidation.subscribe(invalidation.BusReconnected, _record)
+        bus.ensure_listening()
+        bus.ensure_listening()  # one listener per process
+        assert delivered.wait(5)
+        bus.publish(event)
+
+    assert seen == [invalidation.BusReconnected(), event]
+    assert redis.published == [("funba:invalidate:v1", event.to_json())]
@@ -1,16 +1,25 @@
 from __future__ import annotations
 
+import json
 import sys
 import types
 import unittest
 from datetime import date
 from pathlib import Path
+from unittest.mock import patch
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from web.live_game_data import build_live_game_stub, fetch_live_game_detail
+from web import live_game_data
+from web.live_game_data import (
+    LivePlayByPlay,
+    _build_pbp_rows,
+    _build_score_progression,
+    build_live_game_stub,
+    fetch_live_game_detail,
+)
 
 
 def _install_live_endpoint_stubs(*, box_payload, pbp_payload):
@@ -51,6 +60,25 @@ def _install_live_endpoint_stubs(*, box_payload, pbp_payload):
     sys.modules["nba_api.live.nba.endpoints.playbyplay"] = fake_playbyplay
 
 
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.reads = []
+
+    def get(self, key):
+        self.reads.append(key)
+        return self.values.get(key)
+
+    def pipeline(self):
+        return self
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value if isinstance(value, str) else str(value)
+
+    def execute(self):
+        pass
+
+
 class TestLiveGameData(unittest.TestCase):
     def tearDown(self):
         for key in [
@@ -128,3 +156,72 @@ class TestLiveGameData(unittest.TestCase):
 
         self.assertIsNotNone(stub)
         self.assertEqual(stub.game_date, date(2026, 4, 11))
+
+    def test_live_play_by_play_ingests_only_new_actions_and_matches_full_rebuild(self):
+        actions = []
+        home = road = 0
+        state = LivePlayByPlay("0022501178")
+        new_counts = []
+        for number in range(1, 601):
+            if number % 3 == 0:
+                home += 2
+            elif number % 5 == 0:
+                road += 3
+            actions.append({
+                "actionNumber": number,
+                "period": min(4, 1 + number // 150),
+                "clock": f"PT{11 - (number % 150) // 14:02d}M{number % 60:02d}.00S",
+                "actionType": "2pt" if number % 3 == 0 else "rebound",
+                "description": f"Action {number}",
+                "scoreHome": str(home),
+                "scoreAway": str(road),
+            })
+            if number % 25 == 0:
+                new_counts.append(state.ingest(actions))
+
+        self.assertEqual(set(new_counts), {25})
+        self.assertEqual(state.pbp_rows(), _build_pbp_rows(actions))
+        self.assertEqual(state.score_progression(), _build_score_progression(actions))
+
+        # nba_api amended the last play: the checkpoint no longer matches, so rebuild.
+        actions[-1] = dict(actions[-1], description="Action 600 (amended)")
+        self.assertEqual(state.ingest(actions), 600)
+        self.assertEqual(state.pbp_rows()[0]["description"], "Action 600 (amended)")
+
+        restored = LivePlayByPlay.from_dict(json.loads(json.dumps(state.to_dict())))
+        actions.append(dict(actions[-1], actionNumber=601, description="Action 601"))
+        self.assertEqual(restored.ingest(actions), 1)
+        self.assertEqual(restored.pbp_rows(), _build_pbp_rows(actions))
+
+    def test_workers_read_the_shared_play_by_play_only_when_it_is_ahead(self):
+        game = {
+            "gameId": "0022501178",
+            "gameStatus": 2,
+            "homeTeam": {"teamId": "1610612745", "score": "2", "statistics": {}, "players": []},
+            "awayTeam": {"teamId": "1610612750", "score": "0", "statistics": {}, "players": []},
+        }
+        actions = [
+            {"actionNumber": 4, "period": 1, "clock": "PT11M40.00S", "actionType": "2pt",
+             "description": "Layup", "scoreHome": "2", "scoreAway": "0"},
+        ]
+        _install_live_endpoint_stubs(box_payload={"game": game}, pbp_payload={"game": {"actions": actions}})
+        redis = _FakeRedis()
+        key = "funba:live:v2:pbp:0022501178"
+
+        with patch.object(live_game_data, "_redis_or_none", return_value=redis), patch.dict(
+            live_game_data._LIVE_PBP_STATES, clear=True
+        ):
+            fetch_live_game_detail("0022501178")  # first worker: nothing local yet
+            self.assertEqual(redis.values[f"{key}:n"], "4")
+
+            live_game_data._LIVE_PBP_STATES.clear()  # second worker picks up the shared state
+            redis.reads.clear()
+            actions.append(dict(actions[0], actionNumber=9, description="Jumper", scoreHome="4"))
+            payload = fetch_live_game_detail("0022501178")
+            self.assertEqual(redis.reads, [key])
+            self.assertEqual([row["description"] for row in payload["pbp_rows"]], ["Jumper", "Layup"])
+            self.assertEqual(redis.values[f"{key}:n"], "9")
+
+            redis.reads.clear()
+            fetch_live_game_detail("0022501178")  # up to date locally: only the small key is read
+            self.assertEqual(redis.reads, [f"{key}:n"])
@@ -32,6 +32,17 @@ class TestLiveGameRoutes(unittest.TestCase):
         self.assertEqual(body["games"][0]["game_id"], "0022500999")
         self.assertEqual(body["games"][0]["summary"], "Q3 4:22")
 
+    def test_api_games_live_revalidates_unchanged_polls_with_304(self):
+        with patch("web.public_routes.fetch_live_scoreboard_map", return_value={}):
+            first = self.client.get("/api/games/live")
+            etag = first.headers["ETag"]
+            repeat = self.client.get("/api/games/live", headers={"If-None-Match": etag})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["Cache-Control"], "no-cache")
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.data, b"")
+
     def test_api_game_live_returns_503_when_live_data_is_unavailable(self):
         with patch("web.public_routes.fetch_live_game_detail", return_value=None):
             response = self.client.get("/api/games/0022500999/live")
@@ -0,0 +1,89 @@
+import json
+from functools import partial
+from unittest.mock import patch
+
+from web import live_game_data
+from web.live_game_data import fetch_live_game_detail
+from web.live_game_stream import LiveGameHub, build_live_game_state, diff_live_state
+from web.live_scoreboard import LiveScoreboard
+
+from tests.nba_live_stubs import FakeLiveNBA
+
+_GAME_ID = "0022500999"
+
+
+def _no_redis():
+    raise ConnectionError("redis down")
+
+
+def _frames(stream, count):
+    """The next ``count`` events (keepalives skipped) as (id, event, data)."""
+    frames = []
+    while len(frames) < count:
+        chunk = next(stream)
+        if chunk.startswith((":", "retry:")):
+            continue
+        fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+        frames.append((fields.get("id"), fields["event"], json.loads(fields["data"])))
+    return frames
+
+
+def _action(nba, **fields):
+    action = {"period": 3, "clock": "PT04M00.00S", "actionType": "2pt", "teamId": 1610612738, "personId": 2738}
+    action.update(fields)
+    return nba.add_action(_GAME_ID, **action)
+
+
+def test_streams_send_one_snapshot_then_only_new_plays_and_changed_fields():
+    now = [1_000.0]
+    nba = FakeLiveNBA()
+    nba.add_game(_GAME_ID, home_score=2, road_score=0)
+    _action(nba, description="Layup", scoreHome="2", scoreAway="0")
+    hub = LiveGameHub(
+        lambda game_id: build_live_game_state(game_id, fetch_live_game_detail, lambda _game_id: None),
+        board_factory=partial(LiveScoreboard, refresh_seconds=1, redis_factory=_no_redis, clock=lambda: now[0]),
+        poll_seconds=0.01,
+    )
+    seen_rows = []
+
+    def _decorate(kind, payload):
+        seen_rows.append(kind)
+        return payload
+
+    with nba.install(), patch.dict(live_game_data._LIVE_PBP_STATES, clear=True):
+        viewers = [hub.stream(_GAME_ID, None, lang="en", decorate=_decorate, keepalive_seconds=0.2) for _ in range(3)]
+        snapshots = [_frames(viewer, 1)[0] for viewer in viewers]
+        event_id, kind, state = snapshots[0]
+        assert kind == "snapshot"
+        assert {frame[0] for frame in snapshots} == {event_id}
+        assert [row["description"] for row in state["pbp_rows"]] == ["Layup"]
+
+        _action(nba, description="Jumper", scoreHome="2", scoreAway="2", teamId=1610612747, personId=2747)
+        nba.update(_GAME_ID, road_score=2, clock="PT03M41.00S")
+        now[0] += 2
+        diffs = [_frames(viewer, 1)[0] for viewer in viewers]
+
+    _, kind, diff = diffs[0]
+    assert kind == "diff"
+    assert [row["description"] for row in diff["pbp_new"]] == ["Jumper"]
+    assert diff["summary"] == {"road_score": 2, "clock": "3:41", "summary": "Q3 3:41"}
+    assert [point["road"] for point in diff["progression_new"]] == [2]
+    assert set(diff["players"]) == {"1610612747"}  # only the road scorer's row changed
+    assert "pbp_rows" not in diff.get("set", {})
+    assert seen_rows == ["snapshot", "diff"]  # serialised once, not per viewer
+    assert nba.calls["playbyplay"] == 2
+
+    # A reconnect with Last-Event-ID catches up from history; an unknown id gets a fresh snapshot.
+    resumed = hub.stream(_GAME_ID, event_id, lang="en", decorate=_decorate, max_seconds=1)
+    assert _frames(resumed, 1)[0][1:] == ("diff", diff)
+    restarted = hub.stream(_GAME_ID, "another-worker:7", lang="en", decorate=_decorate, max_seconds=1)
+    assert _frames(restarted, 1)[0][1] == "snapshot"
+    for viewer in viewers:
+        viewer.close()
+
+
+def test_rewritten_history_is_resent_whole():
+    previous = {"pbp_rows": [{"event_num": 2}, {"event_num": 1}], "score_progression": [{"t": 0}], "team_stats": [1]}
+    current = {"pbp_rows": [{"event_num": 3}, {"event_num": 1}], "score_progression": [{"t": 0}], "team_stats": [1]}
+    assert diff_live_state(previous, current) == {"set": {"pbp_rows": current["pbp_rows"]}}
+    assert diff_live_state(current, current) == {}
@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+from unittest.mock import patch
+
+from web import live_game_data
+from web.live_game_data import fetch_live_card, fetch_live_scoreboard_map
+from web.live_scoreboard import LiveScoreboard, build_live_games_payload
+
+from tests.nba_live_stubs import FakeLiveNBA
+
+
+class _FakeRedis:
+    """GET / SET NX PX EX with expiry on the test's clock."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.values: dict[str, tuple[object, float | None]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        value, expires_at = self.values.get(key, (None, None))
+        if expires_at is not None and expires_at <= self.clock():
+            return None
+        return value
+
+    def set(self, key, value, nx=False, px=None, ex=None):
+        with self._lock:
+            if nx and self.get(key) is not None:
+                return None
+            ttl = px / 1000 if px else ex
+            self.values[key] = (value, self.clock() + ttl if ttl else None)
+            return True
+
+
+def _slate() -> FakeLiveNBA:
+    nba = FakeLiveNBA()
+    nba.add_game("0022500999", home_score=99, road_score=101)
+    nba.add_game("0022501000", status=1, period=0, clock="")
+    return nba
+
+
+def _wait_for_refresh(board: LiveScoreboard, previous, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        snapshot = board.snapshot()
+        if snapshot.fetched_at != previous.fetched_at:
+            return snapshot
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_concurrent_pollers_across_workers_share_one_upstream_round():
+    now = [1_000.0]
+    redis = _FakeRedis(lambda: now[0])
+    nba = _slate()
+    nba.delay = 0.2
+    workers = [
+        LiveScoreboard(
+            lambda: build_live_games_payload(fetch_live_scoreboard_map, fetch_live_card),
+            refresh_seconds=10,
+            redis_factory=lambda: redis,
+            clock=lambda: now[0],
+        )
+        for _ in range(2)
+    ]
+    bodies = []
+    with nba.install(), patch.dict(live_game_data._LIVE_CARD_CACHE, clear=True):
+        threads = [threading.Thread(target=lambda board=board: bodies.append(board.snapshot())) for board in workers * 4]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert nba.calls == {"scoreboard": 1, "boxscore": 1}  # one live game; the upcoming one needs no boxscore
+        assert len({snapshot.etag for snapshot in bodies}) == 1
+        games = json.loads(bodies[0].body)["games"]
+        assert [game["game_id"] for game in games] == ["0022500999", "0022501000"]
+        assert games[0]["road_scorer"]["value"] == 101
+
+        nba.delay = 0.0
+        first = workers[0].snapshot()
+        assert workers[1].snapshot() == first
+        assert nba.calls["scoreboard"] == 1  # fresh: served from memory
+
+        now[0] += 11
+        stale = workers[0].snapshot()
+        assert stale == first  # stale-while-revalidate: never waits once warm
+        unchanged = _wait_for_refresh(workers[0], first)
+        assert unchanged.etag == first.etag  # same scoreboard, same ETag: clients get 304s
+
+        now[0] += 11
+        live_game_data._LIVE_CARD_CACHE.clear()
+        nba.update("0022500999", home_score=102)
+        changed = _wait_for_refresh(workers[1], workers[1].snapshot())
+        assert changed.etag != first.etag
+        assert json.loads(changed.body)["games"][0]["home_score"] == 102
+        assert nba.calls["scoreboard"] == 3
+
+
+def test_each_process_fetches_for_itself_when_redis_is_down():
+    nba = _slate()
+
+    def _no_redis():
+        raise ConnectionError("redis down")
+
+    board = LiveScoreboard(
+        lambda: build_live_games_payload(fetch_live_scoreboard_map, fetch_live_card),
+        redis_factory=_no_redis,
+    )
+    with nba.install(), patch.dict(live_game_data._LIVE_CARD_CACHE, clear=True):
+        first = board.snapshot()
+        assert board.snapshot() is first
+    assert json.loads(first.body)["games"][0]["status"] == "live"
+    assert nba.calls == {"scoreboard": 1, "boxscore": 1}
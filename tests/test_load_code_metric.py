@@ -21,7 +21,9 @@ def _make_fake_db_models():
     module.engine = MagicMock()
 
     class FakeMetricDefinitionModel:
-        pass
+        # Columns read by the registry version token.
+        id = None
+        updated_at = None
 
     module.MetricDefinition = FakeMetricDefinitionModel
     return module
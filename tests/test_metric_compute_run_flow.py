@@ -73,6 +73,64 @@ def test_compute_game_delta_computes_when_not_already_done():
     assert result["produced"] is True
 
 
+def test_compute_game_deltas_skips_computed_metrics_and_bumps_produced_runs():
+    session_a = _ctx(MagicMock())
+    session_b = _ctx(MagicMock())
+    session_c = _ctx(MagicMock())
+    session_a.query.return_value.filter.return_value.distinct.return_value.all.return_value = [
+        SimpleNamespace(metric_key="metric_a"),
+    ]
+
+    metrics_tasks.compute_game_deltas.push_request(id="worker-1")
+    try:
+        with patch.object(
+            metrics_tasks,
+            "_session_factory",
+            return_value=MagicMock(side_effect=[session_a, session_b, session_c]),
+        ), patch.object(
+            metrics_tasks,
+            "run_deltas_for_game",
+            return_value={"metric_b": True, "metric_c": False},
+        ) as run_deltas, patch.object(
+            metrics_tasks.compute_game_deltas, "retry", side_effect=AssertionError("retry not expected")
+        ):
+            results = metrics_tasks.compute_game_deltas.run(
+                "g1",
+                ["metric_a", "metric_b", "metric_c"],
+                run_ids={"metric_a": "run-a", "metric_b": "run-b", "metric_c": "run-c"},
+            )
+    finally:
+        metrics_tasks.compute_game_deltas.pop_request()
+
+    run_deltas.assert_called_once_with(session_b, "g1", ["metric_b", "metric_c"], commit=True)
+    assert results == [
+        {"game_id": "g1", "metric_key": "metric_a", "skipped": True, "reason": "already_computed"},
+        {"game_id": "g1", "metric_key": "metric_b", "produced": True},
+        {"game_id": "g1", "metric_key": "metric_c", "produced": False},
+    ]
+    session_c.query.return_value.filter.return_value.update.assert_called_once()
+    session_c.commit.assert_called_once()
+
+
+def test_reduce_after_ingest_reads_batched_map_results():
+    session_a = _ctx(MagicMock())
+    session_b = _ctx(MagicMock())
+    session_a.query.return_value.filter.return_value.first.return_value = SimpleNamespace(season="22025")
+
+    with patch.object(metrics_tasks, "_session_factory", return_value=MagicMock(side_effect=[session_a, session_b])), \
+         patch.object(metrics_tasks.reduce_metric_season_task, "delay") as delay:
+        result = metrics_tasks.reduce_after_ingest.run(
+            [[
+                {"game_id": "g1", "metric_key": "metric_a", "produced": True},
+                {"game_id": "g1", "metric_key": "metric_b", "produced": False},
+            ]],
+            game_id="g1",
+        )
+
+    delay.assert_called_once_with("metric_a", "22025", incremental=True)
+    assert result["enqueued"] == 1
+
+
 def test_sweeper_promotes_stuck_mapping_run_after_timeout():
     from datetime import datetime, timedelta
 
@@ -260,3 +318,19 @@ def test_compute_season_metric_marks_run_failed_on_terminal_non_deadlock_error()
     mark_failed.assert_called_once()
     assert mark_failed.call_args.args[1] == "run-1"
     assert "season 22025 failed" in mark_failed.call_args.args[2]
+
+
+def test_map_phase_announces_only_metrics_that_wrote_results_directly():
+    session = MagicMock()
+    session.query.return_value.filter.return_value.scalar.return_value = "22025"
+    metrics = {
+        "game_score": SimpleNamespace(incremental=False),
+        "pts_avg": SimpleNamespace(incremental=True),
+        "idle": SimpleNamespace(incremental=False),
+    }
+
+    with patch.object(metrics_tasks, "get_metric", side_effect=lambda key, session: metrics.get(key)), \
+         patch.object(metrics_tasks, "_announce_metric_results") as announce:
+        metrics_tasks._announce_map_results(session, "g1", {"game_score": True, "pts_avg": True, "idle": False})
+
+    announce.assert_called_once_with("game_score", ["22025"])
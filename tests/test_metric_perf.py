@@ -23,7 +23,7 @@ def _import_runner_module():
     original_runtime = sys.modules.get("metrics.framework.runtime")
 
     fake_models = types.ModuleType("db.models")
-    for name in ("Game", "MetricPerfLog", "MetricResult", "MetricRunLog", "PlayerGameStats", "Team"):
+    for name in ("Game", "GameArtifactStatus", "MetricPerfLog", "MetricResult", "MetricResultCount", "MetricRunLog", "MetricRunningTotal", "PlayerGameStats", "Team"):
         setattr(fake_models, name, MagicMock())
     sys.modules["db.models"] = fake_models
 
@@ -168,16 +168,17 @@ class TestSeasonMetricRunnerFailures(unittest.TestCase):
         session = MagicMock()
         session.connection.return_value = connection
 
-        with runner._metric_result_write_lock(session, timeout_seconds=42):
+        with runner._metric_result_write_lock(session, ["metric_a", "metric_a"], timeout_seconds=42):
             pass
 
         self.assertEqual(connection.execute.call_count, 2)
         acquire_call, release_call = connection.execute.call_args_list
         self.assertIn("GET_LOCK", str(acquire_call.args[0]))
-        self.assertEqual(acquire_call.args[1]["name"], runner._METRIC_RESULT_WRITE_LOCK_NAME)
+        self.assertEqual(acquire_call.args[1]["name"], runner._metric_result_lock_name("metric_a"))
+        self.assertTrue(acquire_call.args[1]["name"].startswith(runner._METRIC_RESULT_WRITE_LOCK_NAME))
         self.assertEqual(acquire_call.args[1]["timeout_seconds"], 42)
         self.assertIn("RELEASE_LOCK", str(release_call.args[0]))
-        self.assertEqual(release_call.args[1]["name"], runner._METRIC_RESULT_WRITE_LOCK_NAME)
+        self.assertEqual(release_call.args[1]["name"], runner._metric_result_lock_name("metric_a"))
 
     def test_run_season_metric_raises_for_missing_metric(self):
         runner = _import_runner_module()
@@ -243,6 +244,9 @@ class TestSeasonMetricRunnerFailures(unittest.TestCase):
             runner,
             "_flush_run_logs",
             side_effect=lambda *_args, **_kwargs: events.append("flush_run_logs"),
+        ), patch.object(
+            runner,
+            "refresh_metric_pool",
         ), patch.object(
             runner,
             "_record_metric_perf",
@@ -295,9 +299,9 @@ class TestSeasonMetricRunnerFailures(unittest.TestCase):
             ("player", "p2"),
         ]
         delta_query_1 = MagicMock()
-        delta_query_1.filter.return_value.order_by.return_value.all.return_value = [('{"pts": 5}',)]
+        delta_query_1.filter.return_value.order_by.return_value.all.return_value = [("g1", '{"pts": 5}')]
         delta_query_2 = MagicMock()
-        delta_query_2.filter.return_value.order_by.return_value.all.return_value = [('{"pts": 2}',)]
+        delta_query_2.filter.return_value.order_by.return_value.all.return_value = [("g1", '{"pts": 2}')]
         session = MagicMock()
         session.query.side_effect = [entity_query, delta_query_1, delta_query_2]
 
@@ -308,8 +312,10 @@ class TestSeasonMetricRunnerFailures(unittest.TestCase):
         with patch.object(runner, "get_metric", return_value=metric), \
              patch.object(runner, "_count_db_ops", side_effect=_fake_count_db_ops), \
              patch.object(runner, "_flush_results") as flush_mock, \
+             patch.object(runner, "_replace_running_totals"), \
+             patch.object(runner, "refresh_metric_pool"), \
              patch.object(runner, "_record_metric_perf"):
-            written = runner.reduce_metric(session, "metric_a", "22025", commit=False)
+            written = runner.reduce_metric(session, "metric_a", "22025", commit=False, streaming=False)
 
         self.assertEqual(written, 1)
         flush_mock.assert_called_once()
@@ -317,6 +323,46 @@ class TestSeasonMetricRunnerFailures(unittest.TestCase):
         self.assertEqual(len(persisted_results), 2)
         self.assertEqual(getattr(persisted_results[0], "entity_id", None), "p1")
 
+    def test_reduce_metric_streaming_reads_all_deltas_in_one_query(self):
+        runner = _import_runner_module()
+        metric = SimpleNamespace(
+            incremental=True,
+            compute_value=MagicMock(side_effect=[SimpleNamespace(entity_id="p1", context=None), None]),
+        )
+
+        stream_query = MagicMock()
+        stream_query.filter.return_value.order_by.return_value.yield_per.return_value = [
+            ("player", "p1", "g1", '{"pts": 5}'),
+            ("player", "p1", "g2", None),
+            ("player", "p1", "g3", '{"pts": 3}'),
+            ("player", "p2", "g1", '{"pts": 2}'),
+        ]
+        session = MagicMock()
+        session.query.side_effect = [stream_query]
+
+        @contextmanager
+        def _fake_count_db_ops(_session):
+            yield lambda: (0, 0)
+
+        with patch.object(runner, "get_metric", return_value=metric), \
+             patch.object(runner, "merge_totals", side_effect=lambda t, d: {k: t.get(k, 0) + d.get(k, 0) for k in {*t, *d}}), \
+             patch.object(runner, "_count_db_ops", side_effect=_fake_count_db_ops), \
+             patch.object(runner, "_flush_results") as flush_mock, \
+             patch.object(runner, "_replace_running_totals"), \
+             patch.object(runner, "refresh_metric_pool"), \
+             patch.object(runner, "_record_metric_perf"):
+            written = runner.reduce_metric(session, "metric_a", "22025", commit=False)
+
+        self.assertEqual(written, 1)
+        self.assertEqual(session.query.call_count, 1)
+        self.assertEqual(
+            [call.args[:3] for call in metric.compute_value.call_args_list],
+            [({"pts": 8}, "22025", "p1"), ({"pts": 2}, "22025", "p2")],
+        )
+        persisted_results = flush_mock.call_args.args[1]
+        self.assertEqual(len(persisted_results), 2)
+        self.assertEqual(persisted_results[0].context, {"pts": 8})
+
 
 class TestMetricPerfAdminPanel(unittest.TestCase):
     def test_load_admin_metric_perf_panel_builds_latest_counts_and_samples(self):
@@ -336,6 +382,7 @@ class TestMetricPerfAdminPanel(unittest.TestCase):
                 recorded_at=datetime(2026, 3, 30, 1, 2, 3),
                 db_reads=7,
                 db_writes=2,
+                lock_wait_ms=12,
             ),
             SimpleNamespace(
                 metric_key="slow_metric",
@@ -343,6 +390,7 @@ class TestMetricPerfAdminPanel(unittest.TestCase):
                 recorded_at=datetime(2026, 3, 29, 1, 2, 3),
                 db_reads=6,
                 db_writes=1,
+                lock_wait_ms=0,
             ),
             SimpleNamespace(
                 metric_key="slow_metric",
@@ -350,6 +398,7 @@ class TestMetricPerfAdminPanel(unittest.TestCase):
                 recorded_at=datetime(2026, 3, 28, 1, 2, 3),
                 db_reads=5,
                 db_writes=1,
+                lock_wait_ms=None,
             ),
         ]
 
@@ -381,6 +430,7 @@ class TestMetricPerfAdminPanel(unittest.TestCase):
         self.assertEqual(row["latest_ms"], 150)
         self.assertEqual(row["db_reads"], 7)
         self.assertEqual(row["db_writes"], 2)
+        self.assertEqual(row["lock_wait_ms"], 12)
         self.assertEqual(row["samples_ms"], [150, 130, 120])
 
 
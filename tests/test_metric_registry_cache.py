@@ -0,0 +1,109 @@
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+
+
+_T0 = datetime(2026, 1, 1)
+
+
+pytestmark = pytest.mark.real_db_models(
+    ("Base", "MetricDefinition"),
+    {"runtime": "metrics.framework.runtime"},
+)
+
+
+def _session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine, tables=[MetricDefinition.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def _add_rule_metric(session, key, *, name=None, status="published", updated_at=_T0):
+    session.add(
+        MetricDefinition(
+            key=key,
+            family_key=key,
+            variant="season",
+            managed_family=False,
+            name=name or key,
+            scope="player",
+            source_type="rule",
+            status=status,
+            definition_json=json.dumps({"source": "player_game_stats", "aggregation": "avg", "stat": "pts"}),
+            min_sample=1,
+            story_score_bonus=0,
+            fill_missing_sub_keys_with_zero=False,
+            created_at=_T0,
+            updated_at=updated_at,
+        )
+    )
+    session.commit()
+
+
+def _statements(session):
+    statements = []
+    event.listen(
+        session.get_bind(),
+        "before_cursor_execute",
+        lambda *args, **kwargs: statements.append(args[2]),
+    )
+    return statements
+
+
+def test_cached_lookups_cost_no_queries_until_the_check_interval_expires():
+    session = _session()
+    _add_rule_metric(session, "pts_avg")
+    first = runtime.get_metric("pts_avg", session=session)
+    runtime.get_all_metrics(session=session)
+    statements = _statements(session)
+
+    assert runtime.get_metric("pts_avg", session=session) is first
+    assert [m.key for m in runtime.get_all_metrics(session=session)] == ["pts_avg"]
+    assert statements == []
+
+    with patch.object(runtime, "_REGISTRY_CHECK_SECONDS", 0):
+        assert runtime.get_metric("pts_avg", session=session) is first
+    assert len(statements) == 1  # version token only; nothing rebuilt
+
+
+def test_edit_in_another_process_is_picked_up_through_the_version_token():
+    session = _session()
+    _add_rule_metric(session, "pts_avg", name="Points")
+    assert runtime.get_metric("pts_avg", session=session).name == "Points"
+
+    row = session.query(MetricDefinition).filter_by(key="pts_avg").one()
+    row.name = "Points Per Game"
+    row.updated_at = _T0 + timedelta(minutes=1)
+    session.commit()
+
+    assert runtime.get_metric("pts_avg", session=session).name == "Points"
+    with patch.object(runtime, "_REGISTRY_CHECK_SECONDS", 0):
+        assert runtime.get_metric("pts_avg", session=session).name == "Points Per Game"
+
+
+def test_newly_published_metric_is_found_without_waiting_and_invalidate_clears():
+    session = _session()
+    _add_rule_metric(session, "pts_avg")
+    assert [m.key for m in runtime.get_all_metrics(session=session)] == ["pts_avg"]
+
+    _add_rule_metric(session, "reb_avg", updated_at=_T0)
+    assert runtime.get_metric("reb_avg", session=session).key == "reb_avg"
+
+    runtime.invalidate_metric_registry()
+    assert {m.key for m in runtime.get_all_metrics(session=session)} == {"pts_avg", "reb_avg"}
+
+
+def test_cached_metric_survives_caller_session_commit_and_close():
+    session = _session()
+    _add_rule_metric(session, "pts_avg")
+    metric = runtime.get_metric("pts_avg", session=session)
+    session.commit()
+    session.close()
+
+    assert [sibling.key for sibling in metric.make_window_siblings()] == []
+    assert metric._base_row.key == "pts_avg"
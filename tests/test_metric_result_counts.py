@@ -0,0 +1,99 @@
+from contextlib import nullcontext
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+pytestmark = pytest.mark.real_db_models(
+    ("Base", "MetricResult", "MetricResultCount"),
+    {"runner": "metrics.framework.runner"},
+    reload=("db.game_artifact_status",),
+)
+
+
+def _session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine, tables=[MetricResult.__table__, MetricResultCount.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def _add(session, metric_key, season, entity_id):
+    session.add(
+        MetricResult(
+            metric_key=metric_key,
+            entity_type="player",
+            entity_id=entity_id,
+            season=season,
+            sub_key="",
+            value_num=1.0,
+            computed_at=datetime(2026, 1, 1),
+        )
+    )
+
+
+def _counts(session):
+    return {(row.metric_key, row.season): row.row_count for row in session.query(MetricResultCount)}
+
+
+def test_reconcile_rebuilds_summary_from_metric_result():
+    session = _session()
+    for entity_id in ("p1", "p2", "p3"):
+        _add(session, "pts", "22025", entity_id)
+    _add(session, "pts", "22024", "p1")
+    _add(session, "reb", None, "p1")
+    session.add(MetricResultCount(metric_key="pts", season="22025", row_count=99, updated_at=datetime(2026, 1, 1)))
+    session.add(MetricResultCount(metric_key="gone", season="22025", row_count=5, updated_at=datetime(2026, 1, 1)))
+    session.commit()
+
+    assert runner.reconcile_result_counts(session) == {"pools": 3, "updated": 3, "removed": 1}
+    assert _counts(session) == {("pts", "22025"): 3, ("pts", "22024"): 1, ("reb", ""): 1}
+    assert runner.reconcile_result_counts(session) == {"pools": 3, "updated": 0, "removed": 0}
+
+
+def test_single_row_inserts_bump_the_pool_and_seed_missing_pools_with_a_count():
+    session = _session()
+    _add(session, "pts", "22025", "p1")
+    _add(session, "pts", "22025", "p2")
+    session.flush()
+
+    runner._bump_result_count(session, "pts", "22025")
+    assert _counts(session) == {("pts", "22025"): 2}
+
+    _add(session, "pts", "22025", "p3")
+    session.flush()
+    runner._bump_result_count(session, "pts", "22025")
+    assert _counts(session) == {("pts", "22025"): 3}
+
+    runner.clear_result_counts(session, ["pts", "pts_career"])
+    assert _counts(session) == {}
+
+
+def test_single_row_upserts_count_only_rows_that_did_not_exist(monkeypatch):
+    from metrics.framework.base import MetricResult as Result
+
+    session = _session()
+    _add(session, "pts", "22025", "p1")
+    session.flush()
+    runner._store_result_count(session, "pts", "22025", 1)
+    execute = session.execute
+    upserts = []
+
+    def _execute(statement, *args, **kwargs):
+        if getattr(statement, "is_insert", False) and statement.table.name == "MetricResult":
+            upserts.append(statement)
+            return SimpleNamespace(rowcount=1)  # CLIENT_FOUND_ROWS reports 1 for updates too
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(session, "execute", _execute)
+    monkeypatch.setattr(runner, "_metric_result_write_lock", lambda *args, **kwargs: nullcontext())
+    for entity_id in ("p1", "p2"):
+        runner._upsert_result(
+            session,
+            Result(metric_key="pts", entity_type="player", entity_id=entity_id, season="22025", game_id=None, value_num=2.0),
+        )
+
+    assert len(upserts) == 2
+    assert _counts(session) == {("pts", "22025"): 2}
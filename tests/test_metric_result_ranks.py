@@ -0,0 +1,113 @@
+from contextlib import nullcontext
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+
+pytestmark = pytest.mark.real_db_models(
+    ("Base", "MetricResult", "MetricResultCount"),
+    {"runner": "metrics.framework.runner"},
+)
+
+
+def _session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine, tables=[MetricResult.__table__, MetricResultCount.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def _metric(rank_order="desc", sub_key_type=None):
+    return SimpleNamespace(incremental=True, trigger="game", sub_key_type=sub_key_type, rank_order=rank_order)
+
+
+def _add(session, entity_id, value, *, metric_key="pts", season="22025", entity_type="player", rank_group=None):
+    session.add(
+        MetricResult(
+            metric_key=metric_key,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            season=season,
+            sub_key="",
+            rank_group=rank_group,
+            value_num=value,
+            computed_at=datetime(2026, 1, 1),
+        )
+    )
+
+
+def _refresh(session, metric, metric_key="pts", season="22025"):
+    with patch.object(runner, "_metric_result_write_lock", lambda _session, _keys: nullcontext()):
+        return runner.refresh_metric_pool(session, metric_key, season, metric)
+
+
+def _ranks(session, metric_key="pts"):
+    return {
+        (row.entity_type, row.entity_id): (row.peer_rank, row.peer_total)
+        for row in session.query(MetricResult).filter(MetricResult.metric_key == metric_key)
+    }
+
+
+def test_refresh_writes_competition_ranks_per_entity_type_and_rank_group():
+    session = _session()
+    for entity_id, value in (("p1", 30.0), ("p2", 25.0), ("p3", 30.0), ("p4", None)):
+        _add(session, entity_id, value)
+    _add(session, "g1", 12.0, rank_group="guard")
+    _add(session, "g2", 18.0, rank_group="guard")
+    _add(session, "t1", 99.0, entity_type="team")
+    _add(session, "p9", 50.0, season="22024")
+    session.commit()
+
+    assert _refresh(session, _metric()) == 6  # p4 has no value and stays NULL
+
+    assert _ranks(session) == {
+        ("player", "p1"): (1, 3),
+        ("player", "p3"): (1, 3),
+        ("player", "p2"): (3, 3),
+        ("player", "p4"): (None, None),
+        ("player", "g1"): (2, 2),
+        ("player", "g2"): (1, 2),
+        ("team", "t1"): (1, 1),
+        ("player", "p9"): (None, None),  # other season untouched
+    }
+
+
+def test_refresh_rewrites_only_changed_rows_and_respects_asc_order():
+    session = _session()
+    for entity_id, value in (("p1", 3.5), ("p2", 1.2), ("p3", 2.0)):
+        _add(session, entity_id, value, metric_key="tov")
+    session.commit()
+    assert _refresh(session, _metric("asc"), metric_key="tov") == 3
+    assert _ranks(session, "tov")[("player", "p2")] == (1, 3)
+
+    session.query(MetricResult).filter(MetricResult.entity_id == "p1").update({"value_num": 5.0})
+    session.commit()
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *a, **k: statements.append(a[2]))
+    assert _refresh(session, _metric("asc"), metric_key="tov") == 0
+    assert [sql.split()[0] for sql in statements] == ["SELECT", "UPDATE"]  # pool read + count row
+    assert "MetricResultCount" in statements[1]
+
+    _add(session, "p4", 0.5, metric_key="tov")
+    session.commit()
+    assert _refresh(session, _metric("asc"), metric_key="tov") == 4
+    assert _ranks(session, "tov") == {
+        ("player", "p4"): (1, 4),
+        ("player", "p2"): (2, 4),
+        ("player", "p3"): (3, 4),
+        ("player", "p1"): (4, 4),
+    }
+
+
+def test_split_and_per_game_metrics_are_left_to_the_query_time_fallback():
+    session = _session()
+    _add(session, "p1", 10.0)
+    session.commit()
+
+    assert _refresh(session, _metric(sub_key_type="opponent")) == 0
+    assert _refresh(session, SimpleNamespace(incremental=False, trigger="game", sub_key_type=None)) == 0
+    assert _ranks(session) == {("player", "p1"): (None, None)}
+    assert _refresh(session, SimpleNamespace(incremental=False, trigger="season", sub_key_type=None)) == 1
@@ -0,0 +1,128 @@
+"""Concurrency tests for the sharded MetricResult write lock.
+
+MySQL named locks are emulated by an in-process shim: ``GET_LOCK`` /
+``RELEASE_LOCK`` statements map onto ``threading.Lock`` objects keyed by name,
+and each MetricResult upsert sleeps for a fixed "write" time. Under the old
+single global lock N reduces serialize to ~N x write time; with per-metric
+shards they overlap.
+"""
+import threading
+import time
+
+from metrics.framework import runner
+from metrics.framework.base import MetricResult
+
+
+_WRITE_SECONDS = 0.2
+
+
+class _NamedLockShim:
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks: dict[str, threading.Lock] = {}
+        self.acquired: list[str] = []
+
+    def _lock(self, name: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def execute(self, statement, params):
+        sql = str(statement)
+        if "GET_LOCK" in sql:
+            ok = self._lock(params["name"]).acquire(timeout=params["timeout_seconds"])
+            if ok:
+                with self._guard:
+                    self.acquired.append(params["name"])
+            return _Scalar(1 if ok else 0)
+        if "RELEASE_LOCK" in sql:
+            self._lock(params["name"]).release()
+            return _Scalar(1)
+        raise AssertionError(f"unexpected statement {sql}")
+
+
+class _Scalar:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar(self):
+        return self._value
+
+
+class _WriteSession:
+    def __init__(self, lock_shim):
+        self._lock_shim = lock_shim
+        self.info = {}
+
+    def connection(self):
+        return self._lock_shim
+
+    def execute(self, _stmt):
+        time.sleep(_WRITE_SECONDS)
+
+
+def _distinct_shard_metric_keys(count: int) -> list[str]:
+    keys: list[str] = []
+    seen: set[str] = set()
+    index = 0
+    while len(keys) < count:
+        key = f"metric_{index}"
+        name = runner._metric_result_lock_name(key)
+        if name not in seen:
+            seen.add(name)
+            keys.append(key)
+        index += 1
+    return keys
+
+
+def _result(metric_key: str) -> MetricResult:
+    return MetricResult(
+        metric_key=metric_key,
+        entity_type="player",
+        entity_id="p1",
+        season="22025",
+        game_id=None,
+        value_num=1.0,
+    )
+
+
+def _run_parallel_flushes(metric_keys: list[str]) -> tuple[float, list[_WriteSession]]:
+    shim = _NamedLockShim()
+    sessions = [_WriteSession(shim) for _ in metric_keys]
+    threads = [
+        threading.Thread(target=runner._flush_results, args=(session, [_result(metric_key)]))
+        for session, metric_key in zip(sessions, metric_keys)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, sessions
+
+
+def test_parallel_reduces_for_unrelated_metrics_do_not_serialize():
+    workers = 4
+    elapsed, sessions = _run_parallel_flushes(_distinct_shard_metric_keys(workers))
+
+    # Fully serialized would take workers * _WRITE_SECONDS (0.8s); sharded ≈ 1/N of that.
+    assert elapsed < _WRITE_SECONDS * workers / 2
+    assert all(session.info[runner._LOCK_WAIT_INFO_KEY] < _WRITE_SECONDS * 1000 / 2 for session in sessions)
+
+
+def test_parallel_reduces_for_same_metric_still_serialize_and_record_lock_wait():
+    workers = 3
+    elapsed, sessions = _run_parallel_flushes(["metric_a"] * workers)
+
+    assert elapsed >= _WRITE_SECONDS * workers * 0.9
+    waits = sorted(session.info[runner._LOCK_WAIT_INFO_KEY] for session in sessions)
+    assert waits[-1] >= _WRITE_SECONDS * 1000 * (workers - 1) * 0.9
+
+
+def test_multi_metric_flush_acquires_shards_in_sorted_order():
+    shim = _NamedLockShim()
+    session = _WriteSession(shim)
+    keys = _distinct_shard_metric_keys(3)
+
+    runner._flush_results(session, [_result(key) for key in reversed(keys)])
+
+    assert shim.acquired == sorted(runner._metric_result_lock_name(key) for key in keys)
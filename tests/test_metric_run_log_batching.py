@@ -44,3 +44,36 @@ def test_flush_run_logs_noops_for_empty_batch():
     sess = DummySession()
     _flush_run_logs(sess, [])
     assert sess.calls == 0
+
+
+def test_run_deltas_for_game_shares_targets_and_flushes_once():
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock, patch
+
+    from metrics.framework import runner
+
+    session = MagicMock()
+    game = SimpleNamespace(game_id="game-1", season="22025")
+    metrics = {
+        "metric_a": SimpleNamespace(key="metric_a", trigger="game"),
+        "metric_b": SimpleNamespace(key="metric_b", trigger="game"),
+        "metric_season": SimpleNamespace(key="metric_season", trigger="season"),
+    }
+
+    def _map(_session, _game, _players, _teams, metric_def):
+        if metric_def.key == "metric_b":
+            raise RuntimeError("boom")
+        return True, [{"metric_key": metric_def.key}]
+
+    with patch.object(runner, "_game_targets_context", return_value=(game, ["p1"], ["t1"])) as targets, \
+         patch.object(runner, "get_metric", side_effect=lambda key, session=None: metrics.get(key)), \
+         patch.object(runner, "_map_metric_for_game", side_effect=_map), \
+         patch.object(runner, "_flush_run_logs") as flush:
+        produced = runner.run_deltas_for_game(
+            session, "game-1", ["metric_a", "metric_b", "metric_season", "missing"]
+        )
+
+    targets.assert_called_once_with(session, "game-1")
+    flush.assert_called_once_with(session, [{"metric_key": "metric_a"}])
+    session.commit.assert_called_once()
+    assert produced == {"metric_a": True, "metric_b": False, "metric_season": False, "missing": False}
@@ -0,0 +1,178 @@
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from metrics.framework.base import MetricResult
+
+
+pytestmark = pytest.mark.real_db_models(
+    ("Base", "MetricPerfLog", "MetricRunLog", "MetricRunningTotal"),
+    {"runner": "metrics.framework.runner"},
+    reload=("db.game_artifact_status",),
+)
+
+
+def _session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(
+        engine,
+        tables=[MetricRunLog.__table__, MetricRunningTotal.__table__, MetricPerfLog.__table__],
+    )
+    return sessionmaker(bind=engine)()
+
+
+class _PointsMetric:
+    key = "metric_pts"
+    incremental = True
+
+    def __init__(self):
+        self.calls = []
+
+    def compute_value(self, totals, season, entity_id):
+        self.calls.append(entity_id)
+        if totals.get("games", 0) < 2:
+            return None
+        return MetricResult(
+            metric_key=self.key,
+            entity_type="player",
+            entity_id=entity_id,
+            season=season,
+            game_id=None,
+            value_num=totals["pts"] / totals["games"],
+        )
+
+
+def _add_delta(session, game_id, entity_id, pts, note=None):
+    delta = {"games": 1, "pts": pts}
+    if note is not None:
+        delta["note"] = note
+    session.add(
+        MetricRunLog(
+            game_id=game_id,
+            metric_key="metric_pts",
+            entity_type="player",
+            entity_id=entity_id,
+            season="22025",
+            computed_at=datetime(2026, 1, 1),
+            produced_result=True,
+            delta_json=json.dumps(delta),
+        )
+    )
+    session.flush()
+
+
+def _reduce(session, metric, fn):
+    written = []
+    with patch.object(runner, "get_metric", return_value=metric), patch.object(
+        runner,
+        "_flush_results",
+        side_effect=lambda _session, results: written.extend(results),
+    ), patch.object(runner, "refresh_metric_pool"):
+        fn(session, "metric_pts", "22025", commit=True)
+    return {r.entity_id: runner._result_row(r)["context_json"] for r in written}
+
+
+def test_incremental_reduce_folds_only_new_deltas_and_matches_full_rebuild():
+    session = _session()
+    for game_id in ("0022500001", "0022500002", "0022500003"):
+        _add_delta(session, game_id, "p1", 10, note=game_id)
+        _add_delta(session, game_id, "p2", 4)
+    session.commit()
+    _reduce(session, _PointsMetric(), runner.reduce_metric)
+
+    _add_delta(session, "0022500004", "p1", 30, note="0022500004")
+    _add_delta(session, "0022500004", "p3", 7)
+    session.commit()
+
+    metric = _PointsMetric()
+    incremental = _reduce(session, metric, runner.reduce_metric_incremental)
+    assert sorted(metric.calls) == ["p1", "p3"]
+
+    full = _reduce(session, _PointsMetric(), runner.reduce_metric)
+    assert incremental == {key: full[key] for key in incremental}
+    checkpoint = session.get(MetricRunningTotal, ("metric_pts", "22025", "player", "p1"))
+    assert checkpoint.last_game_id == "0022500004"
+    assert checkpoint.folded_count == 4
+
+
+def test_incremental_reduce_refolds_entity_when_older_game_arrives_late():
+    session = _session()
+    for game_id in ("0022500002", "0022500003"):
+        _add_delta(session, game_id, "p1", 10, note=game_id)
+    session.commit()
+    _reduce(session, _PointsMetric(), runner.reduce_metric)
+
+    _add_delta(session, "0022500001", "p1", 99, note="0022500001")
+    session.commit()
+
+    incremental = _reduce(session, _PointsMetric(), runner.reduce_metric_incremental)
+    full = _reduce(session, _PointsMetric(), runner.reduce_metric)
+
+    assert incremental["p1"] == full["p1"]
+    assert json.loads(incremental["p1"]) == {"games": 3, "pts": 119, "note": "0022500003"}
+
+
+def test_incremental_reduce_refolds_entity_when_a_folded_game_is_remapped():
+    session = _session()
+    for game_id in ("0022500001", "0022500002"):
+        _add_delta(session, game_id, "p1", 10)
+        _add_delta(session, game_id, "p2", 4)
+    session.commit()
+    _reduce(session, _PointsMetric(), runner.reduce_metric)
+
+    # Same (count, max game_id) as the checkpoint; only the delta and computed_at change.
+    row = session.get(MetricRunLog, ("0022500001", "metric_pts", "player", "p1", "22025"))
+    row.delta_json = json.dumps({"games": 1, "pts": 30})
+    row.computed_at = datetime.utcnow()
+    session.commit()
+
+    metric = _PointsMetric()
+    incremental = _reduce(session, metric, runner.reduce_metric_incremental)
+
+    assert metric.calls == ["p1"]
+    assert json.loads(incremental["p1"]) == {"games": 2, "pts": 40}
+    assert incremental["p1"] == _reduce(session, _PointsMetric(), runner.reduce_metric)["p1"]
+    assert _reduce(session, _PointsMetric(), runner.reduce_metric_incremental) == {}
+
+
+def test_incremental_reduce_bounds_the_remap_scan_by_the_oldest_checkpoint():
+    session = _session()
+    for game_id in ("0022500001", "0022500002"):
+        _add_delta(session, game_id, "p1", 10)
+        _add_delta(session, game_id, "p2", 4)
+    session.commit()
+    _reduce(session, _PointsMetric(), runner.reduce_metric)
+    oldest = min(row.updated_at for row in session.query(MetricRunningTotal))
+
+    statements = []
+    event.listen(
+        session.get_bind(),
+        "before_cursor_execute",
+        lambda _conn, _cursor, statement, parameters, _context, _many: statements.append((statement, parameters)),
+    )
+    _reduce(session, _PointsMetric(), runner.reduce_metric_incremental)
+
+    remap_scans = [
+        parameters
+        for statement, parameters in statements
+        if 'JOIN "MetricRunningTotal"' in statement and '"MetricRunLog".computed_at >=' in statement
+    ]
+    assert len(remap_scans) == 1
+    assert oldest.isoformat(" ") in [str(value) for value in remap_scans[0]]
+
+
+def test_incremental_reduce_without_checkpoint_runs_full_rebuild():
+    session = _session()
+    _add_delta(session, "0022500001", "p1", 10)
+    session.commit()
+
+    with patch.object(runner, "get_metric", return_value=_PointsMetric()), patch.object(
+        runner, "reduce_metric", return_value=0
+    ) as full_mock:
+        runner.reduce_metric_incremental(session, "metric_pts", "22025", commit=False)
+
+    full_mock.assert_called_once_with(session, "metric_pts", "22025", commit=False)
@@ -0,0 +1,160 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+
+pytestmark = pytest.mark.real_db_models(
+    ("Base", "Game", "MetricResult", "PlayerGameStats", "TeamGameStats"),
+    {"milestones": "metrics.framework.milestones"},
+)
+
+
+def _session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(
+        engine,
+        tables=[Game.__table__, PlayerGameStats.__table__, TeamGameStats.__table__],
+    )
+    session = sessionmaker(bind=engine)()
+    lines = {
+        "p1": ("t1", [(31, 11, 10, True), (12, 4, 2, True), (25, 10, 12, True), (9, 2, 1, False)]),
+        "p2": ("t1", [(8, 12, 10, False), (22, 3, 11, False), (0, 0, 0, False), (14, 5, 5, True)]),
+        "p3": ("t2", [(18, 6, 3, True), (27, 13, 4, True), (11, 10, 10, True), (30, 2, 2, True)]),
+    }
+    scores = [(110, 101), (95, 99), (120, 104), (100, 93)]
+    for index, (home_pts, road_pts) in enumerate(scores):
+        game_id = f"00225000{index + 1:02d}"
+        session.add(
+            Game(
+                game_id=game_id,
+                season="22025" if index < 3 else "22024",
+                game_date=date(2025, 11, index + 1) if index < 3 else date(2025, 3, 1),
+                home_team_id="t1",
+                road_team_id="t2",
+                home_team_score=home_pts,
+                road_team_score=road_pts,
+                wining_team_id="t1" if home_pts > road_pts else "t2",
+                game_status="completed",
+                backfill_mismatch=False,
+            )
+        )
+        for team_id, pts, opp_pts in (("t1", home_pts, road_pts), ("t2", road_pts, home_pts)):
+            session.add(TeamGameStats(game_id=game_id, team_id=team_id, pts=pts, fg_pct=0.45, win=pts > opp_pts))
+        for player_id, (team_id, stat_lines) in lines.items():
+            pts, reb, ast, starter = stat_lines[index]
+            session.add(
+                PlayerGameStats(
+                    game_id=game_id,
+                    team_id=team_id,
+                    player_id=player_id,
+                    min=0 if pts == 0 else 30,
+                    sec=0,
+                    pts=pts,
+                    reb=reb,
+                    ast=ast,
+                    stl=0,
+                    blk=0,
+                    starter=starter,
+                )
+            )
+    session.commit()
+    return session
+
+
+def _metric(key, scope, kind, *, min_sample=1, split_key=None, **attrs):
+    return SimpleNamespace(key=key, scope=scope, metric_kind=kind, min_sample=min_sample, split_key=split_key, **attrs)
+
+
+_METRICS = [
+    _metric("pts_total", "player", "season_total", value_field="pts"),
+    _metric("min_total", "player", "season_total", value_field="min"),
+    _metric("games_won", "player", "games_played", split_key="wins"),
+    _metric("bench_games", "player", "games_played", split_key="bench"),
+    _metric("starts", "player", "games_started", min_sample=3),
+    _metric("pts20_games", "player", "count_threshold", criteria=[("pts", 20)], comparator=">="),
+    _metric("double_doubles", "player", "double_double"),
+    _metric("triple_doubles", "player", "triple_double"),
+    _metric("team_wins", "team", "count", stat_field="win"),
+    _metric("team_home_losses", "team", "count", stat_field="loss", split_key="home"),
+    _metric("team_blowouts", "team", "count", stat_field="point_diff", threshold=10),
+    _metric("team_opp_pts", "team", "count", stat_field="opp_pts"),
+]
+
+
+def test_grouped_scan_matches_per_pair_aggregation_with_one_query_per_scope_and_filter():
+    session = _session()
+    pairs = [(metric, season) for season in ("22025", "all_regular", "last3_regular") for metric in _METRICS]
+    cutoff = (date(2025, 11, 3), "0022500003")
+    expected = {
+        (metric.key, season): milestones.aggregate_pool_as_of(session, metric, season, *cutoff)
+        for metric, season in pairs
+    }
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *a, **k: statements.append(a[2]))
+
+    pools = milestones.aggregate_pools_as_of(session, pairs, *cutoff)
+
+    assert pools == expected
+    assert expected[("pts_total", "all_regular")] == {"p1": 52.0, "p2": 44.0, "p3": 75.0}
+    assert expected[("starts", "22025")] == {}
+    # player × {22025, regular-season windows} + team × the same two filters
+    assert len(statements) == 4
+
+
+def test_unsupported_kind_still_raises_like_the_single_pool_path():
+    session = _session()
+    bogus = _metric("bogus", "player", "ratio")
+    try:
+        milestones.aggregate_pools_as_of(session, [(bogus, "22025")], None, "0022500001")
+    except ValueError as exc:
+        assert "ratio" in str(exc)
+    else:
+        raise AssertionError("unsupported metric_kind must raise")
+
+
+def test_batch_detection_seeds_provider_from_grouped_pools():
+    session = _session()
+    seeded_pools = {}
+
+    def _capture(session, game_id, *, prev_values_provider, metric_keys=None):
+        for metric in _METRICS:
+            seeded_pools.setdefault(
+                (game_id, metric.key),
+                prev_values_provider.current_pool(session, metric.key, "22025", metric.scope),
+            )
+        return []
+
+    with (
+        patch.object(milestones, "_applicable_additive_metrics", return_value=_METRICS),
+        patch.object(milestones, "_metric_season_pairs", side_effect=lambda s, g, m, seasons: [(x, "22025") for x in m]),
+        patch.object(milestones, "detect_milestones_for_game", side_effect=_capture),
+    ):
+        milestones.detect_batch_incremental(session, ["0022500003", "0022500002"])
+
+    for metric in _METRICS:
+        assert seeded_pools[("0022500002", metric.key)] == milestones.aggregate_pool_as_of(
+            session, metric, "22025", date(2025, 11, 2), "0022500002"
+        )
+
+
+def test_stored_pool_fallback_sees_results_written_through_the_same_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine, tables=[MetricResult.__table__])
+    session = sessionmaker(bind=engine)()
+    for entity_id, value in (("p1", 30.0), ("p2", 20.0)):
+        session.add(MetricResult(metric_key="pts", entity_type="player", entity_id=entity_id, season="22025",
+                                 sub_key="", value_num=value, computed_at=datetime(2026, 1, 1)))
+    session.flush()
+    assert milestones._load_current_metric_pool(session, "pts", "22025", "player")["p2"] == 20.0
+
+    session.query(MetricResult).filter_by(entity_id="p2").update({"value_num": 45.0})
+    session.add(MetricResult(metric_key="pts", entity_type="player", entity_id="p3", season="22025",
+                             sub_key="", value_num=5.0, computed_at=datetime(2026, 1, 1)))
+    session.flush()
+
+    pool = milestones._load_current_metric_pool(session, "pts", "22025", "player")
+    assert dict(pool) == {"p1": 30.0, "p2": 45.0, "p3": 5.0}
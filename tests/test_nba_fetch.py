@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from db.nba_fetch import EndpointFamily, FetchScheduler, RetryError
+
+
+class _FakeStatsNBA:
+    """Local stand-in for stats.nba.com: fixed latency, scripted throttling."""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.statuses = []  # consumed one per request; empty means 200
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with fake._lock:
+                    fake.requests.append((time.monotonic(), self.path))
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                    status = fake.statuses.pop(0) if fake.statuses else 200
+                time.sleep(fake.latency)
+                with fake._lock:
+                    fake.in_flight -= 1
+                query = parse_qs(urlparse(self.path).query)
+                body = json.dumps({"game_id": query.get("GameID", [None])[0]}).encode()
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/stats/boxscoretraditionalv3"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def fetch(self, game_id):
+        response = requests.get(self.url, params={"GameID": game_id}, timeout=5)
+        response.raise_for_status()
+        return response.json()
+
+
+def _scheduler(rate=100.0, burst=100, concurrency=4, **kwargs):
+    family = EndpointFamily(rate_per_second=rate, burst=burst, concurrency=concurrency)
+    return FetchScheduler({"boxscore": family}, **kwargs)
+
+
+def _call_concurrently(scheduler, fake, game_ids):
+    start = threading.Barrier(len(game_ids))
+    results = [None] * len(game_ids)
+
+    def _worker(index, game_id):
+        start.wait()
+        results[index] = scheduler.call("boxscore", ("boxscore", game_id), fake.fetch, game_id, max_wait=0.1)
+
+    threads = [threading.Thread(target=_worker, args=item) for item in enumerate(game_ids)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_duplicate_in_flight_keys_share_one_request_under_the_concurrency_cap():
+    with _FakeStatsNBA(latency=0.1) as fake:
+        scheduler = _scheduler(concurrency=2, max_concurrency=8)
+        game_ids = [f"00225000{n % 4}" for n in range(12)]
+        results = _call_concurrently(scheduler, fake, game_ids)
+
+    assert [result["game_id"] for result in results] == game_ids
+    assert len(fake.requests) == 4
+    assert fake.max_in_flight == 2
+
+
+def test_family_rate_bounds_request_starts():
+    with _FakeStatsNBA(latency=0.0) as fake:
+        scheduler = _scheduler(rate=10.0, burst=1, concurrency=4)
+        _call_concurrently(scheduler, fake, [f"00225001{n}" for n in range(6)])
+
+    starts = sorted(at for at, _path in fake.requests)
+    assert len(starts) == 6
+    # Burst of one at 10/s: the sixth request cannot start before ~0.5s.
+    assert starts[-1] - starts[0] >= 0.45
+
+
+def test_throttled_requests_back_off_and_retry_until_success():
+    with _FakeStatsNBA() as fake:
+        fake.statuses = [429, 429]
+        result = _scheduler(jitter=lambda: 0.0).call("boxscore", None, fake.fetch, "0022500020", max_wait=0.1)
+
+    assert result == {"game_id": "0022500020"}
+    assert len(fake.requests) == 3
+
+
+def test_exhausted_retries_raise_retry_error_and_client_errors_do_not_retry():
+    with _FakeStatsNBA() as fake:
+        scheduler = _scheduler()
+        fake.statuses = [503] * 5
+        with pytest.raises(RetryError):
+            scheduler.call("boxscore", None, fake.fetch, "0022500030", attempts=3, max_wait=0.05)
+        assert len(fake.requests) == 3
+
+        fake.statuses = [404]
+        with pytest.raises(requests.HTTPError):
+            scheduler.call("boxscore", None, fake.fetch, "0022500031", max_wait=0.05)
+        assert len(fake.requests) == 4
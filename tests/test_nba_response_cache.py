@@ -0,0 +1,120 @@
+from datetime import date, timedelta
+
+import pytest
+
+from db import nba_response_cache
+from db.game_status import GAME_STATUS_COMPLETED, GAME_STATUS_LIVE, GAME_STATUS_UPCOMING
+from db.nba_response_cache import (
+    MODE_REPLAY,
+    ResponseCache,
+    ResponseCacheMiss,
+    cached_response,
+    prune_expired,
+    refreshing_responses,
+)
+
+
+def _statuses(**by_game):
+    return lambda game_id: by_game.get(game_id, (None, None))
+
+
+@pytest.fixture
+def use_cache(monkeypatch):
+    def _use(cache):
+        monkeypatch.setattr(nba_response_cache, "_CACHE", cache)
+        return cache
+
+    return _use
+
+
+def test_decorated_fetcher_is_served_from_disk_for_the_same_bound_arguments(tmp_path, use_cache):
+    settled = date.today() - timedelta(days=30)
+    use_cache(ResponseCache(tmp_path, status_of=_statuses(g1=(GAME_STATUS_COMPLETED, settled))))
+    calls = []
+
+    @cached_response("boxscoretraditionalv3")
+    def fetch(game_id, period=None):
+        calls.append((game_id, period))
+        return {"boxScoreTraditional": {"gameId": game_id, "period": period}}
+
+    first = fetch("g1")
+    assert fetch(game_id="g1", period=None) == first
+    assert fetch("g1", 2) == {"boxScoreTraditional": {"gameId": "g1", "period": 2}}
+    assert calls == [("g1", None), ("g1", 2)]
+    assert len(list(tmp_path.glob("boxscoretraditionalv3/*/*.json.gz"))) == 2
+
+
+def test_refresh_refetches_settled_games_and_overwrites_the_entry(tmp_path, use_cache):
+    settled = date.today() - timedelta(days=30)
+    use_cache(ResponseCache(tmp_path, status_of=_statuses(g1=(GAME_STATUS_COMPLETED, settled))))
+    versions = iter(range(1, 10))
+
+    @cached_response("boxscoretraditionalv3")
+    def fetch(game_id):
+        return {"version": next(versions)}
+
+    assert fetch("g1") == {"version": 1}
+    assert fetch("g1") == {"version": 1}
+    assert fetch("g1", refresh_cache=True) == {"version": 2}
+    with refreshing_responses(False):
+        assert fetch("g1") == {"version": 2}
+    with refreshing_responses():
+        assert fetch("g1") == {"version": 3}
+    assert fetch("g1") == {"version": 3}
+
+
+def test_payloads_failing_the_check_are_neither_stored_nor_served(tmp_path, use_cache):
+    settled = date.today() - timedelta(days=30)
+    cache = use_cache(ResponseCache(tmp_path, status_of=_statuses(g1=(GAME_STATUS_COMPLETED, settled))))
+    cache.put("shotchartdetail", {"game_id": "g1"}, {"rows": []}, game_id="g1")  # stored before the check existed
+    payloads = iter([{"rows": []}, {"rows": [1]}, {"rows": [2]}])
+
+    @cached_response("shotchartdetail", cacheable=lambda payload, params: bool(payload["rows"]))
+    def fetch(game_id):
+        return next(payloads)
+
+    assert fetch("g1") == {"rows": []}
+    assert fetch("g1") == {"rows": [1]}
+    assert fetch("g1") == {"rows": [1]}
+
+
+def test_ttl_follows_game_status(tmp_path):
+    now = [1_000.0]
+    recent = date.today()
+    cache = ResponseCache(
+        tmp_path,
+        status_of=_statuses(
+            live=(GAME_STATUS_LIVE, recent),
+            upcoming=(GAME_STATUS_UPCOMING, recent + timedelta(days=1)),
+            final=(GAME_STATUS_COMPLETED, recent - timedelta(days=10)),
+        ),
+        clock=lambda: now[0],
+    )
+    for game_id in ("live", "upcoming", "final"):
+        cache.put("playbyplayv3", {"game_id": game_id}, {"game": game_id}, game_id=game_id)
+
+    assert cache.get("playbyplayv3", {"game_id": "upcoming"}) is None
+    assert cache.get("playbyplayv3", {"game_id": "live"}) == {"game": "live"}
+    now[0] += 61
+    assert cache.get("playbyplayv3", {"game_id": "live"}) is None
+    now[0] += 10 * 365 * 86400
+    assert cache.get("playbyplayv3", {"game_id": "final"}) == {"game": "final"}
+
+
+def test_replay_serves_expired_entries_and_never_fetches_a_miss(tmp_path, use_cache):
+    now = [1_000.0]
+    writer = ResponseCache(tmp_path, status_of=_statuses(live=(GAME_STATUS_LIVE, date.today())), clock=lambda: now[0])
+    writer.put("playbyplayv3", {"game_id": "live"}, {"game": "live"}, game_id="live")
+    now[0] += 3600
+    use_cache(ResponseCache(tmp_path, mode=MODE_REPLAY, clock=lambda: now[0]))
+
+    @cached_response("playbyplayv3")
+    def fetch(game_id):
+        raise AssertionError("replay must not reach the network")
+
+    assert fetch("live") == {"game": "live"}
+    with pytest.raises(ResponseCacheMiss):
+        fetch("missing")
+
+    assert prune_expired(writer) == 1
+    assert list(tmp_path.glob("*/*/*.json.gz")) == []
@@ -0,0 +1,170 @@
+import threading
+import time
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from flask import Flask
+
+from db import data_version
+from web import page_cache
+
+
+class _FakeRedis:
+    """Just the string / counter / hash commands the page cache uses."""
+
+    def __init__(self):
+        self.values: dict[str, object] = {}
+        self.hashes: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, nx=False, px=None):
+        with self._lock:
+            if nx and key in self.values:
+                return None
+            self.values[key] = value
+            return True
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def hincrby(self, key, field, amount):
+        bucket = self.hashes.setdefault(key, {})
+        bucket[field] = bucket.get(field, 0) + amount
+
+    hincrbyfloat = hincrby
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def expire(self, key, seconds):
+        pass
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+def _app(cache, renders, *, anonymous=lambda: True, delay=0.0, variant=None):
+    app = Flask(__name__)
+
+    def player_page(slug):
+        renders.append(slug)
+        time.sleep(delay)
+        if slug == "missing":
+            return "not found", 404
+        return f"<h1>{slug} #{len(renders)}</h1>"
+
+    app.add_url_rule(
+        "/players/<slug>",
+        endpoint="player_page",
+        view_func=cache.cached_view(
+            player_page,
+            name="player_page",
+            versions=lambda view_args: ("games", "players"),
+            can_cache=anonymous,
+            get_lang=lambda: "en",
+            get_variant=variant,
+        ),
+    )
+    return app
+
+
+@contextmanager
+def _shared_redis(redis):
+    with (
+        patch.object(data_version, "_redis_or_none", return_value=redis),
+        patch.object(data_version, "_CHECK_SECONDS", 0),
+        patch.dict(data_version._recent, clear=True),
+    ):
+        yield
+
+
+def test_anonymous_renders_are_shared_across_workers_until_a_data_version_bump():
+    redis = _FakeRedis()
+    first_renders, second_renders = [], []
+    first = page_cache.PageCache(redis_factory=lambda: redis)
+    second = page_cache.PageCache(redis_factory=lambda: redis)
+    with _shared_redis(redis):
+        first_client = _app(first, first_renders).test_client()
+        second_client = _app(second, second_renders).test_client()
+
+        assert first_client.get("/players/lebron-james").data == b"<h1>lebron-james #1</h1>"
+        assert first_client.get("/players/lebron-james").data == b"<h1>lebron-james #1</h1>"
+        assert second_client.get("/players/lebron-james").data == b"<h1>lebron-james #1</h1>"
+        assert first_client.get("/players/lebron-james?season=22024").data == b"<h1>lebron-james #2</h1>"
+        assert (first_renders, second_renders) == (["lebron-james", "lebron-james"], [])
+
+        data_version.bump_data_versions("players")
+        assert second_client.get("/players/lebron-james").data == b"<h1>lebron-james #1</h1>"
+        assert second_renders == ["lebron-james"]  # new token: re-rendered, not the stale body
+
+        assert first_client.get("/players/missing").status_code == 404
+        assert first_client.get("/players/missing").status_code == 404
+        assert first_renders.count("missing") == 2  # only 200s are stored
+
+        rows = {row["name"]: row for row in first.load_stats()}
+        assert rows["player_page"]["hits"] == 1
+        assert rows["player_page"]["local_hits"] == 1
+        assert rows["player_page"]["renders"] == 2
+        assert rows["player_page"]["bypassed"] == 2
+
+
+def test_workers_with_different_render_flags_do_not_share_entries():
+    redis = _FakeRedis()
+    stream_renders, poll_renders = [], []
+    with _shared_redis(redis):
+        stream = _app(page_cache.PageCache(redis_factory=lambda: redis), stream_renders, variant=lambda: "stream")
+        poll = _app(page_cache.PageCache(redis_factory=lambda: redis), poll_renders, variant=lambda: "poll")
+        stream.test_client().get("/players/lebron-james")
+        poll.test_client().get("/players/lebron-james")
+        poll.test_client().get("/players/lebron-james")
+
+    assert (stream_renders, poll_renders) == (["lebron-james"], ["lebron-james"])
+
+
+def test_signed_in_requests_bypass_and_concurrent_misses_render_once():
+    redis = _FakeRedis()
+    renders = []
+    cache = page_cache.PageCache(redis_factory=lambda: redis)
+    with _shared_redis(redis):
+        signed_in = _app(page_cache.PageCache(redis_factory=lambda: redis), renders, anonymous=lambda: False)
+        signed_in.test_client().get("/players/lebron-james")
+        signed_in.test_client().get("/players/lebron-james")
+        assert len(renders) == 2
+        assert not any(key.startswith("funba:page:v1:player_page") for key in redis.values)
+
+        del renders[:]
+        app = _app(cache, renders, delay=0.2)
+        bodies = []
+        threads = [
+            threading.Thread(target=lambda: bodies.append(app.test_client().get("/players/stephen-curry").data))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert renders == ["stephen-curry"]
+    assert bodies == [b"<h1>stephen-curry #1</h1>"] * 6
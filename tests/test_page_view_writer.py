@@ -0,0 +1,62 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from web.page_view_writer import PageViewWriter
+
+
+pytestmark = pytest.mark.real_db_models(("Base", "PageView"))
+
+
+def _factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pageviews.db'}")
+    Base.metadata.create_all(engine, tables=[PageView.__table__])
+    return sessionmaker(bind=engine)
+
+
+def _row(index: int) -> dict:
+    return {
+        "visitor_id": f"visitor-{index % 7}",
+        "path": f"/players/p{index}",
+        "referrer": "",
+        "user_agent": "Mozilla/5.0",
+        "is_crawler": False,
+        "crawler_name": None,
+        "ip_address": "203.0.113.9",
+        "created_at": datetime(2026, 1, 1),
+    }
+
+
+def test_rows_are_written_in_multi_row_batches_and_drained_on_close(tmp_path):
+    factory = _factory(tmp_path)
+    inserts = []
+    event.listen(
+        factory.kw["bind"],
+        "before_cursor_execute",
+        lambda conn, cursor, statement, params, context, executemany: inserts.append(executemany)
+        if statement.startswith("INSERT") else None,
+    )
+    writer = PageViewWriter(factory, lambda: PageView, batch_size=200, flush_interval_seconds=60)
+
+    assert all(writer.submit(_row(index)) for index in range(450))
+    writer.close()
+
+    with factory() as session:
+        assert session.query(PageView).count() == 450
+    assert inserts == [True, True, True]  # 200 + 200 + 50, never one INSERT per view
+    assert writer.stats() == {"written": 450, "batches": 3, "dropped": 0, "failed": 0, "queued": 0}
+
+
+def test_full_queue_drops_and_failed_batches_are_counted(tmp_path):
+    writer = PageViewWriter(_factory(tmp_path), lambda: PageView, max_queue=2)
+    with patch.object(writer, "_ensure_started"):
+        assert [writer.submit(_row(index)) for index in range(4)] == [True, True, False, False]
+    assert writer.stats()["dropped"] == 2
+
+    broken = PageViewWriter(_factory(tmp_path), lambda: PageView, flush_interval_seconds=0.01)
+    broken.submit({"path": "/missing-required-columns"})
+    broken.close()
+    assert broken.stats()["failed"] == 1
@@ -0,0 +1,59 @@
+import random
+
+from metrics.framework import milestones
+from metrics.framework.rank_index import RankIndex
+
+
+def _random_pool(rng, size):
+    return {f"e{i}": float(rng.choice([rng.randint(1, 40), rng.randint(1, 5)])) for i in range(size)}
+
+
+def test_index_queries_match_linear_pool_scans_through_updates():
+    rng = random.Random(7)
+    pool = _random_pool(rng, 200)
+    index = RankIndex(pool)
+    for _ in range(300):
+        entity_id = f"e{rng.randint(0, 240)}"
+        if rng.random() < 0.2:
+            pool.pop(entity_id, None)
+            index.discard(entity_id)
+        else:
+            pool[entity_id] = float(rng.randint(1, 45))
+            index.set(entity_id, pool[entity_id])
+
+        assert index == pool
+        probe = f"e{rng.randint(0, 240)}"
+        value = float(rng.randint(0, 46))
+        assert milestones._rank_in_pool(index, probe) == milestones._rank_in_pool(pool, probe)
+        assert milestones._target_player_id(probe, value, index) == milestones._target_player_id(probe, value, dict(pool))
+        assert milestones._count_reached(index, value) == milestones._count_reached(dict(pool), value)
+        low, high = sorted((value, float(rng.randint(0, 46))))
+        assert sorted(index.entity_ids_between(low, high)) == sorted(
+            entity_id for entity_id, v in pool.items() if low <= v <= high
+        )
+
+
+def test_copy_is_independent_of_the_original():
+    index = RankIndex({"a": 3.0, "b": 5.0})
+    clone = index.copy()
+    clone.set("a", 9.0)
+    clone.discard("b")
+
+    assert index.rank_of("a") == 2
+    assert clone.rank_of("a") == 1
+    assert "b" in index and "b" not in clone
+
+
+def test_batch_provider_keeps_its_index_in_step_with_recorded_games():
+    rng = random.Random(11)
+    provider = milestones.InMemoryBatchProvider()
+    provider.seed("m", "22025", _random_pool(rng, 50), min_sample=2)
+    maintained = provider.current_pool(None, "m", "22025", "player")
+
+    for game in range(30):
+        players = rng.sample([f"e{i}" for i in range(70)], 12)
+        deltas = {player_id: float(rng.randint(0, 6)) for player_id in players}
+        provider.record_game_deltas(None, f"g{game}", "m", "22025", deltas, {p: 1 for p in players}, 2)
+
+    assert provider.current_pool(None, "m", "22025", "player") is maintained
+    assert maintained == provider._rebuild_index(("m", "22025"))
@@ -409,6 +409,14 @@ def test_ingest_game_retries_when_artifacts_still_incomplete():
             ingest_tasks,
             "process_and_store_game",
         ) as process_mock, patch.object(
+            ingest_tasks,
+            "is_game_detail_back_filled",
+            return_value=False,
+        ), patch.object(
+            ingest_tasks,
+            "is_game_pbp_back_filled",
+            return_value=False,
+        ), patch.object(
             ingest_tasks.ingest_game,
             "retry",
             side_effect=RuntimeError("retrying"),
@@ -810,6 +818,14 @@ def test_ingest_game_force_refreshes_existing_upcoming_game():
             ingest_tasks,
             "process_and_store_game",
         ) as process_mock, patch.object(
+            ingest_tasks,
+            "is_game_detail_back_filled",
+            return_value=True,
+        ), patch.object(
+            ingest_tasks,
+            "is_game_pbp_back_filled",
+            return_value=True,
+        ), patch.object(
             ingest_tasks,
             "has_game_line_score",
             return_value=True,
@@ -0,0 +1,141 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+
+
+_SEASON = "22025"
+
+
+pytestmark = pytest.mark.real_db_models(
+    ("Base", "Game", "PlayerGameStats", "Team"),
+    {"rule_engine": "metrics.framework.rule_engine"},
+)
+
+
+def _session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(
+        engine,
+        tables=[Team.__table__, Game.__table__, PlayerGameStats.__table__],
+    )
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Team(team_id="t1", canonical_team_id=None),
+        Team(team_id="t2", canonical_team_id="t1"),
+        Team(team_id="t3", canonical_team_id=None),
+    ])
+    stat_lines = {
+        "p1": [("t1", 30, 10, 20), ("t1", 12, 5, 11), ("t2", 25, 9, 18)],
+        "p2": [("t3", 8, 3, 9), ("t3", 22, 8, 15)],
+        "p3": [("t3", 0, 0, 0)],
+    }
+    for game_index in range(3):
+        game_id = f"00225000{game_index + 1:02d}"
+        session.add(
+            Game(
+                game_id=game_id,
+                season=_SEASON,
+                game_date=date(2025, 11, game_index + 1),
+                game_status="completed",
+                backfill_mismatch=False,
+            )
+        )
+        for player_id, lines in stat_lines.items():
+            if game_index >= len(lines):
+                continue
+            team_id, pts, fgm, fga = lines[game_index]
+            session.add(
+                PlayerGameStats(
+                    game_id=game_id,
+                    team_id=team_id,
+                    player_id=player_id,
+                    pts=pts,
+                    fgm=fgm,
+                    fga=fga,
+                    starter=player_id != "p3",
+                )
+            )
+    session.commit()
+    return session
+
+
+def _count_statements(session):
+    statements = []
+    event.listen(
+        session.get_bind(),
+        "before_cursor_execute",
+        lambda *args, **kwargs: statements.append(args[2]),
+    )
+    return statements
+
+
+_FILTER_20 = [{"field": "pts", "op": ">=", "value": 20}]
+
+
+@pytest.mark.parametrize(
+    "definition",
+    [
+        {"source": "player_game_stats", "aggregation": "count", "filters": _FILTER_20},
+        {"source": "player_game_stats", "aggregation": "pct_rows", "filters": _FILTER_20},
+        {"source": "player_game_stats", "aggregation": "avg", "stat": "pts"},
+        {"source": "player_game_stats", "aggregation": "sum", "stat": "pts", "filters": _FILTER_20},
+        {"source": "player_game_stats", "aggregation": "max", "stat": "pts"},
+        {"source": "player_game_stats", "aggregation": "ratio", "numerator": "fgm", "denominator": "fga"},
+        {"source": "player_game_stats", "aggregation": "pct_of_total", "stat": "pts", "filters": _FILTER_20},
+        {
+            "source": "player_game_stats",
+            "aggregation": "avg",
+            "stat": "pts",
+            "ranking": {"partition_by": ["entity.current_franchise_id"]},
+        },
+    ],
+)
+def test_batch_matches_per_entity_compute_result(definition):
+    session = _session()
+
+    batch = rule_engine.compute_results_for_season(session, definition, _SEASON, "player")
+
+    expected = {}
+    for player_id in ("p1", "p2", "p3"):
+        result = rule_engine.compute_result(session, definition, player_id, _SEASON, "player")
+        if result is not None:
+            expected[player_id] = result
+    assert batch == expected
+
+
+def test_batch_issues_constant_queries_for_any_entity_count():
+    session = _session()
+    definition = {
+        "source": "player_game_stats",
+        "aggregation": "pct_of_total",
+        "stat": "pts",
+        "ranking": {"partition_by": ["entity.current_franchise_id"]},
+    }
+    statements = _count_statements(session)
+
+    results = rule_engine.compute_results_for_season(session, definition, _SEASON, "player")
+
+    # grouped values + league denominator + latest team + franchise lookup
+    assert len(statements) == 4
+    assert results["p1"]["rank_group"] == "t1"
+    assert results["p2"]["rank_group"] == "t3"
+    assert results["p1"]["context"]["group_sum"] == 97.0
+
+
+def test_batch_with_entity_filter_falls_back_per_entity_and_keeps_empty_counts():
+    session = _session()
+    dynamic = {
+        "source": "player_game_stats",
+        "aggregation": "count",
+        "filters": [{"field": "team_id", "op": "=", "value": "entity.current_team_id"}],
+    }
+    batch = rule_engine.compute_results_for_season(session, dynamic, _SEASON, "player", entity_ids=["p1"])
+    assert batch["p1"]["value_num"] == 1.0
+
+    static = {"source": "player_game_stats", "aggregation": "count", "filters": _FILTER_20}
+    batch = rule_engine.compute_results_for_season(session, static, _SEASON, "player", entity_ids=["p3", "p9"])
+    assert batch["p3"] == rule_engine.compute_result(session, static, "p3", _SEASON, "player")
+    assert batch["p9"]["value_num"] == 0.0
@@ -0,0 +1,116 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+pytestmark = pytest.mark.real_db_models(
+    ("Base", "Game", "PlayerGameStats", "ShotDetailLedger", "ShotRecord"),
+    {"shot_detail": "db.backfill_nba_player_shot_detail"},
+    reload=("nba_api",),
+)
+
+
+def _session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(
+        engine,
+        tables=[Game.__table__, PlayerGameStats.__table__, ShotRecord.__table__, ShotDetailLedger.__table__],
+    )
+    return sessionmaker(bind=engine)()
+
+
+def _game(session, game_id, fga_by_player, shots_by_player):
+    session.add(Game(game_id=game_id, season="22025", game_date=date(2026, 1, 1)))
+    for player_id, fga in fga_by_player.items():
+        session.add(PlayerGameStats(game_id=game_id, team_id="t1", player_id=player_id, fga=fga))
+    for player_id, shots in shots_by_player.items():
+        for _ in range(shots):
+            session.add(ShotRecord(game_id=game_id, team_id="t1", player_id=player_id, season="TBD"))
+    session.flush()
+
+
+def test_ledger_seeds_once_and_gap_finder_only_groups_incomplete_games():
+    session = _session()
+    _game(session, "g_done", {"p1": 2, "p2": 1}, {"p1": 2, "p2": 1})
+    _game(session, "g_gap", {"p1": 3, "p2": 2}, {"p1": 4, "p2": 1})  # p1's surplus must not hide p2's gap
+    _game(session, "g_empty", {"p1": 5}, {})
+    session.commit()
+
+    assert shot_detail.refresh_shot_detail_ledger(session, "22025") == 3
+    assert shot_detail.refresh_shot_detail_ledger(session, "22025") == 0
+    ledger = {row.game_id: row for row in session.query(ShotDetailLedger)}
+    assert {game_id: row.is_complete for game_id, row in ledger.items()} == {
+        "g_done": True,
+        "g_gap": False,
+        "g_empty": False,
+    }
+    assert (ledger["g_gap"].expected_fga, ledger["g_gap"].stored_attempts, ledger["g_gap"].missing_attempts) == (5, 5, 1)
+
+    gaps = sorted(tuple(row) for row in shot_detail.get_un_back_filled_game_and_player(session))
+    assert gaps == [("g_empty", "p1", "t1"), ("g_gap", "p2", "t1")]
+    assert shot_detail.is_game_shot_back_filled(session, "g_done")
+    assert not shot_detail.is_game_shot_back_filled(session, "g_gap")
+
+
+def test_backfill_marks_the_game_complete_in_the_ledger(monkeypatch):
+    session = _session()
+    _game(session, "g1", {"p1": 2}, {})
+    shot_detail.record_shot_detail_completeness(session, ["g1"])
+    shot = {
+        "PLAYER_ID": "p1", "TEAM_ID": "t1", "PERIOD": 1, "MINUTES_REMAINING": 5, "SECONDS_REMAINING": 0,
+        "EVENT_TYPE": "Made Shot", "ACTION_TYPE": "Jump Shot", "SHOT_TYPE": "2PT Field Goal",
+        "SHOT_ZONE_BASIC": "Mid-Range", "SHOT_ZONE_AREA": "Center(C)", "SHOT_ZONE_RANGE": "8-16 ft.",
+        "SHOT_DISTANCE": 12, "LOC_X": 0, "LOC_Y": 120, "SHOT_ATTEMPTED_FLAG": 1, "SHOT_MADE_FLAG": 1,
+    }
+    monkeypatch.setattr(shot_detail, "fetch_shot_chart", lambda *args, **kwargs: {"Shot_Chart_Detail": [shot, shot]})
+
+    shot_detail.back_fill_game_shot_record(session, "g1", commit=True)
+
+    assert session.get(ShotDetailLedger, "g1").is_complete
+    assert list(shot_detail.get_un_back_filled_game_and_player(session)) == []
+
+
+def test_empty_shot_charts_are_refetched_rather_than_cached(monkeypatch, tmp_path):
+    from db import nba_response_cache
+
+    payloads = [
+        {"resultSets": [{"name": "Shot_Chart_Detail", "headers": ["PLAYER_ID"], "rowSet": []}]},
+        {"resultSets": [{"name": "Shot_Chart_Detail", "headers": ["PLAYER_ID"], "rowSet": [["p1"]]}]},
+    ]
+    calls = []
+
+    class _ShotChartDetail:
+        def __init__(self, **kwargs):
+            calls.append(kwargs["game_id_nullable"])
+
+        def get_dict(self):
+            return payloads[min(len(calls), len(payloads)) - 1]
+
+    monkeypatch.setattr(shot_detail.shotchartdetail, "ShotChartDetail", _ShotChartDetail)
+    monkeypatch.setattr(
+        nba_response_cache, "_CACHE", nba_response_cache.ResponseCache(tmp_path, status_of=lambda game_id: (None, None))
+    )
+
+    assert shot_detail.fetch_shot_chart_raw(0, 0, "g1") == payloads[0]
+    assert list(tmp_path.rglob("*.json.gz")) == []
+    assert shot_detail.fetch_shot_chart_raw(0, 0, "g1") == payloads[1]
+    assert shot_detail.fetch_shot_chart_raw(0, 0, "g1") == payloads[1]
+    assert calls == ["g1", "g1"]
+
+
+def test_backfill_of_an_already_complete_game_refreshes_its_stale_ledger_row(monkeypatch):
+    session = _session()
+    _game(session, "g1", {"p1": 2}, {})
+    shot_detail.record_shot_detail_completeness(session, ["g1"])
+    for _ in range(2):
+        session.add(ShotRecord(game_id="g1", team_id="t1", player_id="p1", season="TBD"))
+    session.commit()
+    assert not session.get(ShotDetailLedger, "g1").is_complete
+    monkeypatch.setattr(shot_detail, "fetch_shot_chart", lambda *args, **kwargs: pytest.fail("complete games are not fetched"))
+
+    assert shot_detail.back_fill_game_shot_record(session, "g1", commit=True)
+
+    session.expire_all()
+    assert session.get(ShotDetailLedger, "g1").is_complete
@@ -0,0 +1,149 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+
+pytestmark = pytest.mark.real_db_models(("Base", "Game"), {"slug_index": "db.slug_index"})
+
+
+class _FakeRedis:
+    """Just the hash / counter / sorted-set commands SlugIndex uses."""
+
+    def __init__(self):
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.values: dict[str, int] = {}
+        self.zsets: dict[str, dict[str, float]] = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def hsetnx(self, key, field, value):
+        self.hashes.setdefault(key, {}).setdefault(field, value)
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        self.hashes.setdefault(key, {}).update(mapping or {field: value})
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def _sorted(self, key):
+        return sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+
+    def zrangebyscore(self, key, low, high, withscores=False):
+        low = float(low.lstrip("("))
+        return [(member, score) for member, score in self._sorted(key) if score > low]
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def zrange(self, key, start, stop, withscores=False):
+        return self._sorted(key)[start:stop + 1]
+
+    def zremrangebyrank(self, key, start, stop):
+        for member, _score in self._sorted(key)[start:stop + 1 or None]:
+            del self.zsets[key][member]
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+def _session_factory():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine, tables=[Game.__table__])
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        session.add(Game(game_id="0022500001", slug="20251021-hou-okc", backfill_mismatch=False))
+        session.add(Game(game_id="0022500002", slug=None, backfill_mismatch=False))
+        session.commit()
+    return factory
+
+
+def _count_statements(factory):
+    statements = []
+    event.listen(factory.kw["bind"], "before_cursor_execute", lambda *a, **k: statements.append(a[2]))
+    return statements
+
+
+def test_point_lookups_hit_the_database_once_per_id_and_evict_least_recently_used():
+    factory = _session_factory()
+    index = slug_index.SlugIndex("game", factory, max_entries=2, redis_factory=lambda: None)
+    statements = _count_statements(factory)
+
+    assert index.get("0022500001") == "20251021-hou-okc"
+    assert index.get("0022500001") == "20251021-hou-okc"
+    assert index.get("0022500002", "0022500002") == "0022500002"  # unslugged: default, miss cached
+    assert index.get("0022500002") is None
+    assert len(statements) == 2
+
+    index.get("0022500003")
+    assert len(index) == 2
+    index.get("0022500001")  # evicted as least recently used
+    assert len(statements) == 4
+
+
+def test_shared_hash_serves_other_workers_and_change_feed_evicts_changed_ids():
+    factory = _session_factory()
+    redis = _FakeRedis()
+    with patch.object(slug_index, "_CHECK_SECONDS", 0), patch.object(slug_index, "_redis_or_none", return_value=redis):
+        first = slug_index.SlugIndex("game", factory, redis_factory=lambda: redis)
+        second = slug_index.SlugIndex("game", factory, redis_factory=lambda: redis)
+        assert first.get("0022500001") == "20251021-hou-okc"
+        statements = _count_statements(factory)
+        assert second.get("0022500001") == "20251021-hou-okc"
+        assert statements == []  # served from the shared hash
+
+        with factory() as session:
+            session.get(Game, "0022500001").slug = "20251021-okc-hou"
+            session.commit()
+        del statements[:]
+        slug_index.publish_slug_changes("game", {"0022500001": "20251021-okc-hou"})
+
+        assert second.get("0022500001") == "20251021-okc-hou"
+        assert first.get("0022500001") == "20251021-okc-hou"
+        assert statements == []  # evicted locally, refilled from the published hash
+
+
+def test_get_many_loads_misses_in_one_hmget_and_one_query_then_serves_gets_from_the_lru():
+    factory = _session_factory()
+    redis = _FakeRedis()
+    redis.hashes["funba:slug:v1:game"] = {"0022500009": b"20251101-lal-bos"}
+    index = slug_index.SlugIndex("game", factory, redis_factory=lambda: redis)
+    statements = _count_statements(factory)
+
+    with patch.object(redis, "hget", side_effect=AssertionError("per-id HGET")):
+        slugs = index.get_many(["0022500001", "0022500002", "0022500009", "0022500001"])
+        assert slugs == {"0022500001": "20251021-hou-okc", "0022500009": "20251101-lal-bos"}
+        assert len(statements) == 1
+        assert redis.hashes["funba:slug:v1:game"]["0022500001"] == "20251021-hou-okc"
+
+        assert index.get("0022500009") == "20251101-lal-bos"
+        assert index.get("0022500002") is None  # remembered miss
+        assert index.get_many(["0022500001", "0022500009"]) == {
+            "0022500001": "20251021-hou-okc",
+            "0022500009": "20251101-lal-bos",
+        }
+    assert len(statements) == 1
@@ -315,6 +315,14 @@ def register_admin_misc_routes(app, deps):
                     admin_fragment_url=deps.admin_fragment_url(),
                 )
 
+            if section == "page-cache":
+                panel = deps.load_admin_page_cache_panel()()
+                return deps.render_template()(
+                    "_admin_page_cache.html",
+                    page_cache_rows=panel["page_cache_rows"],
+                    page_cache_hit_rate=panel["page_cache_hit_rate"],
+                )
+
             if section == "story-tuning":
                 panel = deps.load_admin_story_tuning_panel()(
                     session,
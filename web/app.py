@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import ast
+import atexit
 from collections import defaultdict
 from datetime import date, datetime, timedelta
 from functools import lru_cache
@@ -57,6 +58,16 @@ from db.paperclip_settings import (
 from db.ai_usage import get_ai_usage_dashboard, log_ai_usage_event
 from db.models import Award, Feedback, Game, GameContentAnalysisIssuePost, GameLineScore, GamePlayByPlay, MagicToken, MetricComputeRun, MetricDefinition as MetricDefinitionModel, MetricMilestone, MetricPerfLog, MetricResult as MetricResultModel, MetricRunLog, PageView, Player, PlayerGameStats, PlayerSalary, ShotRecord, SocialPost, SocialPostDelivery, SocialPostImage, SocialPostVariant, Team, TeamGameStats, TwitterEngagementConversation, TwitterEngagementMessage, User, engine
 from db.backfill_nba_player_shot_detail import back_fill_game_shot_record_from_api
+from db.invalidation import (
+    BusReconnected,
+    GameIngested,
+    MetricDefinitionPublished,
+    MetricReduced,
+    SlugChanged,
+    get_bus as get_invalidation_bus,
+    subscribe as subscribe_invalidation,
+)
+from db.slug_index import SlugIndex
 from content_pipeline.game_analysis_issues import (
     ensure_game_content_analysis_issue_for_game,
     ensure_game_content_analysis_issues,
@@ -113,6 +124,10 @@ from web.metric_detail_routes import (
 from web.metrics_read_routes import register_metrics_read_routes
 from web.metrics_write_routes import register_metrics_write_routes
 from web.mobile_api_routes import register_mobile_api_routes
+from web.page_cache import PageCache
+from web.crawler_signals import CrawlerSignalStore, WindowFamily
+from web.live_game_stream import live_stream_enabled
+from web.page_view_writer import PageViewWriter
 from web.public_routes import register_public_routes
 from runtime_flags import load_runtime_flags, set_runtime_flag
 
@@ -1066,23 +1081,18 @@ def _player_headshot_url(player_id: str | None) -> str | None:
     return f"https://cdn.nba.com/headshots/nba/latest/260x190/{player_id}.png"
 
 
-# ── Player slug cache ────────────────────────────────────────────────────────
+# ── Slug lookups ─────────────────────────────────────────────────────────────
+#
+# Point lookups through db.slug_index (process LRU → shared Redis hash → one
+# row from the DB) instead of a full {id: slug} table reload per worker.
 
-_player_slug_cache: dict[str, str] = {}
-_player_slug_cache_ts: float = 0
+_player_slug_index = SlugIndex("player", lambda: SessionLocal())
+_game_slug_index = SlugIndex("game", lambda: SessionLocal())
+_team_slug_index = SlugIndex("team", lambda: SessionLocal())
 
 
-def _ensure_player_slug_cache() -> dict[str, str]:
-    import time
-    global _player_slug_cache, _player_slug_cache_ts
-    now = time.monotonic()
-    if _player_slug_cache and (now - _player_slug_cache_ts) < 300:
-        return _player_slug_cache
-    with SessionLocal() as session:
-        rows = session.query(Player.player_id, Player.slug).filter(Player.slug.isnot(None)).all()
-        _player_slug_cache = {r.player_id: r.slug for r in rows}
-    _player_slug_cache_ts = now
-    return _player_slug_cache
+def _ensure_player_slug_cache() -> SlugIndex:
+    return _player_slug_index
 
 
 def _player_url(player_id: str) -> str:
@@ -1093,23 +1103,8 @@ def _player_url(player_id: str) -> str:
     return _localized_url_for("player_page", slug=f"player-{player_id}")
 
 
-# ── Game slug cache ──────────────────────────────────────────────────────────
-
-_game_slug_cache: dict[str, str] = {}
-_game_slug_cache_ts: float = 0
-
-
-def _ensure_game_slug_cache() -> dict[str, str]:
-    import time
-    global _game_slug_cache, _game_slug_cache_ts
-    now = time.monotonic()
-    if _game_slug_cache and (now - _game_slug_cache_ts) < 300:
-        return _game_slug_cache
-    with SessionLocal() as session:
-        rows = session.query(Game.game_id, Game.slug).filter(Game.slug.isnot(None)).all()
-        _game_slug_cache = {r.game_id: r.slug for r in rows}
-    _game_slug_cache_ts = now
-    return _game_slug_cache
+def _ensure_game_slug_cache() -> SlugIndex:
+    return _game_slug_index
 
 
 def _game_url(game_id: str) -> str:
@@ -1120,23 +1115,8 @@ def _game_url(game_id: str) -> str:
     return _localized_url_for("game_page", slug=f"game-{game_id}")
 
 
-# ── Team slug cache ──────────────────────────────────────────────────────────
-
-_team_slug_cache: dict[str, str] = {}
-_team_slug_cache_ts: float = 0
-
-
-def _ensure_team_slug_cache() -> dict[str, str]:
-    import time
-    global _team_slug_cache, _team_slug_cache_ts
-    now = time.monotonic()
-    if _team_slug_cache and (now - _team_slug_cache_ts) < 300:
-        return _team_slug_cache
-    with SessionLocal() as session:
-        rows = session.query(Team.team_id, Team.slug).filter(Team.slug.isnot(None)).all()
-        _team_slug_cache = {r.team_id: r.slug for r in rows}
-    _team_slug_cache_ts = now
-    return _team_slug_cache
+def _ensure_team_slug_cache() -> SlugIndex:
+    return _team_slug_index
 
 
 def _team_url(team_id: str | None) -> str | None:
@@ -1149,6 +1129,13 @@ def _team_url(team_id: str | None) -> str | None:
     return None
 
 
+def _prime_slug_caches(*, player_ids=(), game_ids=(), team_ids=()) -> None:
+    """Load the slugs a list page is about to link in one batch per kind."""
+    _player_slug_index.get_many(player_ids)
+    _game_slug_index.get_many(game_ids)
+    _team_slug_index.get_many(team_ids)
+
+
 def _award_entry_from_row(row, teams: dict[str, Team]) -> dict[str, object]:
     season_value = _coerce_award_season(row.season)
     season_token = str(season_value) if season_value is not None else str(row.season)
@@ -1908,21 +1895,24 @@ def _related_metric_links(session, metric_key: str, runtime_metric, db_metric) -
     return links if len(links) > 1 else []
 
 
-_METRIC_RESULT_COUNTS_TTL_SECONDS = 300
+_METRIC_RESULT_COUNTS_TTL_SECONDS = 3600  # MetricReduced / MetricDefinitionPublished events clear it sooner
 _metric_result_counts_cache: tuple[float, dict[str, int]] | None = None
 _metric_result_counts_lock = threading.Lock()
 
 
 def _metric_result_counts(session) -> dict[str, int]:
-    """Return {metric_key: row_count} grouped over the full MetricResult table.
-
-    Uses a process-wide TTL cache because the underlying GROUP BY scans
-    ~15M rows and runs in ~4 seconds even on a covering index. Counts
-    drive UI badges only, so a few minutes of staleness is fine. The
-    full-table GROUP BY is intentional — filtering with IN(<all keys>)
-    runs ~4x slower because the optimizer falls back to per-key range
-    scans.
+    """Return {metric_key: row_count} for every metric with results.
+
+    Reads the MetricResultCount summary (one row per metric and season), which
+    the metric runner keeps current and a periodic task reconciles, so this is
+    a scan of a few thousand rows. Until the summary has been populated it
+    falls back to the full-table GROUP BY over MetricResult (~15M rows,
+    ~4 seconds); filtering that with IN(<all keys>) runs ~4x slower because
+    the optimizer falls back to per-key range scans. A short process-wide TTL
+    cache still fronts both, since counts drive UI badges only.
     """
+    from db.models import MetricResultCount
+
     global _metric_result_counts_cache
     now = time.monotonic()
     cached = _metric_result_counts_cache
@@ -1933,14 +1923,24 @@ def _metric_result_counts(session) -> dict[str, int]:
         if cached is not None and time.monotonic() - cached[0] < _METRIC_RESULT_COUNTS_TTL_SECONDS:
             return cached[1]
         counts = {
-            row.metric_key: row.count
+            row.metric_key: int(row.count)
             for row in session.query(
-                MetricResultModel.metric_key,
-                func.count(MetricResultModel.id).label("count"),
+                MetricResultCount.metric_key,
+                func.sum(MetricResultCount.row_count).label("count"),
             )
-            .group_by(MetricResultModel.metric_key)
+            .group_by(MetricResultCount.metric_key)
             .all()
         }
+        if not counts:
+            counts = {
+                row.metric_key: row.count
+                for row in session.query(
+                    MetricResultModel.metric_key,
+                    func.count(MetricResultModel.id).label("count"),
+                )
+                .group_by(MetricResultModel.metric_key)
+                .all()
+            }
         _metric_result_counts_cache = (time.monotonic(), counts)
     return counts
 
@@ -4262,11 +4262,55 @@ def _prepare_game_metric_cards(
     return visible_cards, extra_cards
 
 
+def _peer_rank_map(session, result_ids, asc_keys: set[str]) -> dict[int, tuple[int, int]]:
+    """Live {MetricResult.id: (rank, total)} via a peer self-join.
+
+    For desc-ranked metrics: rank = COUNT(peers with higher value) + 1
+    For asc-ranked metrics: rank = COUNT(peers with lower value) + 1
+    Must not be used for split metrics, whose pools would Cartesian-explode.
+    """
+    from sqlalchemy import func
+
+    MR = MetricResultModel
+    e_alias = MR.__table__.alias("e")
+    p_alias = MR.__table__.alias("p")
+
+    if asc_keys:
+        better_expr = case(
+            (e_alias.c.metric_key.in_(asc_keys), p_alias.c.value_num < e_alias.c.value_num),
+            else_=(p_alias.c.value_num > e_alias.c.value_num),
+        )
+    else:
+        better_expr = p_alias.c.value_num > e_alias.c.value_num
+
+    join_cond = and_(
+        p_alias.c.entity_type == e_alias.c.entity_type,
+        p_alias.c.metric_key == e_alias.c.metric_key,
+        p_alias.c.season == e_alias.c.season,
+        func.coalesce(p_alias.c.rank_group, "__none__") == func.coalesce(e_alias.c.rank_group, "__none__"),
+        p_alias.c.value_num.isnot(None),
+    )
+
+    rank_q = (
+        session.query(
+            e_alias.c.id,
+            func.count(p_alias.c.id).label("total"),
+            (func.sum(case((better_expr, 1), else_=0)) + 1).label("rank"),
+        )
+        .select_from(e_alias)
+        .join(p_alias, join_cond)
+        .filter(e_alias.c.id.in_(result_ids))
+        .group_by(e_alias.c.id)
+    )
+    return {r.id: (r.rank, r.total) for r in rank_q.all()}
+
+
 def _get_metric_results(session, entity_type: str, entity_id: str, season: str | None = None) -> dict:
     """Fetch metric results for an entity, split into season and alltime lists.
 
     Returns {"season": [...], "alltime": [...]} each sorted by rank asc (best first).
-    Rank and total are derived at query time via SQL window functions.
+    Rank and total come from the stored peer_rank / peer_total columns, with a
+    query-time self-join for rows the reducer has not ranked.
     """
     import json
     from sqlalchemy import func
@@ -4335,6 +4379,8 @@ def _get_metric_results(session, entity_type: str, entity_id: str, season: str |
             MetricResultModel.value_str,
             MetricResultModel.context_json,
             MetricResultModel.computed_at,
+            MetricResultModel.peer_rank,
+            MetricResultModel.peer_total,
         )
         .filter(*entity_filters)
         .all()
@@ -4364,44 +4410,20 @@ def _get_metric_results(session, entity_type: str, entity_id: str, season: str |
         if family_base_key(k) in split_base_keys
     }
 
-    # Step 2: Compute rank and total via a self-join — only for non-split rows.
-    # For desc-ranked metrics: rank = COUNT(peers with higher value) + 1
-    # For asc-ranked metrics: rank = COUNT(peers with lower value) + 1
-    non_split_ids = {r.id for r in entity_rows if r.metric_key not in split_metric_keys}
-    rank_map: dict[int, tuple[int, int]] = {}
-    if non_split_ids:
-        MR = MetricResultModel
-        e_alias = MR.__table__.alias("e")
-        p_alias = MR.__table__.alias("p")
-
-        if _asc_keys:
-            better_expr = case(
-                (e_alias.c.metric_key.in_(_asc_keys), p_alias.c.value_num < e_alias.c.value_num),
-                else_=(p_alias.c.value_num > e_alias.c.value_num),
-            )
-        else:
-            better_expr = p_alias.c.value_num > e_alias.c.value_num
-
-        join_cond = and_(
-            p_alias.c.entity_type == e_alias.c.entity_type,
-            p_alias.c.metric_key == e_alias.c.metric_key,
-            p_alias.c.season == e_alias.c.season,
-            func.coalesce(p_alias.c.rank_group, "__none__") == func.coalesce(e_alias.c.rank_group, "__none__"),
-            p_alias.c.value_num.isnot(None),
-        )
-
-        rank_q = (
-            session.query(
-                e_alias.c.id,
-                func.count(p_alias.c.id).label("total"),
-                (func.sum(case((better_expr, 1), else_=0)) + 1).label("rank"),
-            )
-            .select_from(e_alias)
-            .join(p_alias, join_cond)
-            .filter(e_alias.c.id.in_(non_split_ids))
-            .group_by(e_alias.c.id)
-        )
-        rank_map = {r.id: (r.rank, r.total) for r in rank_q.all()}
+    # Step 2: Rank and total are materialized on the row at reduce time
+    # (peer_rank / peer_total). Rows without them — per-game metrics and rows
+    # not yet backfilled — fall back to the live peer self-join.
+    rank_map: dict[int, tuple[int, int]] = {
+        r.id: (r.peer_rank, r.peer_total)
+        for r in entity_rows
+        if r.metric_key not in split_metric_keys and r.peer_rank is not None
+    }
+    unranked_ids = {
+        r.id for r in entity_rows
+        if r.metric_key not in split_metric_keys and r.peer_rank is None
+    }
+    if unranked_ids:
+        rank_map.update(_peer_rank_map(session, unranked_ids, _asc_keys))
 
     # Build combined rows with rank/total attached
     rows = []
@@ -5895,13 +5917,10 @@ _SUSPICIOUS_PROBE_PATH_PATTERNS: tuple[re.Pattern[str], ...] = tuple(
     )
 )
 _REPEAT_CRAWLER_IP_LOOKBACK = timedelta(days=30)
-_REPEAT_CRAWLER_IP_CACHE_SECONDS = 300
 _PROXIED_SCRAPER_LOOKBACK = timedelta(minutes=5)
-_PROXIED_SCRAPER_CACHE_SECONDS = 60
 _PROXIED_SCRAPER_MIN_DISTINCT_IPS = 30
 _PROXIED_SCRAPER_UNIQUE_IP_RATIO_PCT = 80
 _STALE_UA_LOOKBACK = timedelta(hours=1)
-_STALE_UA_CACHE_SECONDS = 60
 _STALE_UA_MIN_DISTINCT_IPS = 5
 _STALE_UA_UNIQUE_IP_RATIO_PCT = 90
 _STALE_BROWSER_MAX_CHROME = 138
@@ -5909,25 +5928,21 @@ _STALE_BROWSER_MAX_FIREFOX = 132
 _CHROME_VERSION_RE = re.compile(r"Chrome/(\d+)")
 _FIREFOX_VERSION_RE = re.compile(r"Firefox/(\d+)")
 _DATACENTER_SCRAPER_LOOKBACK = timedelta(hours=1)
-_DATACENTER_SCRAPER_CACHE_SECONDS = 60
 _DATACENTER_SCRAPER_MIN_PV = 100
 _DATACENTER_SCRAPER_MIN_DISTINCT_IPS = 5
 _DATACENTER_SCRAPER_MAX_RATIO_PCT = 20
 _IP_COOKIE_CHURN_LOOKBACK = timedelta(hours=3)
-_IP_COOKIE_CHURN_CACHE_SECONDS = 60
 _IP_COOKIE_CHURN_MIN_PV = 25
 _IP_COOKIE_CHURN_MIN_DISTINCT_VISITORS = 18
 _IP_COOKIE_CHURN_MIN_DISTINCT_UAS = 5
 _IP_COOKIE_CHURN_MIN_VISITOR_RATIO_PCT = 60
 _NETWORK_COOKIE_CHURN_LOOKBACK = timedelta(hours=1)
-_NETWORK_COOKIE_CHURN_CACHE_SECONDS = 60
 _NETWORK_COOKIE_CHURN_MIN_PV = 60
 _NETWORK_COOKIE_CHURN_MIN_DISTINCT_VISITORS = 40
 _NETWORK_COOKIE_CHURN_MIN_DISTINCT_IPS = 20
 _NETWORK_COOKIE_CHURN_MIN_DISTINCT_UAS = 8
 _NETWORK_COOKIE_CHURN_MIN_VISITOR_RATIO_PCT = 50
 _DISTRIBUTED_PROXY_LOOKBACK = timedelta(days=1)
-_DISTRIBUTED_PROXY_CACHE_SECONDS = 300
 _DISTRIBUTED_PROXY_MIN_PV = 40
 _DISTRIBUTED_PROXY_MIN_DISTINCT_VISITORS = 35
 _DISTRIBUTED_PROXY_MIN_DISTINCT_IPS = 30
@@ -5936,7 +5951,7 @@ _DISTRIBUTED_PROXY_MIN_DIRECT_REF_RATIO_PCT = 90
 _DISTRIBUTED_PROXY_MIN_VISITOR_RATIO_PCT = 90
 _DISTRIBUTED_PROXY_MIN_IP_VISITOR_RATIO_PCT = 85
 _DYNAMIC_CRAWLER_REPEAT_LOOKBACK = timedelta(days=30)
-_DYNAMIC_CRAWLER_REPEAT_CACHE_SECONDS = 300
+_SELF_REFERRER_RE = re.compile(r"^http.*://(www\.)?funba\.app", re.IGNORECASE)
 _DYNAMIC_CRAWLER_NAMES = frozenset({
     "ip-cookie-churn-scraper",
     "network-cookie-churn-scraper",
@@ -6009,72 +6024,143 @@ def _probe_crawler_name_for_path(path: str | None) -> str | None:
     return None
 
 
-@lru_cache(maxsize=8192)
-def _recent_repeat_crawler_ip_cached(ip_address: str, cache_bucket: int) -> bool:
-    del cache_bucket
+def _page_view_ip_key(ip_address: str | None) -> str | None:
     value = (ip_address or "").strip()
     if not value or value in ("127.0.0.1", "::1"):
-        return False
-    cutoff = datetime.utcnow() - _REPEAT_CRAWLER_IP_LOOKBACK
-    try:
-        with SessionLocal() as db_sess:
-            auth_spray_seen = (
-                db_sess.query(PageView.id)
-                .filter(
-                    PageView.ip_address == value,
-                    PageView.crawler_name == "auth-spray-bot",
-                    PageView.created_at >= cutoff,
-                )
-                .first()
-            )
-            return auth_spray_seen is not None
-    except Exception:
-        logger.exception("repeat crawler ip lookup failed")
-        return False
-
-
-def _recent_repeat_crawler_ip(ip_address: str | None) -> bool:
-    value = (ip_address or "").strip()
-    cache_bucket = int(time.time() // _REPEAT_CRAWLER_IP_CACHE_SECONDS)
-    return _recent_repeat_crawler_ip_cached(value, cache_bucket)
+        return None
+    return value
 
 
-@lru_cache(maxsize=8192)
-def _proxied_scraper_ua_cached(user_agent: str, cache_bucket: int) -> bool:
-    del cache_bucket
+def _page_view_ua_key(user_agent: str | None) -> str | None:
     ua = (user_agent or "").strip()
     if not ua or len(ua) < _MIN_REAL_UA_LENGTH:
-        return False
-    cutoff = datetime.utcnow() - _PROXIED_SCRAPER_LOOKBACK
-    try:
-        with SessionLocal() as db_sess:
-            row = (
-                db_sess.query(
-                    func.count(func.distinct(PageView.ip_address)).label("uniq_ips"),
-                    func.count(PageView.id).label("pv"),
-                )
-                .filter(
-                    PageView.user_agent == ua,
-                    PageView.created_at >= cutoff,
-                )
-                .one()
+        return None
+    return ua
+
+
+def _is_human_page_view_row(row: dict) -> bool:
+    return not row.get("is_crawler")
+
+
+def _referrer_counts(row: dict) -> dict[str, int]:
+    referrer = row.get("referrer") or ""
+    if not referrer:
+        return {"direct_refs": 1}
+    if _SELF_REFERRER_RE.match(referrer):
+        return {"self_refs": 1}
+    return {"external_refs": 1}
+
+
+# What each dynamic crawler check counts, fed from the page-view stream
+# (see web.crawler_signals) instead of aggregated from PageView per request.
+_CRAWLER_SIGNAL_FAMILIES = {
+    "auth-spray-ip": WindowFamily(
+        seconds=_REPEAT_CRAWLER_IP_LOOKBACK.total_seconds(),
+        key=lambda row: _page_view_ip_key(row.get("ip_address")) if row.get("crawler_name") == "auth-spray-bot" else None,
+    ),
+    "proxied-ua": WindowFamily(
+        seconds=_PROXIED_SCRAPER_LOOKBACK.total_seconds(),
+        key=lambda row: _page_view_ua_key(row.get("user_agent")),
+        distinct=("ip_address",),
+    ),
+    "stale-ua": WindowFamily(
+        seconds=_STALE_UA_LOOKBACK.total_seconds(),
+        key=lambda row: ua if (ua := _page_view_ua_key(row.get("user_agent"))) and _is_stale_browser_ua(ua) else None,
+        distinct=("ip_address",),
+    ),
+    "datacenter-ua": WindowFamily(
+        seconds=_DATACENTER_SCRAPER_LOOKBACK.total_seconds(),
+        key=lambda row: _page_view_ua_key(row.get("user_agent")),
+        distinct=("ip_address",),
+    ),
+    "ip-cookie-churn": WindowFamily(
+        seconds=_IP_COOKIE_CHURN_LOOKBACK.total_seconds(),
+        key=lambda row: _page_view_ip_key(row.get("ip_address")) if _is_human_page_view_row(row) else None,
+        distinct=("visitor_id", "user_agent"),
+    ),
+    "network-cookie-churn": WindowFamily(
+        seconds=_NETWORK_COOKIE_CHURN_LOOKBACK.total_seconds(),
+        key=lambda row: _ipv4_prefix_16(row.get("ip_address")) if _is_human_page_view_row(row) else None,
+        distinct=("visitor_id", "ip_address", "user_agent"),
+    ),
+    "distributed-proxy": WindowFamily(
+        seconds=_DISTRIBUTED_PROXY_LOOKBACK.total_seconds(),
+        key=lambda row: _ipv4_prefix_16(row.get("ip_address")) if _is_human_page_view_row(row) else None,
+        counts=_referrer_counts,
+        distinct=("visitor_id", "ip_address", "path"),
+    ),
+    "dynamic-crawler-prefix": WindowFamily(
+        seconds=_DYNAMIC_CRAWLER_REPEAT_LOOKBACK.total_seconds(),
+        key=lambda row: _ipv4_prefix_16(row.get("ip_address")) if row.get("crawler_name") in _DYNAMIC_CRAWLER_NAMES else None,
+        distinct=("ip_address",),
+    ),
+}
+_MARKED_CRAWLER_SIGNAL_NAMES = ("auth-spray-bot", *sorted(_DYNAMIC_CRAWLER_NAMES))
+
+
+def _crawler_signal_seed_rows(watermark: datetime):
+    """PageView history for a fresh worker's windows, oldest first.
+
+    Marked crawler rows cover the 30-day repeat lookbacks; every row covers
+    the short human / user-agent lookbacks. The store counts each row only
+    towards the families whose own lookback it falls inside.
+    """
+    recent_since = watermark - max(
+        _PROXIED_SCRAPER_LOOKBACK,
+        _STALE_UA_LOOKBACK,
+        _DATACENTER_SCRAPER_LOOKBACK,
+        _IP_COOKIE_CHURN_LOOKBACK,
+        _NETWORK_COOKIE_CHURN_LOOKBACK,
+        _DISTRIBUTED_PROXY_LOOKBACK,
+    )
+    marked_since = watermark - max(_REPEAT_CRAWLER_IP_LOOKBACK, _DYNAMIC_CRAWLER_REPEAT_LOOKBACK)
+    columns = (
+        PageView.visitor_id,
+        PageView.path,
+        PageView.referrer,
+        PageView.user_agent,
+        PageView.is_crawler,
+        PageView.crawler_name,
+        PageView.ip_address,
+        PageView.created_at,
+    )
+    with SessionLocal() as db_sess:
+        marked = (
+            db_sess.query(*columns)
+            .filter(
+                PageView.crawler_name.in_(_MARKED_CRAWLER_SIGNAL_NAMES),
+                PageView.created_at >= marked_since,
+                PageView.created_at < recent_since,
             )
-            uniq = int(row.uniq_ips or 0)
-            pv = int(row.pv or 0)
-            if uniq < _PROXIED_SCRAPER_MIN_DISTINCT_IPS or pv == 0:
-                return False
-            return uniq * 100 >= pv * _PROXIED_SCRAPER_UNIQUE_IP_RATIO_PCT
-    except Exception:
-        logger.exception("proxied scraper UA lookup failed")
-        return False
+            .order_by(PageView.created_at)
+            .yield_per(5000)
+        )
+        for row in marked:
+            yield row._asdict()
+        recent = (
+            db_sess.query(*columns)
+            .filter(PageView.created_at >= recent_since, PageView.created_at < watermark)
+            .order_by(PageView.created_at)
+            .yield_per(5000)
+        )
+        for row in recent:
+            yield row._asdict()
+
+
+_crawler_signals = CrawlerSignalStore(_CRAWLER_SIGNAL_FAMILIES, seed=_crawler_signal_seed_rows)
+
+
+def _recent_repeat_crawler_ip(ip_address: str | None) -> bool:
+    return _crawler_signals.window("auth-spray-ip", _page_view_ip_key(ip_address)).get("pv", 0) > 0
 
 
 def _is_proxied_scraper_ua() -> bool:
-    ua = (request.user_agent.string or "").strip()
-    if not ua:
+    stats = _crawler_signals.window("proxied-ua", _page_view_ua_key(request.user_agent.string))
+    uniq = stats.get("ip_address", 0)
+    pv = stats.get("pv", 0)
+    if uniq < _PROXIED_SCRAPER_MIN_DISTINCT_IPS or pv == 0:
         return False
-    cache_bucket = int(time.time() // _PROXIED_SCRAPER_CACHE_SECONDS)
-    return _proxied_scraper_ua_cached(ua, cache_bucket)
+    return uniq * 100 >= pv * _PROXIED_SCRAPER_UNIQUE_IP_RATIO_PCT
 
 
 def _is_stale_browser_ua(user_agent: str) -> bool:
@@ -6097,87 +6183,6 @@ def _is_stale_browser_ua(user_agent: str) -> bool:
     return False
 
 
-@lru_cache(maxsize=8192)
-def _stale_ua_scraper_cached(user_agent: str, cache_bucket: int) -> bool:
-    del cache_bucket
-    ua = (user_agent or "").strip()
-    if not ua or len(ua) < _MIN_REAL_UA_LENGTH:
-        return False
-    if not _is_stale_browser_ua(ua):
-        return False
-    cutoff = datetime.utcnow() - _STALE_UA_LOOKBACK
-    try:
-        with SessionLocal() as db_sess:
-            row = (
-                db_sess.query(
-                    func.count(func.distinct(PageView.ip_address)).label("uniq_ips"),
-                    func.count(PageView.id).label("pv"),
-                )
-                .filter(
-                    PageView.user_agent == ua,
-                    PageView.created_at >= cutoff,
-                )
-                .one()
-            )
-            uniq = int(row.uniq_ips or 0)
-            pv = int(row.pv or 0)
-            if uniq < _STALE_UA_MIN_DISTINCT_IPS or pv == 0:
-                return False
-            return uniq * 100 >= pv * _STALE_UA_UNIQUE_IP_RATIO_PCT
-    except Exception:
-        logger.exception("stale UA scraper lookup failed")
-        return False
-
-
-def _is_stale_ua_scraper() -> bool:
-    ua = (request.user_agent.string or "").strip()
-    if not ua:
-        return False
-    cache_bucket = int(time.time() // _STALE_UA_CACHE_SECONDS)
-    return _stale_ua_scraper_cached(ua, cache_bucket)
-
-
-@lru_cache(maxsize=8192)
-def _datacenter_scraper_ua_cached(user_agent: str, cache_bucket: int) -> bool:
-    del cache_bucket
-    ua = (user_agent or "").strip()
-    if not ua or len(ua) < _MIN_REAL_UA_LENGTH:
-        return False
-    cutoff = datetime.utcnow() - _DATACENTER_SCRAPER_LOOKBACK
-    try:
-        with SessionLocal() as db_sess:
-            row = (
-                db_sess.query(
-                    func.count(func.distinct(PageView.ip_address)).label("uniq_ips"),
-                    func.count(PageView.id).label("pv"),
-                )
-                .filter(
-                    PageView.user_agent == ua,
-                    PageView.created_at >= cutoff,
-                )
-                .one()
-            )
-            uniq = int(row.uniq_ips or 0)
-            pv = int(row.pv or 0)
-            if pv < _DATACENTER_SCRAPER_MIN_PV:
-                return False
-            if uniq < _DATACENTER_SCRAPER_MIN_DISTINCT_IPS:
-                # Single power user — don't flag.
-                return False
-            return uniq * 100 <= pv * _DATACENTER_SCRAPER_MAX_RATIO_PCT
-    except Exception:
-        logger.exception("datacenter scraper UA lookup failed")
-        return False
-
-
-def _is_datacenter_scraper_ua() -> bool:
-    ua = (request.user_agent.string or "").strip()
-    if not ua:
-        return False
-    cache_bucket = int(time.time() // _DATACENTER_SCRAPER_CACHE_SECONDS)
-    return _datacenter_scraper_ua_cached(ua, cache_bucket)
-
-
 def _ipv4_prefix_16(ip_address: str | None) -> str | None:
     value = (ip_address or "").strip()
     try:
@@ -6188,205 +6193,80 @@ def _ipv4_prefix_16(ip_address: str | None) -> str | None:
     return f"{first}.{second}."
 
 
-@lru_cache(maxsize=8192)
-def _ip_cookie_churn_scraper_cached(ip_address: str, cache_bucket: int) -> bool:
-    del cache_bucket
-    value = (ip_address or "").strip()
-    if not value or value in ("127.0.0.1", "::1"):
-        return False
-    cutoff = datetime.utcnow() - _IP_COOKIE_CHURN_LOOKBACK
-    try:
-        with SessionLocal() as db_sess:
-            row = (
-                db_sess.query(
-                    func.count(PageView.id).label("pv"),
-                    func.count(func.distinct(PageView.visitor_id)).label("visitors"),
-                    func.count(func.distinct(PageView.user_agent)).label("uas"),
-                )
-                .filter(
-                    PageView.ip_address == value,
-                    PageView.created_at >= cutoff,
-                    _human_page_view_filter(PageView),
-                )
-                .one()
-            )
-            pv = int(row.pv or 0)
-            visitors = int(row.visitors or 0)
-            uas = int(row.uas or 0)
-            if pv < _IP_COOKIE_CHURN_MIN_PV:
-                return False
-            if visitors < _IP_COOKIE_CHURN_MIN_DISTINCT_VISITORS:
-                return False
-            if uas < _IP_COOKIE_CHURN_MIN_DISTINCT_UAS:
-                return False
-            return visitors * 100 >= pv * _IP_COOKIE_CHURN_MIN_VISITOR_RATIO_PCT
-    except Exception:
-        logger.exception("IP cookie churn scraper lookup failed")
+def _is_stale_ua_scraper() -> bool:
+    stats = _crawler_signals.window("stale-ua", _page_view_ua_key(request.user_agent.string))
+    uniq = stats.get("ip_address", 0)
+    pv = stats.get("pv", 0)
+    if uniq < _STALE_UA_MIN_DISTINCT_IPS or pv == 0:
         return False
+    return uniq * 100 >= pv * _STALE_UA_UNIQUE_IP_RATIO_PCT
 
 
-def _is_ip_cookie_churn_scraper(ip_address: str | None) -> bool:
-    value = (ip_address or "").strip()
-    if not value:
+def _is_datacenter_scraper_ua() -> bool:
+    stats = _crawler_signals.window("datacenter-ua", _page_view_ua_key(request.user_agent.string))
+    uniq = stats.get("ip_address", 0)
+    pv = stats.get("pv", 0)
+    if pv < _DATACENTER_SCRAPER_MIN_PV:
+        return False
+    if uniq < _DATACENTER_SCRAPER_MIN_DISTINCT_IPS:
+        # Single power user — don't flag.
         return False
-    cache_bucket = int(time.time() // _IP_COOKIE_CHURN_CACHE_SECONDS)
-    return _ip_cookie_churn_scraper_cached(value, cache_bucket)
+    return uniq * 100 <= pv * _DATACENTER_SCRAPER_MAX_RATIO_PCT
 
 
-@lru_cache(maxsize=8192)
-def _network_cookie_churn_scraper_cached(prefix: str, cache_bucket: int) -> bool:
-    del cache_bucket
-    value = (prefix or "").strip()
-    if not value:
+def _is_ip_cookie_churn_scraper(ip_address: str | None) -> bool:
+    stats = _crawler_signals.window("ip-cookie-churn", _page_view_ip_key(ip_address))
+    pv = stats.get("pv", 0)
+    visitors = stats.get("visitor_id", 0)
+    if pv < _IP_COOKIE_CHURN_MIN_PV:
         return False
-    cutoff = datetime.utcnow() - _NETWORK_COOKIE_CHURN_LOOKBACK
-    try:
-        with SessionLocal() as db_sess:
-            row = (
-                db_sess.query(
-                    func.count(PageView.id).label("pv"),
-                    func.count(func.distinct(PageView.visitor_id)).label("visitors"),
-                    func.count(func.distinct(PageView.ip_address)).label("ips"),
-                    func.count(func.distinct(PageView.user_agent)).label("uas"),
-                )
-                .filter(
-                    PageView.ip_address.like(f"{value}%"),
-                    PageView.created_at >= cutoff,
-                    _human_page_view_filter(PageView),
-                )
-                .one()
-            )
-            pv = int(row.pv or 0)
-            visitors = int(row.visitors or 0)
-            ips = int(row.ips or 0)
-            uas = int(row.uas or 0)
-            if pv < _NETWORK_COOKIE_CHURN_MIN_PV:
-                return False
-            if visitors < _NETWORK_COOKIE_CHURN_MIN_DISTINCT_VISITORS:
-                return False
-            if ips < _NETWORK_COOKIE_CHURN_MIN_DISTINCT_IPS:
-                return False
-            if uas < _NETWORK_COOKIE_CHURN_MIN_DISTINCT_UAS:
-                return False
-            return visitors * 100 >= pv * _NETWORK_COOKIE_CHURN_MIN_VISITOR_RATIO_PCT
-    except Exception:
-        logger.exception("network cookie churn scraper lookup failed")
+    if visitors < _IP_COOKIE_CHURN_MIN_DISTINCT_VISITORS:
+        return False
+    if stats.get("user_agent", 0) < _IP_COOKIE_CHURN_MIN_DISTINCT_UAS:
         return False
+    return visitors * 100 >= pv * _IP_COOKIE_CHURN_MIN_VISITOR_RATIO_PCT
 
 
 def _is_network_cookie_churn_scraper(ip_address: str | None) -> bool:
-    prefix = _ipv4_prefix_16(ip_address)
-    if not prefix:
+    stats = _crawler_signals.window("network-cookie-churn", _ipv4_prefix_16(ip_address))
+    pv = stats.get("pv", 0)
+    visitors = stats.get("visitor_id", 0)
+    if pv < _NETWORK_COOKIE_CHURN_MIN_PV:
         return False
-    cache_bucket = int(time.time() // _NETWORK_COOKIE_CHURN_CACHE_SECONDS)
-    return _network_cookie_churn_scraper_cached(prefix, cache_bucket)
-
-
-@lru_cache(maxsize=8192)
-def _distributed_proxy_scraper_cached(prefix: str, cache_bucket: int) -> bool:
-    del cache_bucket
-    value = (prefix or "").strip()
-    if not value:
+    if visitors < _NETWORK_COOKIE_CHURN_MIN_DISTINCT_VISITORS:
         return False
-    cutoff = datetime.utcnow() - _DISTRIBUTED_PROXY_LOOKBACK
-    try:
-        direct_ref = or_(PageView.referrer.is_(None), PageView.referrer == "")
-        self_ref = or_(
-            PageView.referrer.like("http%://funba.app%"),
-            PageView.referrer.like("http%://www.funba.app%"),
-        )
-        external_ref = and_(
-            PageView.referrer.isnot(None),
-            PageView.referrer != "",
-            ~PageView.referrer.like("http%://funba.app%"),
-            ~PageView.referrer.like("http%://www.funba.app%"),
-        )
-        with SessionLocal() as db_sess:
-            row = (
-                db_sess.query(
-                    func.count(PageView.id).label("pv"),
-                    func.count(func.distinct(PageView.visitor_id)).label("visitors"),
-                    func.count(func.distinct(PageView.ip_address)).label("ips"),
-                    func.count(func.distinct(PageView.path)).label("paths"),
-                    func.sum(case((direct_ref, 1), else_=0)).label("direct_refs"),
-                    func.sum(case((self_ref, 1), else_=0)).label("self_refs"),
-                    func.sum(case((external_ref, 1), else_=0)).label("external_refs"),
-                )
-                .filter(
-                    PageView.ip_address.like(f"{value}%"),
-                    PageView.created_at >= cutoff,
-                    _human_page_view_filter(PageView),
-                )
-                .one()
-            )
-            pv = int(row.pv or 0)
-            visitors = int(row.visitors or 0)
-            ips = int(row.ips or 0)
-            paths = int(row.paths or 0)
-            direct_refs = int(row.direct_refs or 0)
-            self_refs = int(row.self_refs or 0)
-            external_refs = int(row.external_refs or 0)
-            if pv < _DISTRIBUTED_PROXY_MIN_PV:
-                return False
-            if visitors < _DISTRIBUTED_PROXY_MIN_DISTINCT_VISITORS:
-                return False
-            if ips < _DISTRIBUTED_PROXY_MIN_DISTINCT_IPS:
-                return False
-            if paths < _DISTRIBUTED_PROXY_MIN_DISTINCT_PATHS:
-                return False
-            if external_refs > 0 or self_refs > 3:
-                return False
-            if visitors * 100 < pv * _DISTRIBUTED_PROXY_MIN_VISITOR_RATIO_PCT:
-                return False
-            if ips * 100 < visitors * _DISTRIBUTED_PROXY_MIN_IP_VISITOR_RATIO_PCT:
-                return False
-            return direct_refs * 100 >= pv * _DISTRIBUTED_PROXY_MIN_DIRECT_REF_RATIO_PCT
-    except Exception:
-        logger.exception("distributed proxy scraper lookup failed")
+    if stats.get("ip_address", 0) < _NETWORK_COOKIE_CHURN_MIN_DISTINCT_IPS:
         return False
+    if stats.get("user_agent", 0) < _NETWORK_COOKIE_CHURN_MIN_DISTINCT_UAS:
+        return False
+    return visitors * 100 >= pv * _NETWORK_COOKIE_CHURN_MIN_VISITOR_RATIO_PCT
 
 
 def _is_distributed_proxy_scraper(ip_address: str | None) -> bool:
-    prefix = _ipv4_prefix_16(ip_address)
-    if not prefix:
+    stats = _crawler_signals.window("distributed-proxy", _ipv4_prefix_16(ip_address))
+    pv = stats.get("pv", 0)
+    visitors = stats.get("visitor_id", 0)
+    ips = stats.get("ip_address", 0)
+    if pv < _DISTRIBUTED_PROXY_MIN_PV:
         return False
-    cache_bucket = int(time.time() // _DISTRIBUTED_PROXY_CACHE_SECONDS)
-    return _distributed_proxy_scraper_cached(prefix, cache_bucket)
-
-
-@lru_cache(maxsize=8192)
-def _recent_marked_dynamic_crawler_prefix_cached(prefix: str, cache_bucket: int) -> bool:
-    del cache_bucket
-    value = (prefix or "").strip()
-    if not value:
+    if visitors < _DISTRIBUTED_PROXY_MIN_DISTINCT_VISITORS:
         return False
-    cutoff = datetime.utcnow() - _DYNAMIC_CRAWLER_REPEAT_LOOKBACK
-    try:
-        with SessionLocal() as db_sess:
-            row = (
-                db_sess.query(
-                    func.count(PageView.id).label("pv"),
-                    func.count(func.distinct(PageView.ip_address)).label("ips"),
-                )
-                .filter(
-                    PageView.ip_address.like(f"{value}%"),
-                    PageView.crawler_name.in_(tuple(_DYNAMIC_CRAWLER_NAMES)),
-                    PageView.created_at >= cutoff,
-                )
-                .one()
-            )
-            return int(row.pv or 0) >= 50 and int(row.ips or 0) >= 5
-    except Exception:
-        logger.exception("dynamic crawler prefix repeat lookup failed")
+    if ips < _DISTRIBUTED_PROXY_MIN_DISTINCT_IPS:
+        return False
+    if stats.get("path", 0) < _DISTRIBUTED_PROXY_MIN_DISTINCT_PATHS:
+        return False
+    if stats.get("external_refs", 0) > 0 or stats.get("self_refs", 0) > 3:
         return False
+    if visitors * 100 < pv * _DISTRIBUTED_PROXY_MIN_VISITOR_RATIO_PCT:
+        return False
+    if ips * 100 < visitors * _DISTRIBUTED_PROXY_MIN_IP_VISITOR_RATIO_PCT:
+        return False
+    return stats.get("direct_refs", 0) * 100 >= pv * _DISTRIBUTED_PROXY_MIN_DIRECT_REF_RATIO_PCT
 
 
 def _recent_marked_dynamic_crawler_prefix(ip_address: str | None) -> bool:
-    prefix = _ipv4_prefix_16(ip_address)
-    if not prefix:
-        return False
-    cache_bucket = int(time.time() // _DYNAMIC_CRAWLER_REPEAT_CACHE_SECONDS)
-    return _recent_marked_dynamic_crawler_prefix_cached(prefix, cache_bucket)
+    stats = _crawler_signals.window("dynamic-crawler-prefix", _ipv4_prefix_16(ip_address))
+    return stats.get("pv", 0) >= 50 and stats.get("ip_address", 0) >= 5
 
 
 def _dynamic_pageview_crawler_name() -> str | None:
@@ -6470,6 +6350,16 @@ def _request_crawler_decision() -> dict[str, object]:
     return decision
 
 
+# Page views are buffered and written in multi-row batches off the request
+# path; gunicorn's worker_exit hook (and atexit) drain the buffer.
+_page_view_writer = PageViewWriter(
+    lambda: SessionLocal(),
+    lambda: PageView,
+    on_batch=lambda rows: _crawler_signals.publish(rows),
+)
+atexit.register(_page_view_writer.close)
+
+
 def _should_track_page_view_request() -> bool:
     return request.method == "GET" and not request.path.startswith("/api/") and not request.path.startswith("/static/")
 
@@ -6495,22 +6385,19 @@ def _record_page_view(*, is_crawler: bool, crawler_name: str | None) -> None:
         except Exception:
             pass
 
-    pv = PageView(
-        visitor_id=_page_view_visitor_id(is_crawler=is_crawler, crawler_name=crawler_name),
-        path=request.path,
-        referrer=(request.referrer or "")[:1000],
-        user_agent=(request.user_agent.string or "")[:500],
-        is_crawler=is_crawler,
-        crawler_name=(crawler_name or "")[:64] or None,
-        ip_address=_real_ip(),
-        created_at=datetime.utcnow(),
-    )
-    try:
-        with SessionLocal() as db_sess:
-            db_sess.add(pv)
-            db_sess.commit()
-    except Exception:
-        logger.exception("page view tracking failed")
+    row = {
+        "visitor_id": _page_view_visitor_id(is_crawler=is_crawler, crawler_name=crawler_name),
+        "path": request.path,
+        "referrer": (request.referrer or "")[:1000],
+        "user_agent": (request.user_agent.string or "")[:500],
+        "is_crawler": is_crawler,
+        "crawler_name": (crawler_name or "")[:64] or None,
+        "ip_address": _real_ip(),
+        "created_at": datetime.utcnow(),
+    }
+    _page_view_writer.submit(row)
+    if not app.config.get("TESTING"):
+        _crawler_signals.observe(row)
 
 
 def _is_bot() -> bool:
@@ -7961,6 +7848,7 @@ def inject_template_helpers():
         "season_year": _season_year,
         "team_name_for_year": _team_name_for_year,
         "team_abbr_for_year": _team_abbr_for_year,
+        "live_stream_enabled": live_stream_enabled(),
     }
 
 
@@ -8107,6 +7995,7 @@ _public_views = register_public_routes(
     get_localized_url_for=lambda: _localized_url_for,
     get_t=lambda: _t,
     get_pct_fmt=lambda: pct_fmt,
+    get_prime_slug_caches=lambda: _prime_slug_caches,
     get_cached_game_metrics_payload=_cached_game_metrics_payload,
     get_load_game_metrics_payload=_load_game_metrics_payload,
 )
@@ -8505,17 +8394,124 @@ _metric_detail_views = register_metric_detail_routes(
         build_metric_feature_context=lambda: _build_metric_feature_context,
         season_label=lambda: _season_label,
         season_year_label=lambda: _season_year_label,
+        prime_slug_caches=lambda: _prime_slug_caches,
         render_template=lambda: render_template,
     ),
 )
 metric_detail = _metric_detail_views.metric_detail
 
 
+# ── Public page cache ────────────────────────────────────────────────────────
+#
+# Anonymous renders of the heaviest public pages go through web.page_cache,
+# keyed by the db.data_version counters each page reads from. Ingest, reduce
+# and roster tasks bump the counters; games_list also shows live scores, so
+# its entries are capped at a minute.
+
+_page_cache = PageCache()
+_PAGE_CACHE_ROUTES = {
+    "player_page": (lambda view_args: ("games", "metrics", "metric-defs", "players", "awards"), None),
+    "team_page": (lambda view_args: ("games", "metrics", "metric-defs", "teams", "players", "awards"), None),
+    "metric_detail": (
+        lambda view_args: ("metric-defs", f"metric:{family_base_key(str(view_args.get('metric_key') or ''))}"),
+        None,
+    ),
+    "awards_page": (lambda view_args: ("awards", "players"), None),
+    "draft_page": (lambda view_args: ("players",), None),
+    "games_list": (lambda view_args: ("games",), 60),
+}
+
+
+def _page_cache_allowed() -> bool:
+    # Logged-in and admin renders carry personalised nav and admin-only rows.
+    if app.config.get("TESTING"):
+        return False
+    return not session.get("user_id") and not is_admin()
+
+
+def _page_cache_variant() -> str:
+    # Flags the context processor exposes to every template end up in the HTML.
+    return "stream" if live_stream_enabled() else "poll"
+
+
+for _page_endpoint, (_page_versions, _page_ttl) in _PAGE_CACHE_ROUTES.items():
+    for _endpoint_name in (_page_endpoint, _LOCALIZED_PUBLIC_ENDPOINTS[_page_endpoint]):
+        app.view_functions[_endpoint_name] = _page_cache.cached_view(
+            app.view_functions[_endpoint_name],
+            name=_page_endpoint,
+            versions=_page_versions,
+            can_cache=_page_cache_allowed,
+            get_lang=_current_lang,
+            get_variant=_page_cache_variant,
+            ttl_seconds=_page_ttl,
+        )
+
+
 _admin_cache: dict = {}
-_ADMIN_CACHE_TTL = 300  # seconds
+_ADMIN_CACHE_TTL = 3600  # seconds; GameIngested / MetricReduced events clear it sooner
 _ADMIN_STALE_REDUCE_GRACE_SECONDS = 300
 
 
+# ── Cache invalidation ───────────────────────────────────────────────────────
+#
+# Celery tasks and admin routes publish typed events on db.invalidation's bus
+# after committing; each worker's listener thread drops the matching entries
+# below, which is what lets these caches keep hour-long TTLs.
+
+@app.before_request
+def _listen_for_invalidations():
+    if app.config.get("TESTING"):
+        return
+    get_invalidation_bus().ensure_listening()
+
+
+def _clear_metric_result_counts_cache() -> None:
+    global _metric_result_counts_cache
+    _metric_result_counts_cache = None
+
+
+@subscribe_invalidation(GameIngested)
+def _on_game_ingested(event: GameIngested) -> None:
+    _admin_cache.clear()
+    _delete_game_metrics_payload_cache(event.game_id)
+
+
+@subscribe_invalidation(MetricReduced)
+def _on_metric_reduced(event: MetricReduced) -> None:
+    # Also published for map-phase MetricResult writes; coverage counts MetricRunLog.
+    _admin_cache.clear()
+    _clear_metric_result_counts_cache()
+
+
+@subscribe_invalidation(MetricDefinitionPublished)
+def _on_metric_definition_published(event: MetricDefinitionPublished) -> None:
+    from metrics.framework.runtime import invalidate_metric_registry
+
+    invalidate_metric_registry()
+    _story_metric_meta.cache_clear()
+    _clear_metric_result_counts_cache()
+
+
+@subscribe_invalidation(SlugChanged)
+def _on_slug_changed(event: SlugChanged) -> None:
+    index = {"player": _player_slug_index, "game": _game_slug_index, "team": _team_slug_index}.get(event.kind)
+    if index is not None:
+        index.forget(event.entity_id)
+
+
+@subscribe_invalidation(BusReconnected)
+def _on_invalidation_bus_reconnected(event: BusReconnected) -> None:
+    # Events published while the listener was down are gone: start over.
+    from metrics.framework.runtime import invalidate_metric_registry
+
+    _admin_cache.clear()
+    _clear_metric_result_counts_cache()
+    _story_metric_meta.cache_clear()
+    invalidate_metric_registry()
+    for index in (_player_slug_index, _game_slug_index, _team_slug_index):
+        index.clear()
+
+
 def _admin_page_arg(name: str, default: int = 1) -> int:
     try:
         return max(1, int(request.args.get(name, default) or default))
@@ -8773,6 +8769,7 @@ def _load_admin_metric_perf_panel(session, *, perf_page: int, perf_page_size: in
                 "last_run_at": latest.recorded_at if latest else None,
                 "db_reads": latest.db_reads if latest else None,
                 "db_writes": latest.db_writes if latest else None,
+                "lock_wait_ms": latest.lock_wait_ms if latest else None,
                 "sample_count": stat.sample_count,
                 "samples_ms": [row.duration_ms for row in metric_rows[:5]],
             }
@@ -8787,6 +8784,16 @@ def _load_admin_metric_perf_panel(session, *, perf_page: int, perf_page_size: in
     }
 
 
+def _load_admin_page_cache_panel() -> dict:
+    rows = _page_cache.load_stats(hours=24)
+    hits = sum(row["hits"] for row in rows)
+    cacheable = hits + sum(row["renders"] for row in rows)
+    return {
+        "page_cache_rows": rows,
+        "page_cache_hit_rate": round(hits / cacheable * 100, 1) if cacheable else None,
+    }
+
+
 def _load_admin_story_tuning_panel(session, *, story_page: int, story_page_size: int, story_q: str | None = None) -> dict:
     """Paginated list of MetricDefinition rows for editing story_score_bonus
     and story_cluster. Filters to status='published'; optional substring match
@@ -8939,6 +8946,7 @@ _admin_misc_views = register_admin_misc_routes(
         load_admin_compute_runs_panel=lambda: _load_admin_compute_runs_panel,
         load_admin_recent_runs_panel=lambda: _load_admin_recent_runs_panel,
         load_admin_metric_perf_panel=lambda: _load_admin_metric_perf_panel,
+        load_admin_page_cache_panel=lambda: _load_admin_page_cache_panel,
         load_admin_story_tuning_panel=lambda: _load_admin_story_tuning_panel,
         metric_definition_model=lambda: MetricDefinitionModel,
         clear_story_metric_meta_cache=lambda: _story_metric_meta.cache_clear,
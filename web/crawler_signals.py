@@ -0,0 +1,319 @@
+"""Sliding-window page-view counters behind the dynamic crawler checks.
+
+``_request_crawler_decision`` asks questions like "how many distinct visitor
+cookies has this /16 sent human page views from in the last hour?". Rather
+than answering them with ``PageView`` aggregates, every worker keeps the
+windows in memory and feeds them from the page-view stream itself:
+
+- its own views, the moment ``_record_page_view`` builds the row;
+- other workers' views, from the batches their ``PageViewWriter`` flushes,
+  relayed over Redis pub/sub (``funba:pageviews:v1``);
+- history from before the worker started, read from ``PageView`` once in the
+  background on first use. Until that finishes ``window`` returns ``{}``, so
+  the checks let requests through rather than guess.
+
+A ``WindowFamily`` names what to count for one kind of key (an IP, a /16
+prefix, a user agent) over one lookback: the page views, any per-row
+counters, and distinct values of row fields. Counters are kept in 1/60th
+buckets of the window; distinct values are exact.
+
+``FUNBA_CRAWLER_SIGNALS_SHARED=0`` keeps each worker to its own traffic
+(single-process dev servers); ``FUNBA_CRAWLER_SIGNAL_KEYS`` caps the number
+of windows each family holds per worker, least recently fed evicted first, so
+a burst of short-lookback keys cannot push out the 30-day families. Windows
+whose lookback has passed are dropped as new views arrive, and a row older
+than a family's lookback (warm-up history) is never counted towards it.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Iterable
+
+
+logger = logging.getLogger(__name__)
+
+_REDIS_URL = os.getenv("FUNBA_CRAWLER_SIGNALS_REDIS_URL") or os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+_SHARED = os.getenv("FUNBA_CRAWLER_SIGNALS_SHARED", "1").strip().lower() not in {"0", "false", "no", "off"}
+_MAX_KEYS = int(os.getenv("FUNBA_CRAWLER_SIGNAL_KEYS", "50000"))
+_CHANNEL = "funba:pageviews:v1"
+_BUCKETS_PER_WINDOW = 60
+_RECONNECT_SECONDS = (1, 2, 5, 10, 30)
+_REDIS_RETRY_SECONDS = 30
+_ROW_FIELDS = ("visitor_id", "path", "referrer", "user_agent", "is_crawler", "crawler_name", "ip_address")
+
+
+@dataclass(frozen=True)
+class WindowFamily:
+    """What to count per key over the last ``seconds``.
+
+    ``key(row)`` returns the key a page view counts towards, or None when
+    the row is not part of this family; ``counts(row)`` returns extra
+    counters for the row; ``distinct`` lists row fields whose distinct
+    values are counted. ``max_keys`` overrides the store's per-family cap.
+    """
+
+    seconds: float
+    key: Callable[[dict], str | None]
+    counts: Callable[[dict], dict[str, int]] | None = None
+    distinct: tuple[str, ...] = ()
+    max_keys: int | None = None
+
+
+class SlidingWindow:
+    """Counters and distinct values for one key over the last ``seconds``."""
+
+    __slots__ = ("seconds", "bucket_seconds", "buckets", "totals", "seen")
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = float(seconds)
+        self.bucket_seconds = max(self.seconds / _BUCKETS_PER_WINDOW, 1.0)
+        self.buckets: deque[tuple[int, Counter]] = deque()
+        self.totals: Counter = Counter()
+        self.seen: dict[str, OrderedDict] = {}
+
+    def add(self, at: float, counts: dict[str, int], values: dict[str, str]) -> None:
+        bucket = int(at // self.bucket_seconds)
+        if self.buckets and self.buckets[-1][0] >= bucket:
+            self.buckets[-1][1].update(counts)  # late arrivals join the newest bucket
+        else:
+            self.buckets.append((bucket, Counter(counts)))
+        self.totals.update(counts)
+        for field, value in values.items():
+            seen = self.seen.setdefault(field, OrderedDict())
+            seen[value] = max(at, seen.get(value, at))
+            seen.move_to_end(value)
+
+    def snapshot(self, now: float) -> dict[str, int]:
+        self._expire(now)
+        result = {name: count for name, count in self.totals.items() if count}
+        result.update({field: len(seen) for field, seen in self.seen.items() if seen})
+        return result
+
+    def is_empty(self, now: float) -> bool:
+        self._expire(now)
+        return not self.buckets
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.seconds
+        while self.buckets and (self.buckets[0][0] + 1) * self.bucket_seconds <= cutoff:
+            _bucket, counts = self.buckets.popleft()
+            self.totals.subtract(counts)
+        for seen in self.seen.values():
+            while seen and next(iter(seen.values())) <= cutoff:
+                seen.popitem(last=False)
+
+
+def _row_time(row: dict) -> float:
+    created_at = row.get("created_at")
+    if isinstance(created_at, datetime):
+        return created_at.replace(tzinfo=timezone.utc).timestamp()
+    if isinstance(created_at, (int, float)):
+        return float(created_at)
+    return time.time()
+
+
+class CrawlerSignalStore:
+    """Per-process sliding windows for every ``WindowFamily``, fed page-view rows."""
+
+    def __init__(
+        self,
+        families: dict[str, WindowFamily],
+        *,
+        seed: Callable[[datetime], Iterable[dict]] | None = None,
+        shared: bool = _SHARED,
+        redis_url: str = _REDIS_URL,
+        client_factory: Callable | None = None,
+        max_keys: int = _MAX_KEYS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._families = families
+        self._seed = seed
+        self._shared = shared
+        self._redis_url = redis_url
+        self._client_factory = client_factory or self._connect
+        self._max_keys = max(int(max_keys), 1)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._windows: dict[str, OrderedDict[str, SlidingWindow]] = {name: OrderedDict() for name in families}
+        self._pid: int | None = None
+        self._origin = ""
+        self._ready = False
+        self._watermark = 0.0
+        self._pending: list[tuple[float, dict]] = []
+        self._client = None
+        self._unavailable_until = 0.0
+
+    # -- feeding -----------------------------------------------------------
+
+    def observe(self, row: dict) -> None:
+        """Count one page view recorded by this process."""
+        self.start()
+        self._apply([(_row_time(row), row)])
+
+    def publish(self, rows: list[dict]) -> None:
+        """Relay a batch of this process's page views to the other workers."""
+        if not self._shared or not rows:
+            return
+        client = self._client_or_none()
+        if client is None:
+            return
+        payload = json.dumps({
+            "origin": self._origin,
+            "rows": [{**{field: row.get(field) for field in _ROW_FIELDS}, "at": _row_time(row)} for row in rows],
+        })
+        try:
+            client.publish(_CHANNEL, payload)
+        except Exception:
+            self._client = None
+            self._unavailable_until = time.monotonic() + _REDIS_RETRY_SECONDS
+            logger.warning("crawler signal publish failed; pausing for %ds", _REDIS_RETRY_SECONDS, exc_info=True)
+
+    def _apply(self, timed_rows: list[tuple[float, dict]]) -> None:
+        with self._lock:
+            if not self._ready:
+                self._pending.extend(timed_rows)
+                return
+            for at, row in timed_rows:
+                self._add_locked(at, row)
+
+    def _add_locked(self, at: float, row: dict) -> None:
+        now = self._clock()
+        for name, family in self._families.items():
+            if at <= now - family.seconds:
+                continue
+            key = family.key(row)
+            if key is None:
+                continue
+            windows = self._windows[name]
+            # Least recently fed first: drop the windows that have slid past their lookback.
+            while windows and next(iter(windows.values())).is_empty(now):
+                windows.popitem(last=False)
+            window = windows.get(key)
+            if window is None:
+                window = windows[key] = SlidingWindow(family.seconds)
+                if len(windows) > max(int(family.max_keys or self._max_keys), 1):
+                    windows.popitem(last=False)
+            else:
+                windows.move_to_end(key)
+            counts = {"pv": 1, **(family.counts(row) if family.counts else {})}
+            values = {field: value for field in family.distinct if (value := row.get(field))}
+            window.add(at, counts, values)
+
+    # -- reading -----------------------------------------------------------
+
+    def window(self, family: str, key: str | None) -> dict[str, int]:
+        """Counters for ``key`` over ``family``'s lookback; ``{}`` when unknown or still warming up."""
+        if not key:
+            return {}
+        self.start()
+        with self._lock:
+            if not self._ready:
+                return {}
+            windows = self._windows.get(family, {})
+            window = windows.get(key)
+            if window is None:
+                return {}
+            now = self._clock()
+            if window.is_empty(now):
+                del windows[key]
+                return {}
+            return window.snapshot(now)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self) -> None:
+        """Begin warming from ``PageView`` and listening to other workers (again after a fork)."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            # A forked child keeps the parent's windows but none of its threads.
+            self._pid = pid
+            self._origin = f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}"
+            self._client = None
+            for windows in self._windows.values():
+                windows.clear()
+            self._pending = []
+            self._ready = self._seed is None
+            self._watermark = self._clock() if self._seed is not None else 0.0
+            watermark = datetime.fromtimestamp(self._watermark, tz=timezone.utc).replace(tzinfo=None)
+        if self._seed is not None:
+            threading.Thread(target=self._warm, args=(watermark,), name="crawler-signals-seed", daemon=True).start()
+        if self._shared:
+            threading.Thread(target=self._listen_forever, name="crawler-signals", daemon=True).start()
+
+    def _warm(self, watermark: datetime) -> None:
+        rows = 0
+        try:
+            for row in self._seed(watermark):
+                with self._lock:
+                    self._add_locked(_row_time(row), row)
+                rows += 1
+        except Exception:
+            logger.exception("crawler signal warm-up failed after %d page views; continuing with live traffic only", rows)
+        with self._lock:
+            for at, row in self._pending:
+                self._add_locked(at, row)
+            self._pending = []
+            self._ready = True
+        logger.info("crawler signals warmed from %d page views", rows)
+
+    def _connect(self):
+        import redis as _redis
+
+        return _redis.Redis.from_url(self._redis_url, socket_connect_timeout=1, health_check_interval=30)
+
+    def _client_or_none(self):
+        if self._unavailable_until and time.monotonic() < self._unavailable_until:
+            return None
+        if self._client is None:
+            try:
+                self._client = self._client_factory()
+            except Exception:
+                self._unavailable_until = time.monotonic() + _REDIS_RETRY_SECONDS
+                logger.exception("crawler signal Redis unavailable")
+                return None
+        return self._client
+
+    def _listen_forever(self) -> None:
+        failures = 0
+        while True:
+            try:
+                pubsub = self._client_factory().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(_CHANNEL)
+                failures = 0
+                for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._receive(message.get("data"))
+            except Exception:
+                logger.warning("crawler signal listener lost Redis; reconnecting", exc_info=True)
+            failures += 1
+            time.sleep(_RECONNECT_SECONDS[min(failures, len(_RECONNECT_SECONDS)) - 1])
+
+    def _receive(self, raw) -> None:
+        try:
+            payload = json.loads(raw.decode("utf-8") if isinstance(raw, bytes) else raw)
+            if payload.get("origin") == self._origin:
+                return
+            rows = [(float(row.pop("at")), row) for row in payload.get("rows") or ()]
+            # Anything older than the warm-up watermark came from PageView already.
+            rows = [(at, row) for at, row in rows if at >= self._watermark]
+        except Exception:
+            logger.warning("ignoring malformed page view batch", exc_info=True)
+            return
+        self._apply(rows)
@@ -2644,15 +2644,13 @@ def register_detail_routes(
                 # Try fetching from NBA API
                 try:
                     from db.backfill_nba_game_detail import (
-                        create_player_period_stats,
                         fetch_all_period_stats,
+                        store_player_period_stats,
                     )
 
                     periods = fetch_all_period_stats(game_id)
                     if periods:
-                        for period, period_rows in periods.items():
-                            for ps in period_rows:
-                                create_player_period_stats(session, game_id, period, ps)
+                        store_player_period_stats(session, game_id, periods)
                         session.commit()
                         rows = (
                             session.query(PlayerGamePeriodStats)
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import json
+import logging
 import math
+import os
 import re
+import threading
 import time
 from datetime import date, datetime
 from types import SimpleNamespace
@@ -12,11 +16,27 @@ from db.game_status import (
     GAME_STATUS_UPCOMING,
 )
 
+logger = logging.getLogger(__name__)
+
 # TTL cache for live card lookups — many home-page hits within a 15s poll
 # window should share one nba_api call.
 _LIVE_CARD_CACHE: dict[str, tuple[float, dict]] = {}
 _LIVE_CARD_TTL_SEC = 12.0
 
+# Incremental play-by-play per live game (see LivePlayByPlay), optionally
+# shared between web workers through Redis. ``_LIVE_PBP_LOCK`` only guards
+# the per-game lock table; each game's state is folded under its own lock.
+_LIVE_PBP_STATES: dict[str, "LivePlayByPlay"] = {}
+_LIVE_PBP_LOCKS: dict[str, threading.Lock] = {}
+_LIVE_PBP_LOCK = threading.Lock()
+_LIVE_PBP_RESYNC_FETCHES = 30
+_LIVE_PBP_KEY_PREFIX = "funba:live:v2:pbp"
+_LIVE_PBP_TTL_SEC = 6 * 3600
+_LIVE_PBP_REDIS_URL = os.getenv("FUNBA_LIVE_SCOREBOARD_REDIS_URL") or os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+_LIVE_PBP_REDIS_RETRY_SEC = 30
+_LIVE_PBP_REDIS = None
+_LIVE_PBP_REDIS_UNAVAILABLE_UNTIL = 0.0
+
 
 _ISO_CLOCK_RE = re.compile(r"^PT(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?$")
 
@@ -295,6 +315,47 @@ def _build_quarter_scores(home_team: dict, away_team: dict) -> list[dict]:
     ]
 
 
+def _progression_point(action: dict, prev_home: int, prev_road: int) -> dict | None:
+    """The score-chart point for one action, or None if the score did not change."""
+    score_home = action.get("scoreHome")
+    score_away = action.get("scoreAway")
+    if score_home in (None, "") or score_away in (None, ""):
+        return None
+    try:
+        home_score = int(score_home)
+        road_score = int(score_away)
+    except (TypeError, ValueError):
+        return None
+    if home_score == prev_home and road_score == prev_road:
+        return None
+    period = _safe_int(action.get("period"))
+    if period <= 0:
+        return None
+    clock_text = _format_clock(action.get("clock"))
+    try:
+        mins, secs = clock_text.split(":")
+        remaining = int(mins) * 60 + int(secs)
+    except Exception:
+        remaining = 0
+    if period <= 4:
+        offset = (period - 1) * 12 * 60
+        dur = 12 * 60
+    else:
+        offset = 48 * 60 + (period - 5) * 5 * 60
+        dur = 5 * 60
+    elapsed = round((offset + dur - remaining) / 60, 3)
+    raw_desc = str(action.get("description") or "").strip()
+    scorer = raw_desc.split()[0] if raw_desc else None
+    desc = raw_desc.split("(")[0].strip() or None
+    return {
+        "t": elapsed,
+        "road": road_score,
+        "home": home_score,
+        "scorer": scorer,
+        "desc": desc,
+    }
+
+
 def _build_score_progression(actions: list[dict]) -> list[dict]:
     """Build the score-chart progression from nba_api live actions.
 
@@ -303,77 +364,196 @@ def _build_score_progression(actions: list[dict]) -> list[dict]:
     chronological order; we append a point for every score change.
     """
     progression: list[dict] = [{"t": 0.0, "road": 0, "home": 0, "scorer": None, "desc": None}]
-    prev_home = prev_road = 0
     for action in actions:
-        score_home = action.get("scoreHome")
-        score_away = action.get("scoreAway")
-        if score_home in (None, "") or score_away in (None, ""):
-            continue
-        try:
-            home_score = int(score_home)
-            road_score = int(score_away)
-        except (TypeError, ValueError):
-            continue
-        if home_score == prev_home and road_score == prev_road:
-            continue
-        period = _safe_int(action.get("period"))
-        if period <= 0:
-            continue
-        clock_text = _format_clock(action.get("clock"))
-        try:
-            mins, secs = clock_text.split(":")
-            remaining = int(mins) * 60 + int(secs)
-        except Exception:
-            remaining = 0
-        if period <= 4:
-            offset = (period - 1) * 12 * 60
-            dur = 12 * 60
-        else:
-            offset = 48 * 60 + (period - 5) * 5 * 60
-            dur = 5 * 60
-        elapsed = round((offset + dur - remaining) / 60, 3)
-        raw_desc = str(action.get("description") or "").strip()
-        scorer = raw_desc.split()[0] if raw_desc else None
-        desc = raw_desc.split("(")[0].strip() or None
-        progression.append(
-            {
-                "t": elapsed,
-                "road": road_score,
-                "home": home_score,
-                "scorer": scorer,
-                "desc": desc,
-            }
-        )
-        prev_home, prev_road = home_score, road_score
+        point = _progression_point(action, progression[-1]["home"], progression[-1]["road"])
+        if point is not None:
+            progression.append(point)
     return progression
 
 
+def _pbp_row(action: dict) -> dict | None:
+    description = str(action.get("description") or "").strip()
+    if not description:
+        return None
+    score_home = action.get("scoreHome")
+    score_away = action.get("scoreAway")
+    score = "-"
+    if score_home not in (None, "") and score_away not in (None, ""):
+        score = f"{score_away}-{score_home}"
+    return {
+        "event_num": _safe_int(action.get("actionNumber")) or "-",
+        "period": _safe_int(action.get("period")) or "-",
+        "clock": _format_clock(action.get("clock")),
+        "event_type": str(action.get("actionType") or "").replace("_", " ").title() or "-",
+        "event_type_code": action.get("actionType"),
+        "description": description,
+        "score": score,
+        "margin": "-",
+        "team_id": str(action.get("teamId") or "") or None,
+        "player_id": str(action.get("personId") or "") or None,
+    }
+
+
 def _build_pbp_rows(actions: list[dict]) -> list[dict]:
-    rows: list[dict] = []
-    for action in reversed(actions):
-        description = str(action.get("description") or "").strip()
-        if not description:
-            continue
-        score_home = action.get("scoreHome")
-        score_away = action.get("scoreAway")
-        score = "-"
-        if score_home not in (None, "") and score_away not in (None, ""):
-            score = f"{score_away}-{score_home}"
-        rows.append(
-            {
-                "event_num": _safe_int(action.get("actionNumber")) or "-",
-                "period": _safe_int(action.get("period")) or "-",
-                "clock": _format_clock(action.get("clock")),
-                "event_type": str(action.get("actionType") or "").replace("_", " ").title() or "-",
-                "event_type_code": action.get("actionType"),
-                "description": description,
-                "score": score,
-                "margin": "-",
-                "team_id": str(action.get("teamId") or "") or None,
-                "player_id": str(action.get("personId") or "") or None,
-            }
-        )
-    return rows
+    rows = (_pbp_row(action) for action in reversed(actions))
+    return [row for row in rows if row is not None]
+
+
+class LivePlayByPlay:
+    """Play-by-play rows and score progression for one live game, built incrementally.
+
+    nba_api returns every action so far on every poll. ``ingest`` only turns
+    the actions after the last ``actionNumber`` it saw into rows and chart
+    points, so polling late in the fourth quarter costs the same as polling
+    early. nba_api does sometimes amend or drop earlier actions. If the
+    checkpoint action is gone or no longer matches, or
+    ``_LIVE_PBP_RESYNC_FETCHES`` polls have gone by, everything is rebuilt
+    from the full list. ``to_dict``/``from_dict`` round-trip the state
+    through Redis, so whichever worker takes the next fetch lease can
+    continue where the last one stopped.
+    """
+
+    def __init__(self, game_id: str) -> None:
+        self.game_id = game_id
+        self._reset()
+
+    def _reset(self) -> None:
+        self.last_action_number = 0
+        self.last_action: dict | None = None
+        self.rows: list[dict] = []  # oldest first
+        self.progression: list[dict] = [{"t": 0.0, "road": 0, "home": 0, "scorer": None, "desc": None}]
+        self.fetches_since_resync = 0
+
+    def ingest(self, actions: list[dict]) -> int:
+        """Fold in the actions not seen yet; returns how many were new."""
+        start = self._resume_index(actions)
+        if start is None or self.fetches_since_resync >= _LIVE_PBP_RESYNC_FETCHES:
+            self._reset()
+            start = 0
+        self.fetches_since_resync += 1
+        new_actions = actions[start:]
+        for action in new_actions:
+            row = _pbp_row(action)
+            if row is not None:
+                self.rows.append(row)
+            point = _progression_point(action, self.progression[-1]["home"], self.progression[-1]["road"])
+            if point is not None:
+                self.progression.append(point)
+        if new_actions:
+            self.last_action_number = _safe_int(actions[-1].get("actionNumber"))
+            self.last_action = dict(actions[-1])
+        return len(new_actions)
+
+    def _resume_index(self, actions: list[dict]) -> int | None:
+        """Index just past the checkpoint action; None when it was dropped or amended."""
+        if self.last_action is None:
+            return 0
+        for index in range(len(actions) - 1, -1, -1):
+            number = _safe_int(actions[index].get("actionNumber"))
+            if number <= self.last_action_number:
+                if number == self.last_action_number and actions[index] == self.last_action:
+                    return index + 1
+                return None
+        return None
+
+    def pbp_rows(self) -> list[dict]:
+        """Newest first; copies, so callers may annotate them."""
+        return [dict(row) for row in reversed(self.rows)]
+
+    def score_progression(self) -> list[dict]:
+        return [dict(point) for point in self.progression]
+
+    def to_dict(self) -> dict:
+        return {
+            "game_id": self.game_id,
+            "last_action_number": self.last_action_number,
+            "last_action": self.last_action,
+            "rows": self.rows,
+            "progression": self.progression,
+            "fetches_since_resync": self.fetches_since_resync,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LivePlayByPlay":
+        state = cls(str(data["game_id"]))
+        state.last_action_number = int(data["last_action_number"])
+        state.last_action = data.get("last_action")
+        state.rows = list(data["rows"])
+        state.progression = list(data["progression"])
+        state.fetches_since_resync = int(data.get("fetches_since_resync") or 0)
+        return state
+
+
+def _redis_or_none():
+    global _LIVE_PBP_REDIS, _LIVE_PBP_REDIS_UNAVAILABLE_UNTIL
+    if _LIVE_PBP_REDIS_UNAVAILABLE_UNTIL and time.monotonic() < _LIVE_PBP_REDIS_UNAVAILABLE_UNTIL:
+        return None
+    if _LIVE_PBP_REDIS is None:
+        try:
+            import redis as _redis
+
+            _LIVE_PBP_REDIS = _redis.Redis.from_url(_LIVE_PBP_REDIS_URL, socket_connect_timeout=1, socket_timeout=1)
+        except Exception:
+            _redis_failed("connect")
+            return None
+    return _LIVE_PBP_REDIS
+
+
+def _redis_failed(action: str) -> None:
+    global _LIVE_PBP_REDIS, _LIVE_PBP_REDIS_UNAVAILABLE_UNTIL
+    _LIVE_PBP_REDIS = None
+    _LIVE_PBP_REDIS_UNAVAILABLE_UNTIL = time.monotonic() + _LIVE_PBP_REDIS_RETRY_SEC
+    logger.warning("live play-by-play Redis %s failed; keeping state per process", action, exc_info=True)
+
+
+def _live_pbp_lock(game_id: str) -> threading.Lock:
+    with _LIVE_PBP_LOCK:
+        lock = _LIVE_PBP_LOCKS.get(game_id)
+        if lock is None:
+            lock = _LIVE_PBP_LOCKS[game_id] = threading.Lock()
+        return lock
+
+
+def _shared_play_by_play(game_id: str) -> LivePlayByPlay | None:
+    """The Redis copy of ``game_id``'s state, fetched only when it is ahead of this process's.
+
+    The small ``:n`` key holds the shared state's last ``actionNumber``; the
+    full state is read and decoded only when this process has none or is
+    behind it.
+    """
+    client = _redis_or_none()
+    if client is None:
+        return None
+    key = f"{_LIVE_PBP_KEY_PREFIX}:{game_id}"
+    local = _LIVE_PBP_STATES.get(game_id)
+    try:
+        if local is not None and _safe_int(client.get(f"{key}:n")) <= local.last_action_number:
+            return None
+        raw = client.get(key)
+    except Exception:
+        _redis_failed("read")
+        return None
+    if not raw:
+        return None
+    try:
+        return LivePlayByPlay.from_dict(json.loads(raw))
+    except Exception:
+        logger.warning("ignoring malformed shared play-by-play for %s", game_id, exc_info=True)
+        return None
+
+
+def _store_live_play_by_play(game_id: str, payload: str, last_action_number: int) -> None:
+    client = _redis_or_none()
+    if client is None:
+        return
+    key = f"{_LIVE_PBP_KEY_PREFIX}:{game_id}"
+    try:
+        pipe = client.pipeline()
+        pipe.set(key, payload, ex=_LIVE_PBP_TTL_SEC)
+        pipe.set(f"{key}:n", last_action_number, ex=_LIVE_PBP_TTL_SEC)
+        pipe.execute()
+    except Exception:
+        _redis_failed("store")
 
 
 def _parse_mmss(clock: str | None) -> int:
@@ -567,6 +747,26 @@ def fetch_live_game_detail(game_id: str) -> dict | None:
     status = _status_from_code(game.get("gameStatus"))
     game_date = _snapshot_game_date(game)
     actions = pbp_payload.get("game", {}).get("actions", [])
+    shared = _shared_play_by_play(game_id)
+    shared_payload = None
+    with _live_pbp_lock(game_id):
+        play_by_play = _LIVE_PBP_STATES.get(game_id)
+        if shared is not None and (play_by_play is None or shared.last_action_number > play_by_play.last_action_number):
+            play_by_play = shared
+        if play_by_play is None:
+            play_by_play = LivePlayByPlay(game_id)
+        _LIVE_PBP_STATES[game_id] = play_by_play
+        if play_by_play.ingest(actions):
+            shared_payload = json.dumps(play_by_play.to_dict(), separators=(",", ":"))
+        last_action_number = play_by_play.last_action_number
+        pbp_rows = play_by_play.pbp_rows()
+        score_progression = play_by_play.score_progression()
+    if shared_payload is not None:
+        _store_live_play_by_play(game_id, shared_payload, last_action_number)
+    if status == GAME_STATUS_COMPLETED:
+        with _LIVE_PBP_LOCK:
+            _LIVE_PBP_STATES.pop(game_id, None)
+            _LIVE_PBP_LOCKS.pop(game_id, None)
 
     return {
         "summary": {
@@ -600,6 +800,6 @@ def fetch_live_game_detail(game_id: str) -> dict | None:
             str(home_team.get("teamId") or ""),
         ],
         "quarter_scores": _build_quarter_scores(home_team, away_team),
-        "pbp_rows": _build_pbp_rows(actions),
-        "score_progression": _build_score_progression(actions),
+        "pbp_rows": pbp_rows,
+        "score_progression": score_progression,
     }
@@ -0,0 +1,341 @@
+"""Server-sent events for live game pages: one shared state, diffs per change.
+
+Polling ``/api/games/<id>/live`` re-sent the whole game: the box score, every
+play-by-play row and the score progression. Each poll also re-localized the
+player names. ``/api/games/<id>/live/stream`` sends that once per connection
+(``event: snapshot``); after that it sends only ``event: diff`` messages
+built by ``diff_live_state``:
+
+- ``summary``: the summary fields that changed (score, clock, period, status);
+- ``players``: per team, the rows that changed, plus the id ``order`` when
+  it moved;
+- ``pbp_new`` / ``progression_new``: play-by-play rows (newest first) and
+  score-chart points added since the previous state;
+- ``set``: any other top-level value that changed, replaced whole (team
+  stats, quarter scores, win probability, leaders). When nba_api rewrites
+  old actions, ``pbp_rows`` / ``score_progression`` are resent here too.
+
+Per process there is one ``LiveGameFeed`` per game. It polls the coalesced
+per-game ``LiveScoreboard`` snapshot while anyone is subscribed. When the
+snapshot's ETag changes it computes the diff once and wakes every stream.
+Each diff is serialised once per language, so a viewer costs one queued
+string per change, not a payload rebuild per poll.
+
+Event ids are ``<feed epoch>:<version>``. A client that reconnects with
+``Last-Event-ID`` gets the diffs it missed if they are still in the feed's
+history; otherwise (a different worker, or too far behind) it gets a fresh
+snapshot. Streams close after ``FUNBA_LIVE_STREAM_MAX_SECONDS`` and the
+browser reconnects, so no connection holds a worker thread indefinitely.
+Streaming needs threaded workers (``FUNBA_GUNICORN_THREADS``), so the
+endpoint stays off unless ``FUNBA_LIVE_STREAM_ENABLED=1``.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from db.game_status import GAME_STATUS_COMPLETED
+from web.live_scoreboard import LIVE_CARD_FIELDS, LiveScoreboard
+
+
+logger = logging.getLogger(__name__)
+
+_STREAM_ENABLED = os.getenv("FUNBA_LIVE_STREAM_ENABLED", "0").strip().lower() in {"1", "true", "yes", "on"}
+_STREAM_MAX_SECONDS = float(os.getenv("FUNBA_LIVE_STREAM_MAX_SECONDS", "300"))
+_POLL_SECONDS = 2.0
+_IDLE_SECONDS = 60.0
+_KEEPALIVE_SECONDS = 15.0
+_RETRY_MS = 3000
+_HISTORY = 200
+_MAX_FEEDS = 64
+
+_STRUCTURED_KEYS = ("summary", "players_by_team", "pbp_rows", "score_progression")
+
+
+def live_stream_enabled() -> bool:
+    return _STREAM_ENABLED
+
+
+def build_live_game_state(
+    game_id: str,
+    fetch_detail: Callable[[str], dict | None],
+    fetch_card: Callable[[str], dict | None],
+) -> dict | None:
+    """``fetch_live_game_detail`` with the live card extras merged in, as ``/live`` serves it."""
+    payload = fetch_detail(game_id)
+    if payload is None:
+        return None
+    try:
+        card = fetch_card(game_id)
+    except Exception:
+        card = None
+    if card:
+        for key in (*LIVE_CARD_FIELDS, "hot_player_ids"):
+            payload[key] = card.get(key)
+    return payload
+
+
+def diff_live_state(previous: dict, current: dict) -> dict:
+    """What changed from ``previous`` to ``current``; ``{}`` when nothing did."""
+    diff: dict = {}
+    replaced: dict = {}
+
+    before = previous.get("summary") or {}
+    summary = {key: value for key, value in (current.get("summary") or {}).items() if before.get(key) != value}
+    if summary:
+        diff["summary"] = summary
+
+    players = {}
+    previous_teams = previous.get("players_by_team") or {}
+    for team_id, rows in (current.get("players_by_team") or {}).items():
+        old_rows = previous_teams.get(team_id) or []
+        old_by_id = {row.get("player_id"): row for row in old_rows}
+        entry = {}
+        changed = [row for row in rows if old_by_id.get(row.get("player_id")) != row]
+        if changed:
+            entry["rows"] = changed
+        order = [row.get("player_id") for row in rows]
+        if order != [row.get("player_id") for row in old_rows]:
+            entry["order"] = order
+        if entry:
+            players[team_id] = entry
+    if players:
+        diff["players"] = players
+
+    # Play-by-play is newest first: normally the old list is the new one's tail.
+    old_pbp = previous.get("pbp_rows") or []
+    pbp = current.get("pbp_rows") or []
+    added = len(pbp) - len(old_pbp)
+    if added >= 0 and pbp[added:] == old_pbp:
+        if added:
+            diff["pbp_new"] = pbp[:added]
+    else:
+        replaced["pbp_rows"] = pbp
+
+    # The score progression is oldest first: normally the old list is a prefix.
+    old_points = previous.get("score_progression") or []
+    points = current.get("score_progression") or []
+    if points[: len(old_points)] == old_points:
+        if len(points) > len(old_points):
+            diff["progression_new"] = points[len(old_points):]
+    else:
+        replaced["score_progression"] = points
+
+    for key, value in current.items():
+        if key not in _STRUCTURED_KEYS and previous.get(key) != value:
+            replaced[key] = value
+    if replaced:
+        diff["set"] = replaced
+    return diff
+
+
+class LiveGameFeed:
+    """Versioned live state for one game in this process, plus recent diffs."""
+
+    def __init__(
+        self,
+        game_id: str,
+        board: LiveScoreboard,
+        *,
+        poll_seconds: float = _POLL_SECONDS,
+        idle_seconds: float = _IDLE_SECONDS,
+        history: int = _HISTORY,
+    ) -> None:
+        self.game_id = game_id
+        self.epoch = uuid.uuid4().hex[:8]
+        self._board = board
+        self._poll_seconds = poll_seconds
+        self._idle_seconds = idle_seconds
+        self._cond = threading.Condition()
+        self._render_lock = threading.Lock()
+        self.version = 0
+        self.state: dict | None = None
+        self._etag: str | None = None
+        self._diffs: deque[tuple[int, dict]] = deque(maxlen=max(int(history), 1))
+        self._rendered: dict[tuple[int, str, str], str] = {}
+        self._subscribers = 0
+        self._last_demand = 0.0
+        self._thread: threading.Thread | None = None
+
+    @contextmanager
+    def subscribed(self):
+        with self._cond:
+            self._subscribers += 1
+            self._last_demand = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"live-feed-{self.game_id}", daemon=True)
+                self._thread.start()
+        try:
+            yield self
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+                self._last_demand = time.monotonic()
+
+    def is_idle(self) -> bool:
+        with self._cond:
+            return self._thread is None and self._subscribers == 0
+
+    def _run(self) -> None:
+        while True:
+            try:
+                snapshot = self._board.snapshot()
+                if snapshot is not None and snapshot.etag != self._etag:
+                    self._publish(snapshot.etag, json.loads(snapshot.body))
+            except Exception:
+                logger.exception("live feed refresh failed for %s", self.game_id)
+            with self._cond:
+                if self._subscribers == 0 and time.monotonic() - self._last_demand > self._idle_seconds:
+                    self._thread = None
+                    return
+                finished = ((self.state or {}).get("summary") or {}).get("status") == GAME_STATUS_COMPLETED
+                # Nothing more will change once the game is final; wake streams so they can close.
+                self._cond.wait(self._idle_seconds if finished else self._poll_seconds)
+
+    def _publish(self, etag: str, state: dict) -> None:
+        with self._cond:
+            self._etag = etag
+            if self.state is not None:
+                diff = diff_live_state(self.state, state)
+                self.state = state
+                if not diff:
+                    return
+                self.version += 1
+                self._diffs.append((self.version, diff))
+            else:
+                self.state = state
+                self.version += 1
+                self._diffs.clear()
+            oldest = self._diffs[0][0] if self._diffs else self.version
+            for key in [key for key in self._rendered if key[0] < oldest - 1]:
+                del self._rendered[key]
+            self._cond.notify_all()
+
+    def events_since(self, since: int | None, timeout: float) -> list[tuple[int, str, dict]]:
+        """Events a client at version ``since`` is missing; waits up to ``timeout`` for the next one."""
+        with self._cond:
+            self._last_demand = time.monotonic()
+            self._cond.wait_for(lambda: self.version > 0 and self.version != since, timeout)
+            if self.version == 0 or since == self.version:
+                return []
+            oldest = self._diffs[0][0] if self._diffs else None
+            if since is None or since > self.version or oldest is None or since < oldest - 1:
+                return [(self.version, "snapshot", self.state)]
+            return [(version, "diff", diff) for version, diff in self._diffs if version > since]
+
+    def is_final(self) -> bool:
+        with self._cond:
+            return ((self.state or {}).get("summary") or {}).get("status") == GAME_STATUS_COMPLETED
+
+    def render(self, version: int, kind: str, payload: dict, lang: str, decorate: Callable[[str, dict], dict]) -> str:
+        """The event's JSON for ``lang``, serialised once for every viewer of this feed."""
+        key = (version, kind, lang)
+        cached = self._rendered.get(key)
+        if cached is not None:
+            return cached
+        with self._render_lock:
+            cached = self._rendered.get(key)
+            if cached is None:
+                cached = json.dumps(decorate(kind, copy.deepcopy(payload)), separators=(",", ":"), default=str)
+                self._rendered[key] = cached
+        return cached
+
+
+class LiveGameHub:
+    """Per-game coalesced snapshots (for polling) and feeds (for streams) in this process."""
+
+    def __init__(
+        self,
+        build_state: Callable[[str], dict | None],
+        *,
+        board_factory: Callable[..., LiveScoreboard] = LiveScoreboard,
+        poll_seconds: float = _POLL_SECONDS,
+        idle_seconds: float = _IDLE_SECONDS,
+        max_feeds: int = _MAX_FEEDS,
+    ) -> None:
+        self._build_state = build_state
+        self._board_factory = board_factory
+        self._poll_seconds = poll_seconds
+        self._idle_seconds = idle_seconds
+        self._max_feeds = max_feeds
+        self._lock = threading.Lock()
+        self._boards: dict[str, LiveScoreboard] = {}
+        self._feeds: dict[str, LiveGameFeed] = {}
+
+    def board(self, game_id: str) -> LiveScoreboard:
+        with self._lock:
+            board = self._boards.get(game_id)
+            if board is None:
+                if len(self._boards) >= self._max_feeds:
+                    for stale_id in [key for key in self._boards if key not in self._feeds][: len(self._boards) // 2 or 1]:
+                        del self._boards[stale_id]
+                board = self._boards[game_id] = self._board_factory(
+                    lambda: self._build_state(game_id), name=f"game:{game_id}"
+                )
+            return board
+
+    def state(self, game_id: str) -> dict | None:
+        """The current live payload for a polling client (a private copy), or None."""
+        snapshot = self.board(game_id).snapshot()
+        return json.loads(snapshot.body) if snapshot is not None else None
+
+    def feed(self, game_id: str) -> LiveGameFeed:
+        board = self.board(game_id)
+        with self._lock:
+            feed = self._feeds.get(game_id)
+            if feed is None:
+                if len(self._feeds) >= self._max_feeds:
+                    for idle_id in [key for key, value in self._feeds.items() if value.is_idle()]:
+                        del self._feeds[idle_id]
+                feed = self._feeds[game_id] = LiveGameFeed(
+                    game_id, board, poll_seconds=self._poll_seconds, idle_seconds=self._idle_seconds
+                )
+            return feed
+
+    def stream(
+        self,
+        game_id: str,
+        last_event_id: str | None,
+        *,
+        lang: str,
+        decorate: Callable[[str, dict], dict],
+        max_seconds: float = _STREAM_MAX_SECONDS,
+        keepalive_seconds: float = _KEEPALIVE_SECONDS,
+    ) -> Iterator[str]:
+        """SSE text for one connection: the catch-up events, then diffs as they happen."""
+        feed = self.feed(game_id)
+        since = _parse_event_id(last_event_id, feed.epoch)
+        deadline = time.monotonic() + max_seconds
+        yield f"retry: {_RETRY_MS}\n\n"
+        with feed.subscribed():
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                events = feed.events_since(since, min(keepalive_seconds, remaining))
+                if not events:
+                    yield ": keepalive\n\n"
+                    continue
+                for version, kind, payload in events:
+                    data = feed.render(version, kind, payload, lang, decorate)
+                    yield f"id: {feed.epoch}:{version}\nevent: {kind}\ndata: {data}\n\n"
+                    since = version
+                if feed.is_final():
+                    yield "event: end\ndata: {}\n\n"
+                    return
+
+
+def _parse_event_id(raw: str | None, epoch: str) -> int | None:
+    text = str(raw or "").strip()
+    feed_epoch, _, version = text.partition(":")
+    if feed_epoch != epoch or not version.isdigit():
+        return None
+    return int(version)
@@ -0,0 +1,227 @@
+"""One coalesced /api/games/live payload per refresh interval.
+
+``api_games_live`` used to call the nba_api live scoreboard, plus a live
+boxscore per game in progress, for every request. ``LiveScoreboard`` keeps
+the serialised payload instead:
+
+- a request gets the current snapshot. Once it is older than
+  ``FUNBA_LIVE_SCOREBOARD_REFRESH_SECONDS``, a single background refresh
+  starts and requests keep getting the stale snapshot until it lands. Only
+  a cold process makes its first request wait (up to ``wait_seconds``);
+- across processes the refresh goes through Redis. The fresh shared
+  snapshot in ``funba:live:v1:games`` is reused if there is one. Otherwise
+  whoever takes the ``funba:live:v1:games:lock`` fetch lease calls nba_api,
+  while everyone else polls the shared key for the result. That is one
+  upstream round per interval for the whole fleet, not per worker. If
+  Redis is unavailable, each process fetches for itself;
+- each snapshot carries an ETag over its body, so polls that send
+  ``If-None-Match`` get a 304 until the scoreboard actually changes.
+
+Nothing polls nba_api while nobody is asking: refreshes only start from
+requests. ``name`` namespaces the shared keys, so the per-game live state
+behind the SSE stream (``web.live_game_stream``) is coalesced the same way.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable
+
+from db.game_status import GAME_STATUS_LIVE
+
+
+logger = logging.getLogger(__name__)
+
+_REFRESH_SECONDS = float(os.getenv("FUNBA_LIVE_SCOREBOARD_REFRESH_SECONDS", "10"))
+_REDIS_URL = os.getenv("FUNBA_LIVE_SCOREBOARD_REDIS_URL") or os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+_KEY_PREFIX = "funba:live:v1"
+_REDIS_RETRY_SECONDS = 30
+_POLL_SECONDS = 0.1
+
+LIVE_CARD_FIELDS = (
+    "home_fg_pct",
+    "road_fg_pct",
+    "home_fg3_pct",
+    "road_fg3_pct",
+    "home_scorer",
+    "road_scorer",
+    "home_rebounder",
+    "road_rebounder",
+    "home_assister",
+    "road_assister",
+    "home_win_probability",
+    "road_win_probability",
+)
+
+
+def build_live_games_payload(fetch_scoreboard: Callable[[], dict], fetch_card: Callable[[str], dict | None]) -> dict:
+    """Scoreboard entries, with live boxscore extras merged into games in progress."""
+    games = []
+    for game_id, snapshot in fetch_scoreboard().items():
+        entry = dict(snapshot)
+        if snapshot.get("status") == GAME_STATUS_LIVE:
+            card = fetch_card(game_id)
+            if card:
+                entry.update({field: card.get(field) for field in LIVE_CARD_FIELDS})
+                entry["hot_player_ids"] = card.get("hot_player_ids", [])
+        games.append(entry)
+    return {"games": games}
+
+
+@dataclass(frozen=True)
+class LiveSnapshot:
+    body: bytes
+    etag: str
+    fetched_at: float
+
+    @classmethod
+    def from_payload(cls, payload: dict, fetched_at: float) -> "LiveSnapshot":
+        body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+        return cls(body=body, etag=hashlib.sha1(body).hexdigest()[:20], fetched_at=fetched_at)
+
+    def dumps(self) -> bytes:
+        return json.dumps({"etag": self.etag, "fetched_at": self.fetched_at}).encode("utf-8") + b"\n" + self.body
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "LiveSnapshot":
+        header, body = raw.split(b"\n", 1)
+        meta = json.loads(header)
+        return cls(body=body, etag=str(meta["etag"]), fetched_at=float(meta["fetched_at"]))
+
+
+class LiveScoreboard:
+    """Coalesced, periodically refreshed live games payload."""
+
+    def __init__(
+        self,
+        build_payload: Callable[[], dict | None],
+        *,
+        name: str = "games",
+        refresh_seconds: float = _REFRESH_SECONDS,
+        wait_seconds: float = 5.0,
+        redis_factory: Callable | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._build_payload = build_payload
+        self._snapshot_key = f"{_KEY_PREFIX}:{name}"
+        self._lock_key = f"{_KEY_PREFIX}:{name}:lock"
+        self._refresh_seconds = max(float(refresh_seconds), 1.0)
+        self._wait_seconds = wait_seconds
+        self._redis_factory = redis_factory or self._connect
+        self._clock = clock
+        self._current: LiveSnapshot | None = None
+        self._lock = threading.Lock()
+        self._inflight: threading.Event | None = None
+        self._client = None
+        self._unavailable_until = 0.0
+
+    def snapshot(self) -> LiveSnapshot | None:
+        """The newest payload; None only if a cold fetch did not finish in ``wait_seconds``."""
+        current = self._current
+        if current is not None and self._clock() - current.fetched_at < self._refresh_seconds:
+            return current
+        done = self._start_refresh()
+        if current is not None:
+            return current
+        done.wait(self._wait_seconds)
+        return self._current
+
+    def _start_refresh(self) -> threading.Event:
+        with self._lock:
+            if self._inflight is None:
+                self._inflight = threading.Event()
+                threading.Thread(target=self._refresh, args=(self._inflight,), name="live-scoreboard", daemon=True).start()
+            return self._inflight
+
+    def _refresh(self, done: threading.Event) -> None:
+        try:
+            snapshot = self._load()
+            if snapshot is not None:
+                self._current = snapshot
+        except Exception:
+            logger.exception("live scoreboard refresh failed")
+        finally:
+            with self._lock:
+                self._inflight = None
+            done.set()
+
+    def _load(self) -> LiveSnapshot | None:
+        client = self._redis_or_none()
+        if client is None:
+            return self._fetch()
+        shared = self._read_shared(client)
+        if shared is not None and self._is_fresh(shared):
+            return shared
+        try:
+            leased = client.set(self._lock_key, uuid.uuid4().hex, nx=True, px=int(self._refresh_seconds * 1000))
+        except Exception:
+            self._redis_failed("lease")
+            return self._fetch()
+        if not leased:
+            # Another process is fetching; its snapshot lands in the shared key.
+            deadline = time.monotonic() + self._wait_seconds
+            while time.monotonic() < deadline:
+                time.sleep(_POLL_SECONDS)
+                latest = self._read_shared(client)
+                if latest is not None and self._is_fresh(latest):
+                    return latest
+            if shared is not None or self._current is not None:
+                return shared
+        snapshot = self._fetch()
+        if snapshot is None:
+            return None
+        try:
+            client.set(self._snapshot_key, snapshot.dumps(), ex=int(max(self._refresh_seconds * 6, 60)))
+        except Exception:
+            self._redis_failed("store")
+        return snapshot
+
+    def _fetch(self) -> LiveSnapshot | None:
+        payload = self._build_payload()
+        if payload is None:
+            return None
+        return LiveSnapshot.from_payload(payload, self._clock())
+
+    def _is_fresh(self, snapshot: LiveSnapshot) -> bool:
+        return self._clock() - snapshot.fetched_at < self._refresh_seconds
+
+    def _read_shared(self, client) -> LiveSnapshot | None:
+        try:
+            raw = client.get(self._snapshot_key)
+        except Exception:
+            self._redis_failed("read")
+            return None
+        if not raw:
+            return None
+        try:
+            return LiveSnapshot.loads(raw)
+        except Exception:
+            logger.warning("ignoring malformed shared live scoreboard", exc_info=True)
+            return None
+
+    def _connect(self):
+        import redis as _redis
+
+        return _redis.Redis.from_url(_REDIS_URL, socket_connect_timeout=1, socket_timeout=1)
+
+    def _redis_or_none(self):
+        if self._unavailable_until and time.monotonic() < self._unavailable_until:
+            return None
+        if self._client is None:
+            try:
+                self._client = self._redis_factory()
+            except Exception:
+                self._redis_failed("connect")
+                return None
+        return self._client
+
+    def _redis_failed(self, action: str) -> None:
+        self._client = None
+        self._unavailable_until = time.monotonic() + _REDIS_RETRY_SECONDS
+        logger.warning("live scoreboard Redis %s failed; fetching per process for %ds", action, _REDIS_RETRY_SECONDS, exc_info=True)
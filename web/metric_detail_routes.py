@@ -96,6 +96,25 @@ def _metric_dataset_description(metric_def, *, zh: bool = False) -> str:
     return f"{description}{separator} {suffix}"[:5000]
 
 
+def _prime_leaderboard_slugs(deps, result_rows: list[dict]) -> None:
+    """Batch-load the slugs behind every player, team and game link the leaderboard renders."""
+    ids = {"player_ids": set(), "team_ids": set(), "game_ids": set()}
+    for row in result_rows:
+        entity_id = str(row["entity_id"]).split(":")[0]
+        if row["entity_type"] in ("player", "player_franchise"):
+            ids["player_ids"].add(entity_id)
+        elif row["entity_type"] == "team":
+            ids["team_ids"].add(row["entity_id"])
+        elif row["entity_type"] == "game":
+            ids["game_ids"].add(entity_id)
+        sub_key_info = row["sub_key_info"] or {}
+        for kind in ("player", "team", "game"):
+            if sub_key_info.get(f"{kind}_id"):
+                ids[f"{kind}_ids"].add(sub_key_info[f"{kind}_id"])
+        ids["game_ids"].update(meta["game_id"] for meta in row["games_meta"] if meta.get("game_id"))
+    deps.prime_slug_caches()(**ids)
+
+
 def register_metric_detail_routes(app, deps):
     from db.entity_id import decode as _decode_entity_id
 
@@ -816,6 +835,7 @@ def register_metric_detail_routes(app, deps):
                     }
                 )
             show_rank_group = any(r["rank_group_label"] for r in result_rows)
+            _prime_leaderboard_slugs(deps, result_rows)
 
             _, backfill = deps.build_metric_backfill_status()(session, query_metric_key)
             dd_key = query_metric_key
@@ -9,6 +9,40 @@ from types import SimpleNamespace
 from flask import jsonify, request
 
 
+def _invalidate_metric_registry(metric_key: str | None = None) -> None:
+    # Drop this process's cached runtime metrics right away; other web
+    # workers follow the MetricDefinitionPublished event (Celery workers the
+    # MetricDefinition version token). Cached public pages carrying metric
+    # names/status follow "metric-defs".
+    from db.data_version import bump_data_versions
+    from db.invalidation import MetricDefinitionPublished, publish
+    from metrics.framework.runtime import invalidate_metric_registry
+
+    invalidate_metric_registry()
+    bump_data_versions("metric-defs")
+    publish(MetricDefinitionPublished(metric_key=metric_key))
+
+
+def _clear_result_counts(session, metric_keys) -> None:
+    # Keep the catalog's MetricResultCount summary in step with the delete.
+    from metrics.framework.runner import clear_result_counts
+
+    clear_result_counts(session, metric_keys)
+
+
+def _clear_metric_game_flags(session, model, metric_keys, flag) -> None:
+    # Run before deleting ``model`` rows, so ingest stops trusting the game's metric flag.
+    from sqlalchemy import select
+
+    from db.game_artifact_status import clear_metric_flags
+
+    clear_metric_flags(
+        session,
+        select(model.game_id).where(model.metric_key.in_(metric_keys), model.game_id.isnot(None)).distinct(),
+        flag,
+    )
+
+
 def register_metrics_write_routes(app, deps):
     @app.post("/api/metrics/search")
     @deps.limiter().limit("30 per minute")
@@ -555,6 +589,7 @@ def register_metrics_write_routes(app, deps):
                 row.status = "published"
                 row.updated_at = now
             session.commit()
+            _invalidate_metric_registry(clean_key if needs_rename else metric_key)
             dispatch_key = clean_key if needs_rename else getattr(base_row, "key", metric_key)
         try:
             deps.dispatch_metric_backfill()(dispatch_key)
@@ -588,6 +623,7 @@ def register_metrics_write_routes(app, deps):
                     row.updated_at = now
                     toggled_keys.append(row.key)
             session.commit()
+            _invalidate_metric_registry(base_row.key)
         return jsonify({"ok": True, "status": new_status, "toggled_keys": toggled_keys})
 
     @app.get("/api/metrics/<metric_key>/qualifying-games")
@@ -744,6 +780,7 @@ def register_metrics_write_routes(app, deps):
             if not any(field in body for field in metadata_fields):
                 metric.updated_at = datetime.utcnow()
                 session.commit()
+                _invalidate_metric_registry(metric_key)
             else:
                 source_type = "code" if code_python else ("rule" if body.get("definition") is not None else getattr(metric, "source_type", "rule"))
                 if source_type == "code":
@@ -808,10 +845,13 @@ def register_metrics_write_routes(app, deps):
                     now=now,
                 )
                 session.commit()
+                _invalidate_metric_registry(metric_key)
 
             if body.get("rebackfill") and metric.status == "published":
                 family_keys = [row.key for row in deps.metric_family_rows()(session, metric)]
+                _clear_metric_game_flags(session, MetricResultModel, family_keys, "has_metric_results")
                 session.query(MetricResultModel).filter(MetricResultModel.metric_key.in_(family_keys)).delete(synchronize_session=False)
+                _clear_result_counts(session, family_keys)
                 session.query(MetricComputeRun).filter(MetricComputeRun.metric_key.in_(family_keys)).delete(synchronize_session=False)
                 session.commit()
 
@@ -819,6 +859,7 @@ def register_metrics_write_routes(app, deps):
                     from sqlalchemy.orm import sessionmaker as _sm
                     _sess = _sm(bind=engine)()
                     try:
+                        _clear_metric_game_flags(_sess, MetricRunLog, family_keys, "has_metric_run_logs")
                         _sess.query(MetricRunLog).filter(MetricRunLog.metric_key.in_(family_keys)).delete(synchronize_session=False)
                         _sess.commit()
                     except Exception:
@@ -0,0 +1,377 @@
+"""Read-through cache for rendered public pages.
+
+Anonymous GETs of the wrapped endpoints are served from, in order:
+
+1. a bounded per-process LRU of rendered bodies;
+2. Redis, ``funba:page:v1:<name>:<lang>:<data version>:<path hash>``, shared
+   by every gunicorn worker (bodies stored zlib-compressed);
+3. the view itself, whose 200 response is written back to both tiers.
+
+The data-version fragment comes from ``db.data_version``: ingest and reduce
+tasks bump the counters a page depends on, so new data changes the key and
+old entries simply age out. ``FUNBA_PAGE_CACHE_TTL_SECONDS`` bounds how long
+an entry lives when a writer forgets to bump.
+
+A miss is rendered once per key: threads in one process queue on a local
+lock, and processes race for a short Redis ``SET NX`` lock; losers poll for
+the winner's body before giving up and rendering themselves.
+
+Lookup outcomes and latencies are counted per page in memory and flushed to
+hourly Redis hashes for the admin panel (``load_page_cache_stats``).
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+from urllib.parse import urlencode
+
+from flask import Response, make_response, request
+
+from db.data_version import data_version_token
+
+
+logger = logging.getLogger(__name__)
+
+_REDIS_URL = os.getenv("FUNBA_PAGE_CACHE_REDIS_URL") or os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+_ENABLED = os.getenv("FUNBA_PAGE_CACHE_ENABLED", "1").strip().lower() not in {"0", "false", "no", "off"}
+_MAX_ENTRIES = int(os.getenv("FUNBA_PAGE_CACHE_SIZE", "200"))
+_TTL_SECONDS = int(os.getenv("FUNBA_PAGE_CACHE_TTL_SECONDS", "900"))
+_LOCK_SECONDS = 15.0
+_WAIT_SECONDS = 3.0
+_POLL_SECONDS = 0.05
+_STATS_FLUSH_SECONDS = 10.0
+_STATS_RETENTION_SECONDS = 2 * 24 * 3600
+_REDIS_RETRY_SECONDS = 30
+_KEY_PREFIX = "funba:page:v1"
+OUTCOMES = ("local", "redis", "render", "bypass")
+
+_redis_client = None
+_redis_unavailable_until = 0.0
+
+
+def _redis_or_none():
+    global _redis_client, _redis_unavailable_until
+    now = time.monotonic()
+    if _redis_unavailable_until and now < _redis_unavailable_until:
+        return None
+    if _redis_client is not None:
+        return _redis_client
+    try:
+        import redis as _redis
+
+        _redis_client = _redis.Redis.from_url(_REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+        return _redis_client
+    except Exception:
+        _redis_unavailable_until = now + _REDIS_RETRY_SECONDS
+        logger.exception("page cache Redis unavailable")
+        return None
+
+
+def _redis_failed(action: str) -> None:
+    global _redis_client, _redis_unavailable_until
+    _redis_client = None
+    _redis_unavailable_until = time.monotonic() + _REDIS_RETRY_SECONDS
+    logger.warning("page cache Redis %s failed; using the local LRU for %ds", action, _REDIS_RETRY_SECONDS, exc_info=True)
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    body: bytes
+    mimetype: str
+
+    def to_response(self) -> Response:
+        return Response(self.body, mimetype=self.mimetype)
+
+    def dumps(self) -> bytes:
+        return self.mimetype.encode("ascii") + b"\n" + zlib.compress(self.body)
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "CachedPage":
+        mimetype, _, body = raw.partition(b"\n")
+        return cls(body=zlib.decompress(body), mimetype=mimetype.decode("ascii"))
+
+
+def _cacheable_response(response) -> bool:
+    if response.status_code != 200 or response.direct_passthrough:
+        return False
+    if response.headers.get("Set-Cookie"):
+        return False
+    cache_control = (response.headers.get("Cache-Control") or "").lower()
+    return "no-store" not in cache_control and "private" not in cache_control
+
+
+def _stats_key(hour: datetime) -> str:
+    return f"{_KEY_PREFIX}:stats:{hour:%Y%m%d%H}"
+
+
+class PageCache:
+    """Two-tier rendered-page cache with single-flight misses."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = _MAX_ENTRIES,
+        ttl_seconds: int = _TTL_SECONDS,
+        redis_factory: Callable = _redis_or_none,
+        wait_seconds: float = _WAIT_SECONDS,
+    ) -> None:
+        self._max_entries = max(int(max_entries), 1)
+        self._ttl_seconds = int(ttl_seconds)
+        self._redis_factory = redis_factory
+        self._wait_seconds = wait_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[CachedPage, float]] = OrderedDict()
+        self._key_locks: dict[str, list] = {}
+        self._counts: dict[tuple[str, str], list[float]] = defaultdict(lambda: [0, 0.0])
+        self._flushed_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ── Lookup tiers ─────────────────────────────────────────────────────
+
+    def _local_get(self, key: str) -> CachedPage | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def _local_set(self, key: str, page: CachedPage, ttl_seconds: int) -> None:
+        with self._lock:
+            self._entries[key] = (page, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _redis_get(self, key: str) -> CachedPage | None:
+        client = self._redis_factory()
+        if client is None:
+            return None
+        try:
+            raw = client.get(key)
+        except Exception:
+            _redis_failed("read")
+            return None
+        if raw is None:
+            return None
+        try:
+            return CachedPage.loads(raw)
+        except Exception:
+            logger.warning("page cache entry %s is unreadable; re-rendering", key, exc_info=True)
+            return None
+
+    def _store(self, key: str, page: CachedPage, ttl_seconds: int) -> None:
+        self._local_set(key, page, ttl_seconds)
+        client = self._redis_factory()
+        if client is None:
+            return
+        try:
+            client.set(key, page.dumps(), ex=ttl_seconds)
+        except Exception:
+            _redis_failed("write")
+
+    def lookup(self, key: str) -> tuple[CachedPage | None, str]:
+        page = self._local_get(key)
+        if page is not None:
+            return page, "local"
+        page = self._redis_get(key)
+        if page is not None:
+            self._local_set(key, page, self._ttl_seconds)
+            return page, "redis"
+        return None, "render"
+
+    @contextmanager
+    def _single_flight(self, key: str):
+        """Hold the right to render ``key``; yields a page if someone else did."""
+        with self._lock:
+            holder = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            holder[1] += 1
+        try:
+            with holder[0]:
+                page, _outcome = self.lookup(key)
+                if page is not None:
+                    yield page
+                    return
+                client = self._redis_factory()
+                lock_key = f"{key}:lock"
+                owns_lock = True
+                if client is not None:
+                    try:
+                        owns_lock = bool(client.set(lock_key, b"1", nx=True, px=int(_LOCK_SECONDS * 1000)))
+                    except Exception:
+                        _redis_failed("lock")
+                        client = None
+                if not owns_lock:
+                    # Another worker is rendering: wait for its body, then give up
+                    # and render too rather than hold the request hostage.
+                    deadline = time.monotonic() + self._wait_seconds
+                    while time.monotonic() < deadline:
+                        time.sleep(_POLL_SECONDS)
+                        page = self._redis_get(key)
+                        if page is not None:
+                            self._local_set(key, page, self._ttl_seconds)
+                            yield page
+                            return
+                try:
+                    yield None
+                finally:
+                    if owns_lock and client is not None:
+                        try:
+                            client.delete(lock_key)
+                        except Exception:
+                            _redis_failed("unlock")
+        finally:
+            with self._lock:
+                holder[1] -= 1
+                if holder[1] == 0:
+                    self._key_locks.pop(key, None)
+
+    # ── Flask integration ────────────────────────────────────────────────
+
+    def cached_view(
+        self,
+        view: Callable,
+        *,
+        name: str,
+        versions: Callable[[dict], tuple[str, ...]],
+        can_cache: Callable[[], bool],
+        get_lang: Callable[[], str],
+        get_variant: Callable[[], str] | None = None,
+        ttl_seconds: int | None = None,
+    ) -> Callable:
+        """Wrap ``view`` so cacheable requests go through the cache.
+
+        ``versions(view_args)`` names the data-version counters the page
+        depends on; ``can_cache()`` vetoes per request (logged-in users see
+        personalised chrome, so only anonymous pages are shared).
+        ``get_variant()`` names process-level render flags baked into the
+        HTML, so workers rendering with different flags never share entries.
+        """
+        ttl_seconds = int(ttl_seconds or self._ttl_seconds)
+
+        @functools.wraps(view)
+        def wrapper(**view_args):
+            started = time.perf_counter()
+            if not _ENABLED or request.method != "GET" or not can_cache():
+                response = view(**view_args)
+                self._record(name, "bypass", started)
+                return response
+            token = data_version_token(versions(view_args))
+            if token is None:
+                response = view(**view_args)
+                self._record(name, "bypass", started)
+                return response
+            query = urlencode(sorted(request.args.items(multi=True)))
+            path_hash = hashlib.sha1(f"{request.path}?{query}".encode("utf-8")).hexdigest()
+            variant = get_variant() if get_variant is not None else ""
+            key = f"{_KEY_PREFIX}:{name}:{get_lang()}:{variant}:{token}:{path_hash}"
+
+            page, outcome = self.lookup(key)
+            if page is not None:
+                self._record(name, outcome, started)
+                return page.to_response()
+            with self._single_flight(key) as page:
+                if page is not None:
+                    self._record(name, "redis", started)
+                    return page.to_response()
+                response = make_response(view(**view_args))
+                if _cacheable_response(response):
+                    self._store(key, CachedPage(response.get_data(), response.mimetype or "text/html"), ttl_seconds)
+                    self._record(name, "render", started)
+                else:
+                    self._record(name, "bypass", started)
+                return response
+
+        return wrapper
+
+    # ── Stats ────────────────────────────────────────────────────────────
+
+    def _record(self, name: str, outcome: str, started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self._lock:
+            count = self._counts[(name, outcome)]
+            count[0] += 1
+            count[1] += elapsed_ms
+        if time.monotonic() - self._flushed_at >= _STATS_FLUSH_SECONDS:
+            self.flush_stats()
+
+    def flush_stats(self) -> None:
+        """Add this process's counters to the current hour's Redis hash."""
+        with self._lock:
+            counts, self._counts = self._counts, defaultdict(lambda: [0, 0.0])
+            self._flushed_at = time.monotonic()
+        if not counts:
+            return
+        client = self._redis_factory()
+        if client is None:
+            return
+        key = _stats_key(datetime.utcnow())
+        try:
+            pipe = client.pipeline()
+            for (name, outcome), (requests, total_ms) in counts.items():
+                pipe.hincrby(key, f"{name}:{outcome}:n", int(requests))
+                pipe.hincrbyfloat(key, f"{name}:{outcome}:ms", round(total_ms, 3))
+            pipe.expire(key, _STATS_RETENTION_SECONDS)
+            pipe.execute()
+        except Exception:
+            _redis_failed("stats flush")
+
+    def load_stats(self, hours: int = 24) -> list[dict]:
+        """Per-page hit rate and latency over the last ``hours`` hours."""
+        self.flush_stats()
+        totals: dict[str, dict[str, list[float]]] = defaultdict(lambda: {outcome: [0, 0.0] for outcome in OUTCOMES})
+        client = self._redis_factory()
+        if client is not None:
+            now = datetime.utcnow()
+            try:
+                pipe = client.pipeline()
+                for offset in range(hours):
+                    pipe.hgetall(_stats_key(now - timedelta(hours=offset)))
+                buckets = pipe.execute()
+            except Exception:
+                _redis_failed("stats read")
+                buckets = []
+            for bucket in buckets:
+                for field, value in (bucket or {}).items():
+                    field = field.decode("utf-8") if isinstance(field, bytes) else str(field)
+                    name, outcome, kind = field.rsplit(":", 2)
+                    if outcome not in OUTCOMES:
+                        continue
+                    totals[name][outcome][0 if kind == "n" else 1] += float(value)
+        rows = []
+        for name, outcomes in sorted(totals.items()):
+            hits = outcomes["local"][0] + outcomes["redis"][0]
+            cacheable = hits + outcomes["render"][0]
+            hit_ms = outcomes["local"][1] + outcomes["redis"][1]
+            rows.append({
+                "name": name,
+                "requests": int(cacheable + outcomes["bypass"][0]),
+                "hits": int(hits),
+                "local_hits": int(outcomes["local"][0]),
+                "renders": int(outcomes["render"][0]),
+                "bypassed": int(outcomes["bypass"][0]),
+                "hit_rate": round(hits / cacheable * 100, 1) if cacheable else None,
+                "avg_hit_ms": round(hit_ms / hits, 2) if hits else None,
+                "avg_render_ms": round(outcomes["render"][1] / outcomes["render"][0], 1) if outcomes["render"][0] else None,
+            })
+        return rows
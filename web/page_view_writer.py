@@ -0,0 +1,181 @@
+"""Buffered PageView inserts off the request path.
+
+Requests hand ``PageViewWriter.submit`` a row dict and return; a daemon
+thread per process drains the bounded queue and writes multi-row INSERTs of
+up to ``FUNBA_PAGE_VIEW_BATCH_SIZE`` rows, at least every
+``FUNBA_PAGE_VIEW_FLUSH_MS`` while rows are waiting. When MySQL falls behind
+and the queue fills, new views are dropped and counted rather than making
+requests wait: analytics tolerate gaps, page latency does not.
+
+``on_batch`` sees each batch before it is written (the crawler signal store
+relays it to the other workers). ``close`` drains what is queued; gunicorn calls it from ``worker_exit``
+(see gunicorn.conf.py) and ``atexit`` covers the dev server.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Callable
+
+
+logger = logging.getLogger(__name__)
+
+_MAX_QUEUE = int(os.getenv("FUNBA_PAGE_VIEW_QUEUE_SIZE", "10000"))
+_BATCH_SIZE = int(os.getenv("FUNBA_PAGE_VIEW_BATCH_SIZE", "200"))
+_FLUSH_SECONDS = int(os.getenv("FUNBA_PAGE_VIEW_FLUSH_MS", "500")) / 1000.0
+_LOSS_LOG_SECONDS = 60.0
+
+
+class PageViewWriter:
+    """Per-process buffered writer for PageView rows."""
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        get_model: Callable,
+        *,
+        max_queue: int = _MAX_QUEUE,
+        batch_size: int = _BATCH_SIZE,
+        flush_interval_seconds: float = _FLUSH_SECONDS,
+        on_batch: Callable[[list[dict]], None] | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._get_model = get_model
+        self._max_queue = max(int(max_queue), 1)
+        self._batch_size = max(int(batch_size), 1)
+        self._flush_interval = flush_interval_seconds
+        self._on_batch = on_batch
+        self._queue: queue.Queue = queue.Queue(maxsize=self._max_queue)
+        self._lock = threading.Lock()
+        self._counts: Counter[str] = Counter()
+        self._logged_losses = 0
+        self._logged_at = 0.0
+        self._pid: int | None = None
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    def submit(self, row: dict) -> bool:
+        """Queue one PageView row; False if it was dropped because the queue is full."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self._counts["dropped"] += 1
+            return False
+        return True
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            "written": counts.get("written", 0),
+            "batches": counts.get("batches", 0),
+            "dropped": counts.get("dropped", 0),
+            "failed": counts.get("failed", 0),
+            "queued": self._queue.qsize(),
+        }
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write everything queued, then stop the flusher thread."""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid():
+            return
+        self._stopping.set()
+        try:
+            self._queue.put_nowait(None)  # wake a flusher blocked on an empty queue
+        except queue.Full:
+            pass  # not empty, so not blocked
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning("page view writer still busy after %.1fs; %d rows unwritten", timeout, self._queue.qsize())
+        self._thread = None
+
+    def _ensure_started(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None:
+                return
+            if self._pid is not None and self._pid != pid:
+                # Forked from a process that already buffered rows: those are
+                # the parent's to write, and its flusher thread did not survive.
+                self._queue = queue.Queue(maxsize=self._max_queue)
+                self._counts = Counter()
+            self._pid = pid
+            self._stopping = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="page-view-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+            elif self._stopping.is_set():
+                return
+            self._log_losses()
+
+    def _next_batch(self) -> list[dict]:
+        batch: list[dict] = []
+        deadline = None
+        while len(batch) < self._batch_size:
+            if self._stopping.is_set():
+                try:
+                    row = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                wait = self._flush_interval if deadline is None else deadline - time.monotonic()
+                if wait <= 0:
+                    break
+                try:
+                    row = self._queue.get(timeout=wait)
+                except queue.Empty:
+                    break
+                if deadline is None:
+                    deadline = time.monotonic() + self._flush_interval
+            if row is not None:
+                batch.append(row)
+        return batch
+
+    def _write(self, batch: list[dict]) -> None:
+        if self._on_batch is not None:
+            try:
+                self._on_batch(batch)
+            except Exception:
+                logger.exception("page view on_batch hook failed")
+        try:
+            with self._session_factory() as session:
+                session.execute(self._get_model().__table__.insert(), batch)
+                session.commit()
+        except Exception:
+            with self._lock:
+                self._counts["failed"] += len(batch)
+            logger.exception("page view batch insert failed (%d rows)", len(batch))
+            return
+        with self._lock:
+            self._counts["written"] += len(batch)
+            self._counts["batches"] += 1
+
+    def _log_losses(self) -> None:
+        now = time.monotonic()
+        if now - self._logged_at < _LOSS_LOG_SECONDS:
+            return
+        with self._lock:
+            losses = self._counts["dropped"] + self._counts["failed"]
+            counts = dict(self._counts)
+        if losses > self._logged_losses:
+            logger.warning(
+                "page view writer: %d dropped (queue full), %d failed, %d written so far",
+                counts.get("dropped", 0),
+                counts.get("failed", 0),
+                counts.get("written", 0),
+            )
+            self._logged_losses = losses
+        self._logged_at = now
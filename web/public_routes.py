@@ -8,7 +8,7 @@ from itertools import groupby as _groupby
 from types import SimpleNamespace
 from typing import Any, Callable
 
-from flask import abort, jsonify, make_response, request
+from flask import abort, jsonify, make_response, request, stream_with_context
 from sqlalchemy import case, func, or_
 
 from db.game_status import (
@@ -23,6 +23,8 @@ from web.live_game_data import (
     fetch_live_game_detail,
     fetch_live_scoreboard_map,
 )
+from web.live_game_stream import LiveGameHub, build_live_game_state, live_stream_enabled
+from web.live_scoreboard import LiveScoreboard, build_live_games_payload
 
 
 _COMPARE_EMPTY_MARK = "—"
@@ -496,6 +498,7 @@ def register_public_routes(
     get_localized_url_for: Callable[..., str],
     get_t: Callable[[str, str | None], str],
     get_pct_fmt: Callable[[Any], str],
+    get_prime_slug_caches: Callable[..., None],
     get_cached_game_metrics_payload: Callable[[str], dict | None] | None = None,
     get_load_game_metrics_payload: Callable[[str], dict] | None = None,
 ):
@@ -2394,6 +2397,7 @@ def register_public_routes(
             future_date_groups = [(dt, entries) for dt, entries in date_groups if dt is not None and dt > today]
             past_date_groups = [(dt, entries) for dt, entries in date_groups if dt is None or dt <= today]
             future_games_count = sum(len(entries) for _, entries in future_date_groups)
+            get_prime_slug_caches()(game_ids=[entry.game_id for entry in paginated])
 
             team_lookup_rows = session.query(Team).all()
             team_lookup = {team.team_id: team for team in team_lookup_rows if getattr(team, "team_id", None)}
@@ -3225,6 +3229,10 @@ def register_public_routes(
         if selected_season and len(str(selected_season)) == 5 and str(selected_season).isdigit():
             season_year = str(selected_season)[1:]
 
+        get_prime_slug_caches()(
+            player_ids=[p["player_id"] for team in teams_with_players for p in team["players"]],
+            team_ids=[team["team_id"] for team in teams_with_players],
+        )
         t = get_t()
         render_template = get_render_template()
         return render_template(
@@ -3236,80 +3244,79 @@ def register_public_routes(
             season_ids=season_ids,
         )
 
+    # One nba_api round per refresh interval, shared by every poller; the
+    # lambda keeps the fetchers patchable in tests.
+    live_scoreboard = LiveScoreboard(lambda: build_live_games_payload(fetch_live_scoreboard_map, fetch_live_card))
+
     def api_games_live():
-        scoreboard = fetch_live_scoreboard_map()
-        games = []
-        for game_id, snapshot in scoreboard.items():
-            entry = dict(snapshot)
-            if snapshot.get("status") == GAME_STATUS_LIVE:
-                card = fetch_live_card(game_id)
-                if card:
-                    entry.update({
-                        "home_fg_pct": card.get("home_fg_pct"),
-                        "road_fg_pct": card.get("road_fg_pct"),
-                        "home_fg3_pct": card.get("home_fg3_pct"),
-                        "road_fg3_pct": card.get("road_fg3_pct"),
-                        "home_scorer": card.get("home_scorer"),
-                        "road_scorer": card.get("road_scorer"),
-                        "home_rebounder": card.get("home_rebounder"),
-                        "road_rebounder": card.get("road_rebounder"),
-                        "home_assister": card.get("home_assister"),
-                        "road_assister": card.get("road_assister"),
-                        "home_win_probability": card.get("home_win_probability"),
-                        "road_win_probability": card.get("road_win_probability"),
-                        "hot_player_ids": card.get("hot_player_ids", []),
-                    })
-            games.append(entry)
-        return jsonify({"games": games})
+        snapshot = live_scoreboard.snapshot()
+        if snapshot is None:
+            return jsonify({"games": []})
+        response = app.response_class(snapshot.body, mimetype="application/json")
+        response.set_etag(snapshot.etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
+
+    # Per-game live state, coalesced like the scoreboard and shared by the
+    # polling endpoint and the SSE stream.
+    live_games = LiveGameHub(lambda game_id: build_live_game_state(game_id, fetch_live_game_detail, fetch_live_card))
+
+    def _decorate_live_player_rows(rows: list[dict]) -> None:
+        from web.app import _player_url, _is_zh, _display_player_name  # lazy to avoid circular import
+        for row in rows:
+            pid = row.get("player_id")
+            if pid:
+                row["player_url"] = _player_url(pid)
+        # Localize player names to Chinese when applicable.
+        if not _is_zh():
+            return
+        pids = {str(row["player_id"]) for row in rows if row.get("player_id")}
+        if not pids:
+            return
+        _SessionLocal = get_session_local()
+        _Player = get_player_model()
+        with _SessionLocal() as sess:
+            db_players = sess.query(_Player).filter(_Player.player_id.in_(pids)).all()
+            name_map = {str(p.player_id): _display_player_name(p) for p in db_players}
+        for row in rows:
+            zh = name_map.get(str(row.get("player_id") or ""))
+            if zh:
+                row["player_name"] = zh
 
     def api_game_live(game_id: str):
-        payload = fetch_live_game_detail(game_id)
+        # The cached live_card (leaders, WP, hot player ids, shooting
+        # percentages) is merged in, so the game-page live panel can update
+        # in the same round-trip as the scoreboard.
+        payload = live_games.state(game_id)
         if payload is None:
             return jsonify({"ok": False, "game_id": game_id, "error": "live_data_unavailable"}), 503
-        from web.app import _player_url, _is_zh, _display_player_name  # lazy to avoid circular import
-        for rows in (payload.get("players_by_team") or {}).values():
-            for row in rows:
-                pid = row.get("player_id")
-                if pid:
-                    row["player_url"] = _player_url(pid)
-        # Localize player names to Chinese when applicable.
-        if _is_zh():
-            pids = set()
-            for rows in (payload.get("players_by_team") or {}).values():
-                for row in rows:
-                    if row.get("player_id"):
-                        pids.add(str(row["player_id"]))
-            if pids:
-                _SessionLocal = get_session_local()
-                _Player = get_player_model()
-                with _SessionLocal() as sess:
-                    db_players = sess.query(_Player).filter(_Player.player_id.in_(pids)).all()
-                    name_map = {str(p.player_id): _display_player_name(p) for p in db_players}
-                for rows in (payload.get("players_by_team") or {}).values():
-                    for row in rows:
-                        zh = name_map.get(str(row.get("player_id") or ""))
-                        if zh:
-                            row["player_name"] = zh
-        # Also merge in the cached live_card (leaders, WP, hot player ids,
-        # shooting percentages) so the game-page live panel can update in
-        # the same round-trip as the scoreboard.
-        try:
-            card = fetch_live_card(game_id)
-        except Exception:
-            card = None
-        if card:
-            for key in (
-                "home_scorer", "road_scorer",
-                "home_rebounder", "road_rebounder",
-                "home_assister", "road_assister",
-                "home_fg_pct", "road_fg_pct",
-                "home_fg3_pct", "road_fg3_pct",
-                "home_win_probability", "road_win_probability",
-                "hot_player_ids",
-            ):
-                payload[key] = card.get(key)
+        _decorate_live_player_rows([row for rows in (payload.get("players_by_team") or {}).values() for row in rows])
         return jsonify({"ok": True, **payload})
 
+    def api_game_live_stream(game_id: str):
+        if not live_stream_enabled():
+            abort(404)
+        from web.app import _is_zh  # lazy to avoid circular import
+
+        def _decorate(kind: str, payload: dict) -> dict:
+            if kind == "snapshot":
+                teams = (payload.get("players_by_team") or {}).values()
+            else:
+                teams = [entry.get("rows") or [] for entry in (payload.get("players") or {}).values()]
+            _decorate_live_player_rows([row for rows in teams for row in rows])
+            return payload
+
+        events = live_games.stream(
+            game_id,
+            request.headers.get("Last-Event-ID") or request.args.get("last_event_id"),
+            lang="zh" if _is_zh() else "en",
+            decorate=_decorate,
+        )
+        response = app.response_class(stream_with_context(events), mimetype="text/event-stream")
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
     app.add_url_rule("/cn/", endpoint="home_zh", view_func=home)
     app.add_url_rule("/", endpoint="home", view_func=home)
     app.add_url_rule("/api/home/feed", endpoint="home_feed_more", view_func=home_feed_more)
@@ -3328,6 +3335,7 @@ def register_public_routes(
     app.add_url_rule("/players", endpoint="players_browse", view_func=players_browse)
     app.add_url_rule("/api/games/live", endpoint="api_games_live", view_func=api_games_live)
     app.add_url_rule("/api/games/<game_id>/live", endpoint="api_game_live", view_func=api_game_live)
+    app.add_url_rule("/api/games/<game_id>/live/stream", endpoint="api_game_live_stream", view_func=api_game_live_stream)
     app.add_url_rule("/cn/players/compare", endpoint="players_compare_zh", view_func=players_compare)
     app.add_url_rule("/players/compare", endpoint="players_compare", view_func=players_compare)
     app.add_url_rule("/cn/draft/<int:year>", endpoint="draft_page_zh", view_func=draft_page)
@@ -3341,6 +3349,7 @@ def register_public_routes(
         players_browse=players_browse,
         api_games_live=api_games_live,
         api_game_live=api_game_live,
+        api_game_live_stream=api_game_live_stream,
         player_hints_api=player_hints_api,
         players_compare=players_compare,
         draft_page=draft_page,